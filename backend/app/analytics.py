@@ -0,0 +1,305 @@
+"""
+Optional in-memory columnar engine for keyword/time aggregations.
+
+paper_keywords is held as parallel NumPy arrays ordered by publication
+time, next to cumulative paper counts per keyword and day. The counts of
+any [start, end) window are two prefix lookups per keyword for the whole
+days, plus one np.bincount over the links of the partial days at the edges.
+Links of newly ingested papers are appended after each ingest commit (or on
+the next query); any other change to paper_keywords bumps the
+links_version counter and triggers a full reload. Enabled with
+settings.analytics_engine.
+"""
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from functools import cached_property
+from datetime import date, datetime, timedelta, timezone
+from itertools import chain
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import BigInteger, Integer, cast, func, select
+from sqlalchemy.orm import Session
+
+from . import counters, models
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(2000, 1, 1, tzinfo=timezone.utc)
+EPOCH_SECONDS = int(EPOCH.timestamp())
+FIRST_WEEK = date(1999, 12, 28)  # EPOCH直前の週の初日（火曜、トレンドAPIの週ラベルと同じ）
+DAY_SECONDS = 24 * 3600
+WEEK_SECONDS = 7 * DAY_SECONDS
+WEEK_OFFSET = (EPOCH.date() - FIRST_WEEK).days * DAY_SECONDS
+# 日次インデックスのキーは keyword_id * DAY_SPAN + 日番号（EPOCHの前後約89年を表せる）
+DAY_SPAN = 1 << 16
+DAY_OFFSET = 1 << 15
+LOAD_BATCH_SIZE = 100_000
+SQL_ID_CHUNK_SIZE = 500
+
+
+def _seconds(dt: datetime) -> np.int32:
+    """Window bound in seconds since EPOCH; links store whole seconds, so bounds are rounded up.
+
+    The bound has the dtype of the seconds column: searchsorted with a Python
+    int would first convert the whole column.
+    """
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return np.int32(math.ceil((dt - EPOCH).total_seconds()))
+
+
+def _published_seconds(db: Session):
+    published_at = models.PaperKeyword.published_at
+    if db.get_bind().dialect.name == 'postgresql':
+        return cast(func.floor(func.extract('epoch', published_at)), BigInteger) - EPOCH_SECONDS
+    return cast(func.strftime('%s', published_at), Integer) - EPOCH_SECONDS
+
+
+def _day_keys(seconds: np.ndarray, keyword_ids: np.ndarray) -> np.ndarray:
+    return keyword_ids.astype(np.int64) * DAY_SPAN + (seconds.astype(np.int64) // DAY_SECONDS + DAY_OFFSET)
+
+
+@dataclass(frozen=True)
+class DailyCounts:
+    """Cumulative link counts per keyword and day.
+
+    Only the (keyword, day) pairs that have links are stored, in keyword-major
+    order, so totals[i] (the links of all keys before keys[i]) doubles as the
+    running count of each keyword up to a day.
+    """
+    keys: np.ndarray  # int64, keyword_id * DAY_SPAN + day, sorted and unique
+    totals: np.ndarray  # int64, len(keys) + 1 exclusive prefix sums
+
+    @classmethod
+    def build(cls, seconds: np.ndarray, keyword_ids: np.ndarray) -> 'DailyCounts':
+        keys, counts = np.unique(_day_keys(seconds, keyword_ids), return_counts=True)
+        return cls(keys, _prefix(counts))
+
+    def merge(self, seconds: np.ndarray, keyword_ids: np.ndarray) -> 'DailyCounts':
+        """Add links in O(stored pairs); new papers mostly land on a few recent days"""
+        new_keys, new_counts = np.unique(_day_keys(seconds, keyword_ids), return_counts=True)
+        counts = np.diff(self.totals)
+        positions = np.searchsorted(self.keys, new_keys)
+        found = positions < len(self.keys)
+        found[found] = self.keys[positions[found]] == new_keys[found]
+        counts[positions[found]] += new_counts[found]
+        keys = np.insert(self.keys, positions[~found], new_keys[~found])
+        counts = np.insert(counts, positions[~found], new_counts[~found])
+        return DailyCounts(keys, _prefix(counts))
+
+    def counts(self, first_day: int, last_day: int, size: int) -> np.ndarray:
+        """Links per keyword id on days [first_day, last_day), days counted from EPOCH"""
+        base = np.arange(size, dtype=np.int64) * DAY_SPAN + DAY_OFFSET
+        lo = np.searchsorted(self.keys, base + first_day)
+        hi = np.searchsorted(self.keys, base + last_day)
+        return self.totals[hi] - self.totals[lo]
+
+
+def _prefix(counts: np.ndarray) -> np.ndarray:
+    totals = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=totals[1:])
+    return totals
+
+
+@dataclass(frozen=True)
+class LinkColumns:
+    """One immutable snapshot of paper_keywords, sorted by publication time"""
+    seconds: np.ndarray  # int32, seconds since EPOCH
+    keyword_ids: np.ndarray  # intp, the index type np.bincount works in
+    paper_ids: np.ndarray  # int32
+    weeks: np.ndarray  # int16, weeks since FIRST_WEEK
+    daily: DailyCounts
+    version: int  # links_version the snapshot was loaded at
+    max_paper_id: int  # Papers up to this id are included
+    size: int  # 1 + largest keyword id, the bincount length
+
+    def keyword_counts(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> np.ndarray:
+        """Papers per keyword id published in [start, end); the cost does not depend on the window length"""
+        if not len(self.seconds):
+            return np.zeros(self.size, dtype=np.int64)
+        lo = _seconds(start) if start is not None else self.seconds[0]
+        hi = _seconds(end) if end is not None else self.seconds[-1] + 1
+        # 丸一日の範囲は日次の累積件数から、端の半端な時間は時刻順の列から数える
+        first_day = -(-int(lo) // DAY_SECONDS)
+        last_day = int(hi) // DAY_SECONDS
+        if first_day >= last_day:
+            return self._slice_counts(lo, hi)
+        counts = self.daily.counts(first_day, last_day, self.size)
+        counts += self._slice_counts(lo, np.int32(first_day * DAY_SECONDS))
+        counts += self._slice_counts(np.int32(last_day * DAY_SECONDS), hi)
+        return counts
+
+    def _slice_counts(self, lo: np.int32, hi: np.int32) -> np.ndarray:
+        window = slice(int(np.searchsorted(self.seconds, lo, 'left')), int(np.searchsorted(self.seconds, hi, 'left')))
+        return np.bincount(self.keyword_ids[window], minlength=self.size).astype(np.int64)
+
+    @cached_property
+    def by_keyword(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(offsets, seconds, weeks) with the links of each keyword contiguous and in time order, built on first use"""
+        order = np.argsort(self.keyword_ids, kind='stable')
+        offsets = np.zeros(self.size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.keyword_ids, minlength=self.size), out=offsets[1:])
+        return offsets, self.seconds[order], self.weeks[order]
+
+
+def _build(rows: np.ndarray, version: int, max_paper_id: int) -> LinkColumns:
+    order = np.argsort(rows[:, 0], kind='stable')
+    rows = rows[order]
+    return LinkColumns(
+        seconds=rows[:, 0].astype(np.int32),
+        keyword_ids=rows[:, 1].astype(np.intp),
+        paper_ids=rows[:, 2].astype(np.int32),
+        weeks=((rows[:, 0] + WEEK_OFFSET) // WEEK_SECONDS).astype(np.int16),
+        daily=DailyCounts.build(rows[:, 0], rows[:, 1]),
+        version=version,
+        max_paper_id=max_paper_id,
+        size=int(rows[:, 1].max()) + 1 if len(rows) else 1
+    )
+
+
+def _append(columns: LinkColumns, rows: np.ndarray, version: int, max_paper_id: int) -> LinkColumns:
+    added = _build(rows, version, max_paper_id)
+    if len(added.seconds) and len(columns.seconds) and added.seconds[0] < columns.seconds[-1]:
+        # 古い日付の論文（過去期間の取り込み）が含まれるときは全体を並べ直す
+        existing = np.stack([columns.seconds, columns.keyword_ids, columns.paper_ids], axis=1).astype(np.int64)
+        return _build(np.concatenate([existing, rows]), version, max_paper_id)
+    return LinkColumns(
+        seconds=np.concatenate([columns.seconds, added.seconds]),
+        keyword_ids=np.concatenate([columns.keyword_ids, added.keyword_ids]),
+        paper_ids=np.concatenate([columns.paper_ids, added.paper_ids]),
+        weeks=np.concatenate([columns.weeks, added.weeks]),
+        daily=columns.daily.merge(added.seconds, added.keyword_ids),
+        version=version,
+        max_paper_id=max_paper_id,
+        size=max(columns.size, added.size)
+    )
+
+
+class KeywordAnalytics:
+    """Process-wide columnar copy of paper_keywords with vectorized aggregations"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._columns: Optional[LinkColumns] = None
+
+    def refresh(self, db: Session) -> LinkColumns:
+        """Return a snapshot that reflects the database, loading only what changed"""
+        version = counters.get_counter(db, counters.LINKS_VERSION)
+        max_paper_id = db.query(func.max(models.Paper.id)).scalar() or 0
+        columns = self._columns
+        if columns is not None and columns.version == version and columns.max_paper_id == max_paper_id:
+            return columns
+
+        with self._lock:
+            columns = self._columns
+            start_time = time.time()
+            if columns is None or columns.version != version or columns.max_paper_id > max_paper_id:
+                columns = _build(self._load(db, 0, max_paper_id), version, max_paper_id)
+                logger.info(f"Loaded {len(columns.seconds)} keyword links in {time.time() - start_time:.2f} seconds.")
+            elif columns.max_paper_id < max_paper_id:
+                added = self._load(db, columns.max_paper_id, max_paper_id)
+                columns = _append(columns, added, version, max_paper_id)
+                logger.info(f"Appended {len(added)} keyword links in {time.time() - start_time:.2f} seconds.")
+            self._columns = columns
+        return columns
+
+    def clear(self) -> None:
+        with self._lock:
+            self._columns = None
+
+    def _load(self, db: Session, after_paper_id: int, max_paper_id: int) -> np.ndarray:
+        """(seconds, keyword_id, paper_id) rows of the links of papers in (after_paper_id, max_paper_id]"""
+        result = db.execute(
+            select(_published_seconds(db), models.PaperKeyword.keyword_id, models.PaperKeyword.paper_id)
+            .where(models.PaperKeyword.paper_id > after_paper_id, models.PaperKeyword.paper_id <= max_paper_id)
+            .execution_options(yield_per=LOAD_BATCH_SIZE)
+        )
+        # Rowからnp.arrayを直接作ると遅いため、平坦化してfromiterで読む
+        batches = [np.fromiter(chain.from_iterable(batch), dtype=np.int64).reshape(-1, 3) for batch in result.partitions()]
+        return np.concatenate(batches) if batches else np.empty((0, 3), dtype=np.int64)
+
+    def top_keywords(
+        self,
+        db: Session,
+        start: Optional[datetime],
+        end: Optional[datetime] = None,
+        limit: int = 100,
+        min_count: int = 1
+    ) -> list[tuple[str, int]]:
+        """(name, count) of the keywords with the most papers in [start, end), most first"""
+        counts = self.refresh(db).keyword_counts(start, end)
+        ids = np.flatnonzero(counts >= max(min_count, 1))
+        top = ids[np.lexsort((ids, -counts[ids]))][:limit]
+        names = _keyword_names(db, top)
+        return [(names[keyword_id], int(counts[keyword_id])) for keyword_id in top.tolist() if keyword_id in names]
+
+    def growth_ranking(
+        self,
+        db: Session,
+        recent_start: datetime,
+        previous_start: datetime,
+        limit: int,
+        min_recent: int = 2
+    ) -> list[tuple[str, int, int]]:
+        """(name, recent_count, previous_count) ranked by growth, then recent count.
+
+        recent counts papers published from recent_start on, previous those
+        in [previous_start, recent_start).
+        """
+        columns = self.refresh(db)
+        recent = columns.keyword_counts(recent_start)
+        previous = columns.keyword_counts(previous_start, recent_start)
+        ids = np.flatnonzero(recent >= min_recent)
+        growth = recent[ids] - previous[ids]
+        top = ids[np.lexsort((ids, -recent[ids], -growth))][:limit]
+        names = _keyword_names(db, top)
+        return [
+            (names[keyword_id], int(recent[keyword_id]), int(previous[keyword_id]))
+            for keyword_id in top.tolist() if keyword_id in names
+        ]
+
+    def weekly_counts(
+        self,
+        db: Session,
+        keyword_ids: list[int],
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> dict[int, dict[date, int]]:
+        """{keyword_id: {week_start: count}} for papers published in [start, end), weeks without papers omitted"""
+        columns = self.refresh(db)
+        offsets, seconds, weeks = columns.by_keyword
+        series: dict[int, dict[date, int]] = {}
+        for keyword_id in keyword_ids:
+            if not 0 <= keyword_id < columns.size:
+                continue
+            lo, hi = int(offsets[keyword_id]), int(offsets[keyword_id + 1])
+            if end is not None:
+                hi = lo + int(np.searchsorted(seconds[lo:hi], _seconds(end), 'left'))
+            if start is not None:
+                lo += int(np.searchsorted(seconds[lo:hi], _seconds(start), 'left'))
+            if lo >= hi:
+                continue
+            first = int(weeks[lo])
+            counts = np.bincount(weeks[lo:hi] - first)
+            offsets_nonzero = np.flatnonzero(counts)
+            series[keyword_id] = {
+                FIRST_WEEK + timedelta(weeks=first + offset): count
+                for offset, count in zip(offsets_nonzero.tolist(), counts[offsets_nonzero].tolist())
+            }
+        return series
+
+
+def _keyword_names(db: Session, keyword_ids: np.ndarray) -> dict[int, str]:
+    ids = keyword_ids.tolist()
+    names: dict[int, str] = {}
+    for i in range(0, len(ids), SQL_ID_CHUNK_SIZE):
+        names.update(db.query(models.Keyword.id, models.Keyword.name).filter(models.Keyword.id.in_(ids[i:i + SQL_ID_CHUNK_SIZE])))
+    return names
+
+
+# プロセス内で共有するエンジン
+keyword_analytics = KeywordAnalytics()
@@ -0,0 +1,181 @@
+"""
+Batched, cached arXiv category lookup
+"""
+import logging
+import re
+import threading
+import time
+from collections import deque
+import xml.etree.ElementTree as ET
+from typing import Callable, Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+ATOM_NAMESPACES = {
+    'atom': 'http://www.w3.org/2005/Atom',
+    'arxiv': 'http://arxiv.org/schemas/atom'
+}
+
+_VERSION_SUFFIX = re.compile(r'v\d+$')
+
+_http_session: Optional[requests.Session] = None
+_http_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """Get the shared, connection-pooled HTTP session for the arXiv API"""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _http_session = session
+        return _http_session
+
+
+def normalize_arxiv_id(arxiv_id: str) -> str:
+    """Strip the abs URL prefix and version suffix from an arXiv ID"""
+    arxiv_id = arxiv_id.strip()
+    if '/abs/' in arxiv_id:
+        arxiv_id = arxiv_id.split('/abs/', 1)[1]
+    return _VERSION_SUFFIX.sub('', arxiv_id)
+
+
+class ArxivApiError(ValueError):
+    """The arXiv API answered with an error feed (e.g. a malformed ID in id_list)"""
+
+
+def parse_category_feed(content: bytes) -> dict[str, list[str]]:
+    """Parse an arXiv Atom feed into {version-less arXiv ID: category terms}
+
+    Raises ArxivApiError for an error feed, which the API returns with HTTP 200.
+    """
+    root = ET.fromstring(content)
+    results = {}
+    for entry in root.findall('atom:entry', ATOM_NAMESPACES):
+        entry_id = entry.findtext('atom:id', default='', namespaces=ATOM_NAMESPACES)
+        if not entry_id:
+            continue
+        if '/api/errors' in entry_id:
+            raise ArxivApiError(entry.findtext('atom:summary', default=entry_id, namespaces=ATOM_NAMESPACES))
+        categories = []
+        for category in entry.findall('atom:category', ATOM_NAMESPACES):
+            term = category.get('term')
+            if term and term not in categories:
+                categories.append(term)
+        results[normalize_arxiv_id(entry_id)] = categories
+    return results
+
+
+class ArxivCategoryResolver:
+    """Resolve arXiv categories for many papers at once.
+
+    Uncached IDs are sent to the arXiv API in ``id_list`` batches over the
+    shared HTTP session, spaced by ``settings.arxiv_api_delay_seconds``.
+    Every ID answered by a successful response is added to
+    ``arxiv_category_cache`` (the caller commits) so it is never looked up
+    again, including IDs the response did not contain an entry for. A batch
+    answered with an error feed is retried one ID at a time, and IDs that
+    still fail are not cached.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        base_url: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        delay_seconds: Optional[float] = None,
+        timeout: Optional[float] = None,
+        http_session: Optional[requests.Session] = None,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.db = db
+        self.base_url = base_url or settings.arxiv_api_url
+        self.batch_size = max(1, batch_size or settings.arxiv_category_batch_size)
+        self.delay_seconds = settings.arxiv_api_delay_seconds if delay_seconds is None else delay_seconds
+        self.timeout = timeout or settings.arxiv_api_timeout
+        self.http_session = http_session or get_http_session()
+        self._sleep = sleep
+        self._last_request_at: Optional[float] = None
+
+    def resolve(self, arxiv_ids: Iterable[str]) -> dict[str, list[str]]:
+        """Return {arxiv_id as given: category terms} for all requested IDs"""
+        requested = {arxiv_id: normalize_arxiv_id(arxiv_id) for arxiv_id in arxiv_ids if arxiv_id}
+        unique_ids = list(dict.fromkeys(requested.values()))
+
+        categories_by_id = self._load_cached(unique_ids)
+        missing = [arxiv_id for arxiv_id in unique_ids if arxiv_id not in categories_by_id]
+        if missing:
+            logger.info(f"Resolving categories for {len(missing)} uncached arXiv IDs "
+                        f"({len(unique_ids) - len(missing)} cached)")
+
+        batches = deque(missing[i:i + self.batch_size] for i in range(0, len(missing), self.batch_size))
+        while batches:
+            batch = batches.popleft()
+            try:
+                fetched = self._fetch_batch(batch)
+            except ArxivApiError as e:
+                if len(batch) > 1:
+                    # 1件の不正なIDでバッチ全体がエラーになるので、1件ずつ問い合わせ直す
+                    logger.warning(f"arXiv API error for a batch of {len(batch)} IDs, retrying one by one: {e}")
+                    batches.extendleft([arxiv_id] for arxiv_id in reversed(batch))
+                else:
+                    logger.warning(f"arXiv API error for {batch[0]}: {e}")
+                continue
+            except (requests.exceptions.RequestException, ET.ParseError) as e:
+                # 失敗したバッチはキャッシュせず、次回の実行で再取得する
+                logger.warning(f"Failed to get categories for {len(batch)} arXiv IDs: {e}")
+                continue
+
+            resolved = {arxiv_id: fetched.get(arxiv_id, []) for arxiv_id in batch}
+            self._store(resolved)
+            categories_by_id.update(resolved)
+
+        return {original: categories_by_id.get(normalized, []) for original, normalized in requested.items()}
+
+    def _load_cached(self, arxiv_ids: list[str]) -> dict[str, list[str]]:
+        cached = {}
+        for i in range(0, len(arxiv_ids), self.batch_size):
+            rows = (
+                self.db.query(models.ArxivCategoryCache.arxiv_id, models.ArxivCategoryCache.categories)
+                .filter(models.ArxivCategoryCache.arxiv_id.in_(arxiv_ids[i:i + self.batch_size]))
+                .all()
+            )
+            cached.update({row.arxiv_id: row.categories for row in rows})
+        return cached
+
+    def _store(self, resolved: dict[str, list[str]]) -> None:
+        self.db.add_all(
+            models.ArxivCategoryCache(arxiv_id=arxiv_id, categories=categories)
+            for arxiv_id, categories in resolved.items()
+        )
+        self.db.flush()
+
+    def _wait_for_rate_limit(self) -> None:
+        if self._last_request_at is None or self.delay_seconds <= 0:
+            return
+        remaining = self.delay_seconds - (time.monotonic() - self._last_request_at)
+        if remaining > 0:
+            self._sleep(remaining)
+
+    def _fetch_batch(self, arxiv_ids: list[str]) -> dict[str, list[str]]:
+        self._wait_for_rate_limit()
+        try:
+            response = self.http_session.get(
+                self.base_url,
+                params={'id_list': ','.join(arxiv_ids), 'max_results': len(arxiv_ids)},
+                timeout=self.timeout
+            )
+        finally:
+            self._last_request_at = time.monotonic()
+        response.raise_for_status()
+        return parse_category_feed(response.content)
@@ -0,0 +1,253 @@
+"""
+Streaming discovery of candidate keywords: bounded-memory n-gram heavy hitters per month
+"""
+import logging
+import re
+from collections import defaultdict
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from . import models, schemas
+from .config import settings
+from .services import STOP_WORDS
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+PHRASE_BREAK_PATTERN = re.compile(r"[.,;:!?()\[\]{}\"]")
+SQL_TERM_CHUNK_SIZE = 500
+
+
+def extract_ngrams(text: str, min_n: int = 2, max_n: Optional[int] = None) -> set[str]:
+    """Return the distinct lowercase n-grams of text.
+
+    N-grams do not cross punctuation, and the ones that start or end with a
+    stop word or contain a bare number are skipped.
+    """
+    max_n = max_n or settings.candidate_keyword_max_ngram
+    ngrams = set()
+    for fragment in PHRASE_BREAK_PATTERN.split(text.lower()):
+        tokens = TOKEN_PATTERN.findall(fragment)
+        digits = [token.isdigit() for token in tokens]
+        edges = [not is_digit and token not in STOP_WORDS for token, is_digit in zip(tokens, digits)]
+        for i, first_ok in enumerate(edges):
+            if not first_ok:
+                continue
+            for j in range(i, min(i + max_n, len(tokens))):
+                if edges[j] and j - i + 1 >= min_n:
+                    ngrams.add(' '.join(tokens[i:j + 1]))
+                if digits[j]:
+                    break  # 数字を含むより長いn-gramも対象外
+    return ngrams
+
+
+class SpaceSaving:
+    """Space-Saving heavy-hitter summary with at most ``capacity`` counters.
+
+    A tracked term's count overestimates its true frequency by at most its
+    error, and an untracked term occurred at most ``min_count`` times.
+    Terms are kept in buckets by count, so updates and evictions are O(1).
+    ``changed`` and ``evicted`` record what to write back to the database;
+    both are bounded by the capacity, since only terms loaded from
+    ``entries`` are reported as evicted.
+    """
+
+    def __init__(self, capacity: int, entries: Iterable[tuple[str, int, int]] = ()):
+        self.capacity = capacity
+        self.counts: dict[str, int] = {}
+        self.errors: dict[str, int] = {}
+        self._buckets: dict[int, set[str]] = defaultdict(set)
+        self.changed: set[str] = set()
+        self.evicted: set[str] = set()
+        for term, count, error in entries:
+            self.counts[term] = count
+            self.errors[term] = error
+            self._buckets[count].add(term)
+        self._stored = set(self.counts)
+        self._min = min(self._buckets) if self._buckets else 0
+
+    @property
+    def min_count(self) -> int:
+        """Upper bound for the count of any untracked term"""
+        return self._min if len(self.counts) >= self.capacity else 0
+
+    def add(self, term: str) -> None:
+        count = self.counts.get(term)
+        if count is not None:
+            self._discard(term, count)
+        elif len(self.counts) < self.capacity:
+            count = 0
+            self.errors[term] = 0
+        else:
+            # 最小のカウンタを奪い、そのカウントを誤差として引き継ぐ
+            count = self._min
+            bucket = self._buckets[count]
+            victim = bucket.pop()  # set.popは前回の位置から探すため、削除が続いても償却O(1)
+            if not bucket:
+                del self._buckets[count]
+            del self.counts[victim], self.errors[victim]
+            self.changed.discard(victim)
+            if victim in self._stored:
+                self.evicted.add(victim)
+            self.errors[term] = count
+
+        self.counts[term] = count + 1
+        self._buckets[count + 1].add(term)
+        self.changed.add(term)
+        if count == 0:
+            self._min = 1
+        elif count == self._min and count not in self._buckets:
+            self._min = count + 1
+
+    def mark_saved(self) -> None:
+        self._stored = set(self.counts)
+        self.changed.clear()
+        self.evicted.clear()
+
+    def _discard(self, term: str, count: int) -> None:
+        bucket = self._buckets[count]
+        bucket.discard(term)
+        if not bucket:
+            del self._buckets[count]
+
+
+class CandidateTermCounter:
+    """Feed paper titles and abstracts into one persisted Space-Saving summary per publication month.
+
+    Each update loads the summaries of the months it touches, counts every
+    distinct n-gram once per paper and writes back only the counters that
+    changed, inside the caller's transaction.
+    """
+
+    def __init__(self, capacity: Optional[int] = None):
+        self.capacity = capacity or settings.candidate_keyword_capacity
+
+    def update(self, db: Session, records: Iterable[dict[str, Any]]) -> None:
+        """Count records carrying ``title``, ``summary`` and ``published_at``"""
+        texts_by_period: dict[str, list[str]] = defaultdict(list)
+        for record in records:
+            texts_by_period[record['published_at'].strftime('%Y-%m')].append(f"{record['title']}. {record['summary']}")
+
+        for period, texts in texts_by_period.items():
+            summary = self.load(db, period)
+            for text in texts:
+                for ngram in extract_ngrams(text):
+                    summary.add(ngram)
+            self.save(db, period, summary)
+
+    def load(self, db: Session, period: str) -> SpaceSaving:
+        rows = (
+            db.query(models.CandidateTermCount.term, models.CandidateTermCount.count, models.CandidateTermCount.error)
+            .filter(models.CandidateTermCount.period == period)
+            .all()
+        )
+        return SpaceSaving(self.capacity, rows)
+
+    def save(self, db: Session, period: str, summary: SpaceSaving) -> None:
+        stale_terms = list(summary.changed | summary.evicted)
+        for i in range(0, len(stale_terms), SQL_TERM_CHUNK_SIZE):
+            db.query(models.CandidateTermCount).filter(
+                models.CandidateTermCount.period == period,
+                models.CandidateTermCount.term.in_(stale_terms[i:i + SQL_TERM_CHUNK_SIZE])
+            ).delete(synchronize_session=False)
+        if summary.changed:
+            db.execute(insert(models.CandidateTermCount), [
+                {'period': period, 'term': term, 'count': summary.counts[term], 'error': summary.errors[term]}
+                for term in summary.changed
+            ])
+        summary.mark_saved()
+
+
+def _period_bounds(db: Session, periods: list[str]) -> dict[str, int]:
+    """Upper bound for the count of a term that is not tracked in each period"""
+    rows = (
+        db.query(
+            models.CandidateTermCount.period,
+            func.min(models.CandidateTermCount.count),
+            func.count(models.CandidateTermCount.term)
+        )
+        .filter(models.CandidateTermCount.period.in_(periods))
+        .group_by(models.CandidateTermCount.period)
+        .all()
+    )
+    return {period: min_count if tracked >= settings.candidate_keyword_capacity else 0 for period, min_count, tracked in rows}
+
+
+def get_candidate_keywords(
+    db: Session,
+    limit: int = 20,
+    months: int = 1,
+    min_count: Optional[int] = None
+) -> schemas.CandidateKeywordsResponse:
+    """Phrases that grew the most in the latest ``months`` months and are not keywords yet.
+
+    The recent count is the guaranteed lower bound (count - error) and the
+    previous count the upper bound of the Space-Saving estimates, so the
+    reported growth is never overstated.
+    """
+    min_count = settings.keyword_min_occurrence_threshold if min_count is None else min_count
+    periods = [
+        period for period, in
+        db.query(models.CandidateTermCount.period).distinct().order_by(models.CandidateTermCount.period.desc()).limit(months * 2)
+    ]
+    recent_periods, previous_periods = periods[:months], periods[months:]
+    if not recent_periods:
+        return schemas.CandidateKeywordsResponse(recent_periods=[], previous_periods=[], candidates=[])
+
+    guaranteed = func.sum(models.CandidateTermCount.count - models.CandidateTermCount.error)
+    recent_counts = dict(
+        db.query(models.CandidateTermCount.term, guaranteed)
+        .filter(models.CandidateTermCount.period.in_(recent_periods))
+        .group_by(models.CandidateTermCount.term)
+        .having(guaranteed >= max(min_count, 1))
+        .all()
+    )
+
+    terms = list(recent_counts)
+    previous_counts: dict[str, int] = defaultdict(int)
+    tracked_in: dict[str, set[str]] = defaultdict(set)
+    existing_keywords: set[str] = set()
+    for i in range(0, len(terms), SQL_TERM_CHUNK_SIZE):
+        chunk = terms[i:i + SQL_TERM_CHUNK_SIZE]
+        for term, period, count in (
+            db.query(models.CandidateTermCount.term, models.CandidateTermCount.period, models.CandidateTermCount.count)
+            .filter(models.CandidateTermCount.period.in_(previous_periods), models.CandidateTermCount.term.in_(chunk))
+        ):
+            previous_counts[term] += count
+            tracked_in[term].add(period)
+        existing_keywords.update(
+            name for name, in db.query(func.lower(models.Keyword.name)).filter(func.lower(models.Keyword.name).in_(chunk))
+        )
+
+    # 前の期間で追跡されていない語は、その期間の最小カウントまで出現していた可能性がある
+    bounds = _period_bounds(db, previous_periods)
+    candidates = []
+    for term, recent_count in recent_counts.items():
+        if term in existing_keywords:
+            continue
+        previous_count = previous_counts[term] + sum(
+            bound for period, bound in bounds.items() if period not in tracked_in[term]
+        )
+        growth_count = recent_count - previous_count
+        if growth_count <= 0:
+            continue
+        if previous_count > 0:
+            growth_rate_percent = round((growth_count / previous_count) * 100, 2)
+        else:
+            growth_rate_percent = float(growth_count * 100)  # 無限大の代わりに大きな数
+        candidates.append(schemas.CandidateKeyword(
+            name=term,
+            recent_count=recent_count,
+            previous_count=previous_count,
+            growth_count=growth_count,
+            growth_rate_percent=growth_rate_percent
+        ))
+
+    candidates.sort(key=lambda k: (k.growth_count, k.recent_count), reverse=True)
+    return schemas.CandidateKeywordsResponse(
+        recent_periods=recent_periods,
+        previous_periods=previous_periods,
+        candidates=candidates[:limit]
+    )
@@ -87,9 +87,19 @@ class Settings(BaseSettings):
     recent_analysis_weeks: int = Field(default=8, description="Recent analysis period in weeks")
     comparison_weeks: int = Field(default=16, description="Comparison period in weeks")
     cache_ttl_seconds: int = Field(default=300, description="Cache TTL in seconds")
+    ai_serve_stale: bool = Field(default=False, description="Answer AI-backed endpoints from the last cached result and refresh stale results in the background (stale-while-revalidate)")
+    ai_cache_fresh_seconds: int = Field(default=21600, description="Age after which a cached AI result served with ai_serve_stale is refreshed in the background")
+    ai_cache_retention_days: int = Field(default=30, description="Days AI analysis results (weekly trend, topic keywords, topic summaries, hot topics) are kept in the database cache tables")
     keyword_fetch_limit: int = Field(default=200, description="Keyword fetch limit")
     word_cloud_items_limit: int = Field(default=100, description="Word cloud items limit")
     latest_papers_fetch_limit: int = Field(default=5000, description="Latest papers fetch limit")
+    candidate_keyword_capacity: int = Field(default=5000, description="Phrases tracked per month by the streaming candidate keyword counter (0 disables it)")
+    candidate_keyword_max_ngram: int = Field(default=3, description="Longest phrase (in words) counted as a candidate keyword")
+    candidate_keywords_limit: int = Field(default=20, description="Candidate keywords limit")
+    tfidf_baseline_weeks: int = Field(default=8, description="Weeks before the target window used as the TF-IDF baseline")
+    tfidf_min_doc_freq: int = Field(default=3, description="Minimum papers in the target window for a distinctive term")
+    keyword_rebuild_workers: int = Field(default=0, description="Processes for whole-corpus keyword association rebuilds (0 = CPU count)")
+    analytics_engine: bool = Field(default=False, description="Serve keyword counts, trends and rankings from the in-memory columnar engine instead of SQL")
     
     # API Limits
     paper_search_default_limit: int = Field(default=100, description="Default paper search limit")
@@ -115,6 +125,12 @@ class Settings(BaseSettings):
     fetch_default_days: int = Field(default=30, description="Default fetch period in days")
     arxiv_max_results: int = Field(default=1000, description="Maximum arXiv results")
     arxiv_api_delay_seconds: int = Field(default=3, description="Delay between arXiv API calls")
+    arxiv_api_url: str = Field(default="https://export.arxiv.org/api/query", description="arXiv API query endpoint")
+    arxiv_api_timeout: int = Field(default=30, description="arXiv API request timeout in seconds")
+    arxiv_indexing_lag_hours: int = Field(default=72, description="Harvest windows ending less than this long ago are resumed, not marked completed, since arXiv may still announce papers in them")
+    arxiv_category_batch_size: int = Field(default=200, description="arXiv IDs per id_list category lookup")
+    ingest_chunk_size: int = Field(default=500, description="Rows per multi-row INSERT during paper ingestion")
+    ingest_max_window_results: int = Field(default=2000, description="Query windows with more arXiv results are split into weeks/days")
     script_execution_timeout: int = Field(default=3600, description="Script execution timeout in seconds")
     
     # Log Settings
@@ -0,0 +1,144 @@
+"""
+Named counters in the corpus_counters table, updated inside the writer's transaction.
+
+Besides the links_version counter, the table holds the corpus totals shown
+on the dashboard (papers, keywords, paper-keyword links), and
+paper_daily_counts holds the papers per publication day, so the dashboard
+reads totals and recent-window counts without scanning papers. Bulk write
+paths update them explicitly; papers and keywords written through the ORM
+are counted by mapper events. The link total is kept by keyword_rollup,
+through which every link change already passes.
+"""
+from collections import Counter
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterable, Optional, Union
+
+from sqlalchemy import Connection, delete, event, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from . import models
+
+# 新しい論文の関連付けの追加以外でpaper_keywordsが変わるたびに増える
+LINKS_VERSION = 'links_version'
+PAPERS = 'papers'
+KEYWORDS = 'keywords'
+LINKS = 'paper_keywords'
+
+DAY = timedelta(days=1)
+
+
+def increment(db: Union[Session, Connection], name: str, delta: int = 1) -> None:
+    table = models.CorpusCounter
+    updated = db.execute(update(table).where(table.name == name).values(value=table.value + delta)).rowcount
+    if not updated:
+        db.execute(insert(table).values(name=name, value=delta))
+
+
+def set_counter(db: Union[Session, Connection], name: str, value: int) -> None:
+    table = models.CorpusCounter
+    db.execute(delete(table).where(table.name == name))
+    db.execute(insert(table).values(name=name, value=value))
+
+
+def get_counter(db: Session, name: str) -> int:
+    return db.query(models.CorpusCounter.value).filter(models.CorpusCounter.name == name).scalar() or 0
+
+
+def get_counters(db: Session, names: list[str]) -> dict[str, int]:
+    """{name: value} for names in one query; missing counters are 0"""
+    values = dict(db.query(models.CorpusCounter.name, models.CorpusCounter.value).filter(models.CorpusCounter.name.in_(names)))
+    return {name: values.get(name, 0) for name in names}
+
+
+def data_version(db: Session) -> str:
+    """Token that changes whenever papers or paper-keyword links change (keys caches of corpus analyses)"""
+    values = get_counters(db, [PAPERS, LINKS, LINKS_VERSION])
+    return '-'.join(str(values[name]) for name in (PAPERS, LINKS, LINKS_VERSION))
+
+
+def publication_day(published_at: datetime) -> date:
+    if published_at.tzinfo is not None:
+        published_at = published_at.astimezone(timezone.utc)
+    return published_at.date()
+
+
+def record_papers(db: Union[Session, Connection], published: Iterable[datetime], sign: int = 1) -> None:
+    """Count added (sign=1) or removed (sign=-1) papers by their publication times"""
+    days = Counter(publication_day(published_at) for published_at in published)
+    if not days:
+        return
+    table = models.PaperDailyCount
+    for day, count in days.items():
+        updated = db.execute(update(table).where(table.day == day).values(count=table.count + sign * count)).rowcount
+        if not updated:
+            db.execute(insert(table).values(day=day, count=sign * count))
+    increment(db, PAPERS, sign * sum(days.values()))
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time(), tzinfo=timezone.utc)
+
+
+def _raw_paper_count(db: Session, start: datetime, end: Optional[datetime]) -> int:
+    query = db.query(func.count(models.Paper.id)).filter(models.Paper.published_at >= start)
+    if end is not None:
+        query = query.filter(models.Paper.published_at < end)
+    return query.scalar()
+
+
+def count_papers_since(db: Session, start: datetime, end: Optional[datetime] = None) -> int:
+    """Papers published in [start, end): whole days from paper_daily_counts, the partial days from papers"""
+    first_day = publication_day(start)
+    if _day_start(first_day) < start:
+        first_day += DAY
+    last_day = publication_day(end) if end is not None else None
+    if last_day is not None and first_day >= last_day:
+        return _raw_paper_count(db, start, end)
+
+    table = models.PaperDailyCount
+    query = db.query(func.coalesce(func.sum(table.count), 0)).filter(table.day >= first_day)
+    if last_day is not None:
+        query = query.filter(table.day < last_day)
+    total = query.scalar()
+    # 日の途中から始まる・終わる部分はpublished_atのインデックスで数える
+    if _day_start(first_day) > start:
+        total += _raw_paper_count(db, start, _day_start(first_day))
+    if last_day is not None and _day_start(last_day) < end:
+        total += _raw_paper_count(db, _day_start(last_day), end)
+    return total
+
+
+def rebuild_counters(db: Session) -> None:
+    """Recompute the corpus totals and paper_daily_counts from the tables (the caller commits)"""
+    day = func.date(models.Paper.published_at)
+    db.execute(delete(models.PaperDailyCount))
+    rows = [
+        {'day': date.fromisoformat(str(published_day)[:10]), 'count': count}
+        for published_day, count in db.query(day, func.count(models.Paper.id)).group_by(day)
+    ]
+    if rows:
+        db.execute(insert(models.PaperDailyCount), rows)
+    set_counter(db, PAPERS, sum(row['count'] for row in rows))
+    set_counter(db, KEYWORDS, db.query(func.count(models.Keyword.id)).scalar())
+    set_counter(db, LINKS, db.query(func.count()).select_from(models.PaperKeyword).scalar())
+
+
+# ORMで個別に追加・削除された論文とキーワードも数える（一括処理の経路は明示的に更新する）
+@event.listens_for(models.Paper, 'after_insert')
+def _count_inserted_paper(mapper, connection, target):
+    record_papers(connection, [target.published_at])
+
+
+@event.listens_for(models.Paper, 'after_delete')
+def _count_deleted_paper(mapper, connection, target):
+    record_papers(connection, [target.published_at], sign=-1)
+
+
+@event.listens_for(models.Keyword, 'after_insert')
+def _count_inserted_keyword(mapper, connection, target):
+    increment(connection, KEYWORDS)
+
+
+@event.listens_for(models.Keyword, 'after_delete')
+def _count_deleted_keyword(mapper, connection, target):
+    increment(connection, KEYWORDS, -1)
@@ -1,5 +1,7 @@
 
-from sqlalchemy import create_engine, TypeDecorator, DateTime, text
+from sqlalchemy import create_engine, TypeDecorator, DateTime, text, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime, timezone
@@ -44,3 +46,13 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def insert_or_ignore(db, model, conflict_columns: list[str]):
+    """重複する行を無視するINSERT文をDBの方言に合わせて作成"""
+    dialect = db.get_bind().dialect.name
+    if dialect == 'sqlite':
+        return sqlite_insert(model).on_conflict_do_nothing(index_elements=conflict_columns)
+    if dialect == 'postgresql':
+        return pg_insert(model).on_conflict_do_nothing(index_elements=conflict_columns)
+    # その他のDBでは呼び出し側で既存行を事前に除外する
+    return insert(model)
@@ -0,0 +1,221 @@
+"""
+arXiv harvesting: rate-limited API access and the month-by-month harvest loop
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Optional
+
+import feedparser
+import requests
+from sqlalchemy.orm import Session
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+from . import models
+from .arxiv_categories import ArxivApiError, get_http_session
+from .config import settings
+from .ingest import (
+    IngestCancelled,
+    IngestPipeline,
+    finish_ingest_run,
+    get_ingest_checkpoint,
+    plan_query_windows,
+)
+from .services import cleanup_low_quality_keywords
+from .tfidf import update_week_vectors
+
+logger = logging.getLogger(__name__)
+
+ARXIV_CATEGORY_QUERY = "(cat:cs.CL OR cat:cs.AI OR cat:cs.LG)"
+MAX_ARXIV_RESULTS = 1000  # arXiv APIの1リクエストあたりの最大取得件数
+
+_last_request_at: Optional[float] = None
+_rate_limit_lock = threading.Lock()
+
+
+def wait_for_rate_limit() -> None:
+    """Space arXiv API requests (probes and pages alike) by settings.arxiv_api_delay_seconds"""
+    global _last_request_at
+    with _rate_limit_lock:
+        if _last_request_at is not None:
+            remaining = settings.arxiv_api_delay_seconds - (time.monotonic() - _last_request_at)
+            if remaining > 0:
+                time.sleep(remaining)
+        _last_request_at = time.monotonic()
+
+
+def build_window_query(window_start: datetime, window_end: datetime) -> str:
+    return f"{ARXIV_CATEGORY_QUERY} AND submittedDate:[{window_start.strftime('%Y%m%d%H%M%S')} TO {window_end.strftime('%Y%m%d%H%M%S')}]"
+
+
+def is_window_closed(window_end: datetime, now: Optional[datetime] = None) -> bool:
+    """True if arXiv should have announced every paper of a window ending at window_end.
+
+    Papers are announced up to a few days after submission, so windows ending
+    within settings.arxiv_indexing_lag_hours (or in the future) stay open:
+    they are resumed from their last offset instead of being skipped.
+    """
+    now = now or datetime.now(timezone.utc)
+    if window_end.tzinfo is None:
+        window_end = window_end.replace(tzinfo=timezone.utc)
+    return window_end < now - timedelta(hours=settings.arxiv_indexing_lag_hours)
+
+
+def _get_feed(search_query: str, start: int, max_results: int) -> Any:
+    wait_for_rate_limit()
+    response = get_http_session().get(
+        settings.arxiv_api_url,
+        # 既定の関連度順はページのオフセットが実行ごとに変わりうるため、last_offsetからの再開に備えて投稿日時の昇順に固定する
+        params={
+            'search_query': search_query, 'start': start, 'max_results': max_results,
+            'sortBy': 'submittedDate', 'sortOrder': 'ascending'
+        },
+        timeout=settings.arxiv_api_timeout
+    )
+    response.raise_for_status()
+    return feedparser.parse(response.content)
+
+
+@retry(wait=wait_exponential(multiplier=1, min=4, max=10), stop=stop_after_attempt(5), retry=retry_if_exception_type(requests.exceptions.RequestException), reraise=True)
+def count_papers_in_window(window_start: datetime, window_end: datetime) -> int:
+    """Probe the number of results in a window (max_results=0 returns only the count).
+
+    Raises ArxivApiError for an error feed (returned with HTTP 200) or a
+    response without a result count, which must not be read as an empty window.
+    """
+    feed = _get_feed(build_window_query(window_start, window_end), 0, 0)
+    for entry in feed.entries:
+        if '/api/errors' in entry.get('id', ''):
+            raise ArxivApiError(entry.get('summary') or entry.get('id'))
+    total_results = feed.feed.get('opensearch_totalresults')
+    if total_results is None:
+        raise ArxivApiError("arXiv API response has no opensearch:totalResults")
+    return int(total_results)
+
+
+@retry(wait=wait_exponential(multiplier=1, min=4, max=10), stop=stop_after_attempt(5), retry=retry_if_exception_type(requests.exceptions.RequestException), reraise=True)
+def fetch_arxiv_page(search_query: str, max_results: int, start: int = 0) -> list[Any]:
+    """Fetch one result page of feed entries.
+
+    Request errors are retried and finally raised: treating them as an empty
+    page would look like the end of the results and complete the window.
+    """
+    try:
+        return _get_feed(search_query, start, max_results).entries
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Error fetching data from arXiv API: {e}")
+        raise
+
+
+def is_cancel_requested(db: Session, run_id: int) -> bool:
+    """Cancellation is requested through the database so it works across workers and processes"""
+    status = db.query(models.IngestRun.status).filter(models.IngestRun.id == run_id).scalar()
+    return status == 'cancelling'
+
+
+def harvest_papers(
+    db: Session,
+    ingest_run: models.IngestRun,
+    start_dt: datetime,
+    end_dt: datetime,
+    fetch_page: Callable[[str, int, int], list[Any]] = fetch_arxiv_page,
+    count_results: Callable[[datetime, datetime], int] = count_papers_in_window
+) -> int:
+    """Harvest [start_dt, end_dt] month by month and finish ingest_run; returns the number of entries fetched"""
+    run_id = ingest_run.id
+    pipeline = IngestPipeline(
+        db, fetch_page, page_size=MAX_ARXIV_RESULTS, delay_seconds=0,  # リクエスト間隔はwait_for_rate_limitで管理する
+        should_stop=lambda: is_cancel_requested(db, run_id)
+    )
+    total_papers_fetched = 0
+    current_month_start = start_dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    try:
+        while current_month_start <= end_dt:
+            next_month_start = (current_month_start + timedelta(days=32)).replace(day=1) # 次の月の1日
+            current_month_end = min(next_month_start - timedelta(seconds=1), end_dt) # その月の最終時刻、または指定されたend_dt
+            month_label = current_month_start.strftime('%Y-%m')
+
+            try:
+                # 前回の実行で完了済みのウィンドウはスキップし、途中のウィンドウは続きから取得する
+                month_checkpoint = get_ingest_checkpoint(db, ARXIV_CATEGORY_QUERY, current_month_start, current_month_end)
+                if month_checkpoint.completed:
+                    logger.info(f"Skipping {month_label}: already ingested.")
+                    current_month_start = next_month_start
+                    continue
+
+                # 件数の多い期間は週単位・日単位に分割し、深いオフセットでのページングを避ける
+                month_papers_seen = 0
+                month_papers_added = 0
+                touched_keyword_ids: set[int] = set()
+                touched_weeks: set = set()
+                empty_windows: list[tuple[datetime, datetime]] = []
+
+                def count_month_results(window_start: datetime, window_end: datetime) -> int:
+                    count = count_results(window_start, window_end)
+                    if count == 0:
+                        empty_windows.append((window_start, window_end))
+                    return count
+
+                for window_start, window_end, window_count in plan_query_windows(count_month_results, current_month_start, current_month_end):
+                    checkpoint = get_ingest_checkpoint(db, ARXIV_CATEGORY_QUERY, window_start, window_end)
+                    if checkpoint.completed:
+                        continue
+
+                    logger.info(f"Fetching {window_count} papers from arXiv for {window_start:%Y-%m-%d} - {window_end:%Y-%m-%d} from offset {checkpoint.last_offset}...")
+                    ingest_run.current_window = f"{window_start:%Y-%m-%d} - {window_end:%Y-%m-%d}"
+                    db.commit()
+                    # 取得したページごとに解析・キーワード抽出・保存・コミットを行う
+                    result = pipeline.run(
+                        build_window_query(window_start, window_end), ingest_run,
+                        checkpoint=checkpoint, complete=is_window_closed(window_end)
+                    )
+                    month_papers_seen += result.papers_seen
+                    month_papers_added += result.papers_added
+                    touched_keyword_ids |= result.keyword_ids
+                    touched_weeks |= result.weeks
+
+                # 新しい論文が入った週のTF-IDFベクトルを作り直す（読み取り側では集計するだけ）
+                update_week_vectors(db, touched_weeks)
+                # 公開待ちの論文が残りうる月（終了が現在に近い、または未来）は完了にせず、次回も取得する
+                # 0件の応答は一時的な空の応答と区別できないため、0件の期間を含む月も完了にしない
+                month_checkpoint.completed = is_window_closed(current_month_end) and not empty_windows
+                db.commit()
+                if empty_windows:
+                    logger.warning(
+                        f"arXiv reported no papers for {len(empty_windows)} window(s) of {month_label}; "
+                        "leaving the month incomplete so they are probed again on the next run."
+                    )
+                if month_papers_seen:
+                    logger.info(f"Fetched {month_papers_seen} papers for {month_label} ({month_papers_added} new).")
+                    total_papers_fetched += month_papers_seen
+                else:
+                    logger.info(f"No papers were fetched for {month_label}.")
+
+                # 新しい論文を追加した後、この月に作成・参照されたキーワードだけを自動クリーンアップ
+                if month_papers_added > 0:
+                    logger.info("Running automatic keyword quality cleanup...")
+                    cleaned_count = cleanup_low_quality_keywords(db, keyword_ids=touched_keyword_ids)
+                    # 削除・統合されたキーワードのIDを次の月で使わないようにする
+                    pipeline.ingestor.reset_caches()
+                    logger.info(f"Automatic cleanup completed. Removed/merged {cleaned_count} keywords.")
+            except IngestCancelled:
+                raise
+            except Exception as e:
+                db.rollback()
+                pipeline.ingestor.reset_caches()
+                logger.error(f"Error fetching papers for {month_label}: {e}", exc_info=True)
+
+            current_month_start = next_month_start
+    except IngestCancelled:
+        logger.info(f"Ingest run {run_id} cancelled after {total_papers_fetched} papers.")
+        finish_ingest_run(db, ingest_run, status='cancelled')
+        return total_papers_fetched
+    except BaseException as e:
+        db.rollback()
+        finish_ingest_run(db, ingest_run, error=str(e) or type(e).__name__)
+        raise
+
+    finish_ingest_run(db, ingest_run)
+    return total_papers_fetched
@@ -0,0 +1,407 @@
+"""
+Bulk ingestion of arXiv feed entries
+"""
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from dateutil import parser as dateutil_parser
+from sqlalchemy.orm import Session
+
+from . import counters, models
+from .analytics import keyword_analytics
+from .candidate_keywords import CandidateTermCounter
+from .config import settings
+from .database import insert_or_ignore
+from .keyword_rollup import apply_deltas, link_values, week_start_of
+from .services import extract_technical_terms_batch, get_keyword_extractor_version, get_paper_content_hash
+
+logger = logging.getLogger(__name__)
+
+
+class IngestCancelled(Exception):
+    """Raised by IngestPipeline when a cancellation was requested between pages"""
+
+
+@dataclass
+class IngestResult:
+    """Counts for one ingest call"""
+    papers_seen: int = 0
+    papers_added: int = 0
+    keywords_added: int = 0
+    keyword_ids: set[int] = field(default_factory=set)
+    weeks: set[date] = field(default_factory=set)  # Weeks (keyword_rollup.week_start_of) that received new papers
+
+
+def parse_entry(entry: Any) -> dict[str, Any]:
+    """Convert a feedparser entry into a row for the papers table"""
+    return {
+        'arxiv_id': entry.id.split('/')[-1],  # arxiv_idはURLの末尾から取得
+        'title': entry.title,
+        'authors': [author.name for author in entry.get('authors', [])],
+        'summary': entry.summary,
+        'published_at': dateutil_parser.parse(entry.published).astimezone(timezone.utc),
+        'categories': list(dict.fromkeys(tag.term for tag in entry.get('tags', []) if tag.get('term'))),
+    }
+
+
+def parse_entries(entries: Iterable[Any]) -> list[dict[str, Any]]:
+    """Parse feed entries, skipping the ones that are missing required fields"""
+    records = []
+    for entry in entries:
+        try:
+            records.append(parse_entry(entry))
+        except (AttributeError, KeyError, ValueError, TypeError) as e:
+            logger.error(f"Error parsing entry {entry.get('id', '?')}: {e}")
+    return records
+
+
+def extract_record_keywords(records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Attach the extracted technical terms to each record"""
+    keyword_lists = extract_technical_terms_batch(record['title'] + " " + record['summary'] for record in records)
+    for record, keywords in zip(records, keyword_lists):
+        record['keywords'] = keywords
+    return records
+
+
+class BulkIngestor:
+    """Write parsed papers with multi-row, conflict-ignoring inserts.
+
+    Existing ``arxiv_id``s are loaded with one query per chunk, and keyword
+    and category ids are kept in name→id maps, so repeated batches do not
+    look them up again. The maps assume the rows still exist: callers that
+    delete or merge keywords (the scoped cleanup after a batch) or roll back
+    a write must call ``reset_caches`` before the next batch. New papers are
+    also fed to the streaming candidate keyword counter. The caller owns
+    the transaction.
+    """
+
+    def __init__(self, db: Session, chunk_size: Optional[int] = None, term_counter: Optional[CandidateTermCounter] = None):
+        self.db = db
+        self.chunk_size = max(1, chunk_size or settings.ingest_chunk_size)
+        if term_counter is None and settings.candidate_keyword_capacity > 0:
+            term_counter = CandidateTermCounter()
+        self.term_counter = term_counter
+        self._keyword_ids: dict[str, int] = {}
+        self._category_ids: dict[str, int] = {}
+
+    def ingest(self, entries: Iterable[Any]) -> IngestResult:
+        """Parse, extract keywords and write a batch of feed entries"""
+        return self.write(extract_record_keywords(parse_entries(entries)))
+
+    def write(self, records: list[dict[str, Any]]) -> IngestResult:
+        """Insert records that carry ``keywords`` (and optionally ``categories``)"""
+        result = IngestResult(papers_seen=len(records))
+
+        # 同じバッチ内の重複と既存の論文を除外
+        unique_records = {record['arxiv_id']: record for record in records}
+        existing = self._existing_arxiv_ids(list(unique_records))
+        new_records = [record for arxiv_id, record in unique_records.items() if arxiv_id not in existing]
+        if not new_records:
+            return result
+
+        paper_columns = ('arxiv_id', 'title', 'authors', 'summary', 'published_at')
+        self._insert_ignore(
+            models.Paper,
+            [{column: record[column] for column in paper_columns} for record in new_records],
+            ['arxiv_id']
+        )
+        paper_ids = self._select_ids(models.Paper.arxiv_id, models.Paper.id, [record['arxiv_id'] for record in new_records])
+        result.papers_added = len(paper_ids)
+        counters.record_papers(self.db, (record['published_at'] for record in new_records if record['arxiv_id'] in paper_ids))
+
+        keyword_ids = self._keyword_ids
+        result.keywords_added = self._resolve_ids(
+            models.Keyword, models.Keyword.name, 'name', keyword_ids,
+            (name for record in new_records for name in record.get('keywords', []))
+        )
+        if result.keywords_added:
+            counters.increment(self.db, counters.KEYWORDS, result.keywords_added)
+        category_ids = self._category_ids
+        self._resolve_ids(
+            models.Category, models.Category.term, 'term', category_ids,
+            (term for record in new_records for term in record.get('categories', []))
+        )
+
+        published_at = {
+            paper_ids[record['arxiv_id']]: record['published_at']
+            for record in new_records if record['arxiv_id'] in paper_ids
+        }
+        paper_keywords = {
+            (paper_ids[record['arxiv_id']], keyword_ids[name])
+            for record in new_records if record['arxiv_id'] in paper_ids
+            for name in record.get('keywords', [])
+        }
+        paper_categories = {
+            (paper_ids[record['arxiv_id']], category_ids[term])
+            for record in new_records if record['arxiv_id'] in paper_ids
+            for term in record.get('categories', [])
+        }
+        link_rows = [
+            link_values(paper_id, keyword_id, published_at[paper_id])
+            for paper_id, keyword_id in paper_keywords
+        ]
+        self._insert_ignore(models.PaperKeyword, link_rows, ['paper_id', 'keyword_id'])
+        # 新しい論文の関連付けなので、そのまま週次集計に加算できる
+        apply_deltas(self.db, Counter((row['keyword_id'], row['week_start']) for row in link_rows))
+        self._insert_ignore(
+            models.PaperCategory,
+            [{'paper_id': paper_id, 'category_id': category_id} for paper_id, category_id in paper_categories],
+            ['paper_id', 'category_id']
+        )
+        # どの抽出器のバージョンでキーワードを抽出したかを記録し、再抽出の対象判定に使う
+        extractor_version = get_keyword_extractor_version()
+        self._insert_ignore(
+            models.PaperExtraction,
+            [
+                {
+                    'paper_id': paper_ids[record['arxiv_id']],
+                    'extractor_version': extractor_version,
+                    'content_hash': get_paper_content_hash(record['title'], record['summary']),
+                    'keywords': record.get('keywords', []),
+                }
+                for record in new_records if record['arxiv_id'] in paper_ids
+            ],
+            ['paper_id']
+        )
+        if self.term_counter is not None:
+            self.term_counter.update(self.db, (record for record in new_records if record['arxiv_id'] in paper_ids))
+        result.keyword_ids = {keyword_id for _, keyword_id in paper_keywords}
+        result.weeks = {week_start_of(published) for published in published_at.values()}
+        return result
+
+    def reset_caches(self) -> None:
+        """Forget the cached name→id maps (after a keyword cleanup or a rollback)"""
+        self._keyword_ids.clear()
+        self._category_ids.clear()
+
+    def keyword_ids_for(self, names: Iterable[str]) -> dict[str, int]:
+        """Return {name: id} for names, creating the keywords that do not exist yet"""
+        names = list(dict.fromkeys(names))
+        added = self._resolve_ids(models.Keyword, models.Keyword.name, 'name', self._keyword_ids, names)
+        if added:
+            counters.increment(self.db, counters.KEYWORDS, added)
+        return {name: self._keyword_ids[name] for name in names if name in self._keyword_ids}
+
+    def _chunks(self, items: list) -> Iterable[list]:
+        for i in range(0, len(items), self.chunk_size):
+            yield items[i:i + self.chunk_size]
+
+    def _existing_arxiv_ids(self, arxiv_ids: list[str]) -> set[str]:
+        existing = set()
+        for chunk in self._chunks(arxiv_ids):
+            existing.update(
+                row.arxiv_id for row in self.db.query(models.Paper.arxiv_id).filter(models.Paper.arxiv_id.in_(chunk))
+            )
+        return existing
+
+    def _select_ids(self, key_column, id_column, keys: list[str]) -> dict[str, int]:
+        ids = {}
+        for chunk in self._chunks(keys):
+            ids.update((key, row_id) for key, row_id in self.db.query(key_column, id_column).filter(key_column.in_(chunk)))
+        return ids
+
+    def _resolve_ids(self, model, key_column, key_name: str, cache: dict[str, int], keys: Iterable[str]) -> int:
+        """Fill cache with {key: id} for keys, inserting missing rows; returns the number inserted"""
+        missing = [key for key in dict.fromkeys(keys) if key and key not in cache]
+        if not missing:
+            return 0
+        found = self._select_ids(key_column, model.id, missing)
+        cache.update(found)
+        to_insert = [key for key in missing if key not in found]
+        if not to_insert:
+            return 0
+        self._insert_ignore(model, [{key_name: key} for key in to_insert], [key_name])
+        cache.update(self._select_ids(key_column, model.id, to_insert))
+        return len(to_insert)
+
+    def _insert_ignore(self, model, rows: list[dict[str, Any]], conflict_columns: list[str]) -> None:
+        """Multi-row INSERT in chunks, skipping rows that hit a unique constraint"""
+        for chunk in self._chunks(rows):
+            self.db.execute(insert_or_ignore(self.db, model, conflict_columns).values(chunk))
+
+
+FetchPage = Callable[[str, int, int], Optional[list[Any]]]
+
+
+def iter_feed_pages(
+    fetch_page: FetchPage,
+    search_query: str,
+    page_size: int,
+    start: int = 0,
+    delay_seconds: float = 0,
+    sleep: Callable[[float], None] = time.sleep
+) -> Iterator[tuple[int, list[Any]]]:
+    """Fetch stage: yield (offset, entries) one result page at a time"""
+    offset = start
+    while True:
+        entries = fetch_page(search_query, page_size, offset)
+        if not entries:
+            return
+        yield offset, entries
+        offset += len(entries)  # 実際に取得できた件数分オフセットを進める
+        if delay_seconds > 0:
+            sleep(delay_seconds)  # APIへの負荷軽減のため、リクエスト間に遅延を入れる
+
+
+def split_window(window_start: datetime, window_end: datetime) -> list[tuple[datetime, datetime]]:
+    """Split an inclusive window into week pieces, or into day pieces if it is a week or shorter"""
+    span = window_end - window_start
+    if span >= timedelta(days=7):
+        step = timedelta(days=7)
+    elif span >= timedelta(days=1):
+        step = timedelta(days=1)
+    else:
+        return [(window_start, window_end)]
+
+    pieces = []
+    piece_start = window_start
+    while piece_start <= window_end:
+        piece_end = min(piece_start + step - timedelta(seconds=1), window_end)
+        pieces.append((piece_start, piece_end))
+        piece_start = piece_end + timedelta(seconds=1)
+    return pieces
+
+
+def plan_query_windows(
+    count_results: Callable[[datetime, datetime], int],
+    window_start: datetime,
+    window_end: datetime,
+    max_results: Optional[int] = None
+) -> Iterator[tuple[datetime, datetime, int]]:
+    """Yield (start, end, result count) pieces of a window small enough to fetch without deep paging.
+
+    Windows whose probed result count exceeds max_results are split into
+    weeks, then days; a single day is fetched as is even if it is larger.
+    """
+    max_results = max_results or settings.ingest_max_window_results
+    count = count_results(window_start, window_end)
+    pieces = split_window(window_start, window_end) if count > max_results else []
+    if len(pieces) <= 1:
+        if count:
+            yield window_start, window_end, count
+        return
+    logger.info(f"Splitting window {window_start:%Y-%m-%d} - {window_end:%Y-%m-%d} ({count} results) into {len(pieces)} pieces")
+    for piece_start, piece_end in pieces:
+        yield from plan_query_windows(count_results, piece_start, piece_end, max_results)
+
+
+def start_ingest_run(db: Session, search_query: str) -> models.IngestRun:
+    """Create the progress record for a harvest"""
+    run = models.IngestRun(search_query=search_query, status='running')
+    db.add(run)
+    db.commit()
+    return run
+
+
+def finish_ingest_run(db: Session, run: models.IngestRun, error: Optional[str] = None, status: Optional[str] = None) -> None:
+    run.status = status or ('failed' if error else 'completed')
+    run.error_message = error
+    run.finished_at = datetime.now(timezone.utc)
+    db.commit()
+
+
+def get_ingest_checkpoint(db: Session, search_query: str, window_start: datetime, window_end: datetime) -> models.IngestCheckpoint:
+    """Load the checkpoint of a query window, creating an empty one on first use"""
+    checkpoint = (
+        db.query(models.IngestCheckpoint)
+        .filter(
+            models.IngestCheckpoint.search_query == search_query,
+            models.IngestCheckpoint.window_start == window_start,
+            models.IngestCheckpoint.window_end == window_end
+        )
+        .first()
+    )
+    if checkpoint is None:
+        checkpoint = models.IngestCheckpoint(
+            search_query=search_query, window_start=window_start, window_end=window_end, last_offset=0, completed=False
+        )
+        db.add(checkpoint)
+        db.commit()
+    return checkpoint
+
+
+class IngestPipeline:
+    """Streaming fetch → parse → extract → write pipeline.
+
+    Each stage is a generator over result pages, so at most one page of
+    entries is held in memory regardless of the window size. Every page is
+    committed together with the progress counters of its ``IngestRun``,
+    which the API reads from the database while the harvest is running.
+    ``should_stop`` is polled after each commit and before the first fetch;
+    a requested stop raises ``IngestCancelled``.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        fetch_page: FetchPage,
+        ingestor: Optional[BulkIngestor] = None,
+        page_size: Optional[int] = None,
+        delay_seconds: Optional[float] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        should_stop: Optional[Callable[[], bool]] = None
+    ):
+        self.db = db
+        self.fetch_page = fetch_page
+        self.should_stop = should_stop
+        self.ingestor = ingestor or BulkIngestor(db)
+        self.page_size = page_size or settings.arxiv_max_results
+        self.delay_seconds = settings.arxiv_api_delay_seconds if delay_seconds is None else delay_seconds
+        self._sleep = sleep
+
+    def run(
+        self,
+        search_query: str,
+        run: models.IngestRun,
+        start: int = 0,
+        checkpoint: Optional[models.IngestCheckpoint] = None,
+        complete: bool = True
+    ) -> IngestResult:
+        """Harvest every page of search_query, committing page by page.
+
+        With a checkpoint, the harvest starts from its last committed offset,
+        each page advances it in the same commit as the page's rows, and the
+        window is marked completed once the last page has been written, unless
+        complete is False (a window that may still receive papers).
+        """
+        if checkpoint is not None:
+            start = checkpoint.last_offset
+        self._check_stop()
+        totals = IngestResult()
+        pages = iter_feed_pages(self.fetch_page, search_query, self.page_size, start, self.delay_seconds, self._sleep)
+        parsed = ((offset, len(entries), parse_entries(entries)) for offset, entries in pages)
+        extracted = ((offset, fetched, extract_record_keywords(records)) for offset, fetched, records in parsed)
+
+        for offset, fetched, records in extracted:
+            result = self.ingestor.write(records)
+            totals.papers_seen += fetched
+            totals.papers_added += result.papers_added
+            totals.keywords_added += result.keywords_added
+            totals.keyword_ids |= result.keyword_ids
+            totals.weeks |= result.weeks
+
+            run.pages_fetched += 1
+            run.papers_fetched += fetched
+            run.papers_added += result.papers_added
+            if checkpoint is not None:
+                checkpoint.last_offset = offset + fetched
+            self.db.commit()
+            logger.info(f"Committed page at offset {offset}: {fetched} entries, {result.papers_added} new papers")
+            if settings.analytics_engine and result.papers_added:
+                # 新しい論文の関連付けをメモリ上の集計にも追記し、ダッシュボードの初回クエリで待たせない
+                keyword_analytics.refresh(self.db)
+            self._check_stop()
+
+        if checkpoint is not None and complete:
+            checkpoint.completed = True
+            self.db.commit()
+        return totals
+
+    def _check_stop(self) -> None:
+        # 停止要求はページのコミット後にのみ確認するため、チェックポイントとの整合性は保たれる
+        if self.should_stop is not None and self.should_stop():
+            raise IngestCancelled()
@@ -0,0 +1,102 @@
+"""
+In-process background ingestion jobs
+"""
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import SessionLocal
+from .harvester import build_window_query, harvest_papers
+from .ingest import start_ingest_run
+
+logger = logging.getLogger(__name__)
+
+
+class IngestJobConflict(Exception):
+    """Raised when an ingest job is started while another one is still running"""
+
+    def __init__(self, job_id: int):
+        super().__init__(f"Ingest job {job_id} is already running")
+        self.job_id = job_id
+
+
+class IngestJobManager:
+    """Run at most one harvest at a time in a background thread of this worker.
+
+    The job id is the id of the ``IngestRun`` record, so progress and
+    cancellation go through the database and the API can report on jobs
+    started by any worker or by the fetch script.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        harvest: Callable[..., int] = harvest_papers
+    ):
+        self.session_factory = session_factory
+        self.harvest = harvest
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._job_id: Optional[int] = None
+
+    @property
+    def running_job_id(self) -> Optional[int]:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self._job_id
+            return None
+
+    def start(self, start_dt: datetime, end_dt: datetime) -> int:
+        """Start a harvest in the background and return its job id"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                raise IngestJobConflict(self._job_id)
+
+            db = self.session_factory()
+            try:
+                job_id = start_ingest_run(db, build_window_query(start_dt, end_dt)).id
+            finally:
+                db.close()
+
+            self._job_id = job_id
+            self._thread = threading.Thread(
+                target=self._run, args=(job_id, start_dt, end_dt), name=f"ingest-job-{job_id}", daemon=True
+            )
+            self._thread.start()
+        logger.info(f"Started ingest job {job_id} for {start_dt:%Y-%m-%d} - {end_dt:%Y-%m-%d}")
+        return job_id
+
+    def cancel(self, db: Session, job_id: int) -> bool:
+        """Request cancellation; the job stops after its current page is committed"""
+        updated = (
+            db.query(models.IngestRun)
+            .filter(models.IngestRun.id == job_id, models.IngestRun.status == 'running')
+            .update({models.IngestRun.status: 'cancelling'}, synchronize_session=False)
+        )
+        db.commit()
+        return updated > 0
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Block until the current job has finished"""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self, job_id: int, start_dt: datetime, end_dt: datetime) -> None:
+        db = self.session_factory()
+        try:
+            ingest_run = db.get(models.IngestRun, job_id)
+            total = self.harvest(db, ingest_run, start_dt, end_dt)
+            logger.info(f"Ingest job {job_id} finished: {total} papers fetched")
+        except Exception as e:
+            # harvest_papersが失敗状態を記録済み
+            logger.error(f"Ingest job {job_id} failed: {e}", exc_info=True)
+        finally:
+            db.close()
+
+
+ingest_jobs = IngestJobManager()
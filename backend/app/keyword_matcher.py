@@ -0,0 +1,132 @@
+"""
+Compiled multi-pattern matcher for dictionary based keyword extraction
+"""
+import re
+from typing import Iterable
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+def _build_trie_pattern(terms: Iterable[str]) -> str:
+    """Compile terms into a single trie-shaped regular expression.
+
+    Sharing prefixes keeps the number of alternatives tried at each text
+    position small, and the greedy optional groups make the regex engine
+    report the longest term starting at a position.
+    """
+    root: dict = {}
+    for term in terms:
+        node = root
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char != '']
+        if not branches:
+            return ''
+        if len(branches) == 1:
+            body = branches[0] if '' not in node else f"(?:{branches[0]})"
+        else:
+            body = f"(?:{'|'.join(branches)})"
+        return body + '?' if '' in node else body
+
+    return build(root)
+
+
+class KeywordMatcher:
+    """Build-once matcher for a ``{lowercase term: display name}`` dictionary.
+
+    Matching follows the longest-match-wins rule of the original
+    ``extract_technical_terms_from_text`` loop: terms are tried from longest
+    to shortest (ties keep dictionary order), and every occurrence of a
+    matched term hides the overlapping occurrences of shorter terms.
+
+    The text is scanned once with a pyahocorasick automaton when the package
+    is installed, otherwise with a trie-shaped regular expression.
+    """
+
+    def __init__(self, terms: dict[str, str]):
+        self._display = {term.lower(): name for term, name in terms.items()}
+        # 長い順（同じ長さは辞書の定義順）が優先順位
+        priority = sorted(self._display, key=len, reverse=True)
+        self._rank = {term: rank for rank, term in enumerate(priority)}
+        self._automaton = None
+        self._pattern = None
+        self._prefixes: dict[str, list[str]] = {}
+        if not priority:
+            return
+        if ahocorasick:
+            self._automaton = ahocorasick.Automaton()
+            for term in priority:
+                self._automaton.add_word(term, term)
+            self._automaton.make_automaton()
+        else:
+            # 同じ位置から始まる短い用語は、最長一致した用語の接頭辞として列挙できる
+            self._prefixes = {
+                term: [term[:size] for size in range(len(term) - 1, 0, -1) if term[:size] in self._rank]
+                for term in priority
+            }
+            self._pattern = re.compile(f"(?=({_build_trie_pattern(priority)}))")
+
+    def _find_occurrences(self, text_lower: str) -> dict[str, list[int]]:
+        """Return the start offsets of every (possibly overlapping) term occurrence"""
+        occurrences: dict[str, list[int]] = {}
+        if self._automaton is not None:
+            for end, term in self._automaton.iter(text_lower):
+                occurrences.setdefault(term, []).append(end - len(term) + 1)
+            return occurrences
+        if self._pattern is None:
+            return occurrences
+        for match in self._pattern.finditer(text_lower):
+            start = match.start()
+            longest = match.group(1)
+            occurrences.setdefault(longest, []).append(start)
+            for prefix in self._prefixes[longest]:
+                occurrences.setdefault(prefix, []).append(start)
+        return occurrences
+
+    def match(self, text: str) -> list[str]:
+        """Return the display names of the terms found in text"""
+        if not text:
+            return []
+
+        text_lower = text.lower()
+        occurrences = self._find_occurrences(text_lower)
+        if not occurrences:
+            return []
+
+        consumed = bytearray(len(text_lower))
+        found: dict[str, None] = {}
+        for term in sorted(occurrences, key=self._rank.__getitem__):
+            size = len(term)
+            available = [start for start in occurrences[term] if consumed.find(1, start, start + size) == -1]
+            if not available:
+                continue
+
+            found[self._display[term]] = None
+            # str.replace と同じく左から重ならない出現箇所を消費する
+            consumed_until = -1
+            for start in available:
+                if start >= consumed_until:
+                    consumed[start:start + size] = b'\x01' * size
+                    consumed_until = start + size
+
+        return list(found)
+
+    def find_all(self, text: str) -> list[str]:
+        """Return every lowercase dictionary term occurring in text as a substring.
+
+        Unlike :meth:`match`, overlapping shorter terms are not hidden; this is
+        the ``term in text.lower()`` test run for all terms in one scan.
+        """
+        if not text:
+            return []
+        return list(self._find_occurrences(text.lower()))
+
+    def match_many(self, texts: Iterable[str]) -> list[list[str]]:
+        """Return the matched display names for each text"""
+        return [self.match(text) for text in texts]
@@ -0,0 +1,350 @@
+"""
+Rebuilds of paper-keyword associations: name scans over paper texts and
+incremental re-extraction of papers whose extractor version or text is stale
+"""
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from sqlalchemy import insert, tuple_
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import settings
+from .database import insert_or_ignore
+from .ingest import BulkIngestor
+from .keyword_matcher import KeywordMatcher
+from .keyword_rollup import link_values, record_links
+from .services import (
+    cleanup_low_quality_keywords,
+    extract_technical_terms_batch,
+    get_keyword_extractor_version,
+    get_paper_content_hash,
+)
+
+logger = logging.getLogger(__name__)
+
+TextRow = tuple[int, str]  # (paper_id, "title summary")
+PaperRow = tuple[int, str, str]  # (paper_id, title, summary)
+Extraction = tuple[int, str, list[str]]  # (paper_id, content_hash, keywords)
+
+# ワーカープロセスごとに一度だけ構築する照合器
+_worker_matcher: Optional[KeywordMatcher] = None
+_worker_keyword_ids: dict[str, list[int]] = {}
+
+
+def build_keyword_index(keyword_rows: Iterable[tuple[int, str]]) -> dict[str, list[int]]:
+    """Map each lowercase keyword name to the ids of the keywords spelled that way"""
+    index: dict[str, list[int]] = {}
+    for keyword_id, name in keyword_rows:
+        if name:
+            index.setdefault(name.lower(), []).append(keyword_id)
+    return index
+
+
+def match_texts(matcher: KeywordMatcher, keyword_ids: dict[str, list[int]], rows: Iterable[TextRow]) -> list[tuple[int, int]]:
+    """Return the (paper_id, keyword_id) pairs whose keyword name occurs in the paper text"""
+    return [
+        (paper_id, keyword_id)
+        for paper_id, text in rows
+        for term in matcher.find_all(text)
+        for keyword_id in keyword_ids[term]
+    ]
+
+
+def _init_worker(keyword_ids: dict[str, list[int]]) -> None:
+    global _worker_matcher, _worker_keyword_ids
+    _worker_keyword_ids = keyword_ids
+    _worker_matcher = KeywordMatcher({term: term for term in keyword_ids})
+
+
+def _match_in_worker(rows: list[TextRow]) -> list[tuple[int, int]]:
+    return match_texts(_worker_matcher, _worker_keyword_ids, rows)
+
+
+def _ordered_map(executor: Executor, fn: Callable[[Any], Any], items: Iterable[Any], window: int) -> Iterator[Any]:
+    """executor.map that keeps at most window tasks in flight instead of submitting everything up front"""
+    pending: deque = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _load_papers(db: Session, paper_ids: list[int]) -> list[PaperRow]:
+    return (
+        db.query(models.Paper.id, models.Paper.title, models.Paper.summary)
+        .filter(models.Paper.id.in_(paper_ids))
+        .order_by(models.Paper.id)
+        .all()
+    )
+
+
+def _load_texts(db: Session, paper_ids: list[int]) -> list[TextRow]:
+    return [(paper_id, f"{title} {summary}") for paper_id, title, summary in _load_papers(db, paper_ids)]
+
+
+def _insert_missing_pairs(db: Session, paper_ids: list[int], pairs: list[tuple[int, int]]) -> int:
+    """Insert the pairs that are not linked yet; existing links of the chunk are loaded in one query"""
+    if not pairs:
+        return 0
+    existing = set(
+        db.query(models.PaperKeyword.paper_id, models.PaperKeyword.keyword_id)
+        .filter(models.PaperKeyword.paper_id.in_(paper_ids))
+        .all()
+    )
+    missing = [pair for pair in dict.fromkeys(pairs) if pair not in existing]
+    if missing:
+        published = dict(
+            db.query(models.Paper.id, models.Paper.published_at)
+            .filter(models.Paper.id.in_({paper_id for paper_id, _ in missing}))
+            .all()
+        )
+        rows = [
+            link_values(paper_id, keyword_id, published[paper_id])
+            for paper_id, keyword_id in missing if paper_id in published
+        ]
+        db.execute(insert_or_ignore(db, models.PaperKeyword, ['paper_id', 'keyword_id']), rows)
+        record_links(db, [(row['keyword_id'], row['week_start']) for row in rows])
+    return len(missing)
+
+
+def rebuild_associations(
+    db: Session,
+    limit: Optional[int] = None,
+    workers: int = 1,
+    chunk_size: Optional[int] = None
+) -> int:
+    """Link papers to every keyword whose name occurs in their title or summary.
+
+    All keyword names are compiled into one matcher and each paper text is
+    scanned once. Papers are processed in chunks of ``chunk_size``: the
+    existing links of a chunk are read in one query, the missing ones are
+    inserted in bulk and the chunk is committed. With ``workers`` > 1 the
+    text scanning runs in a process pool while the parent process keeps
+    reading and writing the database.
+
+    ``limit`` restricts the rebuild to the most recently published papers;
+    ``None`` processes the whole corpus. Returns the number of links added.
+    """
+    start_time = time.time()
+    chunk_size = chunk_size or settings.ingest_chunk_size
+    keyword_ids = build_keyword_index(db.query(models.Keyword.id, models.Keyword.name))
+    if not keyword_ids:
+        return 0
+
+    paper_query = db.query(models.Paper.id)
+    if limit is not None:
+        paper_query = paper_query.order_by(models.Paper.published_at.desc()).limit(limit)
+    else:
+        paper_query = paper_query.order_by(models.Paper.id)
+    paper_ids = [paper_id for paper_id, in paper_query]
+    id_chunks = [paper_ids[i:i + chunk_size] for i in range(0, len(paper_ids), chunk_size)]
+    text_chunks = (_load_texts(db, chunk) for chunk in id_chunks)
+
+    executor = None
+    if workers > 1 and len(id_chunks) > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(keyword_ids,))
+        matched_chunks = _ordered_map(executor, _match_in_worker, text_chunks, workers * 2)
+    else:
+        matcher = KeywordMatcher({term: term for term in keyword_ids})
+        matched_chunks = (match_texts(matcher, keyword_ids, rows) for rows in text_chunks)
+
+    associations_added = 0
+    try:
+        for chunk, pairs in zip(id_chunks, matched_chunks):
+            associations_added += _insert_missing_pairs(db, chunk, pairs)
+            db.commit()
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    logger.info(
+        f"Scanned {len(paper_ids)} papers for {len(keyword_ids)} keyword names and added "
+        f"{associations_added} associations in {time.time() - start_time:.2f} seconds."
+    )
+    return associations_added
+
+
+@dataclass
+class ReextractionResult:
+    """Counts for one re-extraction run"""
+    papers_processed: int = 0
+    papers_changed: int = 0
+    links_added: int = 0
+    links_removed: int = 0
+    keyword_ids: set[int] = field(default_factory=set)
+
+
+def extract_papers(rows: list[PaperRow]) -> list[Extraction]:
+    """Run the current keyword extractor over (paper_id, title, summary) rows, as ingestion does"""
+    keyword_lists = extract_technical_terms_batch(f"{title} {summary}" for _, title, summary in rows)
+    return [
+        (paper_id, get_paper_content_hash(title, summary), keywords)
+        for (paper_id, title, summary), keywords in zip(rows, keyword_lists)
+    ]
+
+
+def _iter_stale_papers(db: Session, extractor_version: str, chunk_size: int) -> Iterator[list[PaperRow]]:
+    """Yield chunks of papers whose extraction record is missing or stale.
+
+    A record is stale if it comes from another extractor version or its
+    content_hash differs from the hash of the paper's current title and
+    summary (the text was edited after extraction). The hash is computed in
+    Python, so every paper text is read once per run; only stale papers are
+    extracted again. Papers are paged by id, so chunks that are still being
+    extracted are not selected again before their results are written.
+    """
+    last_id = 0
+    stale: list[PaperRow] = []
+    while True:
+        rows = (
+            db.query(
+                models.Paper.id, models.Paper.title, models.Paper.summary,
+                models.PaperExtraction.extractor_version, models.PaperExtraction.content_hash
+            )
+            .outerjoin(models.PaperExtraction, models.PaperExtraction.paper_id == models.Paper.id)
+            .filter(models.Paper.id > last_id)
+            .order_by(models.Paper.id)
+            .limit(chunk_size)
+            .all()
+        )
+        for paper_id, title, summary, version, content_hash in rows:
+            if version != extractor_version or content_hash != get_paper_content_hash(title, summary):
+                stale.append((paper_id, title, summary))
+        while len(stale) >= chunk_size:
+            yield stale[:chunk_size]
+            stale = stale[chunk_size:]
+        if len(rows) < chunk_size:
+            if stale:
+                yield stale
+            return
+        last_id = rows[-1][0]
+
+
+def _apply_extractions(
+    db: Session,
+    ingestor: BulkIngestor,
+    extractor_version: str,
+    extractions: list[Extraction],
+    result: ReextractionResult
+) -> None:
+    """Replace the extracted links of a chunk with the new extractor output.
+
+    Only the difference to the previously recorded keywords is written: new
+    names are linked, names the extractor no longer produces are unlinked.
+    Papers without a previous record are only linked, since links of
+    unknown origin cannot be told apart from extracted ones.
+    """
+    paper_ids = [paper_id for paper_id, _, _ in extractions]
+    previous = dict(
+        db.query(models.PaperExtraction.paper_id, models.PaperExtraction.keywords)
+        .filter(models.PaperExtraction.paper_id.in_(paper_ids))
+        .all()
+    )
+
+    added: list[tuple[int, str]] = []
+    removed: list[tuple[int, str]] = []
+    for paper_id, _, keywords in extractions:
+        old_names = set(previous.get(paper_id) or [])
+        new_names = set(keywords)
+        if paper_id in previous and old_names == new_names:
+            continue
+        result.papers_changed += 1
+        added.extend((paper_id, name) for name in new_names - old_names)
+        removed.extend((paper_id, name) for name in old_names - new_names)
+
+    if added:
+        keyword_ids = ingestor.keyword_ids_for(name for _, name in added)
+        pairs = [(paper_id, keyword_ids[name]) for paper_id, name in added if name in keyword_ids]
+        result.links_added += _insert_missing_pairs(db, paper_ids, pairs)
+        result.keyword_ids.update(keyword_id for _, keyword_id in pairs)
+    if removed:
+        removed_ids = dict(
+            db.query(models.Keyword.name, models.Keyword.id)
+            .filter(models.Keyword.name.in_({name for _, name in removed}))
+            .all()
+        )
+        pairs = [(paper_id, removed_ids[name]) for paper_id, name in removed if name in removed_ids]
+        if pairs:
+            link_filter = tuple_(models.PaperKeyword.paper_id, models.PaperKeyword.keyword_id).in_(pairs)
+            linked = db.query(models.PaperKeyword.keyword_id, models.PaperKeyword.week_start).filter(link_filter).all()
+            db.query(models.PaperKeyword).filter(link_filter).delete(synchronize_session=False)
+            record_links(db, linked, sign=-1)
+            result.links_removed += len(linked)
+
+    db.query(models.PaperExtraction).filter(
+        models.PaperExtraction.paper_id.in_(paper_ids)
+    ).delete(synchronize_session=False)
+    db.execute(insert(models.PaperExtraction), [
+        {'paper_id': paper_id, 'extractor_version': extractor_version, 'content_hash': content_hash, 'keywords': keywords}
+        for paper_id, content_hash, keywords in extractions
+    ])
+    result.papers_processed += len(extractions)
+
+
+def reextract_stale_papers(
+    db: Session,
+    workers: int = 1,
+    chunk_size: Optional[int] = None,
+    should_stop: Optional[Callable[[], bool]] = None
+) -> ReextractionResult:
+    """Re-run keyword extraction for papers extracted by an older extractor
+    version or whose title or summary changed since they were extracted.
+
+    The extractor version hashes the whole dictionary and the quality rules,
+    so any dictionary edit makes every paper stale: the next run reads and
+    re-extracts the full corpus, although only papers whose keywords change
+    get their links rewritten. Batch dictionary edits before running it.
+
+    Each chunk is committed together with the new extraction records, so an
+    interrupted run resumes with the papers that are still stale. With
+    ``workers`` > 1 extraction runs in a process pool. ``should_stop`` is
+    checked after every committed chunk. Keywords linked by the run get the
+    same scoped quality cleanup as after ingestion.
+    """
+    start_time = time.time()
+    chunk_size = chunk_size or settings.ingest_chunk_size
+    extractor_version = get_keyword_extractor_version()
+    ingestor = BulkIngestor(db, chunk_size=chunk_size)
+    result = ReextractionResult()
+    paper_chunks = _iter_stale_papers(db, extractor_version, chunk_size)
+
+    executor = None
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        extracted_chunks = _ordered_map(executor, extract_papers, paper_chunks, workers * 2)
+    else:
+        extracted_chunks = (extract_papers(rows) for rows in paper_chunks)
+
+    try:
+        for extractions in extracted_chunks:
+            _apply_extractions(db, ingestor, extractor_version, extractions, result)
+            db.commit()
+            logger.info(f"Re-extracted keywords for {result.papers_processed} papers ({result.papers_changed} changed).")
+            if should_stop and should_stop():
+                break
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    if result.keyword_ids:
+        cleanup_low_quality_keywords(db, keyword_ids=result.keyword_ids)
+    logger.info(
+        f"Re-extraction with extractor {extractor_version} finished in {time.time() - start_time:.2f} seconds: "
+        f"{result.papers_processed} papers, {result.links_added} links added, {result.links_removed} removed."
+    )
+    return result
+
+
+def resolve_worker_count(workers: Optional[int] = None) -> int:
+    """Default to settings.keyword_rebuild_workers; 0 means one process per CPU core"""
+    if workers is None:
+        workers = settings.keyword_rebuild_workers
+    return workers or os.cpu_count() or 1
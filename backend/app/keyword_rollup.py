@@ -0,0 +1,269 @@
+"""
+Pre-aggregated paper counts per keyword and week (keyword_weekly_counts).
+
+Bulk write paths report the links they add or remove, links written through
+the ORM are counted by mapper events, and the dashboard aggregations read
+whole weeks from the rollup instead of scanning every paper-keyword link.
+Every change other than the links of newly ingested papers also bumps the
+links_version counter, which in-memory copies of paper_keywords watch, and
+every change updates the paper_keywords total in corpus_counters.
+
+paper_keywords carries a copy of the paper's published_at and week_start,
+so the rollup and the edge-week counts are read from its covering indexes
+without joining papers or bucketing dates in SQL.
+"""
+import logging
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import bindparam, delete, event, func, insert, inspect, select, text, tuple_, union_all, update
+from sqlalchemy.orm import Session
+
+from . import counters, models
+
+logger = logging.getLogger(__name__)
+
+WEEK = timedelta(days=7)
+SQL_ID_CHUNK_SIZE = 500
+BACKFILL_BATCH_SIZE = 10_000
+
+
+def week_start_of(dt: datetime) -> date:
+    """First day (Tuesday, UTC) of the week containing dt, the week label of the trends API"""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc)
+    day = dt.date()
+    return day - timedelta(days=(day.weekday() - 1) % 7)
+
+
+def _week_datetime(week: date) -> datetime:
+    return datetime(week.year, week.month, week.day, tzinfo=timezone.utc)
+
+
+def _chunked(items: list, size: int = SQL_ID_CHUNK_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def link_values(paper_id: int, keyword_id: int, published_at: datetime) -> dict:
+    """Column values of a paper_keywords row, including the copied publication time and week"""
+    return {
+        'paper_id': paper_id,
+        'keyword_id': keyword_id,
+        'published_at': published_at,
+        'week_start': week_start_of(published_at)
+    }
+
+
+def apply_deltas(db: Session, deltas: dict[tuple[int, date], int]) -> None:
+    """Add {(keyword_id, week_start): delta} to the rollup inside the caller's transaction"""
+    table = models.KeywordWeeklyCount
+    keys = [key for key, delta in deltas.items() if delta]
+    if keys:
+        counters.increment(db, counters.LINKS, sum(deltas[key] for key in keys))
+    for chunk in _chunked(keys):
+        totals = Counter({key: deltas[key] for key in chunk})
+        key_filter = tuple_(table.keyword_id, table.week_start).in_(chunk)
+        for keyword_id, week, count in db.query(table.keyword_id, table.week_start, table.count).filter(key_filter):
+            totals[(keyword_id, week)] += count
+        db.query(table).filter(key_filter).delete(synchronize_session=False)
+        rows = [
+            {'keyword_id': keyword_id, 'week_start': week, 'count': count}
+            for (keyword_id, week), count in totals.items() if count > 0
+        ]
+        if rows:
+            db.execute(insert(table), rows)
+
+
+def record_links(db: Session, links: Iterable[tuple[int, date]], sign: int = 1) -> None:
+    """Count added (sign=1) or removed (sign=-1) links given as (keyword_id, week_start), one per link"""
+    deltas = Counter(links)
+    if not deltas:
+        return
+    apply_deltas(db, {key: sign * count for key, count in deltas.items()})
+    counters.increment(db, counters.LINKS_VERSION)
+
+
+def discard_keywords(db: Session, keyword_ids: list[int]) -> None:
+    """Drop the rollup rows of deleted keywords"""
+    if not keyword_ids:
+        return
+    for chunk in _chunked(keyword_ids):
+        counters.increment(db, counters.LINKS, -_rollup_total(db, chunk))
+        db.query(models.KeywordWeeklyCount).filter(
+            models.KeywordWeeklyCount.keyword_id.in_(chunk)
+        ).delete(synchronize_session=False)
+    counters.increment(db, counters.LINKS_VERSION)
+
+
+def _rollup_total(db: Session, keyword_ids: list[int]) -> int:
+    table = models.KeywordWeeklyCount
+    return db.query(func.coalesce(func.sum(table.count), 0)).filter(table.keyword_id.in_(keyword_ids)).scalar()
+
+
+def rebuild_weekly_counts(db: Session, keyword_ids: Optional[Iterable[int]] = None) -> None:
+    """Recompute the rollup from paper_keywords, for all keywords or only keyword_ids (the caller commits)"""
+    start_time = time.time()
+    table = models.KeywordWeeklyCount
+    source = (
+        select(models.PaperKeyword.keyword_id, models.PaperKeyword.week_start, func.count())
+        .group_by(models.PaperKeyword.keyword_id, models.PaperKeyword.week_start)
+    )
+    columns = ['keyword_id', 'week_start', 'count']
+    counters.increment(db, counters.LINKS_VERSION)
+    if keyword_ids is None:
+        db.execute(delete(table))
+        db.execute(insert(table).from_select(columns, source))
+        counters.set_counter(db, counters.LINKS, db.query(func.coalesce(func.sum(table.count), 0)).scalar())
+        logger.info(f"Rebuilt keyword weekly counts in {time.time() - start_time:.2f} seconds.")
+        return
+    for chunk in _chunked(sorted(set(keyword_ids))):
+        previous_total = _rollup_total(db, chunk)
+        db.query(table).filter(table.keyword_id.in_(chunk)).delete(synchronize_session=False)
+        db.execute(insert(table).from_select(columns, source.where(models.PaperKeyword.keyword_id.in_(chunk))))
+        counters.increment(db, counters.LINKS, _rollup_total(db, chunk) - previous_total)
+
+
+def ensure_link_dates(db: Session) -> bool:
+    """Add and fill paper_keywords.published_at/week_start on a database created before they existed.
+
+    create_all does not alter existing tables, so the columns and their
+    indexes are added here, and the values are copied from papers in
+    batches. Returns True if the table was upgraded (the caller's session is
+    committed).
+    """
+    bind = db.get_bind()
+    table = models.PaperKeyword.__table__
+    existing = {column['name'] for column in inspect(bind).get_columns(table.name)}
+    missing = [column for column in (table.c.published_at, table.c.week_start) if column.name not in existing]
+    if not missing:
+        return False
+
+    start_time = time.time()
+    for column in missing:
+        db.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=bind.dialect)}"))
+    fill = (
+        update(table)
+        .where(table.c.paper_id == bindparam('link_paper_id'))
+        .values(published_at=bindparam('link_published_at'), week_start=bindparam('link_week_start'))
+    )
+    papers = db.execute(
+        select(models.Paper.id, models.Paper.published_at)
+        .where(models.Paper.id.in_(select(table.c.paper_id)))
+        .execution_options(yield_per=BACKFILL_BATCH_SIZE)
+    )
+    for batch in papers.partitions():
+        db.execute(fill, [
+            {'link_paper_id': paper_id, 'link_published_at': published_at, 'link_week_start': week_start_of(published_at)}
+            for paper_id, published_at in batch
+        ])
+    for index in table.indexes:
+        index.create(db.connection(), checkfirst=True)
+    db.commit()
+    logger.info(f"Added publication dates to paper_keywords in {time.time() - start_time:.2f} seconds.")
+    return True
+
+
+def _raw_weekly_counts(start: Optional[datetime], end: Optional[datetime], keyword_ids: Optional[list[int]]):
+    query = (
+        select(
+            models.PaperKeyword.keyword_id,
+            models.PaperKeyword.week_start.label('week_start'),
+            func.count().label('count')
+        )
+        .group_by(models.PaperKeyword.keyword_id, models.PaperKeyword.week_start)
+    )
+    # 週の条件は冗長だが、(week_start, keyword_id) のインデックスで範囲を絞れる
+    if start is not None:
+        query = query.where(models.PaperKeyword.week_start >= week_start_of(start), models.PaperKeyword.published_at >= start)
+    if end is not None:
+        query = query.where(models.PaperKeyword.week_start <= week_start_of(end), models.PaperKeyword.published_at < end)
+    if keyword_ids is not None:
+        query = query.where(models.PaperKeyword.keyword_id.in_(keyword_ids))
+    return query
+
+
+def weekly_counts(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    keyword_ids: Optional[list[int]] = None
+):
+    """Subquery of (keyword_id, week_start, count) for papers published in [start, end).
+
+    Weeks that lie entirely inside the window are read from the rollup; the
+    partial weeks at either edge are counted from paper_keywords, so the
+    counts are exact for any window.
+    """
+    table = models.KeywordWeeklyCount
+    first_week = last_week = None  # 集計テーブルから読む週の範囲 [first_week, last_week)
+    if start is not None:
+        first_week = week_start_of(start)
+        if _week_datetime(first_week) < start:
+            first_week += WEEK
+    if end is not None:
+        last_week = week_start_of(end)
+
+    if first_week is not None and last_week is not None and first_week >= last_week:
+        return _raw_weekly_counts(start, end, keyword_ids).subquery()
+
+    rollup = select(table.keyword_id, table.week_start.label('week_start'), table.count.label('count'))
+    if first_week is not None:
+        rollup = rollup.where(table.week_start >= first_week)
+    if last_week is not None:
+        rollup = rollup.where(table.week_start < last_week)
+    if keyword_ids is not None:
+        rollup = rollup.where(table.keyword_id.in_(keyword_ids))
+    parts = [rollup]
+    if first_week is not None and _week_datetime(first_week) > start:
+        parts.append(_raw_weekly_counts(start, _week_datetime(first_week), keyword_ids))
+    if last_week is not None and _week_datetime(last_week) < end:
+        parts.append(_raw_weekly_counts(_week_datetime(last_week), end, keyword_ids))
+    return union_all(*parts).subquery() if len(parts) > 1 else rollup.subquery()
+
+
+def keyword_counts(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    keyword_ids: Optional[list[int]] = None
+):
+    """Subquery of (keyword_id, count) for papers published in [start, end)"""
+    weeks = weekly_counts(start, end, keyword_ids)
+    return (
+        select(weeks.c.keyword_id, func.sum(weeks.c.count).label('count'))
+        .group_by(weeks.c.keyword_id)
+        .subquery()
+    )
+
+
+def _count_orm_link(connection, link: models.PaperKeyword, sign: int) -> None:
+    counters.increment(connection, counters.LINKS_VERSION)
+    counters.increment(connection, counters.LINKS, sign)
+    table = models.KeywordWeeklyCount
+    key = (table.keyword_id == link.keyword_id) & (table.week_start == link.week_start)
+    updated = connection.execute(update(table).where(key).values(count=table.count + sign)).rowcount
+    if sign > 0 and not updated:
+        connection.execute(insert(table).values(keyword_id=link.keyword_id, week_start=link.week_start, count=sign))
+    elif sign < 0:
+        connection.execute(delete(table).where(key, table.count <= 0))
+
+
+# ORMで追加された関連付けには論文の公開日時と週を複製する
+@event.listens_for(models.PaperKeyword, 'before_insert')
+def _copy_publication_time(mapper, connection, target):
+    if target.published_at is None:
+        target.published_at = connection.scalar(select(models.Paper.published_at).where(models.Paper.id == target.paper_id))
+    if target.week_start is None and target.published_at is not None:
+        target.week_start = week_start_of(target.published_at)
+
+
+# ORMで個別に追加・削除された関連付けも集計に反映する（一括処理の経路はrecord_linksを呼ぶ）
+@event.listens_for(models.PaperKeyword, 'after_insert')
+def _count_inserted_link(mapper, connection, target):
+    _count_orm_link(connection, target, 1)
+
+
+@event.listens_for(models.PaperKeyword, 'after_delete')
+def _count_deleted_link(mapper, connection, target):
+    _count_orm_link(connection, target, -1)
@@ -5,21 +5,32 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response
 from starlette.types import ASGIApp
 from asyncio import TimeoutError, wait_for
-from sqlalchemy import func
 from collections import defaultdict
+from contextlib import asynccontextmanager
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta, timezone
 import logging
 import time
 
-from . import models, schemas, services
-from .database import engine, get_db
+from . import counters, models, schemas, services
+from .database import SessionLocal, engine, get_db
 from .config import settings
+from .ingest_jobs import ingest_jobs
+from .candidate_keywords import get_candidate_keywords
+from .migrations import init_db
 
-# データベースとテーブルを作成
-models.Base.metadata.create_all(bind=engine)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # テーブル作成・スキーマ更新・未実行のデータ移行（CLIのスクリプトも書き込み前に同じinit_dbを呼ぶ）
+    init_db(engine)
+    with SessionLocal() as db:
+        # 保持期間を過ぎたAI分析結果のキャッシュを削除（定期実行はscripts/prune_ai_cache.py）
+        services.prune_ai_caches(db)
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
 
 # CORSミドルウェアの設定
 app.add_middleware(
@@ -104,9 +115,46 @@ def get_trends(
 
     return services.get_trends_data(db, keywords, start_datetime, end_datetime)
 
+@app.get("/api/v1/categories/trends", response_model=list[schemas.CategoryTrendResult])
+def get_category_trends(
+    categories: list[str] = Query(..., description="分析したいarXivカテゴリのリスト (例: cs.CL)"),
+    start_date: str | None = Query(None, description="開始日 (YYYY-MM-DD)"),
+    end_date: str | None = Query(None, description="終了日 (YYYY-MM-DD)"),
+    db: Session = Depends(get_db)
+):
+    if not categories:
+        raise HTTPException(status_code=400, detail="カテゴリは少なくとも1つ指定してください。")
+
+    # 日付文字列をdatetimeオブジェクトに変換
+    start_datetime = None
+    end_datetime = None
+    
+    try:
+        if start_date:
+            if 'T' in start_date:
+                start_datetime = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
+            else:
+                start_datetime = datetime.strptime(start_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        if end_date:
+            if 'T' in end_date:
+                end_datetime = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
+            else:
+                end_datetime = datetime.strptime(end_date, "%Y-%m-%d").replace(hour=23, minute=59, second=59, tzinfo=timezone.utc)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="日付フォーマットが正しくありません。YYYY-MM-DD または YYYY-MM-DDTHH:MM:SSZ形式で入力してください。")
+
+    if start_datetime and end_datetime and start_datetime > end_datetime:
+        raise HTTPException(status_code=400, detail="開始日は終了日より前に設定してください。")
+
+    return services.get_category_trends_data(db, categories, start_datetime, end_datetime)
+
 @app.get("/api/v1/dashboard/trending-keywords", response_model=schemas.DashboardTrendingKeywords)
-def get_trending_keywords(db: Session = Depends(get_db)):
-    trending_keywords = services.get_trending_keywords_data(db)
+def get_trending_keywords(
+    window: int | None = Query(None, ge=1, le=3650, description="直近の期間の日数（未指定の場合は設定値）"),
+    baseline: int | None = Query(None, ge=1, le=3650, description="比較する直前の期間の日数（未指定の場合は設定値）"),
+    db: Session = Depends(get_db)
+):
+    trending_keywords = services.get_trending_keywords_data(db, window, baseline)
     return {"trending_keywords": trending_keywords}
 
 @app.get("/api/v1/dashboard/summary", response_model=schemas.DashboardSummary)
@@ -149,15 +197,19 @@ def search_papers(
     return services.search_papers(db, query, skip, limit, start_datetime, end_datetime, sort_by)
 
 @app.get("/api/v1/keywords/word-cloud", response_model=list[schemas.WordData])
-def get_word_cloud(db: Session = Depends(get_db)):
-    return services.get_word_cloud_data(db)
+def get_word_cloud(
+    window: int | None = Query(None, ge=1, le=3650, description="集計する直近の日数（未指定の場合は設定値）"),
+    db: Session = Depends(get_db)
+):
+    return services.get_word_cloud_data(db, window)
 
 @app.post("/api/v1/keywords/word-cloud", response_model=list[schemas.WordData])
 def get_word_cloud_with_dictionary(
     dictionary: list[schemas.DictionaryKeyword] = Body(...),
+    window: int | None = Query(None, ge=1, le=3650, description="集計する直近の日数（未指定の場合は16週間）"),
     db: Session = Depends(get_db)
 ):
-    return services.get_word_cloud_data_with_dictionary(db, dictionary)
+    return services.get_word_cloud_data_with_dictionary(db, dictionary, window)
 
 @app.post("/api/v1/keywords/suggestions", response_model=list[str])
 def get_keyword_suggestions(
@@ -166,15 +218,24 @@ def get_keyword_suggestions(
 ):
     return services.get_keyword_suggestions(dictionary, query)
 
+@app.get("/api/v1/keywords/candidates", response_model=schemas.CandidateKeywordsResponse)
+def get_keyword_candidates(
+    limit: int = Query(settings.candidate_keywords_limit, ge=1, le=200, description="取得する最大件数"),
+    months: int = Query(1, ge=1, le=12, description="比較する直近の月数"),
+    min_count: int | None = Query(None, ge=1, description="直近の期間での最低出現数"),
+    db: Session = Depends(get_db)
+):
+    """まだキーワードになっていない、急増しているフレーズの一覧"""
+    return get_candidate_keywords(db, limit=limit, months=months, min_count=min_count)
+
 @app.get("/api/v1/keywords/stats")
 def get_keyword_stats(db: Session = Depends(get_db)):
     """キーワード統計情報"""
-    total_keywords = db.query(func.count(models.Keyword.id)).scalar()
-    total_associations = db.query(func.count(models.PaperKeyword.paper_id)).scalar()
+    totals = counters.get_counters(db, [counters.KEYWORDS, counters.LINKS])
     
     return {
-        "total_keywords": total_keywords,
-        "total_associations": total_associations
+        "total_keywords": totals[counters.KEYWORDS],
+        "total_associations": totals[counters.LINKS]
     }
 
 @app.post("/api/v1/hot-topics/summary", response_model=schemas.HotTopicsResponse)
@@ -188,13 +249,16 @@ async def get_hot_topics_summary(
         days = min(max(request.days or settings.hot_topics_analysis_days, 1), 90)  # Configurable default days
         max_topics = min(max(request.max_topics or settings.hot_topics_max_topics, 1), 50)  # Configurable default topics
         language = request.language or "auto"
+        baseline = min(max(request.baseline, 1), 3650) if request.baseline else None
         
         # Call service function
         response = await services.get_hot_topics_summary(
             db=db,
             language=language,
             days=days,
-            max_topics=max_topics
+            max_topics=max_topics,
+            baseline_days=baseline,
+            force_regenerate=request.force_regenerate
         )
         
         return response
@@ -211,6 +275,8 @@ async def get_hot_topics_summary_get(
     language: str = Query("auto", description="Summary language (auto, en, ja, zh, ko, de)"),
     days: int = Query(30, ge=1, le=90, description="Analysis period in days"),
     max_topics: int = Query(20, ge=1, le=50, description="Maximum number of topics"),
+    baseline: int | None = Query(None, ge=1, le=3650, description="Days before the analysis period used as the baseline"),
+    force_regenerate: bool = Query(False, description="Run the analysis again instead of returning the cached result"),
     db: Session = Depends(get_db)
 ):
     """Generate hot topics summary using AI analysis (GET version)"""
@@ -220,7 +286,9 @@ async def get_hot_topics_summary_get(
             db=db,
             language=language,
             days=days,
-            max_topics=max_topics
+            max_topics=max_topics,
+            baseline_days=baseline,
+            force_regenerate=force_regenerate
         )
         
         return response
@@ -368,6 +436,34 @@ async def fetch_papers_endpoint(
             detail=f"Failed to fetch papers: {str(e)}"
         )
 
+@app.get("/api/v1/papers/fetch/progress", response_model=schemas.IngestProgress)
+def get_fetch_progress(
+    run_id: int | None = Query(None, description="取り込み実行ID（未指定の場合は最新）"),
+    db: Session = Depends(get_db)
+):
+    """Get the progress of a running or finished paper fetch"""
+    progress = services.get_ingest_progress(db, run_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="取り込み処理の記録が見つかりません。")
+    return progress
+
+@app.get("/api/v1/papers/fetch/jobs/{job_id}", response_model=schemas.IngestProgress)
+def get_fetch_job(job_id: int, db: Session = Depends(get_db)):
+    """Get the progress of a paper fetch job"""
+    progress = services.get_ingest_progress(db, job_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="指定された取り込みジョブが見つかりません。")
+    return progress
+
+@app.post("/api/v1/papers/fetch/jobs/{job_id}/cancel", response_model=schemas.IngestProgress)
+def cancel_fetch_job(job_id: int, db: Session = Depends(get_db)):
+    """Cancel a running paper fetch job after its current page"""
+    if services.get_ingest_progress(db, job_id) is None:
+        raise HTTPException(status_code=404, detail="指定された取り込みジョブが見つかりません。")
+    if not ingest_jobs.cancel(db, job_id):
+        raise HTTPException(status_code=409, detail="実行中のジョブではないためキャンセルできません。")
+    return services.get_ingest_progress(db, job_id)
+
 @app.get("/api/v1/papers/latest-date")
 async def get_latest_paper_date(db: Session = Depends(get_db)):
     """Get the latest paper date in the database"""
@@ -476,6 +572,31 @@ def get_trend_summary_endpoint(
             detail=f"トレンド要約の取得に失敗しました: {str(e)}"
         )
 
+@app.get("/api/v1/trend-summary/{summary_id}/papers", response_model=schemas.TrendSummaryPapersResponse)
+def get_trend_summary_papers_endpoint(
+    summary_id: int,
+    skip: int = Query(0, ge=0, description="スキップする件数"),
+    limit: int = Query(100, ge=1, le=500, description="取得する最大件数"),
+    db: Session = Depends(get_db)
+):
+    """Get the papers analyzed by a trend summary, in analysis order"""
+    try:
+        response = services.get_trend_summary_papers(db=db, summary_id=summary_id, skip=skip, limit=limit)
+        if not response:
+            raise HTTPException(
+                status_code=404,
+                detail="指定されたトレンド要約が見つかりません"
+            )
+        return response
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Failed to get trend summary papers: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"トレンド要約の論文の取得に失敗しました: {str(e)}"
+        )
+
 @app.delete("/api/v1/trend-summary/{summary_id}")
 def delete_trend_summary_endpoint(
     summary_id: int,
@@ -0,0 +1,66 @@
+"""
+Shared database initialization: tables, schema upgrades and one-time data migrations
+
+Every process that writes the database calls init_db before its first
+write: the API server at startup, and scripts/fetch_papers.py and
+scripts/maintain_keywords.py. Derived tables (the keyword weekly rollup, the
+corpus counters) are maintained incrementally by the writers, so a writer
+running on an upgraded database before they were built would leave them
+partial. Whether they have rows therefore says nothing about whether they are
+complete. Instead, each data migration is recorded in schema_migrations,
+committed with its result, and runs exactly once per database.
+
+Schema upgrades that create_all cannot make (new columns on existing tables)
+inspect the live schema and run on every call; they are cheap when there is
+nothing to do.
+"""
+import logging
+import time
+from typing import Callable, Optional
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from . import counters, keyword_rollup, models, services, tfidf
+from .database import engine, insert_or_ignore
+
+logger = logging.getLogger(__name__)
+
+# 一度だけ実行するデータ移行（名前はschema_migrationsに記録される。追加は末尾に）
+DATA_MIGRATIONS: list[tuple[str, Callable[[Session], object]]] = [
+    ('keyword_weekly_counts', keyword_rollup.rebuild_weekly_counts),
+    ('corpus_counters', counters.rebuild_counters),
+    ('trend_summary_papers', services.ensure_trend_summary_papers),
+    ('tfidf_week_vectors', tfidf.rebuild_week_vectors),
+]
+
+
+def applied_migrations(db: Session) -> set[str]:
+    return {name for name, in db.query(models.SchemaMigration.name)}
+
+
+def run_data_migrations(db: Session) -> list[str]:
+    """Run the data migrations not recorded yet, each committed together with its marker"""
+    applied = applied_migrations(db)
+    ran = []
+    for name, migrate in DATA_MIGRATIONS:
+        if name in applied:
+            continue
+        start_time = time.time()
+        migrate(db)
+        db.execute(insert_or_ignore(db, models.SchemaMigration, ['name']).values(name=name))
+        db.commit()
+        ran.append(name)
+        logger.info(f"Applied data migration {name} in {time.time() - start_time:.2f} seconds.")
+    return ran
+
+
+def init_db(bind: Optional[Engine] = None) -> list[str]:
+    """Create missing tables, upgrade old schemas and apply pending data migrations; returns the migrations run"""
+    bind = bind or engine
+    models.Base.metadata.create_all(bind=bind)
+    with Session(bind=bind, autoflush=False) as db:
+        # create_allでは既存テーブルに列を追加できないため、実際のスキーマを見て更新する
+        keyword_rollup.ensure_link_dates(db)
+        services.ensure_ai_cache_tables(db)
+        return run_data_migrations(db)
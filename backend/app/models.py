@@ -1,5 +1,4 @@
-
-from sqlalchemy import Column, Integer, String, DateTime, JSON, Text, ForeignKey, Index
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Text, ForeignKey, Index, Boolean, UniqueConstraint, LargeBinary, Date
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from .database import Base, UTCDateTime
@@ -17,6 +16,7 @@ class Paper(Base):
     updated_at = Column(UTCDateTime, server_default=func.now(), onupdate=func.now())
 
     keywords = relationship("PaperKeyword", back_populates="paper")
+    categories = relationship("PaperCategory", back_populates="paper")
 
     __table_args__ = (
         Index('idx_paper_published_title', 'published_at', 'title'),
@@ -36,10 +36,103 @@ class PaperKeyword(Base):
 
     paper_id = Column(Integer, ForeignKey("papers.id"), primary_key=True)
     keyword_id = Column(Integer, ForeignKey("keywords.id"), primary_key=True)
+    # 集計クエリがpapersと結合せずに済むよう、論文の公開日時とその週（火曜始まり）を複製して持つ
+    published_at = Column(UTCDateTime, nullable=False)
+    week_start = Column(Date, nullable=False)
 
     paper = relationship("Paper", back_populates="keywords")
     keyword = relationship("Keyword", back_populates="papers")
 
+    __table_args__ = (
+        Index('idx_paper_keywords_keyword_week', 'keyword_id', 'week_start', 'published_at'),
+        Index('idx_paper_keywords_week_keyword', 'week_start', 'keyword_id', 'published_at'),
+    )
+
+class Category(Base):
+    __tablename__ = "categories"
+
+    id = Column(Integer, primary_key=True, index=True)
+    term = Column(String, unique=True, index=True, nullable=False)  # arXiv category term, e.g. cs.CL
+
+    papers = relationship("PaperCategory", back_populates="category")
+
+class PaperCategory(Base):
+    __tablename__ = "paper_categories"
+
+    paper_id = Column(Integer, ForeignKey("papers.id"), primary_key=True)
+    category_id = Column(Integer, ForeignKey("categories.id"), primary_key=True, index=True)
+
+    paper = relationship("Paper", back_populates="categories")
+    category = relationship("Category", back_populates="papers")
+
+class PaperExtraction(Base):
+    __tablename__ = "paper_extractions"
+
+    paper_id = Column(Integer, ForeignKey("papers.id"), primary_key=True)
+    extractor_version = Column(String(64), nullable=False, index=True)  # Version of the extractor that produced keywords
+    content_hash = Column(String(64), nullable=False)  # SHA-256 of the extracted title and summary
+    keywords = Column(JSON, nullable=False)  # Keyword names produced by the extractor
+    updated_at = Column(UTCDateTime, server_default=func.now(), onupdate=func.now())
+
+class KeywordWeeklyCount(Base):
+    __tablename__ = "keyword_weekly_counts"
+
+    keyword_id = Column(Integer, ForeignKey("keywords.id"), primary_key=True)
+    week_start = Column(Date, primary_key=True)  # First day (Tuesday) of the week, same label as the trends query
+    count = Column(Integer, nullable=False)  # Papers linked to the keyword that week
+
+    __table_args__ = (
+        Index('idx_keyword_weekly_counts_week_keyword', 'week_start', 'keyword_id', 'count'),
+    )
+
+class SchemaMigration(Base):
+    __tablename__ = "schema_migrations"
+
+    name = Column(String(100), primary_key=True)  # Data migration applied by app.migrations.init_db
+    applied_at = Column(UTCDateTime, server_default=func.now())
+
+class CorpusCounter(Base):
+    __tablename__ = "corpus_counters"
+
+    name = Column(String(64), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+class PaperDailyCount(Base):
+    __tablename__ = "paper_daily_counts"
+
+    day = Column(Date, primary_key=True)  # UTC publication day
+    count = Column(Integer, nullable=False)  # Papers published that day
+
+class CandidateTermCount(Base):
+    __tablename__ = "candidate_term_counts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    period = Column(String(7), nullable=False, index=True)  # Publication month (YYYY-MM)
+    term = Column(String, nullable=False)  # Lowercase n-gram
+    count = Column(Integer, nullable=False)  # Space-Saving estimate (overestimates by at most error)
+    error = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint('period', 'term', name='uq_candidate_term_period'),
+    )
+
+class TfidfTerm(Base):
+    __tablename__ = "tfidf_terms"
+
+    id = Column(Integer, primary_key=True, index=True)
+    term = Column(String, unique=True, nullable=False)  # Lowercase word or phrase
+
+class WeeklyTermVector(Base):
+    __tablename__ = "weekly_term_vectors"
+
+    id = Column(Integer, primary_key=True, index=True)
+    week_start = Column(UTCDateTime, unique=True, nullable=False)  # Tuesday 00:00 UTC, as keyword_rollup.week_start_of
+    paper_count = Column(Integer, nullable=False)
+    max_paper_id = Column(Integer, nullable=True)  # Detects papers added to the week after the vector was built
+    term_ids = Column(LargeBinary, nullable=False)  # Sorted little-endian int32 tfidf_terms ids
+    doc_freqs = Column(LargeBinary, nullable=False)  # Little-endian int32 document frequency per term id
+    updated_at = Column(UTCDateTime, server_default=func.now(), onupdate=func.now())
+
 class WeeklyTrendCache(Base):
     __tablename__ = "weekly_trend_cache"
 
@@ -63,6 +156,8 @@ class TopicKeywordsCache(Base):
     analysis_period_start = Column(UTCDateTime, nullable=False, index=True)
     analysis_period_end = Column(UTCDateTime, nullable=False, index=True)
     language = Column(String(10), nullable=False, index=True)
+    max_keywords = Column(Integer, nullable=False)
+    prompt_hash = Column(String(64), nullable=False)  # Hash of the system prompt ('' when none)
     keywords_data = Column(JSON, nullable=False)  # Array of {keyword, paper_count, relevance_score}
     total_papers_analyzed = Column(Integer, nullable=False)
     created_at = Column(UTCDateTime, server_default=func.now())
@@ -77,6 +172,7 @@ class TopicSummaryCache(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     keywords_hash = Column(String(64), nullable=False, index=True)  # Hash of sorted keywords
+    prompt_hash = Column(String(64), nullable=False)  # Hash of the system prompt ('' when none)
     language = Column(String(10), nullable=False, index=True)
     analysis_period_start = Column(UTCDateTime, nullable=False)
     analysis_period_end = Column(UTCDateTime, nullable=False)
@@ -92,6 +188,22 @@ class TopicSummaryCache(Base):
         Index('idx_topic_summary_hash_lang', 'keywords_hash', 'language'),
     )
 
+class HotTopicsCache(Base):
+    __tablename__ = "hot_topics_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    analysis_days = Column(Integer, nullable=False)
+    max_topics = Column(Integer, nullable=False)
+    language = Column(String(10), nullable=False)
+    data_version = Column(String(64), nullable=False)  # counters.data_version() when the analysis ran
+    hot_topics_data = Column(JSON, nullable=False)  # Array of HotTopic objects
+    total_papers_analyzed = Column(Integer, nullable=False)
+    created_at = Column(UTCDateTime, server_default=func.now())
+
+    __table_args__ = (
+        Index('idx_hot_topics_cache_key', 'analysis_days', 'max_topics', 'language', 'data_version'),
+    )
+
 class TrendSummary(Base):
     __tablename__ = "trend_summaries"
 
@@ -112,6 +224,13 @@ class TrendSummary(Base):
         Index('idx_trend_summary_created', 'created_at'),
     )
 
+class TrendSummaryPaper(Base):
+    __tablename__ = "trend_summary_papers"
+
+    trend_summary_id = Column(Integer, ForeignKey("trend_summaries.id"), primary_key=True)
+    position = Column(Integer, primary_key=True)  # 分析時の順番（要約中の[論文N]はposition N-1）
+    paper_id = Column(Integer, ForeignKey("papers.id"), nullable=False, index=True)
+
 class PaperSummary(Base):
     __tablename__ = "paper_summaries"
 
@@ -123,3 +242,40 @@ class PaperSummary(Base):
     updated_at = Column(UTCDateTime, server_default=func.now(), onupdate=func.now())
 
     paper = relationship("Paper", backref="paper_summary")
+
+class ArxivCategoryCache(Base):
+    __tablename__ = "arxiv_category_cache"
+
+    arxiv_id = Column(String, primary_key=True)  # Version-less arXiv ID
+    categories = Column(JSON, nullable=False)  # Array of category terms
+    fetched_at = Column(UTCDateTime, server_default=func.now())
+
+class IngestRun(Base):
+    __tablename__ = "ingest_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    search_query = Column(Text, nullable=False)
+    status = Column(String(20), nullable=False, default='running', index=True)  # running / cancelling (cancel requested) / completed / cancelled / failed
+    current_window = Column(String)  # Query window being harvested
+    pages_fetched = Column(Integer, nullable=False, default=0)
+    papers_fetched = Column(Integer, nullable=False, default=0)
+    papers_added = Column(Integer, nullable=False, default=0)
+    error_message = Column(Text)
+    started_at = Column(UTCDateTime, server_default=func.now())
+    updated_at = Column(UTCDateTime, server_default=func.now(), onupdate=func.now())
+    finished_at = Column(UTCDateTime)
+
+class IngestCheckpoint(Base):
+    __tablename__ = "ingest_checkpoints"
+
+    id = Column(Integer, primary_key=True, index=True)
+    search_query = Column(Text, nullable=False)  # Query without the submittedDate window
+    window_start = Column(UTCDateTime, nullable=False)
+    window_end = Column(UTCDateTime, nullable=False)
+    last_offset = Column(Integer, nullable=False, default=0)  # Offset of the next page to fetch
+    completed = Column(Boolean, nullable=False, default=False)
+    updated_at = Column(UTCDateTime, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('search_query', 'window_start', 'window_end', name='uq_ingest_checkpoint_window'),
+    )
@@ -0,0 +1,80 @@
+"""
+Stale-while-revalidate refreshes of cached AI analyses
+
+With settings.ai_serve_stale, the AI-backed endpoints answer from the last
+successful cached result even if it was computed for an earlier period or
+data version, and report its age. A result that is not current, or older than
+settings.ai_cache_fresh_seconds, is regenerated by a background task on the
+server's event loop. At most one refresh per cache key is in flight in this
+worker, so AI calls depend on how often results go stale, not on traffic.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+Regenerate = Callable[[Session], Awaitable[object]]
+
+
+class Revalidator:
+    """Single-flight background regeneration of cached results, keyed by cache key"""
+
+    def __init__(self):
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    def in_flight(self, key: str) -> bool:
+        task = self._tasks.get(key)
+        return task is not None and not task.done()
+
+    def schedule(self, key: str, bind: Engine, regenerate: Regenerate) -> bool:
+        """Run regenerate with its own session in the background unless key is already being refreshed"""
+        if self.in_flight(key):
+            return False
+        self._tasks[key] = asyncio.get_running_loop().create_task(self._run(key, bind, regenerate))
+        return True
+
+    def serve(
+        self,
+        key: str,
+        generated_at: datetime,
+        is_current: bool,
+        bind: Engine,
+        regenerate: Regenerate
+    ) -> tuple[float, bool]:
+        """Age in seconds of a cached result about to be served, and whether it is being refreshed.
+
+        In stale-while-revalidate mode a refresh is started if the result is
+        not current (older period or data version) or past the freshness window.
+        """
+        age = max(0.0, (datetime.now(timezone.utc) - generated_at).total_seconds())
+        if settings.ai_serve_stale and (not is_current or age > settings.ai_cache_fresh_seconds):
+            self.schedule(key, bind, regenerate)
+        return age, self.in_flight(key)
+
+    async def wait(self, timeout: Optional[float] = None) -> None:
+        """Wait until the refreshes in flight have finished"""
+        tasks = [task for task in self._tasks.values() if not task.done()]
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+
+    async def _run(self, key: str, bind: Engine, regenerate: Regenerate) -> None:
+        start_time = time.time()
+        try:
+            with Session(bind=bind) as db:
+                await regenerate(db)
+            logger.info(f"Refreshed cached {key} in {time.time() - start_time:.2f} seconds.")
+        except Exception as e:
+            logger.error(f"Background refresh of {key} failed: {e}", exc_info=True)
+        finally:
+            self._tasks.pop(key, None)
+
+
+revalidator = Revalidator()
@@ -32,6 +32,10 @@ class TrendResult(BaseModel):
 
     model_config = {'from_attributes': True}
 
+class CategoryTrendResult(BaseModel):
+    category: str
+    data: list[TrendDataPoint]
+
 class TrendingKeyword(BaseModel):
     name: str
     recent_count: int
@@ -41,6 +45,18 @@ class TrendingKeyword(BaseModel):
 
     model_config = {'from_attributes': True}
 
+class CandidateKeyword(BaseModel):
+    name: str
+    recent_count: int  # Guaranteed lower bound in the recent periods
+    previous_count: int  # Upper bound in the previous periods
+    growth_count: int
+    growth_rate_percent: float
+
+class CandidateKeywordsResponse(BaseModel):
+    recent_periods: list[str]  # Format: YYYY-MM
+    previous_periods: list[str]
+    candidates: list[CandidateKeyword]
+
 class DashboardTrendingKeywords(BaseModel):
     trending_keywords: list[TrendingKeyword]
 
@@ -92,6 +108,8 @@ class WeeklyTrendResponse(BaseModel):
     total_papers_analyzed: int
     generated_at: datetime
     papers: Optional[List['PaperResponse']] = None  # Papers used in the analysis
+    cache_age_seconds: Optional[float] = None  # Age of a cached result (None when generated for this request)
+    revalidating: bool = False  # A background refresh of the cached result is running
 
 # Topic Keywords Schemas
 class TopicKeyword(BaseModel):
@@ -110,6 +128,8 @@ class TopicKeywordsResponse(BaseModel):
     analysis_period: str
     total_papers_analyzed: int
     generated_at: datetime
+    cache_age_seconds: Optional[float] = None  # Age of a cached result (None when generated for this request)
+    revalidating: bool = False  # A background refresh of the cached result is running
 
 # Topic Summary Schemas
 class TopicSummaryRequest(BaseModel):
@@ -126,6 +146,8 @@ class TopicSummaryResponse(BaseModel):
     key_findings: List[str]
     generated_at: datetime
     papers: Optional[List[PaperResponse]] = None
+    cache_age_seconds: Optional[float] = None  # Age of a cached result (None when generated for this request)
+    revalidating: bool = False  # A background refresh of the cached result is running
 
 # Legacy Hot Topics Schemas (for backward compatibility)
 class HotTopicPaper(BaseModel):
@@ -148,12 +170,16 @@ class HotTopicsRequest(BaseModel):
     language: Optional[str] = "auto"
     days: Optional[int] = 30
     max_topics: Optional[int] = 20
+    baseline: Optional[int] = None  # Days before the analysis period used as the fallback baseline
+    force_regenerate: Optional[bool] = False
 
 class HotTopicsResponse(BaseModel):
     hot_topics: List[HotTopic]
     analysis_period_days: int
     total_papers_analyzed: int
     generated_at: datetime
+    cache_age_seconds: Optional[float] = None  # Age of a cached result (None when generated for this request)
+    revalidating: bool = False  # A background refresh of the cached result is running
 
 # Paper Fetching Schemas
 class PaperFetchRequest(BaseModel):
@@ -161,10 +187,23 @@ class PaperFetchRequest(BaseModel):
     end_date: Optional[str] = None    # YYYY-MM-DD format
     
 class PaperFetchResponse(BaseModel):
-    status: str
+    status: str  # started / running / error
     message: str
     total_fetched: int
     processing_time: float
+    job_id: Optional[int] = None  # Poll /api/v1/papers/fetch/jobs/{job_id} for progress
+
+class IngestProgress(BaseModel):
+    run_id: int
+    status: str  # running / cancelling / completed / failed / cancelled
+    current_window: Optional[str] = None
+    pages_fetched: int
+    papers_fetched: int
+    papers_added: int
+    error_message: Optional[str] = None
+    started_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
 
 class LatestPaperInfo(BaseModel):
     latest_date: Optional[str] = None  # YYYY-MM-DD format
@@ -201,7 +240,11 @@ class TrendSummaryResponse(BaseModel):
     papers: Optional[List[PaperResponse]] = None  # Papers used in analysis
 
 class TrendSummaryListResponse(BaseModel):
-    summaries: List[TrendSummaryResponse]
+    summaries: List[TrendSummaryResponse]  # papersは含まない（/trend-summary/{id}/papersで取得）
+    total_count: int
+
+class TrendSummaryPapersResponse(BaseModel):
+    papers: List[PaperResponse]
     total_count: int
 
 class TrendSummaryUpdateRequest(BaseModel):
@@ -1,21 +1,23 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, case, and_, text
+from sqlalchemy import func, case, and_, text, select, insert, inspect
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Iterable, Optional
 import asyncio
 import hashlib
-import subprocess
-import os
 
 from . import models, schemas
 import logging
 import time
 import re
-import requests
-import xml.etree.ElementTree as ET
 from collections import Counter
 from .ai_service import get_ai_service
+from .arxiv_categories import ArxivCategoryResolver, get_http_session, normalize_arxiv_id, parse_category_feed
+from .keyword_matcher import KeywordMatcher
 from .config import settings
+from .database import insert_or_ignore
+from . import counters, keyword_rollup
+from .analytics import keyword_analytics
+from .revalidation import revalidator
 
 # 定数
 # MIN_RECENT_COUNT = 2  # Moved to settings
@@ -34,8 +36,15 @@ def get_utc_now():
 def get_time_ago(days: int = 0, hours: int = 0):
     return get_utc_now() - timedelta(days=days, hours=hours)
 
-def get_trending_keywords_data(db: Session) -> list[schemas.TrendingKeyword]:
-    cache_key = "trending_keywords"
+def get_trending_keywords_data(
+    db: Session,
+    window_days: int | None = None,
+    baseline_days: int | None = None
+) -> list[schemas.TrendingKeyword]:
+    """直近window_days日の論文数と、その直前baseline_days日の論文数を比べて伸びたキーワードを取得"""
+    window_days = window_days or settings.recent_analysis_weeks * 7
+    baseline_days = baseline_days or (settings.comparison_weeks - settings.recent_analysis_weeks) * 7
+    cache_key = f"trending_keywords_{window_days}_{baseline_days}"
     if cache_key in cache and time.time() - cache[cache_key]["timestamp"] < settings.cache_ttl_seconds:
         logging.info("Returning trending keywords from cache.")
         return cache[cache_key]["data"]
@@ -43,32 +52,26 @@ def get_trending_keywords_data(db: Session) -> list[schemas.TrendingKeyword]:
     start_time = time.time()
     logging.info("Fetching trending keywords from DB...")
 
-    recent_threshold = get_time_ago(days=settings.recent_analysis_weeks * 7)
-    previous_threshold = get_time_ago(days=settings.comparison_weeks * 7)
-
-    # 1段階のクエリで必要なデータをすべて取得
-    query_results = (
-        db.query(
-            models.Keyword.name,
-            func.sum(
-                case((models.Paper.published_at >= recent_threshold, 1), else_=0)
-            ).label("recent_count"),
-            func.sum(
-                case((
-                    and_(
-                        models.Paper.published_at >= previous_threshold,
-                        models.Paper.published_at < recent_threshold
-                    ), 1
-                ), else_=0)
-            ).label("previous_count")
+    recent_threshold = get_time_ago(days=window_days)
+    previous_threshold = get_time_ago(days=window_days + baseline_days)
+
+    if settings.analytics_engine:
+        query_results = keyword_analytics.growth_ranking(db, recent_threshold, previous_threshold, settings.trending_keywords_limit)
+    else:
+        # 週次集計テーブルから直近・比較期間の件数を1つのクエリで取得
+        recent_counts = keyword_rollup.keyword_counts(recent_threshold)
+        previous_counts = keyword_rollup.keyword_counts(previous_threshold, recent_threshold)
+        query_results = (
+            db.query(
+                models.Keyword.name,
+                recent_counts.c.count.label("recent_count"),
+                func.coalesce(previous_counts.c.count, 0).label("previous_count")
+            )
+            .join(recent_counts, recent_counts.c.keyword_id == models.Keyword.id)
+            .outerjoin(previous_counts, previous_counts.c.keyword_id == models.Keyword.id)
+            .filter(recent_counts.c.count >= 2)
+            .all()
         )
-        .join(models.PaperKeyword, models.Keyword.id == models.PaperKeyword.keyword_id)
-        .join(models.Paper, models.PaperKeyword.paper_id == models.Paper.id)
-        .filter(models.Paper.published_at >= previous_threshold)
-        .group_by(models.Keyword.name)
-        .having(func.sum(case((models.Paper.published_at >= recent_threshold, 1), else_=0)) >= 2)
-        .all()
-    )
 
     # Python側で成長率を計算し、ソート
     trending_keywords = []
@@ -98,58 +101,70 @@ def get_trending_keywords_data(db: Session) -> list[schemas.TrendingKeyword]:
     logging.info(f"Fetched trending keywords in {time.time() - start_time:.2f} seconds.")
     return result
 
+def get_week_label(dt: datetime) -> str:
+    """週ラベル（火曜始まり）。paper_keywords.week_start と週次集計の週と同じ"""
+    return keyword_rollup.week_start_of(dt).isoformat()
+
 def get_trends_data(db: Session, keywords: list[str], start_date: datetime | None, end_date: datetime | None) -> list[schemas.TrendResult]:
     start_time_func = time.time()
-    logging.info(f"Fetching trend data for keywords: {keywords} from {start_date} to {end_date}...")
+    logging.info(f"Fetching trend data for {len(keywords)} keywords from {start_date} to {end_date}...")
+
+    if start_date and start_date.tzinfo is None:
+        start_date = start_date.replace(tzinfo=timezone.utc)
+    if end_date and end_date.tzinfo is None:
+        end_date = end_date.replace(tzinfo=timezone.utc)
+    keyword_ids = dict(db.query(models.Keyword.name, models.Keyword.id).filter(models.Keyword.name.in_(set(keywords))))
+
+    # Week-based grouping: 全キーワードの週次件数を週次集計テーブルから1回のクエリで取得（end_dateは含む）
+    counts_by_keyword: dict[int, dict[str, int]] = {}
+    window_end = end_date + timedelta(microseconds=1) if end_date else None
+    if keyword_ids and settings.analytics_engine:
+        for keyword_id, counts in keyword_analytics.weekly_counts(db, list(keyword_ids.values()), start_date, window_end).items():
+            counts_by_keyword[keyword_id] = {week.isoformat(): count for week, count in counts.items()}
+    elif keyword_ids:
+        weeks = keyword_rollup.weekly_counts(start_date, window_end, list(keyword_ids.values()))
+        rows = db.execute(
+            select(weeks.c.keyword_id, weeks.c.week_start, func.sum(weeks.c.count))
+            .group_by(weeks.c.keyword_id, weeks.c.week_start)
+        )
+        for keyword_id, week, count in rows:
+            counts_by_keyword.setdefault(keyword_id, {})[week.isoformat()] = count
+
+    # 期間内の全週を0件で埋める（期間が未指定の側はデータのある範囲まで）
+    all_weeks = [week for counts in counts_by_keyword.values() for week in counts]
+    first_week = get_week_label(start_date) if start_date else min(all_weeks, default=None)
+    last_week = get_week_label(end_date) if end_date else max(all_weeks, default=None)
+    weeks = []
+    if first_week and last_week:
+        week = datetime.fromisoformat(first_week)
+        while (label := week.date().isoformat()) <= last_week:
+            weeks.append(label)
+            week += timedelta(days=7)
+
     results = []
     for keyword_name in keywords:
-        start_time_keyword = time.time()
-        # キーワードIDを取得
-        keyword_obj = db.query(models.Keyword).filter(models.Keyword.name == keyword_name).first()
-        if not keyword_obj:
+        if keyword_name not in keyword_ids:
             results.append(schemas.TrendResult(keyword=keyword_name, data=[]))
-            logging.info(f"Keyword '{keyword_name}' not found. Took {time.time() - start_time_keyword:.2f} seconds.")
             continue
-
-        # Week-based grouping: Get Monday of each week as the date label
-        query = (
-            db.query(
-                func.date(models.Paper.published_at, 'weekday 1', '-6 days').label('week_start'),
-                func.count(models.Paper.id).label('count')
-            )
-            .join(models.PaperKeyword, models.Paper.id == models.PaperKeyword.paper_id)
-            .filter(models.PaperKeyword.keyword_id == keyword_obj.id)
-        )
-        
-        if start_date:
-            if start_date.tzinfo is None:
-                start_date = start_date.replace(tzinfo=timezone.utc)
-            query = query.filter(models.Paper.published_at >= start_date)
-        if end_date:
-            if end_date.tzinfo is None:
-                end_date = end_date.replace(tzinfo=timezone.utc)
-            query = query.filter(models.Paper.published_at <= end_date)
-
-        query = query.group_by('week_start').order_by('week_start')
-        
-        trend_data = []
-        for row in query.all():
-            trend_data.append(schemas.TrendDataPoint(date=row.week_start, count=row.count))
-        
-        results.append(schemas.TrendResult(keyword=keyword_name, data=trend_data))
-        logging.info(f"Fetched trend data for keyword '{keyword_name}' in {time.time() - start_time_keyword:.2f} seconds.")
+        counts = counts_by_keyword.get(keyword_ids[keyword_name], {})
+        results.append(schemas.TrendResult(
+            keyword=keyword_name,
+            data=[schemas.TrendDataPoint(date=week, count=counts.get(week, 0)) for week in weeks]
+        ))
     logging.info(f"Total trend data fetching took {time.time() - start_time_func:.2f} seconds.")
     return results
 
 def get_summary_data(db: Session) -> schemas.DashboardSummary:
-    total_papers = db.query(func.count(models.Paper.id)).scalar()
-    total_keywords = db.query(func.count(models.Keyword.id)).scalar()
-    latest_paper_date = db.query(func.max(models.Paper.published_at)).scalar()
+    # 総数は取り込み・クリーンアップ時に更新されるカウンタから、直近の件数は日次集計から読む
+    totals = counters.get_counters(db, [counters.PAPERS, counters.KEYWORDS])
+    total_papers = totals[counters.PAPERS]
+    total_keywords = totals[counters.KEYWORDS]
+    latest_paper_date = db.query(func.max(models.Paper.published_at)).scalar()  # published_atのインデックスで1行読むだけ
 
     now = get_utc_now()
-    recent_papers_24h = db.query(func.count(models.Paper.id)).filter(models.Paper.published_at >= now - timedelta(hours=24)).scalar()
-    recent_papers_7d = db.query(func.count(models.Paper.id)).filter(models.Paper.published_at >= now - timedelta(days=7)).scalar()
-    recent_papers_30d = db.query(func.count(models.Paper.id)).filter(models.Paper.published_at >= now - timedelta(days=30)).scalar()
+    recent_papers_24h = counters.count_papers_since(db, now - timedelta(hours=24))
+    recent_papers_7d = counters.count_papers_since(db, now - timedelta(days=7))
+    recent_papers_30d = counters.count_papers_since(db, now - timedelta(days=30))
 
     return schemas.DashboardSummary(
         total_papers=total_papers,
@@ -207,8 +222,23 @@ def search_papers(db: Session, query: str, skip: int = 0, limit: int = 100, star
         ))
     return schemas.PaperSearchResponse(papers=results, total_count=total_count)
 
-def get_word_cloud_data(db: Session) -> list[schemas.WordData]:
-    cache_key = "word_cloud"
+def get_top_keyword_counts(db: Session, start: datetime, limit: int, min_count: int = 1) -> list[tuple[str, int]]:
+    """start以降の論文数が多い順に (キーワード名, 論文数) を取得"""
+    if settings.analytics_engine:
+        return keyword_analytics.top_keywords(db, start, limit=limit, min_count=min_count)
+    counts = keyword_rollup.keyword_counts(start)
+    return [
+        tuple(row) for row in
+        db.query(models.Keyword.name, counts.c.count)
+        .join(counts, counts.c.keyword_id == models.Keyword.id)
+        .filter(counts.c.count >= min_count)
+        .order_by(counts.c.count.desc())
+        .limit(limit)
+    ]
+
+def get_word_cloud_data(db: Session, window_days: int | None = None) -> list[schemas.WordData]:
+    window_days = window_days or settings.comparison_weeks * 7
+    cache_key = f"word_cloud_{window_days}"
     if cache_key in cache and time.time() - cache[cache_key]["timestamp"] < settings.cache_ttl_seconds:
         logging.info("Returning word cloud data from cache.")
         return cache[cache_key]["data"]
@@ -216,45 +246,29 @@ def get_word_cloud_data(db: Session) -> list[schemas.WordData]:
     start_time = time.time()
     logging.info("Fetching word cloud data from DB...")
 
-    # 設定可能な期間でキーワードを取得
-    sixteen_weeks_ago = get_time_ago(days=settings.comparison_weeks*7)  # Configurable weeks
-
-    results = (
-        db.query(models.Keyword.name, func.count(models.PaperKeyword.paper_id).label('count'))
-        .join(models.PaperKeyword, models.Keyword.id == models.PaperKeyword.keyword_id)
-        .join(models.Paper, models.PaperKeyword.paper_id == models.Paper.id)
-        .filter(models.Paper.published_at >= sixteen_weeks_ago)
-        .group_by(models.Keyword.name)
-        .order_by(func.count(models.PaperKeyword.paper_id).desc())
-        .limit(100)
-        .all()
-    )
+    # 直近window_days日の論文数でキーワードを取得
+    results = get_top_keyword_counts(db, get_time_ago(days=window_days), limit=100)
 
-    word_cloud_data = [schemas.WordData(text=row.name, value=row.count) for row in results]
+    word_cloud_data = [schemas.WordData(text=name, value=count) for name, count in results]
 
     cache[cache_key] = {"data": word_cloud_data, "timestamp": time.time()}
     logging.info(f"Fetched word cloud data in {time.time() - start_time:.2f} seconds.")
     return word_cloud_data
 
-def get_word_cloud_data_with_dictionary(db: Session, dictionary: list[schemas.DictionaryKeyword]) -> list[schemas.WordData]:
+def get_word_cloud_data_with_dictionary(
+    db: Session,
+    dictionary: list[schemas.DictionaryKeyword],
+    window_days: int | None = None
+) -> list[schemas.WordData]:
     """辞書を考慮したワードクラウドデータを取得"""
     start_time = time.time()
     logging.info("Fetching word cloud data with dictionary from DB...")
 
-    # 期間を16週間に設定
-    sixteen_weeks_ago = get_time_ago(days=16*7)
+    # 期間の既定は16週間
+    window_start = get_time_ago(days=window_days or 16 * 7)
 
     # 通常のキーワード統計を取得
-    results = (
-        db.query(models.Keyword.name, func.count(models.PaperKeyword.paper_id).label('count'))
-        .join(models.PaperKeyword, models.Keyword.id == models.PaperKeyword.keyword_id)
-        .join(models.Paper, models.PaperKeyword.paper_id == models.Paper.id)
-        .filter(models.Paper.published_at >= sixteen_weeks_ago)
-        .group_by(models.Keyword.name)
-        .order_by(func.count(models.PaperKeyword.paper_id).desc())
-        .limit(settings.keyword_fetch_limit)  # Configurable keyword fetch limit
-        .all()
-    )
+    results = get_top_keyword_counts(db, window_start, limit=settings.keyword_fetch_limit)  # Configurable keyword fetch limit
 
     # 辞書キーワードのマッピングを作成（大文字小文字を無視）
     dict_importance = {}
@@ -262,9 +276,9 @@ def get_word_cloud_data_with_dictionary(db: Session, dictionary: list[schemas.Di
         dict_importance[dict_keyword.keyword.lower()] = dict_keyword.importance
 
     word_cloud_data = []
-    for row in results:
-        keyword_lower = row.name.lower()
-        base_value = row.count
+    for name, count in results:
+        keyword_lower = name.lower()
+        base_value = count
         
         # 辞書にあるキーワードは重要度に応じて重み付け
         if keyword_lower in dict_importance:
@@ -278,7 +292,7 @@ def get_word_cloud_data_with_dictionary(db: Session, dictionary: list[schemas.Di
         else:
             weighted_value = base_value
         
-        word_cloud_data.append(schemas.WordData(text=row.name, value=weighted_value))
+        word_cloud_data.append(schemas.WordData(text=name, value=weighted_value))
 
     # 重み付け後に再ソート
     word_cloud_data.sort(key=lambda x: x.value, reverse=True)
@@ -330,36 +344,20 @@ ARXIV_CATEGORY_KEYWORDS = {
 }
 
 def get_arxiv_categories(arxiv_id: str) -> list[str]:
-    """指定されたarXiv IDのカテゴリ情報を取得"""
+    """指定されたarXiv IDのカテゴリ情報を取得（キャッシュなしの単発取得）"""
     try:
-        # arXiv IDからvバージョンを除去
-        clean_id = arxiv_id.split('v')[0] if 'v' in arxiv_id else arxiv_id
+        clean_id = normalize_arxiv_id(arxiv_id)
         
-        url = f"https://export.arxiv.org/api/query?id_list={clean_id}"
-        response = requests.get(url, timeout=10)
+        response = get_http_session().get(
+            settings.arxiv_api_url,
+            params={'id_list': clean_id},
+            timeout=settings.arxiv_api_timeout
+        )
         
         if response.status_code != 200:
             return []
         
-        # XMLをパース
-        root = ET.fromstring(response.content)
-        
-        # 名前空間を定義
-        namespaces = {
-            'atom': 'http://www.w3.org/2005/Atom',
-            'arxiv': 'http://arxiv.org/schemas/atom'
-        }
-        
-        categories = []
-        
-        # カテゴリ情報を抽出
-        for entry in root.findall('atom:entry', namespaces):
-            for category in entry.findall('atom:category', namespaces):
-                term = category.get('term')
-                if term:
-                    categories.append(term)
-        
-        return categories
+        return parse_category_feed(response.content).get(clean_id, [])
         
     except Exception as e:
         logging.warning(f"Failed to get categories for {arxiv_id}: {e}")
@@ -375,297 +373,405 @@ def extract_keywords_from_categories(categories: list[str]) -> list[str]:
     
     return list(keywords)
 
-def extract_technical_terms_from_text(text: str) -> list[str]:
-    """テキストから技術的な用語を抽出（特化辞書方式）"""
-    if not text:
-        return []
+def get_or_create_categories(db: Session, terms: Iterable[str]) -> dict[str, int]:
+    """カテゴリ名からIDへのマップを取得（未登録のカテゴリは作成）"""
+    terms = list(dict.fromkeys(term for term in terms if term))
+    if not terms:
+        return {}
     
-    # 包括的なストップワードリスト
-    stop_words = {
-        # 基本的な英単語
-        'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 
-        'from', 'up', 'about', 'into', 'through', 'during', 'before', 'after', 'above', 'below', 
-        'between', 'among', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 
-        'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can', 
-        'this', 'that', 'these', 'those', 'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves',
-        'you', 'your', 'yours', 'yourself', 'yourselves', 'he', 'him', 'his', 'himself', 'she', 
-        'her', 'hers', 'herself', 'it', 'its', 'itself', 'they', 'them', 'their', 'theirs', 
-        'themselves', 'what', 'which', 'who', 'whom', 'whose', 'where', 'when', 'why', 'how',
-        'all', 'any', 'both', 'each', 'few', 'more', 'most', 'other', 'some', 'such', 'no', 'nor',
-        'not', 'only', 'own', 'same', 'so', 'than', 'too', 'very', 's', 't', 'll', 'don',
-        # 一般的な動詞・形容詞
-        'get', 'got', 'give', 'given', 'take', 'taken', 'make', 'made', 'come', 'came', 'go', 'went',
-        'see', 'seen', 'know', 'known', 'think', 'thought', 'look', 'find', 'found', 'want', 'need',
-        'try', 'tried', 'ask', 'asked', 'work', 'worked', 'seem', 'seemed', 'feel', 'felt', 'leave', 'left',
-        'call', 'called', 'keep', 'kept', 'let', 'put', 'say', 'said', 'tell', 'told', 'become', 'became',
-        'turn', 'turned', 'move', 'moved', 'play', 'played', 'run', 'ran', 'believe', 'believed',
-        'hold', 'held', 'bring', 'brought', 'happen', 'happened', 'write', 'written', 'provide', 'provided',
-        'sit', 'sat', 'stand', 'stood', 'lose', 'lost', 'pay', 'paid', 'meet', 'met', 'include', 'included',
-        'continue', 'continued', 'set', 'change', 'changed', 'lead', 'led', 'understand', 'understood',
-        'watch', 'watched', 'follow', 'followed', 'stop', 'stopped', 'create', 'created', 'speak', 'spoke',
-        'read', 'read', 'allow', 'allowed', 'add', 'added', 'spend', 'spent', 'grow', 'grew', 'open', 'opened',
-        'walk', 'walked', 'win', 'won', 'offer', 'offered', 'remember', 'remembered', 'love', 'loved',
-        'consider', 'considered', 'appear', 'appeared', 'buy', 'bought', 'wait', 'waited', 'serve', 'served',
-        'die', 'died', 'send', 'sent', 'expect', 'expected', 'build', 'built', 'stay', 'stayed',
-        'fall', 'fell', 'cut', 'reach', 'reached', 'kill', 'killed', 'remain', 'remained',
-        # 一般的な形容詞
-        'good', 'great', 'big', 'small', 'large', 'long', 'short', 'high', 'low', 'old', 'new', 'young',
-        'different', 'same', 'right', 'wrong', 'important', 'possible', 'impossible', 'easy', 'hard',
-        'early', 'late', 'first', 'last', 'next', 'previous', 'best', 'better', 'worse', 'worst',
-        'hot', 'cold', 'warm', 'cool', 'fast', 'slow', 'quick', 'heavy', 'light', 'strong', 'weak',
-        'full', 'empty', 'clean', 'dirty', 'clear', 'dark', 'bright', 'free', 'busy', 'sure',
-        'ready', 'available', 'real', 'true', 'false', 'simple', 'complex', 'single', 'multiple',
-        # 論文でよく使われる一般的な単語
-        'paper', 'work', 'study', 'research', 'result', 'results', 'method', 'methods', 'approach',
-        'technique', 'techniques', 'way', 'ways', 'problem', 'problems', 'solution', 'solutions',
-        'system', 'systems', 'process', 'processes', 'application', 'applications', 'example', 'examples',
-        'case', 'cases', 'number', 'numbers', 'time', 'times', 'year', 'years', 'day', 'days',
-        'way', 'ways', 'place', 'places', 'part', 'parts', 'point', 'points', 'line', 'lines',
-        'area', 'areas', 'level', 'levels', 'kind', 'kinds', 'type', 'types', 'form', 'forms',
-        'end', 'ends', 'side', 'sides', 'hand', 'hands', 'eye', 'eyes', 'head', 'heads',
-        'fact', 'facts', 'question', 'questions', 'answer', 'answers', 'reason', 'reasons',
-        'idea', 'ideas', 'information', 'data', 'detail', 'details', 'feature', 'features',
-        'value', 'values', 'rate', 'rates', 'size', 'sizes', 'amount', 'amounts', 'total', 'totals',
-        'order', 'orders', 'group', 'groups', 'team', 'teams', 'member', 'members', 'person', 'people',
-        'man', 'men', 'woman', 'women', 'child', 'children', 'family', 'families', 'friend', 'friends',
-        'company', 'companies', 'business', 'businesses', 'service', 'services', 'product', 'products',
-        'market', 'markets', 'price', 'prices', 'cost', 'costs', 'money', 'dollar', 'dollars',
-        'country', 'countries', 'state', 'states', 'city', 'cities', 'town', 'towns', 'world', 'worlds',
-        'life', 'lives', 'death', 'deaths', 'health', 'healthcare', 'food', 'foods', 'water', 'waters',
-        'house', 'houses', 'home', 'homes', 'school', 'schools', 'student', 'students', 'teacher', 'teachers',
-        'book', 'books', 'page', 'pages', 'word', 'words', 'name', 'names', 'story', 'stories',
-        'news', 'report', 'reports', 'article', 'articles', 'website', 'websites', 'internet',
-        'computer', 'computers', 'phone', 'phones', 'email', 'emails', 'message', 'messages',
-        'image', 'images', 'picture', 'pictures', 'video', 'videos', 'music', 'sound', 'sounds',
-        'game', 'games', 'movie', 'movies', 'show', 'shows', 'tv', 'television',
-        'car', 'cars', 'road', 'roads', 'street', 'streets', 'building', 'buildings',
-        'room', 'rooms', 'office', 'offices', 'door', 'doors', 'window', 'windows',
-        'table', 'tables', 'chair', 'chairs', 'bed', 'beds', 'floor', 'floors',
-        # 数字、記号、コード関連
-        'com', 'org', 'net', 'edu', 'gov', 'www', 'http', 'https', 'html', 'css', 'js',
-        'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine', 'ten',
-        'first', 'second', 'third', 'fourth', 'fifth', 'sixth', 'seventh', 'eighth', 'ninth', 'tenth',
-        # よくある誤抽出
-        'using', 'used', 'use', 'uses', 'show', 'shows', 'shown', 'based', 'propose', 'proposed',
-        'present', 'presented', 'demonstrate', 'demonstrated', 'evaluate', 'evaluated', 'compare', 'compared',
-        'analyze', 'analyzed', 'examine', 'examined', 'investigate', 'investigated', 'explore', 'explored',
-        'discuss', 'discussed', 'describe', 'described', 'explain', 'explained', 'review', 'reviewed',
-        'survey', 'surveyed', 'focus', 'focused', 'address', 'addressed', 'tackle', 'tackled',
-        'achieve', 'achieved', 'obtain', 'obtained', 'improve', 'improved', 'enhance', 'enhanced',
-        'develop', 'developed', 'design', 'designed', 'implement', 'implemented', 'apply', 'applied',
-        'introduce', 'introduced', 'establish', 'established', 'formulate', 'formulated',
-        'perform', 'performed', 'conduct', 'conducted', 'carry', 'carried', 'execute', 'executed',
-        'test', 'tested', 'validate', 'validated', 'verify', 'verified', 'confirm', 'confirmed',
-        'measure', 'measured', 'calculate', 'calculated', 'compute', 'computed', 'determine', 'determined',
-        'estimate', 'estimated', 'predict', 'predicted', 'model', 'models', 'modeling', 'modelling'
+    category_ids = {
+        row.term: row.id
+        for row in db.query(models.Category.term, models.Category.id).filter(models.Category.term.in_(terms)).all()
     }
     
-    # 特化された技術用語辞書（完全一致のみ）
-    specialized_tech_dictionary = {
-        # === AI/MLモデル名 ===
-        'bert': 'BERT',
-        'gpt': 'GPT', 
-        'gpt-3': 'GPT-3',
-        'gpt-4': 'GPT-4',
-        'chatgpt': 'ChatGPT',
-        't5': 'T5',
-        'bart': 'BART',
-        'roberta': 'RoBERTa',
-        'electra': 'ELECTRA',
-        'deberta': 'DeBERTa',
-        'albert': 'ALBERT',
-        'distilbert': 'DistilBERT',
-        'xlnet': 'XLNet',
-        'ernie': 'ERNIE',
-        'claude': 'Claude',
-        'gemini': 'Gemini',
-        'llama': 'LLaMA',
-        'mistral': 'Mistral',
-        'mixtral': 'Mixtral',
-        
-        # === コンピュータビジョンモデル ===
-        'resnet': 'ResNet',
-        'vgg': 'VGG',
-        'inception': 'Inception',
-        'densenet': 'DenseNet',
-        'efficientnet': 'EfficientNet',
-        'mobilenet': 'MobileNet',
-        'yolo': 'YOLO',
-        'r-cnn': 'R-CNN',
-        'faster r-cnn': 'Faster R-CNN',
-        'mask r-cnn': 'Mask R-CNN',
-        'clip': 'CLIP',
-        'dall-e': 'DALL-E',
-        'stable diffusion': 'Stable Diffusion',
-        'midjourney': 'Midjourney',
-        
-        # === アーキテクチャ・手法 ===
-        'transformer': 'Transformer',
-        'vision transformer': 'Vision Transformer',
-        'attention mechanism': 'Attention Mechanism',
-        'self-attention': 'Self-Attention',
-        'cross-attention': 'Cross-Attention',
-        'multi-head attention': 'Multi-Head Attention',
-        'lstm': 'LSTM',
-        'gru': 'GRU',
-        'cnn': 'CNN',
-        'rnn': 'RNN',
-        'convolutional neural network': 'Convolutional Neural Network',
-        'recurrent neural network': 'Recurrent Neural Network',
-        'graph neural network': 'Graph Neural Network',
-        'generative adversarial network': 'Generative Adversarial Network',
-        'variational autoencoder': 'Variational Autoencoder',
-        'autoencoder': 'Autoencoder',
-        'diffusion model': 'Diffusion Model',
-        'gan': 'GAN',
-        'vae': 'VAE',
-        
-        # === 学習パラダイム ===
-        'large language model': 'Large Language Model',
-        'foundation model': 'Foundation Model',
-        'multimodal model': 'Multimodal Model',
-        'machine learning': 'Machine Learning',
-        'deep learning': 'Deep Learning',
-        'reinforcement learning': 'Reinforcement Learning',
-        'supervised learning': 'Supervised Learning',
-        'unsupervised learning': 'Unsupervised Learning',
-        'self-supervised learning': 'Self-Supervised Learning',
-        'semi-supervised learning': 'Semi-Supervised Learning',
-        'transfer learning': 'Transfer Learning',
-        'meta-learning': 'Meta-Learning',
-        'continual learning': 'Continual Learning',
-        'federated learning': 'Federated Learning',
-        'few-shot learning': 'Few-Shot Learning',
-        'zero-shot learning': 'Zero-Shot Learning',
-        'one-shot learning': 'One-Shot Learning',
-        'in-context learning': 'In-Context Learning',
-        'multi-task learning': 'Multi-Task Learning',
-        'contrastive learning': 'Contrastive Learning',
-        
-        # === ファインチューニング技術 ===
-        'fine-tuning': 'Fine-Tuning',
-        'pre-training': 'Pre-Training',
-        'parameter-efficient fine-tuning': 'Parameter-Efficient Fine-Tuning',
-        'lora': 'LoRA',
-        'adalora': 'AdaLoRA', 
-        'prefix tuning': 'Prefix Tuning',
-        'prompt tuning': 'Prompt Tuning',
-        'prompt engineering': 'Prompt Engineering',
-        'instruction tuning': 'Instruction Tuning',
-        'rlhf': 'RLHF',
-        'reinforcement learning from human feedback': 'Reinforcement Learning from Human Feedback',
-        
-        # === タスク・アプリケーション ===
-        'natural language processing': 'Natural Language Processing',
-        'computer vision': 'Computer Vision',
-        'speech recognition': 'Speech Recognition',
-        'automatic speech recognition': 'Automatic Speech Recognition',
-        'machine translation': 'Machine Translation',
-        'question answering': 'Question Answering',
-        'text summarization': 'Text Summarization',
-        'sentiment analysis': 'Sentiment Analysis',
-        'named entity recognition': 'Named Entity Recognition',
-        'object detection': 'Object Detection',
-        'semantic segmentation': 'Semantic Segmentation',
-        'instance segmentation': 'Instance Segmentation',
-        'image classification': 'Image Classification',
-        'image generation': 'Image Generation',
-        'text-to-image': 'Text-to-Image',
-        'image-to-text': 'Image-to-Text',
-        'vision-language': 'Vision-Language',
-        'multimodal learning': 'Multimodal Learning',
-        
-        # === 最適化・訓練 ===
-        'gradient descent': 'Gradient Descent',
-        'stochastic gradient descent': 'Stochastic Gradient Descent',
-        'adam optimizer': 'Adam Optimizer',
-        'backpropagation': 'Backpropagation',
-        'batch normalization': 'Batch Normalization',
-        'layer normalization': 'Layer Normalization',
-        'dropout': 'Dropout',
-        'regularization': 'Regularization',
-        'adversarial training': 'Adversarial Training',
-        'knowledge distillation': 'Knowledge Distillation',
-        'model compression': 'Model Compression',
-        'neural architecture search': 'Neural Architecture Search',
-        'hyperparameter optimization': 'Hyperparameter Optimization',
-        
-        # === 評価指標 ===
-        'cross-entropy': 'Cross-Entropy',
-        'mean squared error': 'Mean Squared Error',
-        'kl divergence': 'KL Divergence',
-        'cosine similarity': 'Cosine Similarity',
-        'intersection over union': 'Intersection over Union',
-        'receiver operating characteristic': 'ROC',
-        'area under curve': 'AUC',
-        'f1 score': 'F1 Score',
-        'precision': 'Precision',
-        'recall': 'Recall',
-        'accuracy': 'Accuracy',
-        
-        # === 技術ツール・フレームワーク ===
-        'pytorch': 'PyTorch',
-        'tensorflow': 'TensorFlow', 
-        'keras': 'Keras',
-        'jax': 'JAX',
-        'hugging face': 'Hugging Face',
-        'transformers': 'Transformers',
-        'openai': 'OpenAI',
-        'anthropic': 'Anthropic',
-        'cuda': 'CUDA',
-        'cudnn': 'cuDNN',
-        'nvidia': 'NVIDIA',
-        'tpu': 'TPU',
-        'gpu': 'GPU',
-        'distributed training': 'Distributed Training',
-        
-        # === AI安全性・個人情報 ===
-        'ai safety': 'AI Safety',
-        'ai alignment': 'AI Alignment',
-        'constitutional ai': 'Constitutional AI',
-        'differential privacy': 'Differential Privacy',
-        'adversarial robustness': 'Adversarial Robustness',
-        'fairness in ai': 'Fairness in AI',
-        'explainable ai': 'Explainable AI',
-        'interpretable machine learning': 'Interpretable Machine Learning',
-        
-        # === 新しい技術トレンド ===
-        'retrieval-augmented generation': 'Retrieval-Augmented Generation',
-        'rag': 'RAG',
-        'chain-of-thought': 'Chain-of-Thought',
-        'reasoning': 'Reasoning',
-        'causal inference': 'Causal Inference',
-        'causal machine learning': 'Causal Machine Learning',
-        'neuromorphic computing': 'Neuromorphic Computing',
-        'quantum machine learning': 'Quantum Machine Learning',
-        'edge ai': 'Edge AI',
-        'federated learning': 'Federated Learning',
-        'differential privacy': 'Differential Privacy'
+    new_categories = [models.Category(term=term) for term in terms if term not in category_ids]
+    if new_categories:
+        db.add_all(new_categories)
+        db.flush()  # IDを生成するためにflush
+        category_ids.update({category.term: category.id for category in new_categories})
+    
+    return category_ids
+
+def save_paper_categories(db: Session, categories_by_paper_id: dict[int, list[str]]) -> int:
+    """論文ごとのカテゴリを正規化テーブルに保存（コミットは呼び出し側で行う）"""
+    category_ids = get_or_create_categories(
+        db, (term for terms in categories_by_paper_id.values() for term in terms)
+    )
+    
+    associations = {
+        (paper_id, category_ids[term])
+        for paper_id, terms in categories_by_paper_id.items()
+        for term in terms
+        if term in category_ids
     }
+    db.add_all(models.PaperCategory(paper_id=paper_id, category_id=category_id) for paper_id, category_id in associations)
+    return len(associations)
+
+def get_paper_categories(db: Session, paper_ids: list[int]) -> dict[int, list[str]]:
+    """保存済みのカテゴリを論文IDごとに取得（ネットワークアクセスなし）"""
+    categories_by_paper_id: dict[int, list[str]] = {}
+    for i in range(0, len(paper_ids), 500):
+        rows = (
+            db.query(models.PaperCategory.paper_id, models.Category.term)
+            .join(models.Category, models.PaperCategory.category_id == models.Category.id)
+            .filter(models.PaperCategory.paper_id.in_(paper_ids[i:i + 500]))
+            .all()
+        )
+        for paper_id, term in rows:
+            categories_by_paper_id.setdefault(paper_id, []).append(term)
+    return categories_by_paper_id
+
+def backfill_paper_categories(db: Session, limit: int = 1000) -> int:
+    """カテゴリ未保存の論文（取り込み時にカテゴリを保存していない古い論文）をarXiv APIから補完"""
+    papers = (
+        db.query(models.Paper.id, models.Paper.arxiv_id)
+        .outerjoin(models.PaperCategory, models.Paper.id == models.PaperCategory.paper_id)
+        .filter(models.PaperCategory.paper_id.is_(None))
+        .order_by(models.Paper.published_at.desc())
+        .limit(limit)
+        .all()
+    )
+    if not papers:
+        return 0
     
-    keywords = set()
-    text_lower = text.lower()
+    categories_by_arxiv_id = ArxivCategoryResolver(db).resolve(paper.arxiv_id for paper in papers)
+    saved_count = save_paper_categories(
+        db, {paper.id: categories_by_arxiv_id.get(paper.arxiv_id, []) for paper in papers}
+    )
+    db.commit()
     
-    # 1. 特化辞書からの完全一致検索（長い順にソートして優先度を付ける）
-    sorted_terms = sorted(specialized_tech_dictionary.items(), key=lambda x: len(x[0]), reverse=True)
+    logging.info(f"Backfilled {saved_count} category associations for {len(papers)} papers.")
+    return saved_count
+
+def get_category_trends_data(db: Session, categories: list[str], start_date: datetime | None, end_date: datetime | None) -> list[schemas.CategoryTrendResult]:
+    """arXivカテゴリごとの週次論文数を取得"""
+    start_time = time.time()
     
-    for term_lower, term_proper in sorted_terms:
-        if term_lower in text_lower:
-            keywords.add(term_proper)
-            # 既にマッチした部分を除去して重複を防ぐ
-            text_lower = text_lower.replace(term_lower, ' ')
+    query = (
+        db.query(models.Category.term, models.Paper.published_at)
+        .join(models.PaperCategory, models.Category.id == models.PaperCategory.category_id)
+        .join(models.Paper, models.PaperCategory.paper_id == models.Paper.id)
+        .filter(models.Category.term.in_(categories))
+    )
+    if start_date:
+        if start_date.tzinfo is None:
+            start_date = start_date.replace(tzinfo=timezone.utc)
+        query = query.filter(models.Paper.published_at >= start_date)
+    if end_date:
+        if end_date.tzinfo is None:
+            end_date = end_date.replace(tzinfo=timezone.utc)
+        query = query.filter(models.Paper.published_at <= end_date)
+    
+    # Week-based grouping: get_trends_data と同じ火曜始まりの週ラベル（SQLの日付関数はDBごとに違うのでPythonで集計）
+    week_counts = Counter(
+        (term, keyword_rollup.week_start_of(published_at))
+        for term, published_at in query.yield_per(10_000)
+    )
+    
+    data_by_category: dict[str, list[schemas.TrendDataPoint]] = {category: [] for category in categories}
+    for (term, week), count in sorted(week_counts.items(), key=lambda item: item[0][1]):
+        data_by_category[term].append(schemas.TrendDataPoint(date=week.isoformat(), count=count))
+    
+    logging.info(f"Fetched category trend data for {len(categories)} categories in {time.time() - start_time:.2f} seconds.")
+    return [schemas.CategoryTrendResult(category=category, data=data) for category, data in data_by_category.items()]
+
+# 包括的なストップワードリスト
+STOP_WORDS = frozenset({
+    # 基本的な英単語
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 
+    'from', 'up', 'about', 'into', 'through', 'during', 'before', 'after', 'above', 'below', 
+    'between', 'among', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 
+    'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can', 
+    'this', 'that', 'these', 'those', 'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves',
+    'you', 'your', 'yours', 'yourself', 'yourselves', 'he', 'him', 'his', 'himself', 'she', 
+    'her', 'hers', 'herself', 'it', 'its', 'itself', 'they', 'them', 'their', 'theirs', 
+    'themselves', 'what', 'which', 'who', 'whom', 'whose', 'where', 'when', 'why', 'how',
+    'all', 'any', 'both', 'each', 'few', 'more', 'most', 'other', 'some', 'such', 'no', 'nor',
+    'not', 'only', 'own', 'same', 'so', 'than', 'too', 'very', 's', 't', 'll', 'don',
+    # 一般的な動詞・形容詞
+    'get', 'got', 'give', 'given', 'take', 'taken', 'make', 'made', 'come', 'came', 'go', 'went',
+    'see', 'seen', 'know', 'known', 'think', 'thought', 'look', 'find', 'found', 'want', 'need',
+    'try', 'tried', 'ask', 'asked', 'work', 'worked', 'seem', 'seemed', 'feel', 'felt', 'leave', 'left',
+    'call', 'called', 'keep', 'kept', 'let', 'put', 'say', 'said', 'tell', 'told', 'become', 'became',
+    'turn', 'turned', 'move', 'moved', 'play', 'played', 'run', 'ran', 'believe', 'believed',
+    'hold', 'held', 'bring', 'brought', 'happen', 'happened', 'write', 'written', 'provide', 'provided',
+    'sit', 'sat', 'stand', 'stood', 'lose', 'lost', 'pay', 'paid', 'meet', 'met', 'include', 'included',
+    'continue', 'continued', 'set', 'change', 'changed', 'lead', 'led', 'understand', 'understood',
+    'watch', 'watched', 'follow', 'followed', 'stop', 'stopped', 'create', 'created', 'speak', 'spoke',
+    'read', 'read', 'allow', 'allowed', 'add', 'added', 'spend', 'spent', 'grow', 'grew', 'open', 'opened',
+    'walk', 'walked', 'win', 'won', 'offer', 'offered', 'remember', 'remembered', 'love', 'loved',
+    'consider', 'considered', 'appear', 'appeared', 'buy', 'bought', 'wait', 'waited', 'serve', 'served',
+    'die', 'died', 'send', 'sent', 'expect', 'expected', 'build', 'built', 'stay', 'stayed',
+    'fall', 'fell', 'cut', 'reach', 'reached', 'kill', 'killed', 'remain', 'remained',
+    # 一般的な形容詞
+    'good', 'great', 'big', 'small', 'large', 'long', 'short', 'high', 'low', 'old', 'new', 'young',
+    'different', 'same', 'right', 'wrong', 'important', 'possible', 'impossible', 'easy', 'hard',
+    'early', 'late', 'first', 'last', 'next', 'previous', 'best', 'better', 'worse', 'worst',
+    'hot', 'cold', 'warm', 'cool', 'fast', 'slow', 'quick', 'heavy', 'light', 'strong', 'weak',
+    'full', 'empty', 'clean', 'dirty', 'clear', 'dark', 'bright', 'free', 'busy', 'sure',
+    'ready', 'available', 'real', 'true', 'false', 'simple', 'complex', 'single', 'multiple',
+    # 論文でよく使われる一般的な単語
+    'paper', 'work', 'study', 'research', 'result', 'results', 'method', 'methods', 'approach',
+    'technique', 'techniques', 'way', 'ways', 'problem', 'problems', 'solution', 'solutions',
+    'system', 'systems', 'process', 'processes', 'application', 'applications', 'example', 'examples',
+    'case', 'cases', 'number', 'numbers', 'time', 'times', 'year', 'years', 'day', 'days',
+    'way', 'ways', 'place', 'places', 'part', 'parts', 'point', 'points', 'line', 'lines',
+    'area', 'areas', 'level', 'levels', 'kind', 'kinds', 'type', 'types', 'form', 'forms',
+    'end', 'ends', 'side', 'sides', 'hand', 'hands', 'eye', 'eyes', 'head', 'heads',
+    'fact', 'facts', 'question', 'questions', 'answer', 'answers', 'reason', 'reasons',
+    'idea', 'ideas', 'information', 'data', 'detail', 'details', 'feature', 'features',
+    'value', 'values', 'rate', 'rates', 'size', 'sizes', 'amount', 'amounts', 'total', 'totals',
+    'order', 'orders', 'group', 'groups', 'team', 'teams', 'member', 'members', 'person', 'people',
+    'man', 'men', 'woman', 'women', 'child', 'children', 'family', 'families', 'friend', 'friends',
+    'company', 'companies', 'business', 'businesses', 'service', 'services', 'product', 'products',
+    'market', 'markets', 'price', 'prices', 'cost', 'costs', 'money', 'dollar', 'dollars',
+    'country', 'countries', 'state', 'states', 'city', 'cities', 'town', 'towns', 'world', 'worlds',
+    'life', 'lives', 'death', 'deaths', 'health', 'healthcare', 'food', 'foods', 'water', 'waters',
+    'house', 'houses', 'home', 'homes', 'school', 'schools', 'student', 'students', 'teacher', 'teachers',
+    'book', 'books', 'page', 'pages', 'word', 'words', 'name', 'names', 'story', 'stories',
+    'news', 'report', 'reports', 'article', 'articles', 'website', 'websites', 'internet',
+    'computer', 'computers', 'phone', 'phones', 'email', 'emails', 'message', 'messages',
+    'image', 'images', 'picture', 'pictures', 'video', 'videos', 'music', 'sound', 'sounds',
+    'game', 'games', 'movie', 'movies', 'show', 'shows', 'tv', 'television',
+    'car', 'cars', 'road', 'roads', 'street', 'streets', 'building', 'buildings',
+    'room', 'rooms', 'office', 'offices', 'door', 'doors', 'window', 'windows',
+    'table', 'tables', 'chair', 'chairs', 'bed', 'beds', 'floor', 'floors',
+    # 数字、記号、コード関連
+    'com', 'org', 'net', 'edu', 'gov', 'www', 'http', 'https', 'html', 'css', 'js',
+    'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine', 'ten',
+    'first', 'second', 'third', 'fourth', 'fifth', 'sixth', 'seventh', 'eighth', 'ninth', 'tenth',
+    # よくある誤抽出
+    'using', 'used', 'use', 'uses', 'show', 'shows', 'shown', 'based', 'propose', 'proposed',
+    'present', 'presented', 'demonstrate', 'demonstrated', 'evaluate', 'evaluated', 'compare', 'compared',
+    'analyze', 'analyzed', 'examine', 'examined', 'investigate', 'investigated', 'explore', 'explored',
+    'discuss', 'discussed', 'describe', 'described', 'explain', 'explained', 'review', 'reviewed',
+    'survey', 'surveyed', 'focus', 'focused', 'address', 'addressed', 'tackle', 'tackled',
+    'achieve', 'achieved', 'obtain', 'obtained', 'improve', 'improved', 'enhance', 'enhanced',
+    'develop', 'developed', 'design', 'designed', 'implement', 'implemented', 'apply', 'applied',
+    'introduce', 'introduced', 'establish', 'established', 'formulate', 'formulated',
+    'perform', 'performed', 'conduct', 'conducted', 'carry', 'carried', 'execute', 'executed',
+    'test', 'tested', 'validate', 'validated', 'verify', 'verified', 'confirm', 'confirmed',
+    'measure', 'measured', 'calculate', 'calculated', 'compute', 'computed', 'determine', 'determined',
+    'estimate', 'estimated', 'predict', 'predicted', 'model', 'models', 'modeling', 'modelling'
+})
+
+# 特化された技術用語辞書（完全一致のみ）
+SPECIALIZED_TECH_DICTIONARY = {
+    # === AI/MLモデル名 ===
+    'bert': 'BERT',
+    'gpt': 'GPT', 
+    'gpt-3': 'GPT-3',
+    'gpt-4': 'GPT-4',
+    'chatgpt': 'ChatGPT',
+    't5': 'T5',
+    'bart': 'BART',
+    'roberta': 'RoBERTa',
+    'electra': 'ELECTRA',
+    'deberta': 'DeBERTa',
+    'albert': 'ALBERT',
+    'distilbert': 'DistilBERT',
+    'xlnet': 'XLNet',
+    'ernie': 'ERNIE',
+    'claude': 'Claude',
+    'gemini': 'Gemini',
+    'llama': 'LLaMA',
+    'mistral': 'Mistral',
+    'mixtral': 'Mixtral',
+    
+    # === コンピュータビジョンモデル ===
+    'resnet': 'ResNet',
+    'vgg': 'VGG',
+    'inception': 'Inception',
+    'densenet': 'DenseNet',
+    'efficientnet': 'EfficientNet',
+    'mobilenet': 'MobileNet',
+    'yolo': 'YOLO',
+    'r-cnn': 'R-CNN',
+    'faster r-cnn': 'Faster R-CNN',
+    'mask r-cnn': 'Mask R-CNN',
+    'clip': 'CLIP',
+    'dall-e': 'DALL-E',
+    'stable diffusion': 'Stable Diffusion',
+    'midjourney': 'Midjourney',
+    
+    # === アーキテクチャ・手法 ===
+    'transformer': 'Transformer',
+    'vision transformer': 'Vision Transformer',
+    'attention mechanism': 'Attention Mechanism',
+    'self-attention': 'Self-Attention',
+    'cross-attention': 'Cross-Attention',
+    'multi-head attention': 'Multi-Head Attention',
+    'lstm': 'LSTM',
+    'gru': 'GRU',
+    'cnn': 'CNN',
+    'rnn': 'RNN',
+    'convolutional neural network': 'Convolutional Neural Network',
+    'recurrent neural network': 'Recurrent Neural Network',
+    'graph neural network': 'Graph Neural Network',
+    'generative adversarial network': 'Generative Adversarial Network',
+    'variational autoencoder': 'Variational Autoencoder',
+    'autoencoder': 'Autoencoder',
+    'diffusion model': 'Diffusion Model',
+    'gan': 'GAN',
+    'vae': 'VAE',
+    
+    # === 学習パラダイム ===
+    'large language model': 'Large Language Model',
+    'foundation model': 'Foundation Model',
+    'multimodal model': 'Multimodal Model',
+    'machine learning': 'Machine Learning',
+    'deep learning': 'Deep Learning',
+    'reinforcement learning': 'Reinforcement Learning',
+    'supervised learning': 'Supervised Learning',
+    'unsupervised learning': 'Unsupervised Learning',
+    'self-supervised learning': 'Self-Supervised Learning',
+    'semi-supervised learning': 'Semi-Supervised Learning',
+    'transfer learning': 'Transfer Learning',
+    'meta-learning': 'Meta-Learning',
+    'continual learning': 'Continual Learning',
+    'federated learning': 'Federated Learning',
+    'few-shot learning': 'Few-Shot Learning',
+    'zero-shot learning': 'Zero-Shot Learning',
+    'one-shot learning': 'One-Shot Learning',
+    'in-context learning': 'In-Context Learning',
+    'multi-task learning': 'Multi-Task Learning',
+    'contrastive learning': 'Contrastive Learning',
+    
+    # === ファインチューニング技術 ===
+    'fine-tuning': 'Fine-Tuning',
+    'pre-training': 'Pre-Training',
+    'parameter-efficient fine-tuning': 'Parameter-Efficient Fine-Tuning',
+    'lora': 'LoRA',
+    'adalora': 'AdaLoRA', 
+    'prefix tuning': 'Prefix Tuning',
+    'prompt tuning': 'Prompt Tuning',
+    'prompt engineering': 'Prompt Engineering',
+    'instruction tuning': 'Instruction Tuning',
+    'rlhf': 'RLHF',
+    'reinforcement learning from human feedback': 'Reinforcement Learning from Human Feedback',
+    
+    # === タスク・アプリケーション ===
+    'natural language processing': 'Natural Language Processing',
+    'computer vision': 'Computer Vision',
+    'speech recognition': 'Speech Recognition',
+    'automatic speech recognition': 'Automatic Speech Recognition',
+    'machine translation': 'Machine Translation',
+    'question answering': 'Question Answering',
+    'text summarization': 'Text Summarization',
+    'sentiment analysis': 'Sentiment Analysis',
+    'named entity recognition': 'Named Entity Recognition',
+    'object detection': 'Object Detection',
+    'semantic segmentation': 'Semantic Segmentation',
+    'instance segmentation': 'Instance Segmentation',
+    'image classification': 'Image Classification',
+    'image generation': 'Image Generation',
+    'text-to-image': 'Text-to-Image',
+    'image-to-text': 'Image-to-Text',
+    'vision-language': 'Vision-Language',
+    'multimodal learning': 'Multimodal Learning',
+    
+    # === 最適化・訓練 ===
+    'gradient descent': 'Gradient Descent',
+    'stochastic gradient descent': 'Stochastic Gradient Descent',
+    'adam optimizer': 'Adam Optimizer',
+    'backpropagation': 'Backpropagation',
+    'batch normalization': 'Batch Normalization',
+    'layer normalization': 'Layer Normalization',
+    'dropout': 'Dropout',
+    'regularization': 'Regularization',
+    'adversarial training': 'Adversarial Training',
+    'knowledge distillation': 'Knowledge Distillation',
+    'model compression': 'Model Compression',
+    'neural architecture search': 'Neural Architecture Search',
+    'hyperparameter optimization': 'Hyperparameter Optimization',
+    
+    # === 評価指標 ===
+    'cross-entropy': 'Cross-Entropy',
+    'mean squared error': 'Mean Squared Error',
+    'kl divergence': 'KL Divergence',
+    'cosine similarity': 'Cosine Similarity',
+    'intersection over union': 'Intersection over Union',
+    'receiver operating characteristic': 'ROC',
+    'area under curve': 'AUC',
+    'f1 score': 'F1 Score',
+    'precision': 'Precision',
+    'recall': 'Recall',
+    'accuracy': 'Accuracy',
+    
+    # === 技術ツール・フレームワーク ===
+    'pytorch': 'PyTorch',
+    'tensorflow': 'TensorFlow', 
+    'keras': 'Keras',
+    'jax': 'JAX',
+    'hugging face': 'Hugging Face',
+    'transformers': 'Transformers',
+    'openai': 'OpenAI',
+    'anthropic': 'Anthropic',
+    'cuda': 'CUDA',
+    'cudnn': 'cuDNN',
+    'nvidia': 'NVIDIA',
+    'tpu': 'TPU',
+    'gpu': 'GPU',
+    'distributed training': 'Distributed Training',
+    
+    # === AI安全性・個人情報 ===
+    'ai safety': 'AI Safety',
+    'ai alignment': 'AI Alignment',
+    'constitutional ai': 'Constitutional AI',
+    'differential privacy': 'Differential Privacy',
+    'adversarial robustness': 'Adversarial Robustness',
+    'fairness in ai': 'Fairness in AI',
+    'explainable ai': 'Explainable AI',
+    'interpretable machine learning': 'Interpretable Machine Learning',
+    
+    # === 新しい技術トレンド ===
+    'retrieval-augmented generation': 'Retrieval-Augmented Generation',
+    'rag': 'RAG',
+    'chain-of-thought': 'Chain-of-Thought',
+    'reasoning': 'Reasoning',
+    'causal inference': 'Causal Inference',
+    'causal machine learning': 'Causal Machine Learning',
+    'neuromorphic computing': 'Neuromorphic Computing',
+    'quantum machine learning': 'Quantum Machine Learning',
+    'edge ai': 'Edge AI',
+    'federated learning': 'Federated Learning',
+    'differential privacy': 'Differential Privacy'
+}
+
+# 特化辞書から一度だけ構築するマッチャー
+TECHNICAL_TERM_MATCHER = KeywordMatcher(SPECIALIZED_TECH_DICTIONARY)
+
+# \b[A-Z]{2,5}\b と同じマッチだが、先頭を文字クラスにして正規表現エンジンの高速スキャンを効かせる
+ACRONYM_PATTERN = re.compile(r'[A-Z](?<!\w[A-Z])[A-Z]{1,4}\b')
+ACRONYM_EXCLUDES = frozenset(['THE', 'AND', 'FOR', 'BUT', 'NOT', 'YOU', 'ALL', 'CAN', 'GET', 'OUT', 'WHO', 'HAS', 'HAD'])
+
+def extract_technical_terms_from_text(text: str) -> list[str]:
+    """テキストから技術的な用語を抽出（特化辞書方式）"""
+    if not text:
+        return []
+    
+    # 1. 特化辞書からの完全一致検索（長い用語を優先し、マッチした部分は短い用語に再利用しない）
+    return _add_acronyms(text, TECHNICAL_TERM_MATCHER.match(text))
+
+def _add_acronyms(text: str, matched_terms: list[str]) -> list[str]:
+    """辞書でマッチした用語に略語を加える"""
+    keywords = set(matched_terms)
     
     # 2. 略語の特別処理（大文字のみ、2-5文字）
-    acronym_pattern = r'\b[A-Z]{2,5}\b'
-    acronyms = re.findall(acronym_pattern, text)
-    for acronym in acronyms:
-        if (acronym not in ['THE', 'AND', 'FOR', 'BUT', 'NOT', 'YOU', 'ALL', 'CAN', 'GET', 'OUT', 'WHO', 'HAS', 'HAD'] and
-            len(acronym) >= 2):
+    for acronym in ACRONYM_PATTERN.findall(text):
+        if acronym not in ACRONYM_EXCLUDES:
             keywords.add(acronym)
     
-    
     return list(keywords)
 
+def extract_technical_terms_batch(texts: Iterable[str]) -> list[list[str]]:
+    """複数テキストから技術用語を一括抽出（テキストごとのキーワードリストを返す）"""
+    texts = [text or "" for text in texts]
+    return [
+        _add_acronyms(text, matched_terms)
+        for text, matched_terms in zip(texts, TECHNICAL_TERM_MATCHER.match_many(texts))
+    ]
+
 def update_keywords_from_papers_improved(db: Session, limit: int = 1000) -> int:
     """改良されたキーワード抽出（arXivカテゴリ + テキスト解析）"""
     start_time = time.time()
@@ -681,27 +787,22 @@ def update_keywords_from_papers_improved(db: Session, limit: int = 1000) -> int:
     
     # 全論文からキーワードを抽出
     all_keywords = []
-    processed_count = 0
     
+    # 1. 取り込み時に保存したarXivカテゴリからキーワードを抽出
+    categories_by_paper_id = get_paper_categories(db, [paper.id for paper in recent_papers])
     for paper in recent_papers:
-        processed_count += 1
-        if processed_count % 100 == 0:
-            logging.info(f"Processed {processed_count}/{len(recent_papers)} papers...")
-        
-        # 1. arXivカテゴリからキーワードを抽出
-        categories = get_arxiv_categories(paper.arxiv_id)
+        categories = categories_by_paper_id.get(paper.id)
         if categories:
             category_keywords = extract_keywords_from_categories(categories)
             all_keywords.extend(category_keywords)
-        
-        # 2. タイトルから技術用語を抽出
-        title_keywords = extract_technical_terms_from_text(paper.title)
-        all_keywords.extend(title_keywords)
-        
-        # 3. 要約から技術用語を抽出（最初の500文字のみ）
-        summary_excerpt = paper.summary[:500] if paper.summary else ""
-        summary_keywords = extract_technical_terms_from_text(summary_excerpt)
-        all_keywords.extend(summary_keywords)
+    
+    # 2-3. タイトルと要約（最初の500文字のみ）から技術用語を一括抽出
+    texts = []
+    for paper in recent_papers:
+        texts.append(paper.title)
+        texts.append(paper.summary[:500] if paper.summary else "")
+    for text_keywords in extract_technical_terms_batch(texts):
+        all_keywords.extend(text_keywords)
     
     # 頻出度をカウント
     keyword_counts = Counter(all_keywords)
@@ -735,74 +836,87 @@ def update_keywords_from_papers_improved(db: Session, limit: int = 1000) -> int:
     logging.info(f"Added {new_keywords_added} new keywords in {time.time() - start_time:.2f} seconds.")
     return new_keywords_added
 
+# 品質チェックで常に高品質とみなすキーワード（特化辞書の表記）
+SPECIALIZED_KEYWORD_NAMES = frozenset({
+    'BERT', 'GPT', 'GPT-3', 'GPT-4', 'ChatGPT', 'T5', 'BART', 'RoBERTa', 'ELECTRA', 'DeBERTa',
+    'ALBERT', 'DistilBERT', 'XLNet', 'ERNIE', 'Claude', 'Gemini', 'LLaMA', 'Mistral', 'Mixtral',
+    'ResNet', 'VGG', 'Inception', 'DenseNet', 'EfficientNet', 'MobileNet', 'YOLO', 'R-CNN',
+    'Faster R-CNN', 'Mask R-CNN', 'CLIP', 'DALL-E', 'Stable Diffusion', 'Midjourney',
+    'Transformer', 'Vision Transformer', 'Attention Mechanism', 'Self-Attention', 'Cross-Attention',
+    'Multi-Head Attention', 'LSTM', 'GRU', 'CNN', 'RNN', 'Convolutional Neural Network',
+    'Recurrent Neural Network', 'Graph Neural Network', 'Generative Adversarial Network',
+    'Variational Autoencoder', 'Autoencoder', 'Diffusion Model', 'GAN', 'VAE',
+    'Large Language Model', 'Foundation Model', 'Multimodal Model', 'Machine Learning',
+    'Deep Learning', 'Reinforcement Learning', 'Supervised Learning', 'Unsupervised Learning',
+    'Self-Supervised Learning', 'Semi-Supervised Learning', 'Transfer Learning', 'Meta-Learning',
+    'Continual Learning', 'Federated Learning', 'Few-Shot Learning', 'Zero-Shot Learning',
+    'One-Shot Learning', 'In-Context Learning', 'Multi-Task Learning', 'Contrastive Learning',
+    'Fine-Tuning', 'Pre-Training', 'Parameter-Efficient Fine-Tuning', 'LoRA', 'AdaLoRA',
+    'Prefix Tuning', 'Prompt Tuning', 'Prompt Engineering', 'Instruction Tuning', 'RLHF',
+    'Reinforcement Learning from Human Feedback', 'Natural Language Processing', 'Computer Vision',
+    'Speech Recognition', 'Automatic Speech Recognition', 'Machine Translation', 'Question Answering',
+    'Text Summarization', 'Sentiment Analysis', 'Named Entity Recognition', 'Object Detection',
+    'Semantic Segmentation', 'Instance Segmentation', 'Image Classification', 'Image Generation',
+    'Text-to-Image', 'Image-to-Text', 'Vision-Language', 'Multimodal Learning',
+    'Gradient Descent', 'Stochastic Gradient Descent', 'Adam Optimizer', 'Backpropagation',
+    'Batch Normalization', 'Layer Normalization', 'Dropout', 'Regularization', 'Adversarial Training',
+    'Knowledge Distillation', 'Model Compression', 'Neural Architecture Search', 'Hyperparameter Optimization',
+    'Cross-Entropy', 'Mean Squared Error', 'KL Divergence', 'Cosine Similarity', 'Intersection over Union',
+    'ROC', 'AUC', 'F1 Score', 'Precision', 'Recall', 'Accuracy', 'PyTorch', 'TensorFlow', 'Keras',
+    'JAX', 'Hugging Face', 'Transformers', 'OpenAI', 'Anthropic', 'CUDA', 'cuDNN', 'NVIDIA', 'TPU',
+    'GPU', 'Distributed Training', 'AI Safety', 'AI Alignment', 'Constitutional AI', 'Differential Privacy',
+    'Adversarial Robustness', 'Fairness in AI', 'Explainable AI', 'Interpretable Machine Learning',
+    'Retrieval-Augmented Generation', 'RAG', 'Chain-of-Thought', 'Reasoning', 'Causal Inference',
+    'Causal Machine Learning', 'Neuromorphic Computing', 'Quantum Machine Learning', 'Edge AI'
+})
+
+# 絶対的に除外する低品質ワード
+LOW_QUALITY_WORDS = frozenset({
+    # 一般的すぎる単語
+    'model', 'models', 'data', 'out', 'while', 'multi', 'large', 'existing',
+    'however', 'system', 'training', 'dataset', 'text', 'framework', 'performance',
+    'method', 'approach', 'result', 'results', 'work', 'paper', 'study', 'research',
+    'analysis', 'evaluation', 'experiment', 'test', 'baseline', 'comparison', 'novel',
+    'new', 'existing', 'current', 'previous', 'recent', 'proposed', 'based', 'using',
+    'show', 'shows', 'demonstrate', 'demonstrates', 'achieve', 'achieves', 'improve', 'improves',
+    'enhance', 'enhances', 'provide', 'provides', 'present', 'presents', 'introduce', 'introduces',
+    'effective', 'efficient', 'robust', 'accurate', 'better', 'best', 'good', 'high', 'low',
+    'various', 'different', 'multiple', 'several', 'many', 'few', 'single', 'simple', 'complex',
+    # 特に一般的な動詞・形容詞
+    'can', 'could', 'should', 'would', 'may', 'might', 'will', 'shall', 'must',
+    'get', 'got', 'give', 'take', 'make', 'come', 'go', 'see', 'know', 'think',
+    'look', 'find', 'want', 'need', 'try', 'use', 'work', 'call', 'ask', 'seem',
+    'feel', 'become', 'leave', 'move', 'play', 'run', 'turn', 'start', 'begin',
+    'end', 'stop', 'keep', 'let', 'put', 'set', 'hold', 'bring', 'follow', 'lead',
+    # ストップワード系
+    'the', 'and', 'for', 'with', 'this', 'that', 'these', 'those', 'are', 'was', 'were',
+    'have', 'has', 'had', 'our', 'we', 'they', 'their', 'them', 'his', 'her', 'its',
+    'your', 'you', 'all', 'any', 'some', 'more', 'most', 'such', 'only', 'same',
+    'very', 'just', 'now', 'also', 'one', 'two', 'three', 'first', 'second', 'third'
+})
+
+# 技術的キーワードの指示語
+TECH_INDICATORS = frozenset({
+    'learning', 'neural', 'network', 'algorithm', 'optimization', 'training',
+    'inference', 'embedding', 'attention', 'transformer', 'convolution',
+    'generation', 'classification', 'regression', 'clustering', 'segmentation',
+    'detection', 'recognition', 'processing', 'computing', 'vision', 'language',
+    'speech', 'multimodal', 'adversarial', 'generative', 'discriminative',
+    'supervised', 'unsupervised', 'reinforcement', 'self-supervised'
+})
+
+
 def is_high_quality_keyword(keyword: str) -> bool:
     """キーワードの品質をチェック（特化辞書ベース）"""
     keyword_clean = keyword.strip()
     keyword_lower = keyword_clean.lower()
     
     # 特化辞書にあるキーワードは高品質
-    specialized_values = {
-        'BERT', 'GPT', 'GPT-3', 'GPT-4', 'ChatGPT', 'T5', 'BART', 'RoBERTa', 'ELECTRA', 'DeBERTa',
-        'ALBERT', 'DistilBERT', 'XLNet', 'ERNIE', 'Claude', 'Gemini', 'LLaMA', 'Mistral', 'Mixtral',
-        'ResNet', 'VGG', 'Inception', 'DenseNet', 'EfficientNet', 'MobileNet', 'YOLO', 'R-CNN',
-        'Faster R-CNN', 'Mask R-CNN', 'CLIP', 'DALL-E', 'Stable Diffusion', 'Midjourney',
-        'Transformer', 'Vision Transformer', 'Attention Mechanism', 'Self-Attention', 'Cross-Attention',
-        'Multi-Head Attention', 'LSTM', 'GRU', 'CNN', 'RNN', 'Convolutional Neural Network',
-        'Recurrent Neural Network', 'Graph Neural Network', 'Generative Adversarial Network',
-        'Variational Autoencoder', 'Autoencoder', 'Diffusion Model', 'GAN', 'VAE',
-        'Large Language Model', 'Foundation Model', 'Multimodal Model', 'Machine Learning',
-        'Deep Learning', 'Reinforcement Learning', 'Supervised Learning', 'Unsupervised Learning',
-        'Self-Supervised Learning', 'Semi-Supervised Learning', 'Transfer Learning', 'Meta-Learning',
-        'Continual Learning', 'Federated Learning', 'Few-Shot Learning', 'Zero-Shot Learning',
-        'One-Shot Learning', 'In-Context Learning', 'Multi-Task Learning', 'Contrastive Learning',
-        'Fine-Tuning', 'Pre-Training', 'Parameter-Efficient Fine-Tuning', 'LoRA', 'AdaLoRA',
-        'Prefix Tuning', 'Prompt Tuning', 'Prompt Engineering', 'Instruction Tuning', 'RLHF',
-        'Reinforcement Learning from Human Feedback', 'Natural Language Processing', 'Computer Vision',
-        'Speech Recognition', 'Automatic Speech Recognition', 'Machine Translation', 'Question Answering',
-        'Text Summarization', 'Sentiment Analysis', 'Named Entity Recognition', 'Object Detection',
-        'Semantic Segmentation', 'Instance Segmentation', 'Image Classification', 'Image Generation',
-        'Text-to-Image', 'Image-to-Text', 'Vision-Language', 'Multimodal Learning',
-        'Gradient Descent', 'Stochastic Gradient Descent', 'Adam Optimizer', 'Backpropagation',
-        'Batch Normalization', 'Layer Normalization', 'Dropout', 'Regularization', 'Adversarial Training',
-        'Knowledge Distillation', 'Model Compression', 'Neural Architecture Search', 'Hyperparameter Optimization',
-        'Cross-Entropy', 'Mean Squared Error', 'KL Divergence', 'Cosine Similarity', 'Intersection over Union',
-        'ROC', 'AUC', 'F1 Score', 'Precision', 'Recall', 'Accuracy', 'PyTorch', 'TensorFlow', 'Keras',
-        'JAX', 'Hugging Face', 'Transformers', 'OpenAI', 'Anthropic', 'CUDA', 'cuDNN', 'NVIDIA', 'TPU',
-        'GPU', 'Distributed Training', 'AI Safety', 'AI Alignment', 'Constitutional AI', 'Differential Privacy',
-        'Adversarial Robustness', 'Fairness in AI', 'Explainable AI', 'Interpretable Machine Learning',
-        'Retrieval-Augmented Generation', 'RAG', 'Chain-of-Thought', 'Reasoning', 'Causal Inference',
-        'Causal Machine Learning', 'Neuromorphic Computing', 'Quantum Machine Learning', 'Edge AI'
-    }
-    
-    if keyword_clean in specialized_values:
+    if keyword_clean in SPECIALIZED_KEYWORD_NAMES:
         return True
     
     # 絶対的に除外する低品質ワード
-    low_quality_words = {
-        # 一般的すぎる単語
-        'model', 'models', 'data', 'out', 'while', 'multi', 'large', 'existing',
-        'however', 'system', 'training', 'dataset', 'text', 'framework', 'performance',
-        'method', 'approach', 'result', 'results', 'work', 'paper', 'study', 'research',
-        'analysis', 'evaluation', 'experiment', 'test', 'baseline', 'comparison', 'novel',
-        'new', 'existing', 'current', 'previous', 'recent', 'proposed', 'based', 'using',
-        'show', 'shows', 'demonstrate', 'demonstrates', 'achieve', 'achieves', 'improve', 'improves',
-        'enhance', 'enhances', 'provide', 'provides', 'present', 'presents', 'introduce', 'introduces',
-        'effective', 'efficient', 'robust', 'accurate', 'better', 'best', 'good', 'high', 'low',
-        'various', 'different', 'multiple', 'several', 'many', 'few', 'single', 'simple', 'complex',
-        # 特に一般的な動詞・形容詞
-        'can', 'could', 'should', 'would', 'may', 'might', 'will', 'shall', 'must',
-        'get', 'got', 'give', 'take', 'make', 'come', 'go', 'see', 'know', 'think',
-        'look', 'find', 'want', 'need', 'try', 'use', 'work', 'call', 'ask', 'seem',
-        'feel', 'become', 'leave', 'move', 'play', 'run', 'turn', 'start', 'begin',
-        'end', 'stop', 'keep', 'let', 'put', 'set', 'hold', 'bring', 'follow', 'lead',
-        # ストップワード系
-        'the', 'and', 'for', 'with', 'this', 'that', 'these', 'those', 'are', 'was', 'were',
-        'have', 'has', 'had', 'our', 'we', 'they', 'their', 'them', 'his', 'her', 'its',
-        'your', 'you', 'all', 'any', 'some', 'more', 'most', 'such', 'only', 'same',
-        'very', 'just', 'now', 'also', 'one', 'two', 'three', 'first', 'second', 'third'
-    }
-    
-    if keyword_lower in low_quality_words:
+    if keyword_lower in LOW_QUALITY_WORDS:
         return False
     
     # 基本的なフィルタリング
@@ -825,215 +939,317 @@ def is_high_quality_keyword(keyword: str) -> bool:
         return True
     
     # 3. 技術的キーワードの指示語を含む
-    tech_indicators = {
-        'learning', 'neural', 'network', 'algorithm', 'optimization', 'training',
-        'inference', 'embedding', 'attention', 'transformer', 'convolution',
-        'generation', 'classification', 'regression', 'clustering', 'segmentation',
-        'detection', 'recognition', 'processing', 'computing', 'vision', 'language',
-        'speech', 'multimodal', 'adversarial', 'generative', 'discriminative',
-        'supervised', 'unsupervised', 'reinforcement', 'self-supervised'
-    }
-    
-    if any(indicator in keyword_lower for indicator in tech_indicators):
+    if any(indicator in keyword_lower for indicator in TECH_INDICATORS):
         return True
     
     # その他の場合は低品質とみなす
     return False
 
-def cleanup_low_quality_keywords(db: Session) -> int:
-    """低品質なキーワードをデータベースから削除"""
+# 抽出・品質判定のロジック自体を変更した場合に上げる（辞書や単語リストの変更は自動で反映される）
+KEYWORD_EXTRACTOR_REVISION = 1
+
+def get_keyword_extractor_version() -> str:
+    """キーワード抽出器のバージョン（リビジョンと辞書・品質ルールのハッシュ）
+
+    辞書を1語でも変更するとバージョンが変わり、次の再抽出（maintain_keywords.py --reextract）で全論文を読み直して抽出し直す。
+    """
+    digest = hashlib.sha256(repr((
+        sorted(SPECIALIZED_TECH_DICTIONARY.items()),
+        ACRONYM_PATTERN.pattern,
+        sorted(ACRONYM_EXCLUDES),
+        sorted(SPECIALIZED_KEYWORD_NAMES),
+        sorted(LOW_QUALITY_WORDS),
+        sorted(TECH_INDICATORS),
+    )).encode('utf-8')).hexdigest()
+    return f"{KEYWORD_EXTRACTOR_REVISION}-{digest[:16]}"
+
+def get_paper_content_hash(title: str, summary: str) -> str:
+    """キーワード抽出の対象テキスト（タイトルと要約）のハッシュ"""
+    return hashlib.sha256(f"{title}\n{summary}".encode('utf-8')).hexdigest()
+
+# 大文字小文字の重複統合で優先する表記
+PREFERRED_KEYWORD_NAMES = {
+    'bert': 'BERT', 'gpt': 'GPT', 'transformer': 'Transformer',
+    'machine learning': 'Machine Learning', 'deep learning': 'Deep Learning',
+    'neural network': 'Neural Network', 'large language model': 'Large Language Model',
+    'attention': 'Attention', 'fine-tuning': 'Fine-tuning', 'multimodal': 'Multimodal',
+    'rag': 'RAG', 'language models': 'Language Models', 'generative ai': 'Generative AI',
+    'learning': 'Learning', 'language': 'Language', 'network': 'Network',
+    'generation': 'Generation', 'natural language processing': 'Natural Language Processing',
+    'computer vision': 'Computer Vision', 'reinforcement learning': 'Reinforcement Learning'
+}
+
+# IN句・CASE式1つあたりの最大ID数
+SQL_ID_CHUNK_SIZE = 500
+
+def _chunked(items: list, size: int = SQL_ID_CHUNK_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def get_keyword_rows(db: Session, keyword_ids: Optional[Iterable[int]] = None) -> list[tuple[int, str]]:
+    """キーワードの(id, name)を取得（keyword_ids指定時はそのIDのみ）"""
+    if keyword_ids is None:
+        return [tuple(row) for row in db.query(models.Keyword.id, models.Keyword.name)]
+    rows = []
+    for chunk in _chunked(list(set(keyword_ids))):
+        rows.extend(tuple(row) for row in db.query(models.Keyword.id, models.Keyword.name).filter(models.Keyword.id.in_(chunk)))
+    return rows
+
+def delete_keywords(db: Session, keyword_ids: list[int]) -> None:
+    """キーワードと関連付けをまとめて削除（コミットは呼び出し側で行う）"""
+    deleted = 0
+    for chunk in _chunked(keyword_ids):
+        db.query(models.PaperKeyword).filter(models.PaperKeyword.keyword_id.in_(chunk)).delete(synchronize_session=False)
+        deleted += db.query(models.Keyword).filter(models.Keyword.id.in_(chunk)).delete(synchronize_session=False)
+    if deleted:
+        counters.increment(db, counters.KEYWORDS, -deleted)
+    keyword_rollup.discard_keywords(db, keyword_ids)
+
+def cleanup_low_quality_keywords(db: Session, keyword_ids: Optional[Iterable[int]] = None) -> int:
+    """低品質なキーワードをデータベースから削除
+    
+    keyword_idsを指定した場合は、そのキーワード（取り込んだバッチで作成・参照されたもの）だけを検査する。
+    全件の検査は scripts/maintain_keywords.py で行う。
+    品質判定はPythonで行い、削除と重複統合はまとめたSQL文で1つのトランザクション内で実行する。
+    """
     start_time = time.time()
-    logging.info("Starting cleanup of low quality keywords...")
-    
-    # 全キーワードを取得
-    all_keywords = db.query(models.Keyword).all()
-    
-    removed_count = 0
+    if keyword_ids is None:
+        logging.info("Starting cleanup of low quality keywords...")
+    else:
+        keyword_ids = set(keyword_ids)
+        logging.info(f"Starting cleanup of {len(keyword_ids)} touched keywords...")
     
     # 1. 低品質キーワードの削除
-    for keyword in all_keywords:
-        if not is_high_quality_keyword(keyword.name):
-            # 関連付けを削除
-            db.query(models.PaperKeyword).filter(
-                models.PaperKeyword.keyword_id == keyword.id
-            ).delete()
-            
-            # キーワードを削除
-            db.delete(keyword)
-            removed_count += 1
-            
-            if removed_count % 50 == 0:
-                logging.info(f"Removed {removed_count} low quality keywords...")
-    
-    db.commit()
+    low_quality_ids = [keyword_id for keyword_id, name in get_keyword_rows(db, keyword_ids) if not is_high_quality_keyword(name)]
+    delete_keywords(db, low_quality_ids)
+    removed_count = len(low_quality_ids)
     
     # 2. 大文字小文字の重複を統合
-    duplicate_count = merge_case_duplicates(db)
+    duplicate_count = _merge_case_duplicates(db, keyword_ids)
+    db.commit()
+    cache.clear()
     
     logging.info(f"Removed {removed_count} low quality keywords and merged {duplicate_count} duplicates in {time.time() - start_time:.2f} seconds.")
     return removed_count + duplicate_count
 
-def merge_case_duplicates(db: Session) -> int:
-    """大文字小文字の違いによる重複キーワードを統合"""
+def merge_case_duplicates(db: Session, keyword_ids: Optional[Iterable[int]] = None) -> int:
+    """大文字小文字の違いによる重複キーワードを統合（keyword_ids指定時はそれらと同名のキーワードのみ）"""
+    merged_count = _merge_case_duplicates(db, keyword_ids)
+    db.commit()
+    
+    # キャッシュを自動クリア
+    cache.clear()
+    logging.info("Cache cleared after keyword cleanup")
+    
+    return merged_count
+
+def _merge_case_duplicates(db: Session, keyword_ids: Optional[Iterable[int]] = None) -> int:
     logging.info("Merging case-sensitive duplicate keywords...")
     
-    # すべてのキーワードを取得
-    all_keywords = db.query(models.Keyword).all()
+    if keyword_ids is None:
+        # すべてのキーワードを取得
+        keyword_rows = get_keyword_rows(db)
+    else:
+        # 対象キーワードと小文字で一致するキーワードのみを取得
+        normalized_names = list({name.lower() for _, name in get_keyword_rows(db, keyword_ids)})
+        keyword_rows = []
+        for chunk in _chunked(normalized_names):
+            keyword_rows.extend(
+                tuple(row) for row in
+                db.query(models.Keyword.id, models.Keyword.name).filter(func.lower(models.Keyword.name).in_(chunk))
+            )
     
     # 正規化されたキーワード名でグループ化
-    keyword_groups = {}
-    for kw in all_keywords:
-        normalized = kw.name.lower()
-        if normalized not in keyword_groups:
-            keyword_groups[normalized] = []
-        keyword_groups[normalized].append(kw)
-    
-    merged_count = 0
+    keyword_groups: dict[str, list[tuple[int, str]]] = {}
+    for keyword_id, name in keyword_rows:
+        keyword_groups.setdefault(name.lower(), []).append((keyword_id, name))
     
+    # 統合元ID → 統合先ID と、改名が必要な統合先を決める
+    merge_into: dict[int, int] = {}
+    renames: dict[int, str] = {}
     for normalized_name, keywords in keyword_groups.items():
         if len(keywords) <= 1:
             continue
-            
-        # 最適なキーワード名を選択（特化辞書にある場合はそれを優先）
-        specialized_tech_dictionary = {
-            'bert': 'BERT', 'gpt': 'GPT', 'transformer': 'Transformer',
-            'machine learning': 'Machine Learning', 'deep learning': 'Deep Learning',
-            'neural network': 'Neural Network', 'large language model': 'Large Language Model',
-            'attention': 'Attention', 'fine-tuning': 'Fine-tuning', 'multimodal': 'Multimodal',
-            'rag': 'RAG', 'language models': 'Language Models', 'generative ai': 'Generative AI',
-            'learning': 'Learning', 'language': 'Language', 'network': 'Network',
-            'generation': 'Generation', 'natural language processing': 'Natural Language Processing',
-            'computer vision': 'Computer Vision', 'reinforcement learning': 'Reinforcement Learning'
-        }
         
-        # 特化辞書にある場合はその形式を使用
-        preferred_name = specialized_tech_dictionary.get(normalized_name)
+        # 特化辞書にある場合はその形式、なければより技術用語らしい形式を選択
+        preferred_name = PREFERRED_KEYWORD_NAMES.get(normalized_name)
         if not preferred_name:
-            # より適切な形式を選択（大文字で始まる、技術用語らしい形式）
-            preferred_keyword = max(keywords, key=lambda k: (
-                k.name[0].isupper(),  # 大文字で始まる
-                len(k.name),  # より長い
-                sum(1 for c in k.name if c.isupper())  # 大文字が多い
-            ))
-            preferred_name = preferred_keyword.name
-        
-        # 優先キーワードを見つけるか作成
-        preferred_keyword = None
-        for kw in keywords:
-            if kw.name == preferred_name:
-                preferred_keyword = kw
-                break
-        
-        if not preferred_keyword:
+            preferred_name = max(keywords, key=lambda k: (
+                k[1][0].isupper(),  # 大文字で始まる
+                len(k[1]),  # より長い
+                sum(1 for c in k[1] if c.isupper())  # 大文字が多い
+            ))[1]
+        
+        preferred_id = next((keyword_id for keyword_id, name in keywords if name == preferred_name), None)
+        if preferred_id is None:
             # 優先する名前のキーワードがない場合、最初のものを使って名前を更新
-            preferred_keyword = keywords[0]
-            preferred_keyword.name = preferred_name
-            db.add(preferred_keyword)
-        
-        # 他のキーワードの関連付けを優先キーワードに移動
-        for kw in keywords:
-            if kw.id == preferred_keyword.id:
-                continue
-                
-            # 関連付けを移動
-            associations = db.query(models.PaperKeyword).filter(
-                models.PaperKeyword.keyword_id == kw.id
-            ).all()
-            
-            for assoc in associations:
-                # 既に同じ論文とキーワードの関連付けがないかチェック
-                existing = db.query(models.PaperKeyword).filter(
-                    models.PaperKeyword.paper_id == assoc.paper_id,
-                    models.PaperKeyword.keyword_id == preferred_keyword.id
-                ).first()
-                
-                if not existing:
-                    assoc.keyword_id = preferred_keyword.id
-                    db.add(assoc)
-                else:
-                    # 重複する場合は古い関連付けを削除
-                    db.delete(assoc)
-            
-            # 古いキーワードを削除
-            db.delete(kw)
-            merged_count += 1
-            
-        logging.info(f"Merged {len(keywords)-1} duplicates for '{preferred_name}'")
-    
-    db.commit()
-    
-    # キャッシュを自動クリア
-    cache.clear()
-    logging.info("Cache cleared after keyword cleanup")
+            preferred_id = keywords[0][0]
+            renames[preferred_id] = preferred_name
+        
+        for keyword_id, _ in keywords:
+            if keyword_id != preferred_id:
+                merge_into[keyword_id] = preferred_id
+        logging.info(f"Merging {len(keywords)-1} duplicates for '{preferred_name}'")
+    
+    if not merge_into:
+        return 0
+    
+    # 関連付けを統合先に付け替え（既に同じ論文との関連付けがあるものは無視）してから、統合元を削除
+    insert_links = insert_or_ignore(db, models.PaperKeyword, ['paper_id', 'keyword_id'])
+    for chunk in _chunked(list(merge_into)):
+        target_id = case({old_id: merge_into[old_id] for old_id in chunk}, value=models.PaperKeyword.keyword_id)
+        db.execute(insert_links.from_select(
+            ['paper_id', 'keyword_id', 'published_at', 'week_start'],
+            select(
+                models.PaperKeyword.paper_id, target_id, models.PaperKeyword.published_at, models.PaperKeyword.week_start
+            ).where(models.PaperKeyword.keyword_id.in_(chunk))
+        ))
+    delete_keywords(db, list(merge_into))
+    # 付け替えで重複の除かれた件数は統合先ごとに数え直す
+    keyword_rollup.rebuild_weekly_counts(db, set(merge_into.values()))
+    
+    for chunk in _chunked(list(renames)):
+        db.query(models.Keyword).filter(models.Keyword.id.in_(chunk)).update(
+            {models.Keyword.name: case({keyword_id: renames[keyword_id] for keyword_id in chunk}, value=models.Keyword.id)},
+            synchronize_session=False
+        )
     
-    return merged_count
+    return len(merge_into)
 
 # 旧関数を維持（互換性のため）
 def update_keywords_from_papers(db: Session, limit: int = 1000) -> int:
     """互換性のためのラッパー関数"""
     return update_keywords_from_papers_improved(db, limit)
 
-def rebuild_paper_keyword_associations(db: Session) -> int:
-    """既存の論文と新しいキーワードの関連付けを再構築"""
-    start_time = time.time()
+def rebuild_paper_keyword_associations(db: Session, all_papers: bool = False, workers: int = 1) -> int:
+    """既存の論文と新しいキーワードの関連付けを再構築
+
+    既定では最新のlatest_papers_fetch_limit件、all_papers=Trueで全論文を対象にする
+    """
+    from .keyword_rebuild import rebuild_associations
+
     logging.info("Rebuilding paper-keyword associations...")
-    
-    # 既存の関連付けをクリア（必要に応じて）
-    # db.query(models.PaperKeyword).delete()
-    
-    # 全キーワードを取得
-    keywords = {kw.name: kw.id for kw in db.query(models.Keyword).all()}
-    
-    # 最近の論文を取得
-    recent_papers = (
-        db.query(models.Paper)
-        .order_by(models.Paper.published_at.desc())
-        .limit(settings.latest_papers_fetch_limit)  # Configurable latest papers limit
-        .all()
-    )
-    
-    associations_added = 0
-    
-    for paper in recent_papers:
-        # 論文のテキストから該当するキーワードを検索
-        paper_text = f"{paper.title} {paper.summary}".lower()
-        
-        for keyword_name, keyword_id in keywords.items():
-            if keyword_name.lower() in paper_text:
-                # 既存の関連付けをチェック
-                existing = (
-                    db.query(models.PaperKeyword)
-                    .filter(
-                        models.PaperKeyword.paper_id == paper.id,
-                        models.PaperKeyword.keyword_id == keyword_id
-                    )
-                    .first()
-                )
-                
-                if not existing:
-                    # 新しい関連付けを追加
-                    association = models.PaperKeyword(
-                        paper_id=paper.id,
-                        keyword_id=keyword_id
-                    )
-                    db.add(association)
-                    associations_added += 1
-    
-    db.commit()
-    
-    logging.info(f"Added {associations_added} new associations in {time.time() - start_time:.2f} seconds.")
+    limit = None if all_papers else settings.latest_papers_fetch_limit
+    associations_added = rebuild_associations(db, limit=limit, workers=workers)
+    if associations_added:
+        cache.clear()
     return associations_added
 
+# 分析用レコードに必要な論文の列（本文以外の関連は読み込まない）
+PAPER_RECORD_COLUMNS = (
+    models.Paper.id, models.Paper.arxiv_id, models.Paper.title,
+    models.Paper.authors, models.Paper.summary, models.Paper.published_at
+)
+
+def get_paper_keyword_names(db: Session, paper_ids: list[int]) -> dict[int, list[str]]:
+    """論文IDごとのキーワード名（SQL_ID_CHUNK_SIZE件ごとに1クエリでまとめて取得）"""
+    names = {paper_id: [] for paper_id in paper_ids}
+    for chunk in _chunked(list(names)):
+        rows = (
+            db.query(models.PaperKeyword.paper_id, models.Keyword.name)
+            .join(models.Keyword, models.Keyword.id == models.PaperKeyword.keyword_id)
+            .filter(models.PaperKeyword.paper_id.in_(chunk))
+        )
+        for paper_id, name in rows:
+            names[paper_id].append(name)
+    return names
+
+def load_paper_records(db: Session, papers_query) -> list[dict]:
+    """papers_queryが選ぶ論文の分析用レコード（必要な列とキーワードだけを2クエリで取得）
+
+    papers_queryは絞り込み・並び順・件数を指定したmodels.Paperのクエリ
+    """
+    rows = papers_query.with_entities(*PAPER_RECORD_COLUMNS).all()
+    keywords = get_paper_keyword_names(db, [row.id for row in rows])
+    return [
+        {
+            'id': row.id,
+            'title': row.title,
+            'authors': row.authors,
+            'published_at': row.published_at.isoformat(),
+            'summary': row.summary,
+            'keywords': keywords[row.id],
+            'arxiv_id': row.arxiv_id
+        }
+        for row in rows
+    ]
+
+def to_paper_response(record: dict) -> schemas.PaperResponse:
+    """load_paper_recordsのレコードをPaperResponseに変換"""
+    return schemas.PaperResponse(
+        id=record['id'],
+        arxiv_id=record['arxiv_id'],
+        title=record['title'],
+        summary=record['summary'],
+        published_at=record['published_at'],
+        authors=record['authors'],
+        arxiv_url=f"https://arxiv.org/abs/{record['arxiv_id']}",
+        keywords=record['keywords']
+    )
+
+def get_top_keywords_for_papers(db: Session, paper_ids: list[int], limit: int = 10) -> list[dict]:
+    """論文集合で多く使われているキーワード上位limit件（GROUP BYで集計、paper_idsはSQL_ID_CHUNK_SIZE件以内）"""
+    paper_count = func.count(models.PaperKeyword.paper_id)
+    rows = (
+        db.query(models.Keyword.name, paper_count)
+        .join(models.PaperKeyword, models.Keyword.id == models.PaperKeyword.keyword_id)
+        .filter(models.PaperKeyword.paper_id.in_(paper_ids))
+        .group_by(models.Keyword.id, models.Keyword.name)
+        .order_by(paper_count.desc(), models.Keyword.name)
+        .limit(limit)
+    )
+    return [{"keyword": name, "count": count} for name, count in rows]
+
 async def get_hot_topics_summary(
     db: Session, 
     language: str = "auto", 
     days: int = 30, 
-    max_topics: int = 10
+    max_topics: int = 10,
+    baseline_days: Optional[int] = None,
+    force_regenerate: bool = False
 ) -> schemas.HotTopicsResponse:
-    """Get hot topics summary using AI analysis"""
+    """Get hot topics summary using AI analysis (baseline_days only affects the local fallback)
+
+    AI results are cached per (days, max_topics, language) until papers or
+    keyword links change; force_regenerate skips the cached result. With
+    settings.ai_serve_stale the last result is served even for an older data
+    version while it is refreshed in the background.
+    """
     start_time = time.time()
     logging.info(f"Generating hot topics summary for last {days} days in {language}...")
     
+    # Check cache first (unless force regenerate is requested)
+    data_version = counters.data_version(db)
+    cache_key = (
+        models.HotTopicsCache.analysis_days == days,
+        models.HotTopicsCache.max_topics == max_topics,
+        models.HotTopicsCache.language == language
+    )
+    if not force_regenerate:
+        cached_query = db.query(models.HotTopicsCache).filter(*cache_key)
+        if not settings.ai_serve_stale:
+            cached_query = cached_query.filter(models.HotTopicsCache.data_version == data_version)
+        cached_result = cached_query.order_by(models.HotTopicsCache.created_at.desc()).first()
+        if cached_result:
+            logging.info(f"Returning cached hot topics summary from {cached_result.created_at}")
+            cache_age_seconds, revalidating = revalidator.serve(
+                f"hot_topics:{days}:{max_topics}:{language}",
+                cached_result.created_at,
+                cached_result.data_version == data_version,
+                db.get_bind(),
+                lambda session: get_hot_topics_summary(session, language, days, max_topics, baseline_days, force_regenerate=True)
+            )
+            return schemas.HotTopicsResponse(
+                hot_topics=cached_result.hot_topics_data,
+                analysis_period_days=days,
+                total_papers_analyzed=cached_result.total_papers_analyzed,
+                generated_at=cached_result.created_at,
+                cache_age_seconds=cache_age_seconds,
+                revalidating=revalidating
+            )
+    else:
+        logging.info("Force regeneration requested - skipping cache")
+    
     # Get recent papers for analysis
     cutoff_date = get_time_ago(days=days)
     
@@ -1044,10 +1260,10 @@ async def get_hot_topics_summary(
         .limit(500)  # Limit to prevent token overflow
     )
     
-    recent_papers = recent_papers_query.all()
+    papers_data = load_paper_records(db, recent_papers_query)
     total_papers_analyzed = recent_papers_query.count()
     
-    if not recent_papers:
+    if not papers_data:
         # Return empty response if no recent papers
         return schemas.HotTopicsResponse(
             hot_topics=[],
@@ -1056,28 +1272,6 @@ async def get_hot_topics_summary(
             generated_at=get_utc_now()
         )
     
-    # Convert papers to analysis format
-    papers_data = []
-    for paper in recent_papers:
-        # Get paper keywords
-        paper_keywords = (
-            db.query(models.Keyword.name)
-            .join(models.PaperKeyword, models.Keyword.id == models.PaperKeyword.keyword_id)
-            .filter(models.PaperKeyword.paper_id == paper.id)
-            .all()
-        )
-        
-        paper_data = {
-            'id': paper.id,
-            'title': paper.title,
-            'authors': paper.authors,
-            'published_at': paper.published_at.isoformat(),
-            'summary': paper.summary,
-            'keywords': [kw.name for kw in paper_keywords],
-            'arxiv_id': paper.arxiv_id
-        }
-        papers_data.append(paper_data)
-    
     try:
         # Get AI service and analyze hot topics with timeout
         ai_service = get_ai_service()
@@ -1120,57 +1314,81 @@ async def get_hot_topics_summary(
             generated_at=get_utc_now()
         )
         
+        # Cache the result (replacing results for older data versions)
+        db.query(models.HotTopicsCache).filter(*cache_key).delete(synchronize_session=False)
+        db.add(models.HotTopicsCache(
+            analysis_days=days,
+            max_topics=max_topics,
+            language=language,
+            data_version=data_version,
+            hot_topics_data=[topic.model_dump(mode='json') for topic in hot_topics_response],
+            total_papers_analyzed=total_papers_analyzed
+        ))
+        db.commit()
+        
         logging.info(f"Generated hot topics summary with {len(hot_topics_response)} topics in {time.time() - start_time:.2f} seconds.")
         return response
         
     except asyncio.TimeoutError:
         logging.error(f"Hot topics analysis timed out after {settings.hot_topics_timeout} seconds")
         # Return fallback response with keyword-based analysis
-        return await get_fallback_hot_topics(db, days, max_topics, total_papers_analyzed)
+        return await get_fallback_hot_topics(db, days, max_topics, total_papers_analyzed, baseline_days)
     except Exception as e:
         logging.error(f"Failed to generate hot topics summary: {e}")
+        db.rollback()
         
         # Return fallback response with keyword-based analysis
-        return await get_fallback_hot_topics(db, days, max_topics, total_papers_analyzed)
+        return await get_fallback_hot_topics(db, days, max_topics, total_papers_analyzed, baseline_days)
 
 async def get_fallback_hot_topics(
     db: Session, 
     days: int, 
     max_topics: int, 
-    total_papers_analyzed: int
+    total_papers_analyzed: int,
+    baseline_days: Optional[int] = None
 ) -> schemas.HotTopicsResponse:
-    """Fallback hot topics analysis using keyword frequency"""
-    logging.info("Using fallback keyword-based hot topics analysis...")
+    """Fallback hot topics analysis using distinctive terms (TF-IDF), or keyword frequency.
+
+    The TF-IDF baseline covers the baseline_days before the analysis period,
+    widened to whole weeks (settings.tfidf_baseline_weeks if not given).
+    """
+    from .tfidf import get_distinctive_terms
+
+    logging.info("Using fallback TF-IDF hot topics analysis...")
     
     cutoff_date = get_time_ago(days=days)
+    now = get_utc_now()
     
-    # Get trending keywords for the period
-    trending_keywords = (
-        db.query(
-            models.Keyword.name,
-            func.count(models.PaperKeyword.paper_id).label('paper_count')
-        )
-        .join(models.PaperKeyword, models.Keyword.id == models.PaperKeyword.keyword_id)
-        .join(models.Paper, models.PaperKeyword.paper_id == models.Paper.id)
-        .filter(models.Paper.published_at >= cutoff_date)
-        .group_by(models.Keyword.name)
-        .having(func.count(models.PaperKeyword.paper_id) >= settings.hot_topics_min_papers)
-        .order_by(func.count(models.PaperKeyword.paper_id).desc())
-        .limit(max_topics)
-        .all()
+    # 直近の期間でベースラインより特徴的な語句をローカルで抽出（AI呼び出しなし）
+    baseline_weeks = -(-baseline_days // 7) if baseline_days else None
+    distinctive_terms = get_distinctive_terms(
+        db, cutoff_date, now, limit=max_topics, baseline_weeks=baseline_weeks, min_doc_freq=settings.hot_topics_min_papers
     )
+    if distinctive_terms:
+        max_score = distinctive_terms[0].score
+        trending_topics = [
+            (term.term, term.doc_freq, max(10, round(100 * term.score / max_score)))
+            for term in distinctive_terms
+        ]
+    else:
+        # Get trending keywords for the period
+        trending_keywords = get_top_keyword_counts(db, cutoff_date, limit=max_topics, min_count=settings.hot_topics_min_papers)
+        # Calculate trend score based on ranking
+        trending_topics = [
+            (keyword_name, paper_count, max(10, 100 - i * 10))
+            for i, (keyword_name, paper_count) in enumerate(trending_keywords)
+        ]
     
     hot_topics_response = []
     
-    for i, (keyword_name, paper_count) in enumerate(trending_keywords):
-        # Get recent papers for this keyword
+    for topic, paper_count, trend_score in trending_topics:
+        # Get recent papers mentioning this topic
+        pattern = f"%{topic}%"
         recent_papers_query = (
             db.query(models.Paper)
-            .join(models.PaperKeyword, models.Paper.id == models.PaperKeyword.paper_id)
-            .join(models.Keyword, models.PaperKeyword.keyword_id == models.Keyword.id)
             .filter(
-                models.Keyword.name == keyword_name,
-                models.Paper.published_at >= cutoff_date
+                models.Paper.published_at >= cutoff_date,
+                models.Paper.title.ilike(pattern) | models.Paper.summary.ilike(pattern)
             )
             .order_by(models.Paper.published_at.desc())
             .limit(5)
@@ -1189,15 +1407,12 @@ async def get_fallback_hot_topics(
             )
             recent_papers_response.append(paper_response)
         
-        # Calculate trend score based on ranking
-        trend_score = max(10, 100 - i * 10)
-        
         hot_topic = schemas.HotTopic(
-            topic=keyword_name,
+            topic=topic,
             paper_count=paper_count,
             recent_papers=recent_papers_response,
-            summary=f"Research area focusing on {keyword_name} with {paper_count} recent papers",
-            keywords=[keyword_name],
+            summary=f"Research area focusing on {topic} with {paper_count} recent papers",
+            keywords=[topic],
             trend_score=trend_score
         )
         hot_topics_response.append(hot_topic)
@@ -1225,26 +1440,85 @@ def create_keywords_hash(keywords: list[str]) -> str:
     keywords_str = "|".join(sorted_keywords)
     return hashlib.sha256(keywords_str.encode()).hexdigest()
 
+def create_prompt_hash(system_prompt: Optional[str]) -> str:
+    """Create hash of a custom system prompt for caching ('' when none)"""
+    if not system_prompt:
+        return ''
+    return hashlib.sha256(system_prompt.encode()).hexdigest()
+
+def get_topic_analysis_period() -> tuple[datetime, datetime]:
+    """Cache bucket of the last-7-days topic analyses: [today 00:00 UTC - 7 days, today 00:00 UTC]"""
+    period_end = get_utc_now().replace(hour=0, minute=0, second=0, microsecond=0)
+    return period_end - timedelta(days=7), period_end
+
+# AI分析結果を保存するキャッシュテーブル（ensure_ai_cache_tablesで古いスキーマを作り直し、prune_ai_cachesで古い行を消す）
+AI_CACHE_MODELS = (models.WeeklyTrendCache, models.TopicKeywordsCache, models.TopicSummaryCache, models.HotTopicsCache)
+
+def ensure_ai_cache_tables(db: Session) -> bool:
+    """Recreate topic cache tables created before their cache-key columns existed.
+
+    Nothing wrote to these tables before the columns were added, so the old
+    tables hold no results and are replaced instead of altered. Returns True
+    if a table was recreated.
+    """
+    bind = db.get_bind()
+    recreated = False
+    for model in (models.TopicKeywordsCache, models.TopicSummaryCache):
+        table = model.__table__
+        existing = {column['name'] for column in inspect(bind).get_columns(table.name)}
+        if existing >= set(table.columns.keys()):
+            continue
+        table.drop(db.connection())
+        table.create(db.connection())
+        recreated = True
+    if recreated:
+        db.commit()
+        logging.info("Recreated topic cache tables with their cache-key columns.")
+    return recreated
+
+def prune_ai_caches(db: Session, retention_days: Optional[int] = None) -> int:
+    """Delete cached AI results older than retention_days (default: settings.ai_cache_retention_days)"""
+    if retention_days is None:
+        retention_days = settings.ai_cache_retention_days
+    threshold = get_time_ago(days=retention_days)
+    deleted = 0
+    for model in AI_CACHE_MODELS:
+        deleted += db.query(model).filter(model.created_at < threshold).delete(synchronize_session=False)
+    db.commit()
+    if deleted:
+        logging.info(f"Pruned {deleted} cached AI results older than {retention_days} days.")
+    return deleted
+
 # New Weekly Trend Analysis Functions with Cache
 async def get_latest_weekly_trend_overview(
     db: Session, 
     language: str = "auto"
 ) -> schemas.WeeklyTrendResponse | None:
-    """Get latest cached weekly trend overview"""
+    """Get latest cached weekly trend overview
+
+    With settings.ai_serve_stale an overview of an earlier week is served too,
+    and this week's overview is regenerated in the background.
+    """
     week_start, week_end = get_current_week_period()
     
-    cached_result = (
-        db.query(models.WeeklyTrendCache)
-        .filter(
+    cached_query = db.query(models.WeeklyTrendCache).filter(models.WeeklyTrendCache.language == language)
+    if not settings.ai_serve_stale:
+        cached_query = cached_query.filter(
             models.WeeklyTrendCache.analysis_period_start == week_start,
-            models.WeeklyTrendCache.analysis_period_end == week_end,
-            models.WeeklyTrendCache.language == language
+            models.WeeklyTrendCache.analysis_period_end == week_end
         )
-        .order_by(models.WeeklyTrendCache.created_at.desc())
-        .first()
-    )
+    cached_result = cached_query.order_by(models.WeeklyTrendCache.created_at.desc()).first()
     
     if cached_result:
+        cache_age_seconds, revalidating = revalidator.serve(
+            f"weekly_trend:{language}",
+            cached_result.created_at,
+            cached_result.analysis_period_start == week_start,
+            db.get_bind(),
+            lambda session: get_weekly_trend_overview(session, language, force_regenerate=True)
+        )
+        # 分析した週の論文を返す（古い週の結果を返す場合も含む）
+        week_start, week_end = cached_result.analysis_period_start, cached_result.analysis_period_end
         start_date = week_start.strftime("%Y-%m-%d")
         end_date = week_end.strftime("%Y-%m-%d")
         
@@ -1259,28 +1533,19 @@ async def get_latest_weekly_trend_overview(
             .order_by(models.Paper.published_at.desc())
             .limit(100)  # Same limit as AI analysis
         )
-        recent_papers = recent_papers_query.all()
+        recent_papers = load_paper_records(db, recent_papers_query)
         
         # Convert papers to PaperResponse format
-        paper_responses = []
-        for paper in recent_papers:
-            paper_responses.append(schemas.PaperResponse(
-                id=paper.id,
-                title=paper.title,
-                authors=paper.authors,
-                summary=paper.summary,
-                published_at=paper.published_at,
-                arxiv_id=paper.arxiv_id,
-                arxiv_url=f"https://arxiv.org/abs/{paper.arxiv_id}",
-                keywords=[pk.keyword.name for pk in paper.keywords] if paper.keywords else []
-            ))
+        paper_responses = [to_paper_response(record) for record in recent_papers]
         
         return schemas.WeeklyTrendResponse(
             trend_overview=cached_result.trend_overview,
             analysis_period=f"{start_date} to {end_date}",
             total_papers_analyzed=cached_result.total_papers_analyzed,
             generated_at=cached_result.created_at,
-            papers=paper_responses
+            papers=paper_responses,
+            cache_age_seconds=cache_age_seconds,
+            revalidating=revalidating
         )
     
     return None
@@ -1318,10 +1583,10 @@ async def get_weekly_trend_overview(
         .limit(100)  # Limit for AI processing
     )
     
-    recent_papers = recent_papers_query.all()
+    papers_data = load_paper_records(db, recent_papers_query)
     total_papers_analyzed = recent_papers_query.count()
     
-    if not recent_papers:
+    if not papers_data:
         return schemas.WeeklyTrendResponse(
             trend_overview="No papers found for the past week.",
             analysis_period=f"{start_date} to {end_date}",
@@ -1329,27 +1594,6 @@ async def get_weekly_trend_overview(
             generated_at=get_utc_now()
         )
     
-    # Convert papers to analysis format
-    papers_data = []
-    for paper in recent_papers:
-        paper_keywords = (
-            db.query(models.Keyword.name)
-            .join(models.PaperKeyword, models.Keyword.id == models.PaperKeyword.keyword_id)
-            .filter(models.PaperKeyword.paper_id == paper.id)
-            .all()
-        )
-        
-        paper_data = {
-            'id': paper.id,
-            'title': paper.title,
-            'authors': paper.authors,
-            'published_at': paper.published_at.isoformat(),
-            'summary': paper.summary,
-            'keywords': [kw.name for kw in paper_keywords],
-            'arxiv_id': paper.arxiv_id
-        }
-        papers_data.append(paper_data)
-    
     try:
         # Get AI service and generate overview with timeout
         ai_service = get_ai_service()
@@ -1370,18 +1614,7 @@ async def get_weekly_trend_overview(
         db.commit()
         
         # Convert papers to PaperResponse format
-        paper_responses = []
-        for paper in recent_papers:
-            paper_responses.append(schemas.PaperResponse(
-                id=paper.id,
-                title=paper.title,
-                authors=paper.authors,
-                summary=paper.summary,
-                published_at=paper.published_at,
-                arxiv_id=paper.arxiv_id,
-                arxiv_url=f"https://arxiv.org/abs/{paper.arxiv_id}",
-                keywords=[pk.keyword.name for pk in paper.keywords] if paper.keywords else []
-            ))
+        paper_responses = [to_paper_response(record) for record in papers_data]
         
         response = schemas.WeeklyTrendResponse(
             trend_overview=trend_overview,
@@ -1401,18 +1634,7 @@ async def get_weekly_trend_overview(
         fallback_overview = f"This week ({start_date} to {end_date}) saw {total_papers_analyzed} new research papers across various domains including machine learning, AI applications, and emerging technologies. The research landscape continues to evolve with contributions spanning theoretical advances and practical applications."
         
         # Convert papers to PaperResponse format for fallback
-        paper_responses = []
-        for paper in recent_papers:
-            paper_responses.append(schemas.PaperResponse(
-                id=paper.id,
-                title=paper.title,
-                authors=paper.authors,
-                summary=paper.summary,
-                published_at=paper.published_at,
-                arxiv_id=paper.arxiv_id,
-                arxiv_url=f"https://arxiv.org/abs/{paper.arxiv_id}",
-                keywords=[pk.keyword.name for pk in paper.keywords] if paper.keywords else []
-            ))
+        paper_responses = [to_paper_response(record) for record in papers_data]
         
         return schemas.WeeklyTrendResponse(
             trend_overview=fallback_overview,
@@ -1429,7 +1651,12 @@ async def get_topic_keywords(
     system_prompt: Optional[str] = None,
     force_regenerate: bool = False
 ) -> schemas.TopicKeywordsResponse:
-    """Extract topic keywords from recent papers"""
+    """Extract topic keywords from recent papers
+
+    Results are cached per day, language, max_keywords and system prompt.
+    With settings.ai_serve_stale an earlier day's result is served while it is
+    refreshed in the background.
+    """
     start_time = time.time()
     logging.info(f"Extracting topic keywords (max: {max_keywords}) in {language}...")
     
@@ -1438,6 +1665,42 @@ async def get_topic_keywords(
     start_date = cutoff_date.strftime("%Y-%m-%d")
     end_date = get_utc_now().strftime("%Y-%m-%d")
     
+    # Check cache first (unless force regenerate is requested)
+    period_start, period_end = get_topic_analysis_period()
+    prompt_hash = create_prompt_hash(system_prompt)
+    if not force_regenerate:
+        cached_query = db.query(models.TopicKeywordsCache).filter(
+            models.TopicKeywordsCache.language == language,
+            models.TopicKeywordsCache.max_keywords == max_keywords,
+            models.TopicKeywordsCache.prompt_hash == prompt_hash
+        )
+        if not settings.ai_serve_stale:
+            cached_query = cached_query.filter(
+                models.TopicKeywordsCache.analysis_period_start == period_start,
+                models.TopicKeywordsCache.analysis_period_end == period_end
+            )
+        cached_result = cached_query.order_by(models.TopicKeywordsCache.created_at.desc()).first()
+        if cached_result:
+            logging.info(f"Returning cached topic keywords from {cached_result.created_at}")
+            cache_age_seconds, revalidating = revalidator.serve(
+                f"topic_keywords:{language}:{max_keywords}:{prompt_hash}",
+                cached_result.created_at,
+                cached_result.analysis_period_start == period_start,
+                db.get_bind(),
+                lambda session: get_topic_keywords(session, language, max_keywords, system_prompt, force_regenerate=True)
+            )
+            cached_start, cached_end = cached_result.analysis_period_start, cached_result.analysis_period_end
+            return schemas.TopicKeywordsResponse(
+                keywords=cached_result.keywords_data,
+                analysis_period=f"{cached_start.strftime('%Y-%m-%d')} to {cached_end.strftime('%Y-%m-%d')}",
+                total_papers_analyzed=cached_result.total_papers_analyzed,
+                generated_at=cached_result.created_at,
+                cache_age_seconds=cache_age_seconds,
+                revalidating=revalidating
+            )
+    else:
+        logging.info("Force regeneration requested - skipping cache")
+    
     recent_papers_query = (
         db.query(models.Paper)
         .filter(models.Paper.published_at >= cutoff_date)
@@ -1445,10 +1708,10 @@ async def get_topic_keywords(
         .limit(200)  # More papers for keyword extraction
     )
     
-    recent_papers = recent_papers_query.all()
+    papers_data = load_paper_records(db, recent_papers_query)
     total_papers_analyzed = recent_papers_query.count()
     
-    if not recent_papers:
+    if not papers_data:
         return schemas.TopicKeywordsResponse(
             keywords=[],
             analysis_period=f"{start_date} to {end_date}",
@@ -1456,27 +1719,6 @@ async def get_topic_keywords(
             generated_at=get_utc_now()
         )
     
-    # Convert papers to analysis format
-    papers_data = []
-    for paper in recent_papers:
-        paper_keywords = (
-            db.query(models.Keyword.name)
-            .join(models.PaperKeyword, models.Keyword.id == models.PaperKeyword.keyword_id)
-            .filter(models.PaperKeyword.paper_id == paper.id)
-            .all()
-        )
-        
-        paper_data = {
-            'id': paper.id,
-            'title': paper.title,
-            'authors': paper.authors,
-            'published_at': paper.published_at.isoformat(),
-            'summary': paper.summary,
-            'keywords': [kw.name for kw in paper_keywords],
-            'arxiv_id': paper.arxiv_id
-        }
-        papers_data.append(paper_data)
-    
     try:
         # Get AI service and extract keywords with timeout
         ai_service = get_ai_service()
@@ -1495,6 +1737,19 @@ async def get_topic_keywords(
             )
             keywords_response.append(keyword_response)
         
+        # Cache the result
+        cache_entry = models.TopicKeywordsCache(
+            analysis_period_start=period_start,
+            analysis_period_end=period_end,
+            language=language,
+            max_keywords=max_keywords,
+            prompt_hash=prompt_hash,
+            keywords_data=[keyword.model_dump() for keyword in keywords_response],
+            total_papers_analyzed=total_papers_analyzed
+        )
+        db.add(cache_entry)
+        db.commit()
+        
         response = schemas.TopicKeywordsResponse(
             keywords=keywords_response,
             analysis_period=f"{start_date} to {end_date}",
@@ -1507,6 +1762,7 @@ async def get_topic_keywords(
         
     except Exception as e:
         logging.error(f"Failed to extract topic keywords: {e}")
+        db.rollback()
         
         # Fallback: use database keywords frequency
         return await get_fallback_topic_keywords(db, cutoff_date, max_keywords, total_papers_analyzed)
@@ -1517,27 +1773,35 @@ async def get_fallback_topic_keywords(
     max_keywords: int,
     total_papers_analyzed: int
 ) -> schemas.TopicKeywordsResponse:
-    """Fallback topic keywords using database frequency analysis"""
-    logging.info("Using fallback keyword frequency analysis...")
+    """Fallback topic keywords using distinctive terms (TF-IDF), or database keyword frequency"""
+    from .tfidf import get_distinctive_terms
+
+    logging.info("Using fallback TF-IDF topic keyword analysis...")
     
     start_date = cutoff_date.strftime("%Y-%m-%d")
     end_date = get_utc_now().strftime("%Y-%m-%d")
     
-    # Get trending keywords for the period
-    trending_keywords = (
-        db.query(
-            models.Keyword.name,
-            func.count(models.PaperKeyword.paper_id).label('paper_count')
+    # 直近の期間でベースラインより特徴的な語句をローカルで抽出（AI呼び出しなし）
+    distinctive_terms = get_distinctive_terms(db, cutoff_date, get_utc_now(), limit=max_keywords)
+    if distinctive_terms:
+        max_score = distinctive_terms[0].score
+        keywords_response = [
+            schemas.TopicKeyword(
+                keyword=term.term,
+                paper_count=term.doc_freq,
+                relevance_score=round(100.0 * term.score / max_score, 2)
+            )
+            for term in distinctive_terms
+        ]
+        return schemas.TopicKeywordsResponse(
+            keywords=keywords_response,
+            analysis_period=f"{start_date} to {end_date}",
+            total_papers_analyzed=total_papers_analyzed,
+            generated_at=get_utc_now()
         )
-        .join(models.PaperKeyword, models.Keyword.id == models.PaperKeyword.keyword_id)
-        .join(models.Paper, models.PaperKeyword.paper_id == models.Paper.id)
-        .filter(models.Paper.published_at >= cutoff_date)
-        .group_by(models.Keyword.name)
-        .having(func.count(models.PaperKeyword.paper_id) >= 1)
-        .order_by(func.count(models.PaperKeyword.paper_id).desc())
-        .limit(max_keywords)
-        .all()
-    )
+    
+    # Get trending keywords for the period
+    trending_keywords = get_top_keyword_counts(db, cutoff_date, limit=max_keywords)
     
     keywords_response = []
     for i, (keyword_name, paper_count) in enumerate(trending_keywords):
@@ -1565,7 +1829,12 @@ async def get_topic_summary(
     system_prompt: Optional[str] = None,
     force_regenerate: bool = False
 ) -> schemas.TopicSummaryResponse:
-    """Generate summary for selected topic keywords"""
+    """Generate summary for selected topic keywords
+
+    Results are cached per keyword set, language, day and system prompt. With
+    settings.ai_serve_stale an earlier day's summary is served while it is
+    refreshed in the background.
+    """
     start_time = time.time()
     logging.info(f"Generating topic summary for keywords: {keywords} in {language}...")
     
@@ -1579,6 +1848,29 @@ async def get_topic_summary(
             generated_at=get_utc_now()
         )
     
+    # Check cache first (unless force regenerate is requested)
+    period_start, period_end = get_topic_analysis_period()
+    keywords_hash = create_keywords_hash(keywords)
+    prompt_hash = create_prompt_hash(system_prompt)
+    cached_result = None
+    if not force_regenerate:
+        cached_query = db.query(models.TopicSummaryCache).filter(
+            models.TopicSummaryCache.keywords_hash == keywords_hash,
+            models.TopicSummaryCache.language == language,
+            models.TopicSummaryCache.prompt_hash == prompt_hash
+        )
+        if not settings.ai_serve_stale:
+            cached_query = cached_query.filter(
+                models.TopicSummaryCache.analysis_period_start == period_start,
+                models.TopicSummaryCache.analysis_period_end == period_end
+            )
+        cached_result = cached_query.order_by(models.TopicSummaryCache.created_at.desc()).first()
+        if cached_result:
+            # 大文字小文字や順番が違っても同じキーワード集合なので、分析時のキーワードで論文を探す
+            keywords = cached_result.keywords
+    else:
+        logging.info("Force regeneration requested - skipping cache")
+    
     # Get recent papers related to the selected keywords
     cutoff_date = get_time_ago(days=7)
     
@@ -1596,10 +1888,34 @@ async def get_topic_summary(
         .limit(settings.get_topic_analysis_limit())
     )
     
-    related_papers = related_papers_query.all()
+    if cached_result:
+        logging.info(f"Returning cached topic summary from {cached_result.created_at}")
+        requested_keywords = keywords
+        cache_age_seconds, revalidating = revalidator.serve(
+            f"topic_summary:{keywords_hash}:{language}:{prompt_hash}",
+            cached_result.created_at,
+            cached_result.analysis_period_start == period_start,
+            db.get_bind(),
+            lambda session: get_topic_summary(session, requested_keywords, language, system_prompt, force_regenerate=True)
+        )
+        # 表示用の論文だけを読み込む
+        display_papers = load_paper_records(db, related_papers_query.limit(settings.ui_papers_display_limit))
+        return schemas.TopicSummaryResponse(
+            topic_name=cached_result.topic_name,
+            summary=cached_result.summary,
+            keywords=keywords,
+            related_paper_count=cached_result.related_paper_count,
+            key_findings=cached_result.key_findings,
+            generated_at=cached_result.created_at,
+            papers=[to_paper_response(record) for record in display_papers],
+            cache_age_seconds=cache_age_seconds,
+            revalidating=revalidating
+        )
+    
+    papers_data = load_paper_records(db, related_papers_query)
     related_paper_count = related_papers_query.count()
     
-    if not related_papers:
+    if not papers_data:
         topic_name = " & ".join(keywords) if len(keywords) > 1 else keywords[0]
         return schemas.TopicSummaryResponse(
             topic_name=topic_name,
@@ -1610,27 +1926,6 @@ async def get_topic_summary(
             generated_at=get_utc_now()
         )
     
-    # Convert papers to analysis format
-    papers_data = []
-    for paper in related_papers:
-        paper_keywords = (
-            db.query(models.Keyword.name)
-            .join(models.PaperKeyword, models.Keyword.id == models.PaperKeyword.keyword_id)
-            .filter(models.PaperKeyword.paper_id == paper.id)
-            .all()
-        )
-        
-        paper_data = {
-            'id': paper.id,
-            'title': paper.title,
-            'authors': paper.authors,
-            'published_at': paper.published_at.isoformat(),
-            'summary': paper.summary,
-            'keywords': [kw.name for kw in paper_keywords],
-            'arxiv_id': paper.arxiv_id
-        }
-        papers_data.append(paper_data)
-    
     try:
         # Get AI service and generate topic summary with timeout
         ai_service = get_ai_service()
@@ -1640,26 +1935,9 @@ async def get_topic_summary(
         )
         
         # Convert papers to response format
-        paper_responses = []
-        for paper in related_papers[:settings.ui_papers_display_limit]:  # Configurable UI papers limit
-            # Get keywords for this paper
-            paper_keywords = (
-                db.query(models.Keyword.name)
-                .join(models.PaperKeyword, models.Keyword.id == models.PaperKeyword.keyword_id)
-                .filter(models.PaperKeyword.paper_id == paper.id)
-                .all()
-            )
-            
-            paper_responses.append(schemas.PaperResponse(
-                id=paper.id,
-                arxiv_id=paper.arxiv_id,
-                title=paper.title,
-                summary=paper.summary,
-                published_at=paper.published_at,
-                authors=paper.authors,
-                arxiv_url=f"https://arxiv.org/abs/{paper.arxiv_id}",
-                keywords=[kw.name for kw in paper_keywords]
-            ))
+        paper_responses = [
+            to_paper_response(record) for record in papers_data[:settings.ui_papers_display_limit]  # Configurable UI papers limit
+        ]
 
         response = schemas.TopicSummaryResponse(
             topic_name=summary_ai.get('topic_name', ' & '.join(keywords)),
@@ -1671,6 +1949,21 @@ async def get_topic_summary(
             papers=paper_responses
         )
         
+        # Cache the result
+        db.add(models.TopicSummaryCache(
+            keywords_hash=keywords_hash,
+            prompt_hash=prompt_hash,
+            language=language,
+            analysis_period_start=period_start,
+            analysis_period_end=period_end,
+            topic_name=response.topic_name,
+            summary=response.summary,
+            keywords=keywords,
+            related_paper_count=related_paper_count,
+            key_findings=response.key_findings
+        ))
+        db.commit()
+        
         logging.info(f"Generated topic summary for {len(keywords)} keywords in {time.time() - start_time:.2f} seconds.")
         return response
         
@@ -1682,26 +1975,9 @@ async def get_topic_summary(
         fallback_summary = f"Research in {topic_name} shows active development with {related_paper_count} related papers in the past week. This area encompasses various methodologies and applications in current academic research."
         
         # Convert papers to response format for fallback
-        paper_responses = []
-        for paper in related_papers[:settings.ui_papers_display_limit]:  # Configurable UI papers limit
-            # Get keywords for this paper
-            paper_keywords = (
-                db.query(models.Keyword.name)
-                .join(models.PaperKeyword, models.Keyword.id == models.PaperKeyword.keyword_id)
-                .filter(models.PaperKeyword.paper_id == paper.id)
-                .all()
-            )
-            
-            paper_responses.append(schemas.PaperResponse(
-                id=paper.id,
-                arxiv_id=paper.arxiv_id,
-                title=paper.title,
-                summary=paper.summary,
-                published_at=paper.published_at,
-                authors=paper.authors,
-                arxiv_url=f"https://arxiv.org/abs/{paper.arxiv_id}",
-                keywords=[kw.name for kw in paper_keywords]
-            ))
+        paper_responses = [
+            to_paper_response(record) for record in papers_data[:settings.ui_papers_display_limit]  # Configurable UI papers limit
+        ]
 
         return schemas.TopicSummaryResponse(
             topic_name=topic_name,
@@ -1722,81 +1998,68 @@ async def fetch_papers_from_arxiv(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None
 ) -> schemas.PaperFetchResponse:
-    """Fetch papers from arXiv using the existing script"""
-    start_time = time.time()
-    logging.info(f"Starting paper fetch from arXiv...")
+    """Start a background ingest job for papers from arXiv and return its job id"""
+    from .ingest_jobs import IngestJobConflict, ingest_jobs
     
+    start_time = time.time()
     try:
-        # Get script path
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        backend_dir = os.path.dirname(current_dir)
-        script_path = os.path.join(backend_dir, 'scripts', 'fetch_papers.py')
-        
-        # Get papers count before fetch
-        papers_before = db.query(models.Paper).count()
-        
-        # Build command
-        cmd = ['python', script_path]
-        
         if start_date:
-            cmd.extend(['--start-date', start_date])
+            start_dt = datetime.strptime(start_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        else:
+            start_dt = get_utc_now() - timedelta(days=settings.fetch_default_days)
         if end_date:
-            cmd.extend(['--end-date', end_date])
-        
-        # Execute script in background
-        logging.info(f"Executing: {' '.join(cmd)}")
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            cwd=backend_dir,
-            timeout=settings.script_execution_timeout  # Configurable script timeout
-        )
-        
-        if result.returncode != 0:
-            error_msg = f"Paper fetch script failed with return code {result.returncode}: {result.stderr}"
-            logging.error(error_msg)
-            return schemas.PaperFetchResponse(
-                status="error",
-                message=error_msg,
-                total_fetched=0,
-                processing_time=time.time() - start_time
-            )
-        
-        # Get papers count after fetch
-        papers_after = db.query(models.Paper).count()
-        total_fetched = papers_after - papers_before
-        
-        processing_time = time.time() - start_time
-        
-        success_msg = f"Successfully fetched {total_fetched} new papers in {processing_time:.2f} seconds"
-        logging.info(success_msg)
-        
-        return schemas.PaperFetchResponse(
-            status="success",
-            message=success_msg,
-            total_fetched=total_fetched,
-            processing_time=processing_time
-        )
-        
-    except subprocess.TimeoutExpired:
-        error_msg = "Paper fetch operation timed out after 1 hour"
-        logging.error(error_msg)
+            end_dt = datetime.strptime(end_date, "%Y-%m-%d").replace(hour=23, minute=59, second=59, tzinfo=timezone.utc)
+        else:
+            end_dt = get_utc_now()
+    except ValueError:
         return schemas.PaperFetchResponse(
             status="error",
-            message=error_msg,
+            message="Invalid date format. Use YYYY-MM-DD.",
             total_fetched=0,
             processing_time=time.time() - start_time
         )
-    except Exception as e:
-        error_msg = f"Failed to fetch papers: {str(e)}"
-        logging.error(error_msg)
+    
+    try:
+        job_id = ingest_jobs.start(start_dt, end_dt)
+    except IngestJobConflict as e:
         return schemas.PaperFetchResponse(
-            status="error",
-            message=error_msg,
+            status="running",
+            message=f"Paper fetch job {e.job_id} is already running",
             total_fetched=0,
-            processing_time=time.time() - start_time
+            processing_time=time.time() - start_time,
+            job_id=e.job_id
         )
+    
+    return schemas.PaperFetchResponse(
+        status="started",
+        message=f"Started paper fetch job {job_id}",
+        total_fetched=0,
+        processing_time=time.time() - start_time,
+        job_id=job_id
+    )
+
+def get_ingest_progress(db: Session, run_id: Optional[int] = None) -> Optional[schemas.IngestProgress]:
+    """取り込み処理の進捗を取得（run_id未指定の場合は最新の実行）"""
+    query = db.query(models.IngestRun)
+    if run_id is not None:
+        ingest_run = query.filter(models.IngestRun.id == run_id).first()
+    else:
+        ingest_run = query.order_by(models.IngestRun.id.desc()).first()
+    if not ingest_run:
+        return None
+    
+    return schemas.IngestProgress(
+        run_id=ingest_run.id,
+        status=ingest_run.status,
+        current_window=ingest_run.current_window,
+        pages_fetched=ingest_run.pages_fetched,
+        papers_fetched=ingest_run.papers_fetched,
+        papers_added=ingest_run.papers_added,
+        error_message=ingest_run.error_message,
+        started_at=ingest_run.started_at,
+        updated_at=ingest_run.updated_at,
+        finished_at=ingest_run.finished_at
+    )
 
 # Trend Summary Functions
 async def create_trend_summary(
@@ -1823,10 +2086,10 @@ async def create_trend_summary(
             .limit(request.paper_count)
         )
         
-        papers = papers_query.all()
-        actual_paper_count = len(papers)
+        papers_data = load_paper_records(db, papers_query)
+        actual_paper_count = len(papers_data)
         
-        if not papers:
+        if not papers_data:
             return schemas.TrendSummaryResponse(
                 id=0,
                 title=request.title,
@@ -1840,27 +2103,6 @@ async def create_trend_summary(
                 created_at=get_utc_now()
             )
         
-        # Convert papers to analysis format
-        papers_data = []
-        for paper in papers:
-            paper_keywords = (
-                db.query(models.Keyword.name)
-                .join(models.PaperKeyword, models.Keyword.id == models.PaperKeyword.keyword_id)
-                .filter(models.PaperKeyword.paper_id == paper.id)
-                .all()
-            )
-            
-            paper_data = {
-                'id': paper.id,
-                'title': paper.title,
-                'authors': paper.authors,
-                'published_at': paper.published_at.isoformat(),
-                'summary': paper.summary,
-                'keywords': [kw.name for kw in paper_keywords],
-                'arxiv_id': paper.arxiv_id
-            }
-            papers_data.append(paper_data)
-        
         # Get AI service with custom provider and model if specified
         if request.ai_provider and request.ai_model:
             from .ai_service import AIServiceFactory
@@ -1952,22 +2194,7 @@ async def create_trend_summary(
         cleaned_summary = cleaned_summary.strip()
         
         # Calculate top keywords from the papers
-        keyword_counts = {}
-        for paper in papers:
-            paper_keywords = (
-                db.query(models.Keyword.name)
-                .join(models.PaperKeyword, models.Keyword.id == models.PaperKeyword.keyword_id)
-                .filter(models.PaperKeyword.paper_id == paper.id)
-                .all()
-            )
-            for kw in paper_keywords:
-                keyword_counts[kw.name] = keyword_counts.get(kw.name, 0) + 1
-        
-        # Get top 10 keywords
-        top_keywords = [
-            {"keyword": kw, "count": count}
-            for kw, count in sorted(keyword_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-        ]
+        top_keywords = get_top_keywords_for_papers(db, [paper['id'] for paper in papers_data])
         
         # Generate key insights based on analysis - combine AI insights with data insights
         key_insights = []
@@ -1990,25 +2217,7 @@ async def create_trend_summary(
         key_insights = key_insights[:5]
         
         # Convert papers to response format for paper references
-        paper_responses = []
-        for i, paper in enumerate(papers):  # Use all papers from analysis
-            paper_keywords = (
-                db.query(models.Keyword.name)
-                .join(models.PaperKeyword, models.Keyword.id == models.PaperKeyword.keyword_id)
-                .filter(models.PaperKeyword.paper_id == paper.id)
-                .all()
-            )
-            
-            paper_responses.append(schemas.PaperResponse(
-                id=paper.id,
-                title=paper.title,
-                authors=paper.authors,
-                summary=paper.summary,
-                published_at=paper.published_at,
-                arxiv_id=paper.arxiv_id,
-                arxiv_url=f"https://arxiv.org/abs/{paper.arxiv_id}",
-                keywords=[kw.name for kw in paper_keywords]
-            ))
+        paper_responses = [to_paper_response(record) for record in papers_data]
 
         # Create database entry
         trend_summary = models.TrendSummary(
@@ -2023,6 +2232,9 @@ async def create_trend_summary(
         )
         
         db.add(trend_summary)
+        db.flush()
+        # 分析した論文をその順番のまま保存（一覧・詳細は範囲クエリを再実行せずこれを読む）
+        save_trend_summary_papers(db, trend_summary.id, [paper['id'] for paper in papers_data])
         db.commit()
         db.refresh(trend_summary)
         
@@ -2060,12 +2272,73 @@ async def create_trend_summary(
             created_at=get_utc_now()
         )
 
+def save_trend_summary_papers(db: Session, summary_id: int, paper_ids: list[int]) -> None:
+    """トレンド要約が分析した論文を分析時の順番で保存（コミットは呼び出し側で行う）"""
+    if paper_ids:
+        db.execute(insert(models.TrendSummaryPaper), [
+            {'trend_summary_id': summary_id, 'position': position, 'paper_id': paper_id}
+            for position, paper_id in enumerate(paper_ids)
+        ])
+
+def ensure_trend_summary_papers(db: Session) -> int:
+    """分析論文が保存されていない既存のトレンド要約に、当時と同じ範囲クエリで論文を補完（アップグレード後の初回起動時）"""
+    has_papers = select(models.TrendSummaryPaper.trend_summary_id).where(
+        models.TrendSummaryPaper.trend_summary_id == models.TrendSummary.id
+    ).exists()
+    summaries = db.query(models.TrendSummary).filter(~has_papers).all()
+    for summary in summaries:
+        paper_ids = [
+            paper_id for paper_id, in db.query(models.Paper.id)
+            .filter(
+                models.Paper.published_at >= summary.period_start,
+                models.Paper.published_at <= summary.period_end
+            )
+            .order_by(models.Paper.published_at.desc())
+            .limit(summary.paper_count)
+        ]
+        save_trend_summary_papers(db, summary.id, paper_ids)
+    if summaries:
+        db.commit()
+        logging.info(f"Stored analyzed papers for {len(summaries)} existing trend summaries.")
+    return len(summaries)
+
+def load_trend_summary_papers(db: Session, summary_id: int, skip: int = 0, limit: Optional[int] = None) -> list[schemas.PaperResponse]:
+    """トレンド要約の分析論文を分析時の順番で取得（trend_summary_papersの主キー範囲とpapersの主キーで引く）"""
+    link = models.TrendSummaryPaper
+    papers_query = (
+        db.query(models.Paper)
+        .join(link, link.paper_id == models.Paper.id)
+        .filter(link.trend_summary_id == summary_id, link.position >= skip)
+        .order_by(link.position)
+    )
+    if limit is not None:
+        papers_query = papers_query.filter(link.position < skip + limit)
+    return [to_paper_response(record) for record in load_paper_records(db, papers_query)]
+
+def to_trend_summary_response(
+    summary: models.TrendSummary,
+    papers: Optional[list[schemas.PaperResponse]] = None
+) -> schemas.TrendSummaryResponse:
+    return schemas.TrendSummaryResponse(
+        id=summary.id,
+        title=summary.title,
+        period_start=summary.period_start,
+        period_end=summary.period_end,
+        paper_count=summary.paper_count,
+        summary=summary.summary,
+        key_insights=summary.key_insights,
+        top_keywords=summary.top_keywords,
+        language=summary.language,
+        created_at=summary.created_at,
+        papers=papers
+    )
+
 def get_trend_summaries(
     db: Session,
     skip: int = 0,
     limit: int = 20
 ) -> schemas.TrendSummaryListResponse:
-    """Get list of trend summaries"""
+    """Get list of trend summaries (without papers; see get_trend_summary_papers)"""
     
     # Get total count
     total_count = db.query(models.TrendSummary).count()
@@ -2079,59 +2352,8 @@ def get_trend_summaries(
         .all()
     )
     
-    # Convert to response format
-    summary_responses = []
-    for summary in summaries:
-        # Fetch papers from the same period to include in response
-        papers = (
-            db.query(models.Paper)
-            .filter(
-                models.Paper.published_at >= summary.period_start,
-                models.Paper.published_at <= summary.period_end
-            )
-            .order_by(models.Paper.published_at.desc())
-            .limit(summary.paper_count)  # Use the original paper count limit
-            .all()
-        )
-        
-        # Convert papers to response format
-        paper_responses = []
-        for paper in papers:  # Use all papers from query
-            paper_keywords = (
-                db.query(models.Keyword.name)
-                .join(models.PaperKeyword, models.Keyword.id == models.PaperKeyword.keyword_id)
-                .filter(models.PaperKeyword.paper_id == paper.id)
-                .all()
-            )
-            
-            paper_responses.append(schemas.PaperResponse(
-                id=paper.id,
-                title=paper.title,
-                authors=paper.authors,
-                summary=paper.summary,
-                published_at=paper.published_at,
-                arxiv_id=paper.arxiv_id,
-                arxiv_url=f"https://arxiv.org/abs/{paper.arxiv_id}",
-                keywords=[kw.name for kw in paper_keywords]
-            ))
-        
-        summary_response = schemas.TrendSummaryResponse(
-            id=summary.id,
-            title=summary.title,
-            period_start=summary.period_start,
-            period_end=summary.period_end,
-            paper_count=summary.paper_count,
-            summary=summary.summary,
-            key_insights=summary.key_insights,
-            top_keywords=summary.top_keywords,
-            language=summary.language,
-            created_at=summary.created_at,
-            papers=paper_responses  # Include papers
-        )
-        summary_responses.append(summary_response)
-    
     return schemas.TrendSummaryListResponse(
-        summaries=summary_responses,
+        summaries=[to_trend_summary_response(summary) for summary in summaries],
         total_count=total_count
     )
 
@@ -2139,58 +2361,34 @@ def get_trend_summary_by_id(
     db: Session,
     summary_id: int
 ) -> Optional[schemas.TrendSummaryResponse]:
-    """Get a specific trend summary by ID"""
+    """Get a specific trend summary by ID with the papers it analyzed"""
     
-    summary = db.query(models.TrendSummary).filter(models.TrendSummary.id == summary_id).first()
+    summary = db.get(models.TrendSummary, summary_id)
     
     if not summary:
         return None
     
-    # Get papers from the same period for reference
-    papers = (
-        db.query(models.Paper)
-        .filter(
-            models.Paper.published_at >= summary.period_start,
-            models.Paper.published_at <= summary.period_end
-        )
-        .order_by(models.Paper.published_at.desc())
-        .limit(settings.get_trend_summary_limit())  # Configurable paper limit
-        .all()
-    )
-    
-    # Convert papers to response format
-    paper_responses = []
-    for paper in papers:
-        paper_keywords = (
-            db.query(models.Keyword.name)
-            .join(models.PaperKeyword, models.Keyword.id == models.PaperKeyword.keyword_id)
-            .filter(models.PaperKeyword.paper_id == paper.id)
-            .all()
-        )
-        
-        paper_responses.append(schemas.PaperResponse(
-            id=paper.id,
-            title=paper.title,
-            authors=paper.authors,
-            summary=paper.summary,
-            published_at=paper.published_at,
-            arxiv_id=paper.arxiv_id,
-            arxiv_url=f"https://arxiv.org/abs/{paper.arxiv_id}",
-            keywords=[kw.name for kw in paper_keywords]
-        ))
+    return to_trend_summary_response(summary, load_trend_summary_papers(db, summary_id))
+
+def get_trend_summary_papers(
+    db: Session,
+    summary_id: int,
+    skip: int = 0,
+    limit: int = 100
+) -> Optional[schemas.TrendSummaryPapersResponse]:
+    """Get a page of the papers a trend summary analyzed"""
+    if db.get(models.TrendSummary, summary_id) is None:
+        return None
     
-    return schemas.TrendSummaryResponse(
-        id=summary.id,
-        title=summary.title,
-        period_start=summary.period_start,
-        period_end=summary.period_end,
-        paper_count=summary.paper_count,
-        summary=summary.summary,
-        key_insights=summary.key_insights,
-        top_keywords=summary.top_keywords,
-        language=summary.language,
-        created_at=summary.created_at,
-        papers=paper_responses  # Include papers for reference
+    total_count = (
+        db.query(func.count())
+        .select_from(models.TrendSummaryPaper)
+        .filter(models.TrendSummaryPaper.trend_summary_id == summary_id)
+        .scalar()
+    )
+    return schemas.TrendSummaryPapersResponse(
+        papers=load_trend_summary_papers(db, summary_id, skip, limit),
+        total_count=total_count
     )
 
 def get_latest_trend_summary(db: Session, language: str = None) -> schemas.TrendSummaryResponse | None:
@@ -2216,6 +2414,7 @@ def delete_trend_summary(db: Session, summary_id: int) -> bool:
         return False
     
     try:
+        db.query(models.TrendSummaryPaper).filter(models.TrendSummaryPaper.trend_summary_id == summary_id).delete()
         db.delete(summary)
         db.commit()
         logging.info(f"Deleted trend summary with ID {summary_id}")
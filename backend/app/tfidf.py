@@ -0,0 +1,280 @@
+"""
+Distinctive terms per period: sparse TF-IDF over titles and abstracts,
+aggregated from stored per-week document-frequency vectors
+
+The vectors of the weeks that received new papers are rebuilt by the ingest
+paths (harvest_papers after each month, save_papers_to_db after each batch);
+refresh_week_vectors (scripts/maintain_keywords.py --rebuild-term-vectors)
+builds the missing and stale ones for the whole corpus and drops unused
+terms; existing databases get every vector built once by the
+tfidf_week_vectors data migration of init_db. Reads only aggregate the
+stored vectors. Weeks are the Tuesday-based weeks of the keyword trends
+(keyword_rollup.week_start_of).
+
+Week vectors keep every term, including those in a single paper: pruning
+rare terms per week would undercount the baseline of a term that occurs
+once in each baseline week and give it a false lift. The minimum document
+frequency is applied to the summed target weeks instead.
+"""
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from . import models
+from .candidate_keywords import extract_ngrams
+from .config import settings
+from .database import insert_or_ignore
+from .keyword_rollup import week_start_of
+
+logger = logging.getLogger(__name__)
+
+WEEK = timedelta(days=7)
+SQL_TERM_CHUNK_SIZE = 500
+INT32 = np.dtype('<i4')
+
+
+@dataclass
+class DistinctiveTerm:
+    term: str
+    doc_freq: int  # Papers in the target weeks containing the term
+    baseline_doc_freq: int  # Papers in the baseline weeks containing the term
+    score: float
+
+
+def week_start(dt: datetime | date) -> datetime:
+    """00:00 UTC of the first day (Tuesday) of the week containing dt, as in the keyword trends"""
+    if isinstance(dt, datetime):
+        dt = week_start_of(dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc))
+    return datetime(dt.year, dt.month, dt.day, tzinfo=timezone.utc)
+
+
+def extract_terms(text: str) -> set[str]:
+    """Words and phrases counted by the TF-IDF engine (the candidate keyword n-grams plus single words)"""
+    return extract_ngrams(text, min_n=1)
+
+
+def _resolve_term_ids(db: Session, terms: list[str]) -> dict[str, int]:
+    ids: dict[str, int] = {}
+    for i in range(0, len(terms), SQL_TERM_CHUNK_SIZE):
+        chunk = terms[i:i + SQL_TERM_CHUNK_SIZE]
+        ids.update(db.query(models.TfidfTerm.term, models.TfidfTerm.id).filter(models.TfidfTerm.term.in_(chunk)))
+    missing = [term for term in terms if term not in ids]
+    for i in range(0, len(missing), SQL_TERM_CHUNK_SIZE):
+        chunk = missing[i:i + SQL_TERM_CHUNK_SIZE]
+        db.execute(insert_or_ignore(db, models.TfidfTerm, ['term']).values([{'term': term} for term in chunk]))
+        ids.update(db.query(models.TfidfTerm.term, models.TfidfTerm.id).filter(models.TfidfTerm.term.in_(chunk)))
+    return ids
+
+
+def build_week_vector(db: Session, week: datetime) -> models.WeeklyTermVector:
+    """Count in how many of the week's papers each term occurs and store all counts (the caller commits)"""
+    paper_count = 0
+    max_paper_id = None
+    doc_freqs: Counter = Counter()
+    rows = db.query(models.Paper.id, models.Paper.title, models.Paper.summary).filter(
+        models.Paper.published_at >= week,
+        models.Paper.published_at < week + WEEK
+    )
+    for paper_id, title, summary in rows:
+        paper_count += 1
+        max_paper_id = max(paper_id, max_paper_id or 0)
+        doc_freqs.update(extract_terms(f"{title}. {summary}"))
+
+    term_ids = _resolve_term_ids(db, list(doc_freqs))
+    ids = np.fromiter((term_ids[term] for term in doc_freqs), dtype=INT32, count=len(doc_freqs))
+    counts = np.fromiter(doc_freqs.values(), dtype=INT32, count=len(doc_freqs))
+    order = np.argsort(ids)
+
+    vector = db.query(models.WeeklyTermVector).filter(models.WeeklyTermVector.week_start == week).one_or_none()
+    if vector is None:
+        vector = models.WeeklyTermVector(week_start=week)
+        db.add(vector)
+    vector.paper_count = paper_count
+    vector.max_paper_id = max_paper_id
+    vector.term_ids = ids[order].tobytes()
+    vector.doc_freqs = counts[order].tobytes()
+    return vector
+
+
+def update_week_vectors(db: Session, weeks: Iterable[datetime | date]) -> int:
+    """Rebuild the vectors of weeks that received new papers (the caller commits); returns the number rebuilt"""
+    weeks = sorted({week_start(week) for week in weeks})
+    for week in weeks:
+        build_week_vector(db, week)
+    if weeks:
+        db.flush()
+        logger.info(f"Rebuilt {len(weeks)} weekly term vectors.")
+    return len(weeks)
+
+
+def refresh_week_vectors(db: Session, rebuild_all: bool = False) -> int:
+    """Build the missing or stale vectors of every week, drop the others and the unused terms.
+
+    The paper count and largest paper id of each week are read in one pass
+    over the papers and compared with the stored vectors, so only weeks
+    whose papers changed are scanned for terms (all weeks with rebuild_all).
+    Commits; returns the number of vectors rebuilt.
+    """
+    started = time.time()
+    stats: dict[datetime, list[int]] = {}
+    for paper_id, published_at in db.query(models.Paper.id, models.Paper.published_at).yield_per(10_000):
+        week_stats = stats.setdefault(week_start(published_at), [0, 0])
+        week_stats[0] += 1
+        week_stats[1] = max(week_stats[1], paper_id)
+
+    stored = {
+        vector.week_start: (vector.id, vector.paper_count, vector.max_paper_id)
+        for vector in db.query(
+            models.WeeklyTermVector.id, models.WeeklyTermVector.week_start,
+            models.WeeklyTermVector.paper_count, models.WeeklyTermVector.max_paper_id
+        )
+    }
+    # 論文のない週や、火曜始まりでない（以前の月曜始まりの）週のベクトルを削除
+    obsolete_ids = [vector_id for week, (vector_id, _, _) in stored.items() if week not in stats]
+    for i in range(0, len(obsolete_ids), SQL_TERM_CHUNK_SIZE):
+        db.query(models.WeeklyTermVector).filter(
+            models.WeeklyTermVector.id.in_(obsolete_ids[i:i + SQL_TERM_CHUNK_SIZE])
+        ).delete(synchronize_session=False)
+
+    stale_weeks = [
+        week for week, (paper_count, max_paper_id) in stats.items()
+        if rebuild_all or stored.get(week, (None, None, None))[1:] != (paper_count, max_paper_id)
+    ]
+    for week in sorted(stale_weeks):
+        build_week_vector(db, week)
+        db.commit()
+    pruned = prune_unused_terms(db)
+    db.commit()
+
+    logger.info(
+        f"Refreshed weekly term vectors in {time.time() - started:.2f} seconds: {len(stale_weeks)} rebuilt, "
+        f"{len(obsolete_ids)} removed, {pruned} unused terms pruned."
+    )
+    return len(stale_weeks)
+
+
+def rebuild_week_vectors(db: Session) -> int:
+    """Rebuild the vectors of every week (data migration run once by init_db); commits"""
+    return refresh_week_vectors(db, rebuild_all=True)
+
+
+def prune_unused_terms(db: Session) -> int:
+    """Delete the terms no stored week vector refers to (the caller commits)"""
+    used = [np.frombuffer(term_ids, dtype=INT32) for term_ids, in db.query(models.WeeklyTermVector.term_ids)]
+    used_ids = set(np.unique(np.concatenate(used)).tolist()) if used else set()
+    unused_ids = [term_id for term_id, in db.query(models.TfidfTerm.id) if term_id not in used_ids]
+    for i in range(0, len(unused_ids), SQL_TERM_CHUNK_SIZE):
+        db.query(models.TfidfTerm).filter(
+            models.TfidfTerm.id.in_(unused_ids[i:i + SQL_TERM_CHUNK_SIZE])
+        ).delete(synchronize_session=False)
+    return len(unused_ids)
+
+
+def get_week_vectors(db: Session, weeks: list[datetime]) -> dict[datetime, models.WeeklyTermVector]:
+    """Return the stored vectors of weeks; weeks without a vector are left out"""
+    return {
+        vector.week_start: vector
+        for vector in db.query(models.WeeklyTermVector).filter(models.WeeklyTermVector.week_start.in_(weeks))
+    }
+
+
+def _aggregate(vectors: list[models.WeeklyTermVector], size: int) -> tuple[int, np.ndarray]:
+    """Sum week vectors into a dense document-frequency array indexed by term id"""
+    paper_count = sum(vector.paper_count for vector in vectors)
+    if not vectors:
+        return 0, np.zeros(size)
+    ids = np.concatenate([np.frombuffer(vector.term_ids, dtype=INT32) for vector in vectors])
+    counts = np.concatenate([np.frombuffer(vector.doc_freqs, dtype=INT32) for vector in vectors])
+    return paper_count, np.bincount(ids, weights=counts, minlength=size)
+
+
+def _overlaps(term: str, other: str) -> bool:
+    """True if one term is a word-aligned part of the other"""
+    return f" {term} " in f" {other} " or f" {other} " in f" {term} "
+
+
+def get_distinctive_terms(
+    db: Session,
+    start_date: datetime,
+    end_date: datetime,
+    limit: int = 30,
+    baseline_weeks: Optional[int] = None,
+    min_doc_freq: Optional[int] = None
+) -> list[DistinctiveTerm]:
+    """Terms most over-represented in the weeks of [start_date, end_date] relative to the weeks before.
+
+    The target window is widened to whole (Tuesday-based) weeks, and only
+    the stored week vectors are read; weeks without one count as empty. A term scores
+    tf * idf * log(lift), where tf is the share of target papers containing
+    it, idf is computed over target and baseline papers together, and lift
+    is the smoothed ratio of its target and baseline shares. Terms that are
+    part of a better-scored term (or contain one) are skipped.
+    """
+    started = time.time()
+    baseline_weeks = settings.tfidf_baseline_weeks if baseline_weeks is None else baseline_weeks
+    min_doc_freq = settings.tfidf_min_doc_freq if min_doc_freq is None else min_doc_freq
+    first_week, last_week = week_start(start_date), week_start(end_date)
+    target_weeks = [first_week + WEEK * i for i in range((last_week - first_week) // WEEK + 1)]
+    baseline = [first_week - WEEK * i for i in range(baseline_weeks, 0, -1)]
+
+    vectors_by_week = get_week_vectors(db, baseline + target_weeks)
+    # ベクトルのない週（論文がない、または未構築）は0件として扱う
+    baseline_vectors = [vectors_by_week[week] for week in baseline if week in vectors_by_week]
+    target_vectors = [vectors_by_week[week] for week in target_weeks if week in vectors_by_week]
+    vectors = baseline_vectors + target_vectors
+    size = 1 + max(
+        (int(np.frombuffer(vector.term_ids, dtype=INT32)[-1]) for vector in vectors if vector.term_ids),
+        default=0
+    )
+    target_papers, target_df = _aggregate(target_vectors, size)
+    baseline_papers, baseline_df = _aggregate(baseline_vectors, size)
+    if not target_papers:
+        return []
+
+    candidates = np.flatnonzero(target_df >= max(min_doc_freq, 1))
+    df_t, df_b = target_df[candidates], baseline_df[candidates]
+    tf = df_t / target_papers
+    idf = np.log((target_papers + baseline_papers + 1) / (df_t + df_b + 1)) + 1
+    lift = ((df_t + 1) / (target_papers + 1)) / ((df_b + 1) / (baseline_papers + 1))
+    scores = tf * idf * np.log(lift)
+    over = scores > 0
+    candidates, scores, df_t, df_b = candidates[over], scores[over], df_t[over], df_b[over]
+
+    # 重複するフレーズを除いても足りるよう多めに候補を取る
+    top = np.argsort(-scores, kind='stable')[:limit * 5]
+    names = dict(
+        db.query(models.TfidfTerm.id, models.TfidfTerm.term)
+        .filter(models.TfidfTerm.id.in_([int(candidates[i]) for i in top]))
+        .all()
+    )
+    # 同点なら長いフレーズを優先する
+    ranked = sorted(
+        top,
+        key=lambda i: (-round(float(scores[i]), 9), -len(names.get(int(candidates[i]), '').split()))
+    )
+
+    selected: list[DistinctiveTerm] = []
+    for i in ranked:
+        term = names.get(int(candidates[i]))
+        if term is None or any(_overlaps(term, chosen.term) for chosen in selected):
+            continue
+        selected.append(DistinctiveTerm(
+            term=term,
+            doc_freq=int(df_t[i]),
+            baseline_doc_freq=int(df_b[i]),
+            score=float(scores[i])
+        ))
+        if len(selected) >= limit:
+            break
+
+    logger.info(
+        f"Scored {len(candidates)} terms over {len(target_weeks)} target and {len(baseline)} baseline weeks "
+        f"in {time.time() - started:.3f} seconds."
+    )
+    return selected
@@ -0,0 +1,117 @@
+"""
+Benchmark: keyword aggregations from SQL (weekly rollup) vs the in-memory columnar engine
+
+Usage:
+    python benchmarks/benchmark_analytics.py --papers 1700000 --keywords 20000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+# backendディレクトリをsys.pathに追加
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from app import models, services
+from app.analytics import keyword_analytics
+from app.config import settings
+from app.database import Base
+from app.keyword_rollup import link_values, rebuild_weekly_counts
+
+BATCH_SIZE = 100_000
+
+
+def populate(db, paper_count: int, keyword_count: int) -> int:
+    """Papers spread over the last three years with three keywords each; returns the link count"""
+    rng = random.Random(0)
+    now = services.get_utc_now().replace(microsecond=0)
+    db.execute(insert(models.Keyword), [{'name': f"Keyword {i}"} for i in range(keyword_count)])
+    for batch_start in range(0, paper_count, BATCH_SIZE):
+        ids = range(batch_start + 1, min(batch_start + BATCH_SIZE, paper_count) + 1)
+        published = {i: now - timedelta(seconds=rng.randrange(3 * 365 * 24 * 3600)) for i in ids}
+        db.execute(insert(models.Paper), [
+            {'id': i, 'arxiv_id': f"bench.{i}", 'title': "", 'authors': [], 'summary': "", 'published_at': published[i]}
+            for i in ids
+        ])
+        db.execute(insert(models.PaperKeyword), [
+            link_values(i, keyword_id, published[i])
+            for i in ids
+            for keyword_id in {min(int(rng.paretovariate(1.2)), keyword_count) for _ in range(3)}
+        ])
+    rebuild_weekly_counts(db)
+    db.commit()
+    return db.query(models.PaperKeyword).count()
+
+
+def run(label: str, fn, repeat: int = 5) -> None:
+    timings = []
+    for _ in range(repeat):
+        services.cache.clear()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    print(f"{label:<30}: {min(timings) * 1000:10.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the columnar analytics engine.")
+    parser.add_argument("--papers", type=int, default=1_700_000, help="Number of synthetic papers")
+    parser.add_argument("--keywords", type=int, default=20000, help="Number of keywords")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine, autoflush=False)()
+        try:
+            links = populate(db, args.papers, args.keywords)
+            start = time.perf_counter()
+            keyword_analytics.refresh(db)
+            print(f"{'engine load':<30}: {(time.perf_counter() - start) * 1000:10.1f} ms ({links} links)")
+
+            trend_keywords = [f"Keyword {i}" for i in range(1, 51)]
+            now = services.get_utc_now()
+            recent = now - timedelta(weeks=settings.recent_analysis_weeks)
+            previous = now - timedelta(weeks=settings.comparison_weeks)
+            run("engine: growth ranking", lambda: keyword_analytics.growth_ranking(db, recent, previous, 10))
+            run("engine: top 100, 16 weeks", lambda: keyword_analytics.top_keywords(db, previous, limit=100))
+            for days in (7, 380, 1100):
+                run(f"engine: {days}-day window counts",
+                    lambda: keyword_analytics.refresh(db).keyword_counts(now - timedelta(days=days + 20), now - timedelta(days=20)))
+            run("engine: 50 weekly series", lambda: keyword_analytics.weekly_counts(db, list(range(2, 52))))
+
+            for engine_enabled in (False, True):
+                settings.analytics_engine = engine_enabled
+                mode = "engine" if engine_enabled else "SQL"
+                run(f"trending keywords ({mode})", lambda: services.get_trending_keywords_data(db))
+                run(f"trending 30d vs 2y ({mode})", lambda: services.get_trending_keywords_data(db, 30, 730))
+                run(f"word cloud ({mode})", lambda: services.get_word_cloud_data(db))
+                run(f"trends, 50 kw, 1 year ({mode})",
+                    lambda: services.get_trends_data(db, trend_keywords, now - timedelta(days=365), now))
+                run(f"trends, 50 kw, all ({mode})", lambda: services.get_trends_data(db, trend_keywords, None, None))
+
+            # 新しい論文の取り込み後の差分読み込み
+            db.execute(insert(models.Paper), [
+                {'id': args.papers + 1 + i, 'arxiv_id': f"new.{i}", 'title': "", 'authors': [], 'summary': "", 'published_at': now}
+                for i in range(1000)
+            ])
+            db.execute(insert(models.PaperKeyword), [link_values(args.papers + 1 + i, 1, now) for i in range(1000)])
+            db.commit()
+            start = time.perf_counter()
+            keyword_analytics.refresh(db)
+            print(f"{'engine append (1000 papers)':<30}: {(time.perf_counter() - start) * 1000:10.1f} ms")
+        finally:
+            db.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: candidate phrase counting, full Counter vs bounded Space-Saving summary
+
+Usage:
+    python benchmarks/benchmark_candidate_keywords.py --papers 20000 --capacity 5000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+# backendディレクトリをsys.pathに追加
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from app.candidate_keywords import SpaceSaving, extract_ngrams
+from benchmark_keyword_extraction import generate_abstracts
+
+
+def iter_abstracts(count: int, batch_size: int = 1000):
+    """Generate abstracts lazily so only the counter itself stays in memory.
+
+    A unique token per abstract keeps the phrase vocabulary growing, as it
+    does over a real corpus.
+    """
+    for batch_start in range(0, count, batch_size):
+        batch = generate_abstracts(min(batch_size, count - batch_start), seed=batch_start)
+        for i, abstract in enumerate(batch, start=batch_start):
+            yield f"{abstract} novel method{i} variant{i % 9973}"
+
+
+def count(abstracts, counter):
+    for abstract in abstracts:
+        for ngram in extract_ngrams(abstract):
+            counter.add(ngram)
+    return counter
+
+
+def run(label: str, papers: int, make_counter) -> None:
+    start = time.perf_counter()
+    counter = count(iter_abstracts(papers), make_counter())
+    elapsed = time.perf_counter() - start
+    del counter
+
+    # メモリは別パスで計測する（tracemallocは実行を遅くするため）
+    tracemalloc.start()
+    counter = count(iter_abstracts(papers), make_counter())
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<22}: {elapsed:8.2f} s ({papers / elapsed:8.0f} papers/s, {retained / 2**20:8.1f} MiB retained, {counter.size} phrases kept)")
+
+
+class FullCounter(Counter):
+    """Reference: exact counts for every phrase ever seen"""
+
+    def add(self, ngram: str) -> None:
+        self[ngram] += 1
+
+    @property
+    def size(self) -> int:
+        return len(self)
+
+
+class BoundedSummary(SpaceSaving):
+    @property
+    def size(self) -> int:
+        return len(self.counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streaming candidate phrase counting.")
+    parser.add_argument("--papers", type=int, default=20000, help="Number of synthetic abstracts")
+    parser.add_argument("--capacity", type=int, default=5000, help="Space-Saving counters")
+    args = parser.parse_args()
+
+    run("full Counter", args.papers, FullCounter)
+    run(f"Space-Saving ({args.capacity})", args.papers, lambda: BoundedSummary(args.capacity))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark: paper ingestion, legacy per-row ORM path vs bulk multi-row inserts
+
+Usage:
+    python benchmarks/benchmark_ingest.py --papers 20000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import timezone
+
+from dateutil import parser as dateutil_parser
+from feedparser import FeedParserDict
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# backendディレクトリをsys.pathに追加
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from app.database import Base
+from app.ingest import BulkIngestor
+from app.models import Keyword, Paper, PaperKeyword
+from app.services import extract_technical_terms_batch
+from benchmark_keyword_extraction import generate_abstracts
+
+
+def generate_entries(count: int) -> list[FeedParserDict]:
+    """Generate feedparser-like entries with realistic abstracts"""
+    return [
+        FeedParserDict(
+            id=f"http://arxiv.org/abs/2401.{i:05d}v1",
+            title=f"Paper {i}",
+            summary=abstract,
+            published=f"2024-01-{i % 28 + 1:02d}T00:00:00Z",
+            authors=[FeedParserDict(name="Alice"), FeedParserDict(name="Bob")],
+            tags=[FeedParserDict(term="cs.CL"), FeedParserDict(term="cs.LG")],
+        )
+        for i, abstract in enumerate(generate_abstracts(count))
+    ]
+
+
+def legacy_save(db, papers) -> None:
+    """Reference copy of the previous per-row save_papers_to_db loop"""
+    keyword_lists = extract_technical_terms_batch(entry.title + " " + entry.summary for entry in papers)
+    for entry, extracted_keywords in zip(papers, keyword_lists):
+        arxiv_id = entry.id.split('/')[-1]
+        if db.query(Paper).filter(Paper.arxiv_id == arxiv_id).first():
+            continue
+        new_paper = Paper(
+            arxiv_id=arxiv_id,
+            title=entry.title,
+            authors=[author.name for author in entry.authors],
+            summary=entry.summary,
+            published_at=dateutil_parser.parse(entry.published).astimezone(timezone.utc)
+        )
+        db.add(new_paper)
+        db.flush()
+        for kw_name in extracted_keywords:
+            keyword_obj = db.query(Keyword).filter(Keyword.name == kw_name).first()
+            if not keyword_obj:
+                keyword_obj = Keyword(name=kw_name)
+                db.add(keyword_obj)
+                db.flush()
+            db.add(PaperKeyword(paper_id=new_paper.id, keyword_id=keyword_obj.id))
+    db.commit()
+
+
+def run(label: str, papers, save) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        try:
+            start = time.perf_counter()
+            save(db, papers)
+            elapsed = time.perf_counter() - start
+            paper_count = db.query(Paper).count()
+        finally:
+            db.close()
+            engine.dispose()
+    print(f"{label:<22}: {elapsed:8.2f} s ({paper_count / elapsed * 60:10.0f} papers/min, {paper_count} papers)")
+    return elapsed
+
+
+def bulk_save(db, papers) -> None:
+    BulkIngestor(db).ingest(papers)
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark paper ingestion.")
+    parser.add_argument("--papers", type=int, default=20000, help="Number of synthetic feed entries")
+    args = parser.parse_args()
+
+    papers = generate_entries(args.papers)
+    legacy_time = run("legacy per-row ORM", papers, legacy_save)
+    bulk_time = run("bulk multi-row insert", papers, bulk_save)
+    print(f"{'speedup':<22}: {legacy_time / bulk_time:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
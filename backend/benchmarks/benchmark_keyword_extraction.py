@@ -0,0 +1,87 @@
+"""
+Benchmark: dictionary keyword extraction, legacy per-term scan vs compiled matcher
+
+Usage:
+    python benchmarks/benchmark_keyword_extraction.py --papers 100000
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+# backendディレクトリをsys.pathに追加
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from app.services import (
+    ACRONYM_EXCLUDES,
+    SPECIALIZED_TECH_DICTIONARY,
+    extract_technical_terms_batch,
+)
+
+FILLER_WORDS = (
+    "we propose a novel approach that improves the performance of existing methods on several "
+    "benchmark datasets and our experiments show consistent gains over strong baselines while "
+    "reducing computational cost across tasks such as classification retrieval and generation "
+    "the results suggest that careful design of the training objective and data pipeline matters"
+).split()
+
+
+def legacy_extract(text: str) -> list[str]:
+    """Reference copy of the previous per-call implementation"""
+    if not text:
+        return []
+    keywords = set()
+    text_lower = text.lower()
+    sorted_terms = sorted(dict(SPECIALIZED_TECH_DICTIONARY).items(), key=lambda x: len(x[0]), reverse=True)
+    for term_lower, term_proper in sorted_terms:
+        if term_lower in text_lower:
+            keywords.add(term_proper)
+            text_lower = text_lower.replace(term_lower, ' ')
+    for acronym in re.findall(r'\b[A-Z]{2,5}\b', text):
+        if acronym not in ACRONYM_EXCLUDES:
+            keywords.add(acronym)
+    return list(keywords)
+
+
+def generate_abstracts(count: int, seed: int = 42) -> list[str]:
+    """Generate abstract-sized texts that mention a few dictionary terms each"""
+    rng = random.Random(seed)
+    terms = list(SPECIALIZED_TECH_DICTIONARY)
+    abstracts = []
+    for _ in range(count):
+        words = [rng.choice(FILLER_WORDS) for _ in range(rng.randint(120, 220))]
+        for _ in range(rng.randint(2, 8)):
+            words.insert(rng.randrange(len(words)), rng.choice(terms))
+        abstracts.append(" ".join(words).capitalize())
+    return abstracts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark technical term extraction.")
+    parser.add_argument("--papers", type=int, default=100000, help="Number of synthetic abstracts")
+    args = parser.parse_args()
+
+    abstracts = generate_abstracts(args.papers)
+    print(f"Generated {len(abstracts)} abstracts (avg {sum(map(len, abstracts)) / len(abstracts):.0f} chars)")
+
+    start = time.perf_counter()
+    legacy_results = [legacy_extract(text) for text in abstracts]
+    legacy_time = time.perf_counter() - start
+    print(f"legacy per-term scan : {legacy_time:8.2f} s ({legacy_time / len(abstracts) * 1e6:7.1f} us/abstract)")
+
+    start = time.perf_counter()
+    results = extract_technical_terms_batch(abstracts)
+    matcher_time = time.perf_counter() - start
+    print(f"compiled matcher     : {matcher_time:8.2f} s ({matcher_time / len(abstracts) * 1e6:7.1f} us/abstract)")
+
+    mismatches = sum(1 for old, new in zip(legacy_results, results) if set(old) != set(new))
+    print(f"speedup              : {legacy_time / matcher_time:8.2f}x")
+    print(f"mismatched abstracts : {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
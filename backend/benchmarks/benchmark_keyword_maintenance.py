@@ -0,0 +1,129 @@
+"""
+Benchmark: keyword cleanup and case-duplicate merging, legacy per-row ORM loop vs set-based SQL
+
+Usage:
+    python benchmarks/benchmark_keyword_maintenance.py --keywords 20000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+# backendディレクトリをsys.pathに追加
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from app import models, services
+from app.database import Base
+from app.keyword_rollup import link_values
+from app.services import PREFERRED_KEYWORD_NAMES, cleanup_low_quality_keywords, is_high_quality_keyword
+
+
+def legacy_cleanup(db) -> int:
+    """Reference copy of the previous cleanup_low_quality_keywords + merge_case_duplicates"""
+    removed_count = 0
+    for keyword in db.query(models.Keyword).all():
+        if not is_high_quality_keyword(keyword.name):
+            db.query(models.PaperKeyword).filter(models.PaperKeyword.keyword_id == keyword.id).delete()
+            db.delete(keyword)
+            removed_count += 1
+    db.commit()
+
+    keyword_groups = {}
+    for kw in db.query(models.Keyword).all():
+        keyword_groups.setdefault(kw.name.lower(), []).append(kw)
+
+    merged_count = 0
+    for normalized_name, keywords in keyword_groups.items():
+        if len(keywords) <= 1:
+            continue
+        preferred_name = PREFERRED_KEYWORD_NAMES.get(normalized_name) or max(
+            keywords, key=lambda k: (k.name[0].isupper(), len(k.name), sum(1 for c in k.name if c.isupper()))
+        ).name
+        preferred_keyword = next((kw for kw in keywords if kw.name == preferred_name), None)
+        if not preferred_keyword:
+            preferred_keyword = keywords[0]
+            preferred_keyword.name = preferred_name
+        for kw in keywords:
+            if kw.id == preferred_keyword.id:
+                continue
+            for assoc in db.query(models.PaperKeyword).filter(models.PaperKeyword.keyword_id == kw.id).all():
+                existing = db.query(models.PaperKeyword).filter(
+                    models.PaperKeyword.paper_id == assoc.paper_id,
+                    models.PaperKeyword.keyword_id == preferred_keyword.id
+                ).first()
+                if not existing:
+                    assoc.keyword_id = preferred_keyword.id
+                else:
+                    db.delete(assoc)
+            db.flush()
+            db.delete(kw)
+            merged_count += 1
+    db.commit()
+    return removed_count + merged_count
+
+
+def populate(db, keyword_count: int, paper_count: int, seed: int = 42) -> None:
+    """10% low quality keywords, 5% lowercase duplicates, ~3 papers per keyword"""
+    rng = random.Random(seed)
+    published_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    db.execute(insert(models.Paper), [
+        {'arxiv_id': f"bench.{i}", 'title': f"Paper {i}", 'authors': [], 'summary': "", 'published_at': published_at}
+        for i in range(paper_count)
+    ])
+    names = []
+    for i in range(keyword_count):
+        roll = rng.random()
+        if roll < 0.10:
+            names.append(f"Widget {i}")
+        elif roll < 0.15 and names:
+            names.append(names[rng.randrange(len(names))].lower())
+        else:
+            names.append(f"Topic {i} Learning")
+    names = list(dict.fromkeys(names))
+    db.execute(insert(models.Keyword), [{'name': name} for name in names])
+    links = {(rng.randrange(paper_count) + 1, keyword_id) for keyword_id in range(1, len(names) + 1) for _ in range(3)}
+    db.execute(insert(models.PaperKeyword), [link_values(p, k, published_at) for p, k in links])
+    db.commit()
+
+
+def run(label: str, keyword_count: int, paper_count: int, cleanup) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine, autoflush=False)()
+        try:
+            populate(db, keyword_count, paper_count)
+            start = time.perf_counter()
+            changed = cleanup(db)
+            elapsed = time.perf_counter() - start
+            remaining = db.query(models.Keyword).count()
+            links = db.query(models.PaperKeyword).count()
+        finally:
+            db.close()
+            engine.dispose()
+    print(f"{label:<18}: {elapsed:8.2f} s ({changed} removed/merged, {remaining} keywords and {links} links left)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark keyword cleanup.")
+    parser.add_argument("--keywords", type=int, default=20000, help="Number of synthetic keywords")
+    parser.add_argument("--papers", type=int, default=20000, help="Number of synthetic papers")
+    args = parser.parse_args()
+
+    services.logging.disable(services.logging.INFO)
+    legacy_time = run("legacy per-row ORM", args.keywords, args.papers, legacy_cleanup)
+    set_based_time = run("set-based SQL", args.keywords, args.papers, cleanup_low_quality_keywords)
+    print(f"{'speedup':<18}: {legacy_time / set_based_time:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark: paper-keyword association rebuild, legacy per-pair loop vs compiled matcher with bulk insert
+
+Usage:
+    python benchmarks/benchmark_keyword_rebuild.py --papers 5000 --keywords 5000 --workers 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+# backendディレクトリをsys.pathに追加
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from app import models
+from app.database import Base
+from app.keyword_rebuild import rebuild_associations, resolve_worker_count
+from app.services import SPECIALIZED_TECH_DICTIONARY
+from benchmark_keyword_extraction import generate_abstracts
+
+
+def legacy_rebuild(db, limit: int) -> int:
+    """Reference copy of the previous rebuild_paper_keyword_associations"""
+    keywords = {kw.name: kw.id for kw in db.query(models.Keyword).all()}
+    recent_papers = db.query(models.Paper).order_by(models.Paper.published_at.desc()).limit(limit).all()
+    associations_added = 0
+    for paper in recent_papers:
+        paper_text = f"{paper.title} {paper.summary}".lower()
+        for keyword_name, keyword_id in keywords.items():
+            if keyword_name.lower() in paper_text:
+                existing = db.query(models.PaperKeyword).filter(
+                    models.PaperKeyword.paper_id == paper.id,
+                    models.PaperKeyword.keyword_id == keyword_id
+                ).first()
+                if not existing:
+                    db.add(models.PaperKeyword(paper_id=paper.id, keyword_id=keyword_id))
+                    associations_added += 1
+    db.commit()
+    return associations_added
+
+
+def populate(db, paper_count: int, keyword_count: int) -> None:
+    """Dictionary terms plus synthetic multi-word names, so the vocabulary has keyword_count entries"""
+    published_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    db.execute(insert(models.Paper), [
+        {'arxiv_id': f"bench.{i}", 'title': f"Paper {i}", 'authors': [], 'summary': abstract, 'published_at': published_at}
+        for i, abstract in enumerate(generate_abstracts(paper_count))
+    ])
+    names = list(SPECIALIZED_TECH_DICTIONARY.values())[:keyword_count]
+    names += [f"Synthetic Term {i} Learning" for i in range(keyword_count - len(names))]
+    db.execute(insert(models.Keyword), [{'name': name} for name in names])
+    db.commit()
+
+
+def run(label: str, paper_count: int, keyword_count: int, rebuild) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine, autoflush=False)()
+        try:
+            populate(db, paper_count, keyword_count)
+            start = time.perf_counter()
+            added = rebuild(db)
+            elapsed = time.perf_counter() - start
+        finally:
+            db.close()
+            engine.dispose()
+    print(f"{label:<22}: {elapsed:8.2f} s ({added} associations, {paper_count / elapsed:10.0f} papers/s)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark paper-keyword association rebuilds.")
+    parser.add_argument("--papers", type=int, default=5000, help="Number of synthetic papers")
+    parser.add_argument("--keywords", type=int, default=5000, help="Number of keywords")
+    parser.add_argument("--workers", type=int, default=0, help="Processes for the parallel run (0 = CPU count)")
+    args = parser.parse_args()
+    workers = resolve_worker_count(args.workers)
+
+    legacy_time = run("legacy per-pair loop", args.papers, args.keywords, lambda db: legacy_rebuild(db, args.papers))
+    single_time = run("matcher, 1 process", args.papers, args.keywords, lambda db: rebuild_associations(db, limit=args.papers))
+    pool_time = run(f"matcher, {workers} processes", args.papers, args.keywords,
+                    lambda db: rebuild_associations(db, limit=args.papers, workers=workers))
+    print(f"{'speedup (1 process)':<22}: {legacy_time / single_time:8.2f}x")
+    print(f"{'speedup (pool)':<22}: {legacy_time / pool_time:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark: dashboard keyword aggregations, joins over paper_keywords vs the keyword_weekly_counts rollup
+
+Usage:
+    python benchmarks/benchmark_keyword_rollup.py --papers 200000 --keywords 5000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+from sqlalchemy import case, create_engine, func, insert
+from sqlalchemy.orm import sessionmaker
+
+# backendディレクトリをsys.pathに追加
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from app import models, services
+from app.config import settings
+from app.database import Base
+from app.keyword_rollup import link_values, rebuild_weekly_counts
+
+
+def legacy_trending(db) -> int:
+    """Reference copy of the previous get_trending_keywords_data query"""
+    recent_threshold = services.get_time_ago(days=settings.recent_analysis_weeks * 7)
+    previous_threshold = services.get_time_ago(days=settings.comparison_weeks * 7)
+    return len(
+        db.query(
+            models.Keyword.name,
+            func.sum(case((models.Paper.published_at >= recent_threshold, 1), else_=0)),
+            func.sum(case((models.Paper.published_at < recent_threshold, 1), else_=0))
+        )
+        .join(models.PaperKeyword, models.Keyword.id == models.PaperKeyword.keyword_id)
+        .join(models.Paper, models.PaperKeyword.paper_id == models.Paper.id)
+        .filter(models.Paper.published_at >= previous_threshold)
+        .group_by(models.Keyword.name)
+        .having(func.sum(case((models.Paper.published_at >= recent_threshold, 1), else_=0)) >= 2)
+        .all()
+    )
+
+
+def legacy_word_cloud(db) -> int:
+    """Reference copy of the previous get_word_cloud_data query"""
+    return len(
+        db.query(models.Keyword.name, func.count(models.PaperKeyword.paper_id))
+        .join(models.PaperKeyword, models.Keyword.id == models.PaperKeyword.keyword_id)
+        .join(models.Paper, models.PaperKeyword.paper_id == models.Paper.id)
+        .filter(models.Paper.published_at >= services.get_time_ago(days=settings.comparison_weeks * 7))
+        .group_by(models.Keyword.name)
+        .order_by(func.count(models.PaperKeyword.paper_id).desc())
+        .limit(100)
+        .all()
+    )
+
+
+def populate(db, paper_count: int, keyword_count: int) -> None:
+    """Papers spread over the last year, three keywords each"""
+    rng = random.Random(0)
+    now = services.get_utc_now()
+    published = [now - timedelta(minutes=rng.randrange(365 * 24 * 60)) for _ in range(paper_count)]
+    db.execute(insert(models.Paper), [
+        {'arxiv_id': f"bench.{i}", 'title': f"Paper {i}", 'authors': [], 'summary': "", 'published_at': published_at}
+        for i, published_at in enumerate(published)
+    ])
+    db.execute(insert(models.Keyword), [{'name': f"Keyword {i}"} for i in range(keyword_count)])
+    db.execute(insert(models.PaperKeyword), [
+        link_values(paper_id, keyword_id, published[paper_id - 1])
+        for paper_id in range(1, paper_count + 1)
+        for keyword_id in rng.sample(range(1, keyword_count + 1), 3)
+    ])
+    db.commit()
+
+
+def run(label: str, query) -> None:
+    services.cache.clear()
+    start = time.perf_counter()
+    rows = query()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22}: {elapsed * 1000:10.1f} ms ({rows} rows)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark keyword aggregations with and without the weekly rollup.")
+    parser.add_argument("--papers", type=int, default=200000, help="Number of synthetic papers")
+    parser.add_argument("--keywords", type=int, default=5000, help="Number of keywords")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine, autoflush=False)()
+        try:
+            populate(db, args.papers, args.keywords)
+            start = time.perf_counter()
+            rebuild_weekly_counts(db)
+            db.commit()
+            print(f"{'rollup rebuild':<22}: {(time.perf_counter() - start) * 1000:10.1f} ms "
+                  f"({db.query(models.KeywordWeeklyCount).count()} rows)")
+
+            run("trending (join)", lambda: legacy_trending(db))
+            run("trending (rollup)", lambda: len(services.get_trending_keywords_data(db)))
+            run("word cloud (join)", lambda: legacy_word_cloud(db))
+            run("word cloud (rollup)", lambda: len(services.get_word_cloud_data(db)))
+        finally:
+            db.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: dashboard summary and keyword stats, COUNT scans vs the materialized counters
+
+Usage:
+    python benchmarks/benchmark_summary.py --papers 1000000 --keywords 20000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+from sqlalchemy import create_engine, func, insert
+from sqlalchemy.orm import sessionmaker
+
+# backendディレクトリをsys.pathに追加
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from app import counters, models, services
+from app.database import Base
+from app.keyword_rollup import link_values
+
+BATCH_SIZE = 100_000
+
+
+def legacy_summary(db) -> None:
+    """Reference copy of the previous get_summary_data and /keywords/stats queries"""
+    db.query(func.count(models.Paper.id)).scalar()
+    db.query(func.count(models.Keyword.id)).scalar()
+    db.query(func.max(models.Paper.published_at)).scalar()
+    now = services.get_utc_now()
+    for since in (timedelta(hours=24), timedelta(days=7), timedelta(days=30)):
+        db.query(func.count(models.Paper.id)).filter(models.Paper.published_at >= now - since).scalar()
+    db.query(func.count(models.Keyword.id)).scalar()
+    db.query(func.count(models.PaperKeyword.paper_id)).scalar()
+
+
+def summary(db) -> None:
+    services.get_summary_data(db)
+    counters.get_counters(db, [counters.KEYWORDS, counters.LINKS])
+
+
+def populate(db, paper_count: int, keyword_count: int) -> None:
+    """Papers spread over the last three years with three keywords each"""
+    rng = random.Random(0)
+    now = services.get_utc_now()
+    db.execute(insert(models.Keyword), [{'name': f"Keyword {i}"} for i in range(keyword_count)])
+    for batch_start in range(0, paper_count, BATCH_SIZE):
+        ids = range(batch_start + 1, min(batch_start + BATCH_SIZE, paper_count) + 1)
+        published = {i: now - timedelta(seconds=rng.randrange(3 * 365 * 24 * 3600)) for i in ids}
+        db.execute(insert(models.Paper), [
+            {'id': i, 'arxiv_id': f"bench.{i}", 'title': "", 'authors': [], 'summary': "", 'published_at': published[i]}
+            for i in ids
+        ])
+        db.execute(insert(models.PaperKeyword), [
+            link_values(i, keyword_id, published[i])
+            for i in ids
+            for keyword_id in rng.sample(range(1, keyword_count + 1), 3)
+        ])
+    db.commit()
+
+
+def run(label: str, fn, repeat: int = 5) -> None:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    print(f"{label:<22}: {min(timings) * 1000:10.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard summary with and without counters.")
+    parser.add_argument("--papers", type=int, default=1_000_000, help="Number of synthetic papers")
+    parser.add_argument("--keywords", type=int, default=20000, help="Number of keywords")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine, autoflush=False)()
+        try:
+            populate(db, args.papers, args.keywords)
+            start = time.perf_counter()
+            counters.rebuild_counters(db)
+            db.commit()
+            print(f"{'counters rebuild':<22}: {(time.perf_counter() - start) * 1000:10.1f} ms")
+
+            run("summary (COUNT scans)", lambda: legacy_summary(db))
+            run("summary (counters)", lambda: summary(db))
+        finally:
+            db.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
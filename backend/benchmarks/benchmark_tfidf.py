@@ -0,0 +1,73 @@
+"""
+Benchmark: building the weekly term vectors (done at ingest time) vs distinctive term queries over them
+
+Usage:
+    python benchmarks/benchmark_tfidf.py --papers 20000 --weeks 12
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+# backendディレクトリをsys.pathに追加
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from app import models
+from app.database import Base
+from app.tfidf import get_distinctive_terms, refresh_week_vectors
+from benchmark_keyword_extraction import generate_abstracts
+
+END = datetime(2024, 6, 30, tzinfo=timezone.utc)
+
+
+def populate(db, paper_count: int, weeks: int) -> None:
+    """Papers spread evenly over the weeks; the last week also mentions a new phrase"""
+    span = timedelta(weeks=weeks)
+    rows = []
+    for i, abstract in enumerate(generate_abstracts(paper_count)):
+        published_at = END - span + span * (i / paper_count)
+        if published_at > END - timedelta(weeks=1) and i % 3 == 0:
+            abstract += " We apply speculative decoding."
+        rows.append({'arxiv_id': f"bench.{i}", 'title': f"Paper {i}", 'authors': [], 'summary': abstract, 'published_at': published_at})
+    db.execute(insert(models.Paper), rows)
+    db.commit()
+
+
+def run(label: str, db, days: int) -> None:
+    start = time.perf_counter()
+    terms = get_distinctive_terms(db, END - timedelta(days=days), END, limit=10)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22}: {elapsed * 1000:10.1f} ms (top: {', '.join(term.term for term in terms[:3])})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TF-IDF distinctive term queries.")
+    parser.add_argument("--papers", type=int, default=20000, help="Number of synthetic papers")
+    parser.add_argument("--weeks", type=int, default=12, help="Weeks the papers are spread over")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine, autoflush=False)()
+        try:
+            populate(db, args.papers, args.weeks)
+            start = time.perf_counter()
+            refresh_week_vectors(db)
+            print(f"{'build vectors':<22}: {(time.perf_counter() - start) * 1000:10.1f} ms")
+            run("query (28 days)", db, 28)
+            run("query (7 days)", db, 7)
+        finally:
+            db.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
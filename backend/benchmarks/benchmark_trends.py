@@ -0,0 +1,100 @@
+"""
+Benchmark: /api/v1/trends data for many keywords, legacy per-keyword queries vs one grouped rollup query
+
+Usage:
+    python benchmarks/benchmark_trends.py --papers 50000 --keywords 50
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, func, insert
+from sqlalchemy.orm import sessionmaker
+
+# backendディレクトリをsys.pathに追加
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from app import models
+from app.database import Base
+from app.keyword_rollup import link_values, rebuild_weekly_counts
+from app.services import get_trends_data
+
+
+def legacy_trends(db, keywords: list[str]) -> int:
+    """Reference copy of the previous get_trends_data: one lookup and one grouped query per keyword"""
+    points = 0
+    for keyword_name in keywords:
+        keyword_obj = db.query(models.Keyword).filter(models.Keyword.name == keyword_name).first()
+        if not keyword_obj:
+            continue
+        points += len(
+            db.query(func.date(models.Paper.published_at, 'weekday 1', '-6 days').label('week_start'), func.count(models.Paper.id))
+            .join(models.PaperKeyword, models.Paper.id == models.PaperKeyword.paper_id)
+            .filter(models.PaperKeyword.keyword_id == keyword_obj.id)
+            .group_by('week_start')
+            .all()
+        )
+    return points
+
+
+def populate(db, paper_count: int, keyword_count: int) -> list[str]:
+    rng = random.Random(0)
+    start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+    published = [start + timedelta(minutes=rng.randrange(2 * 365 * 24 * 60)) for _ in range(paper_count)]
+    db.execute(insert(models.Paper), [
+        {'arxiv_id': f"bench.{i}", 'title': f"Paper {i}", 'authors': [], 'summary': "", 'published_at': published_at}
+        for i, published_at in enumerate(published)
+    ])
+    names = [f"Keyword {i}" for i in range(keyword_count * 4)]
+    db.execute(insert(models.Keyword), [{'name': name} for name in names])
+    db.execute(insert(models.PaperKeyword), [
+        link_values(paper_id, keyword_id, published[paper_id - 1])
+        for paper_id in range(1, paper_count + 1)
+        for keyword_id in rng.sample(range(1, len(names) + 1), 3)
+    ])
+    rebuild_weekly_counts(db)
+    db.commit()
+    return names[:keyword_count]
+
+
+def run(label: str, keywords: list[str], trends) -> float:
+    start = time.perf_counter()
+    points = trends(keywords)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22}: {elapsed * 1000:10.1f} ms ({len(keywords)} keywords, {points} points)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark multi-keyword trend queries.")
+    parser.add_argument("--papers", type=int, default=50000, help="Number of synthetic papers")
+    parser.add_argument("--keywords", type=int, default=50, help="Keywords requested at once")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine, autoflush=False)()
+        try:
+            keywords = populate(db, args.papers, args.keywords)
+
+            def current(names):
+                return sum(len(result.data) for result in get_trends_data(db, names, None, None))
+
+            legacy_time = run("legacy per keyword", keywords, lambda names: legacy_trends(db, names))
+            single_time = run("rollup query", keywords, current)
+            run("rollup query (1)", keywords[:1], current)
+            print(f"{'speedup':<22}: {legacy_time / single_time:8.2f}x")
+        finally:
+            db.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,7 @@
-from app.database import engine
-from app.models import Base
+from app.migrations import init_db
 
 def create_db_tables():
-    Base.metadata.create_all(bind=engine)
+    init_db()
     print("Database tables created.")
 
 if __name__ == "__main__":
@@ -0,0 +1,75 @@
+import sys
+import os
+import argparse
+import logging
+import time
+
+# backendディレクトリをsys.pathに追加
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from app.database import SessionLocal
+from app.keyword_rebuild import reextract_stale_papers, resolve_worker_count
+from app.counters import rebuild_counters
+from app.keyword_rollup import rebuild_weekly_counts
+from app.tfidf import refresh_week_vectors
+from app.services import backfill_paper_categories, cleanup_low_quality_keywords, rebuild_paper_keyword_associations
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Full-table keyword maintenance. Ingestion only re-checks the keywords touched by each batch; run this periodically to sweep the whole vocabulary."
+    )
+    parser.add_argument("--reextract", action="store_true", help="Re-run keyword extraction for papers extracted by an older extractor version or edited since. Any dictionary change re-extracts the whole corpus.")
+    parser.add_argument("--rebuild-associations", action="store_true", help="Also rebuild paper-keyword associations for recent papers.")
+    parser.add_argument("--all-papers", action="store_true", help="Rebuild associations for the whole corpus instead of the latest papers.")
+    parser.add_argument("--rebuild-rollup", action="store_true", help="Recompute the keyword weekly counts rollup and the dashboard counters from the tables.")
+    parser.add_argument("--rebuild-term-vectors", action="store_true", help="Build the missing or stale weekly TF-IDF term vectors and prune unused terms (init_db builds all of them once after upgrading).")
+    parser.add_argument("--backfill-categories", type=int, default=0, metavar="N", help="Look up arXiv categories for up to N papers stored without them (batched, cached API requests).")
+    parser.add_argument("--workers", type=int, default=None, help="Processes used to extract from / scan paper texts (default: settings.keyword_rebuild_workers, 0 = CPU count).")
+    args = parser.parse_args()
+
+    try:
+        from app.migrations import init_db
+        init_db()
+    except ImportError as e:
+        logging.error(f"Failed to import database modules: {e}")
+        sys.exit(1)
+
+    start_time = time.time()
+    db = SessionLocal()
+    try:
+        if args.reextract:
+            result = reextract_stale_papers(db, workers=resolve_worker_count(args.workers))
+            logging.info(
+                f"Re-extracted {result.papers_processed} papers ({result.papers_changed} changed): "
+                f"{result.links_added} links added, {result.links_removed} removed."
+            )
+
+        if args.backfill_categories > 0:
+            backfill_paper_categories(db, limit=args.backfill_categories)
+
+        cleaned_count = cleanup_low_quality_keywords(db)
+        logging.info(f"Full keyword cleanup completed. Removed/merged {cleaned_count} keywords.")
+
+        if args.rebuild_associations:
+            added_count = rebuild_paper_keyword_associations(
+                db, all_papers=args.all_papers, workers=resolve_worker_count(args.workers)
+            )
+            logging.info(f"Rebuilt associations: {added_count} added.")
+
+        if args.rebuild_term_vectors:
+            rebuilt_count = refresh_week_vectors(db)
+            logging.info(f"Rebuilt {rebuilt_count} weekly term vectors.")
+
+        if args.rebuild_rollup:
+            rebuild_weekly_counts(db)
+            rebuild_counters(db)
+            db.commit()
+    finally:
+        db.close()
+
+    logging.info(f"Keyword maintenance completed in {time.time() - start_time:.2f} seconds")
@@ -0,0 +1,37 @@
+import sys
+import os
+import argparse
+import logging
+
+# backendディレクトリをsys.pathに追加
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from app.config import settings
+from app.database import SessionLocal
+from app.services import prune_ai_caches
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Delete cached AI analysis results (weekly trend, topic keywords, topic summaries, hot topics) past their retention period. Run it periodically, e.g. from cron."
+    )
+    parser.add_argument("--days", type=int, default=settings.ai_cache_retention_days, help="Keep results created in the last N days (default: settings.ai_cache_retention_days).")
+    args = parser.parse_args()
+
+    try:
+        from app.migrations import init_db
+        init_db()
+    except ImportError as e:
+        logging.error(f"Failed to import database modules: {e}")
+        sys.exit(1)
+
+    db = SessionLocal()
+    try:
+        deleted = prune_ai_caches(db, retention_days=args.days)
+        logging.info(f"Deleted {deleted} cached AI results.")
+    finally:
+        db.close()
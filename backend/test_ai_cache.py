@@ -0,0 +1,176 @@
+"""
+Test cases for the database caches of AI analyses (topic keywords, topic summaries, hot topics)
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from sqlalchemy import inspect, text
+
+from app import models, services
+from app.config import settings
+from app.revalidation import revalidator
+from test_api import session, PaperFactory
+from test_paper_records import add_papers, count_queries
+
+
+def ai_service():
+    mock_service = AsyncMock()
+    mock_service.extract_topic_keywords.return_value = [{'keyword': "keyword 0", 'paper_count': 8, 'relevance_score': 90.0}]
+    mock_service.generate_topic_summary.return_value = {'topic_name': "Keyword 3", 'summary': "Summary", 'key_findings': ["Finding"]}
+    return mock_service
+
+
+def test_topic_keywords_are_cached_per_key(session):
+    add_papers(session, 8, datetime.now(timezone.utc) - timedelta(hours=1))
+    mock_service = ai_service()
+
+    def topic_keywords(**kwargs):
+        with patch('app.services.get_ai_service', return_value=mock_service):
+            return asyncio.run(services.get_topic_keywords(session, language="en", **kwargs))
+
+    first = topic_keywords(max_keywords=10)
+    assert topic_keywords(max_keywords=10).keywords == first.keywords
+    assert topic_keywords(max_keywords=10).analysis_period == first.analysis_period
+    assert mock_service.extract_topic_keywords.await_count == 1
+
+    topic_keywords(max_keywords=20)
+    topic_keywords(max_keywords=10, system_prompt="Focus on robotics")
+    topic_keywords(max_keywords=10, system_prompt="Focus on robotics")
+    assert mock_service.extract_topic_keywords.await_count == 3
+
+    topic_keywords(max_keywords=10, force_regenerate=True)
+    assert mock_service.extract_topic_keywords.await_count == 4
+
+
+def test_topic_summaries_are_cached_per_keyword_set(session):
+    add_papers(session, 12, datetime.now(timezone.utc) - timedelta(hours=1))
+    mock_service = ai_service()
+
+    def topic_summary(keywords, **kwargs):
+        with patch('app.services.get_ai_service', return_value=mock_service):
+            return asyncio.run(services.get_topic_summary(session, keywords, "en", **kwargs))
+
+    first = topic_summary(["keyword 3", "keyword 2"])
+    cached = topic_summary(["Keyword 2 ", "keyword 3"])
+    assert mock_service.generate_topic_summary.await_count == 1
+    assert (cached.summary, cached.key_findings, cached.related_paper_count) == ("Summary", ["Finding"], 6)
+    assert [paper.id for paper in cached.papers] == [paper.id for paper in first.papers]
+
+    topic_summary(["keyword 3"])
+    topic_summary(["keyword 3", "keyword 2"], force_regenerate=True)
+    assert mock_service.generate_topic_summary.await_count == 3
+
+
+def test_hot_topics_are_cached_until_the_data_changes(session):
+    papers = add_papers(session, 6, datetime.now(timezone.utc) - timedelta(hours=1))
+    paper = {'id': papers[0].id, 'title': papers[0].title, 'authors': ["Author"], 'published_at': papers[0].published_at.isoformat(), 'summary': "", 'arxiv_id': papers[0].arxiv_id}
+    mock_service = AsyncMock()
+    mock_service.analyze_hot_topics.return_value = [SimpleNamespace(
+        topic="Keyword 0", paper_count=6, recent_papers=[paper], summary="Summary", keywords=["keyword 0"], trend_score=80.0
+    )]
+
+    def hot_topics(**kwargs):
+        with patch('app.services.get_ai_service', return_value=mock_service):
+            return asyncio.run(services.get_hot_topics_summary(session, language="en", days=7, max_topics=5, **kwargs))
+
+    first = hot_topics()
+    with count_queries(session) as statements:
+        cached = hot_topics()
+    # データバージョンとキャッシュの2クエリだけで返す
+    assert len(statements) == 2
+    assert cached.hot_topics == first.hot_topics
+    assert cached.total_papers_analyzed == 6
+    assert mock_service.analyze_hot_topics.await_count == 1
+
+    hot_topics(force_regenerate=True)
+    assert mock_service.analyze_hot_topics.await_count == 2
+
+    # 新しい論文が入ると次のリクエストで分析し直し、古い結果は置き換える
+    PaperFactory(published_at=datetime.now(timezone.utc))
+    session.commit()
+    assert hot_topics().total_papers_analyzed == 7
+    assert mock_service.analyze_hot_topics.await_count == 3
+    assert session.query(models.HotTopicsCache).count() == 1
+
+
+def test_stale_topic_keywords_are_served_while_one_refresh_runs(session):
+    add_papers(session, 8, datetime.now(timezone.utc) - timedelta(hours=1))
+    period_start, period_end = services.get_topic_analysis_period()
+    session.add(models.TopicKeywordsCache(
+        analysis_period_start=period_start - timedelta(days=1), analysis_period_end=period_end - timedelta(days=1),
+        language="en", max_keywords=10, prompt_hash='', total_papers_analyzed=3,
+        keywords_data=[{'keyword': "old keyword", 'paper_count': 3, 'relevance_score': 50.0}],
+        created_at=datetime.now(timezone.utc) - timedelta(days=1)
+    ))
+    session.commit()
+    mock_service = ai_service()
+
+    async def scenario():
+        # 前日の結果をすぐに返し、更新は同時リクエストでも1回だけバックグラウンドで行う
+        stale = [await services.get_topic_keywords(session, language="en", max_keywords=10) for _ in range(3)]
+        await revalidator.wait()
+        fresh = await services.get_topic_keywords(session, language="en", max_keywords=10)
+        return stale, fresh
+
+    with patch.object(settings, 'ai_serve_stale', True), patch('app.services.get_ai_service', return_value=mock_service):
+        stale, fresh = asyncio.run(scenario())
+
+    assert all(result.keywords[0].keyword == "old keyword" and result.revalidating for result in stale)
+    assert stale[0].cache_age_seconds >= timedelta(days=1).total_seconds()
+    assert mock_service.extract_topic_keywords.await_count == 1
+    assert fresh.keywords[0].keyword == "keyword 0"
+    assert fresh.analysis_period.startswith(period_start.strftime('%Y-%m-%d'))
+    assert fresh.cache_age_seconds < settings.ai_cache_fresh_seconds and not fresh.revalidating
+
+
+def test_stale_results_are_only_served_when_enabled(session):
+    add_papers(session, 8, datetime.now(timezone.utc) - timedelta(hours=1))
+    period_start, period_end = services.get_topic_analysis_period()
+    session.add(models.TopicKeywordsCache(
+        analysis_period_start=period_start - timedelta(days=1), analysis_period_end=period_end - timedelta(days=1),
+        language="en", max_keywords=10, prompt_hash='', keywords_data=[], total_papers_analyzed=3
+    ))
+    session.commit()
+    mock_service = ai_service()
+
+    with patch('app.services.get_ai_service', return_value=mock_service):
+        result = asyncio.run(services.get_topic_keywords(session, language="en", max_keywords=10))
+
+    assert result.keywords[0].keyword == "keyword 0"
+    assert result.cache_age_seconds is None
+    assert mock_service.extract_topic_keywords.await_count == 1
+
+
+def test_old_cached_results_are_pruned(session):
+    now = datetime.now(timezone.utc)
+    for created_at in (now - timedelta(days=40), now - timedelta(days=2)):
+        session.add(models.WeeklyTrendCache(
+            analysis_period_start=now, analysis_period_end=now, language="en",
+            trend_overview="Overview", total_papers_analyzed=1, created_at=created_at
+        ))
+        session.add(models.TopicKeywordsCache(
+            analysis_period_start=now, analysis_period_end=now, language="en", max_keywords=10,
+            prompt_hash='', keywords_data=[], total_papers_analyzed=1, created_at=created_at
+        ))
+    session.commit()
+
+    assert services.prune_ai_caches(session, retention_days=30) == 2
+    assert session.query(models.WeeklyTrendCache).count() == 1
+    assert session.query(models.TopicKeywordsCache).count() == 1
+
+
+def test_cache_tables_without_key_columns_are_recreated(session):
+    models.TopicKeywordsCache.__table__.drop(session.connection())
+    session.execute(text(
+        "CREATE TABLE topic_keywords_cache (id INTEGER PRIMARY KEY, analysis_period_start DATETIME, "
+        "analysis_period_end DATETIME, language VARCHAR(10), keywords_data JSON, total_papers_analyzed INTEGER, "
+        "created_at DATETIME, updated_at DATETIME)"
+    ))
+    session.commit()
+
+    assert services.ensure_ai_cache_tables(session) is True
+    assert services.ensure_ai_cache_tables(session) is False
+    columns = {column['name'] for column in inspect(session.get_bind()).get_columns("topic_keywords_cache")}
+    assert {'max_keywords', 'prompt_hash'} <= columns
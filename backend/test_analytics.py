@@ -0,0 +1,105 @@
+"""
+Test cases for the in-memory columnar analytics engine
+"""
+import random
+from datetime import timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import insert
+
+from app import counters, models, services
+from app.analytics import DailyCounts, keyword_analytics
+from app.config import settings
+from app.ingest import BulkIngestor
+from app.keyword_rollup import link_values, rebuild_weekly_counts
+from test_api import session
+from test_ingest import render_feed
+
+
+@pytest.fixture
+def use_engine(monkeypatch):
+    """Return a function that switches services between SQL and the engine"""
+    keyword_analytics.clear()
+
+    def use(enabled):
+        monkeypatch.setattr(settings, "analytics_engine", enabled)
+        services.cache.clear()
+    yield use
+    keyword_analytics.clear()
+
+
+def populate(session, papers=600, keywords=8):
+    rng = random.Random(5)
+    now = services.get_utc_now().replace(microsecond=0)
+    session.execute(insert(models.Keyword), [{'name': f"Keyword {i}"} for i in range(keywords)])
+    published = [now - timedelta(minutes=rng.randrange(30 * 7 * 24 * 60)) for _ in range(papers)]
+    session.execute(insert(models.Paper), [
+        {'arxiv_id': f"p{i}", 'title': "t", 'authors': [], 'summary': "s", 'published_at': published_at}
+        for i, published_at in enumerate(published)
+    ])
+    session.execute(insert(models.PaperKeyword), [
+        link_values(paper_id, keyword_id, published[paper_id - 1])
+        for paper_id in range(1, papers + 1)
+        for keyword_id in rng.sample(range(1, keywords + 1), rng.randrange(1, 4))
+    ])
+    rebuild_weekly_counts(session)
+    session.commit()
+    return [f"Keyword {i}" for i in range(keywords)]
+
+
+def answers(session, names):
+    now = services.get_utc_now()
+    return (
+        sorted(services.get_trending_keywords_data(session), key=lambda k: k.name),
+        sorted(services.get_trending_keywords_data(session, 10, 45), key=lambda k: k.name),
+        sorted(services.get_word_cloud_data(session), key=lambda w: w.text),
+        sorted(services.get_word_cloud_data(session, 3), key=lambda w: w.text),
+        services.get_trends_data(session, names, now - timedelta(days=61, hours=5), now - timedelta(days=3, hours=7)),
+        services.get_trends_data(session, names, None, None),
+    )
+
+
+def test_engine_matches_sql(session, use_engine):
+    names = populate(session)
+    use_engine(False)
+    expected = answers(session, names)
+    assert all(expected)
+    use_engine(True)
+    assert answers(session, names) == expected
+
+
+def test_engine_appends_new_papers_and_reloads_on_other_changes(session, use_engine):
+    names = populate(session, papers=50)
+    use_engine(True)
+    loaded = keyword_analytics.refresh(session)
+
+    BulkIngestor(session).ingest(render_feed([("2401.00001v1", "Large Language Model agents", [])]))
+    session.commit()
+    appended = keyword_analytics.refresh(session)
+    assert appended.version == loaded.version
+    assert len(appended.keyword_ids) > len(loaded.keyword_ids)
+    assert keyword_analytics.refresh(session) is appended
+
+    services.delete_keywords(session, [1])
+    session.commit()
+    reloaded = keyword_analytics.refresh(session)
+    assert reloaded.version == counters.get_counter(session, counters.LINKS_VERSION) != appended.version
+    assert 1 not in reloaded.keyword_ids
+
+    use_engine(False)
+    expected = answers(session, names)
+    use_engine(True)
+    assert answers(session, names) == expected
+
+
+def test_daily_prefix_counts_match_brute_force():
+    rng = np.random.default_rng(3)
+    seconds = np.sort(rng.integers(-30 * 86400, 400 * 86400, 3000)).astype(np.int32)
+    keyword_ids = rng.integers(0, 12, 3000)
+    daily = DailyCounts.build(seconds[:2000], keyword_ids[:2000]).merge(seconds[2000:], keyword_ids[2000:])
+    days = seconds // 86400
+    for first_day, last_day in [(-30, 400), (0, 1), (17, 250), (399, 400), (-100, -20), (5, 5)]:
+        selected = (days >= first_day) & (days < last_day)
+        expected = np.bincount(keyword_ids[selected], minlength=12)
+        assert daily.counts(first_day, last_day, 12).tolist() == expected.tolist()
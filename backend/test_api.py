@@ -149,16 +149,16 @@ def test_get_trends_single_keyword(client, session):
     data = response.json()
     assert len(data) == 1
     assert data[0]["keyword"] == "LLM"
-    assert len(data[0]["data"]) == 3  # 週単位で集計されるため3つのデータポイント
-    # sort data by date before asserting
-    sorted_data = sorted(data[0]["data"], key=lambda x: x["date"])
+    assert len(data[0]["data"]) == 6  # 週単位で集計し、論文のない週は0件で埋める
     # 週単位で集計されるため、日付が週の始まりになる
-    assert sorted_data[0]["date"] == "2022-12-27"  # 2023-01-01を含む週の始まり
-    assert sorted_data[0]["count"] == 1
-    assert sorted_data[1]["date"] == "2023-01-10"  # 2023-01-15を含む週の始まり
-    assert sorted_data[1]["count"] == 1
-    assert sorted_data[2]["date"] == "2023-01-31"  # 2023-02-01を含む週の始まり
-    assert sorted_data[2]["count"] == 1
+    assert [(point["date"], point["count"]) for point in data[0]["data"]] == [
+        ("2022-12-27", 1),  # 2023-01-01を含む週の始まり
+        ("2023-01-03", 0),
+        ("2023-01-10", 1),  # 2023-01-15を含む週の始まり
+        ("2023-01-17", 0),
+        ("2023-01-24", 0),
+        ("2023-01-31", 1),  # 2023-02-01を含む週の始まり
+    ]
 
 def test_get_trends_multiple_keywords(client, session):
     keyword_llm = KeywordFactory(name="LLM")
@@ -197,13 +197,28 @@ def test_get_trends_date_range(client, session):
     data = response.json()
     assert len(data) == 1
     assert data[0]["keyword"] == "Paper"
-    assert len(data[0]["data"]) == 2  # 週単位集計で、2つのデータポイント
+    assert len(data[0]["data"]) == 6  # 指定期間の全週（2023-01-31を含む週まで）
     # 週単位集計で、2023-01-01と、2023-01-15が異なる週になる
-    sorted_data = sorted(data[0]["data"], key=lambda x: x["date"])
-    assert sorted_data[0]["date"] == "2022-12-27"  # 2023-01-01を含む週の始まり
-    assert sorted_data[0]["count"] == 1
-    assert sorted_data[1]["date"] == "2023-01-10"  # 2023-01-15を含む週の始まり
-    assert sorted_data[1]["count"] == 1
+    counts = {point["date"]: point["count"] for point in data[0]["data"]}
+    assert counts["2022-12-27"] == 1  # 2023-01-01を含む週の始まり
+    assert counts["2023-01-10"] == 1  # 2023-01-15を含む週の始まり
+    assert counts["2023-01-31"] == 0  # 2023-02-01の論文は期間外
+    assert sum(counts.values()) == 2
+
+def test_get_trends_shares_one_zero_filled_axis(client, session):
+    keyword_llm = KeywordFactory(name="LLM")
+    KeywordFactory(name="AI")
+    for published_at in [datetime(2023, 1, 1, tzinfo=timezone.utc), datetime(2023, 1, 15, tzinfo=timezone.utc)]:
+        PaperKeywordFactory(paper=PaperFactory(published_at=published_at), keyword=keyword_llm)
+    session.commit()
+
+    response = client.get("/api/v1/trends?keywords=LLM&keywords=AI&keywords=Unknown")
+    assert response.status_code == 200
+    data = {trend["keyword"]: trend["data"] for trend in response.json()}
+    assert [point["count"] for point in data["LLM"]] == [1, 0, 1]
+    assert [point["date"] for point in data["AI"]] == ["2022-12-27", "2023-01-03", "2023-01-10"]
+    assert [point["count"] for point in data["AI"]] == [0, 0, 0]
+    assert data["Unknown"] == []
 
 def test_get_trends_no_keywords(client):
     response = client.get("/api/v1/trends")
@@ -288,6 +303,34 @@ def test_get_trending_keywords_empty_db(client):
     assert "trending_keywords" in data
     assert len(data["trending_keywords"]) == 0
 
+def test_get_trending_keywords_with_custom_window(client, session):
+    now = datetime.now(timezone.utc)
+    papers = [PaperFactory(published_at=now - timedelta(days=days)) for days in (5, 10, 100, 120)]
+    keyword_llm = KeywordFactory(name="LLM")
+    keyword_ai = KeywordFactory(name="AI")
+    for paper in papers[:2]:
+        PaperKeywordFactory(paper=paper, keyword=keyword_llm)
+    for paper in papers:
+        PaperKeywordFactory(paper=paper, keyword=keyword_ai)
+    session.commit()
+
+    # 直近30日とその前の100日を比較
+    response = client.get("/api/v1/dashboard/trending-keywords?window=30&baseline=100")
+    assert response.status_code == 200
+    trends = {k["name"]: (k["recent_count"], k["previous_count"]) for k in response.json()["trending_keywords"]}
+    assert trends == {"LLM": (2, 0), "AI": (2, 2)}
+
+    # 直近7日では最低件数(2)に届かない
+    response = client.get("/api/v1/dashboard/trending-keywords?window=7&baseline=7")
+    assert response.json()["trending_keywords"] == []
+
+    response = client.get("/api/v1/dashboard/trending-keywords?window=0")
+    assert response.status_code == 422
+
+    response = client.get("/api/v1/keywords/word-cloud?window=7")
+    assert response.status_code == 200
+    assert {w["text"]: w["value"] for w in response.json()} == {"LLM": 1, "AI": 1}
+
 def test_cors_headers(client):
     response = client.get("/api/v1/dashboard/summary", headers={"Origin": "http://localhost:3000"})
     assert response.status_code == 200
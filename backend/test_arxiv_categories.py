@@ -0,0 +1,129 @@
+"""
+Test cases for batched arXiv category lookup against a local fake Atom server
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from app import models
+from app.arxiv_categories import ArxivCategoryResolver, normalize_arxiv_id
+from test_api import session
+
+FAKE_CATEGORIES = {
+    "2401.00001": ["cs.CL", "cs.AI"],
+    "2401.00002": ["cs.CV"],
+    "2401.00003": ["cs.LG", "stat.ML"],
+    "2401.00004": ["cs.RO"],
+    "2401.00005": ["cs.IR"],
+}
+
+
+def render_feed(arxiv_ids):
+    # arXivは不正なIDが1件でもあるとHTTP 200でエラーフィードを返す
+    invalid_ids = [arxiv_id for arxiv_id in arxiv_ids if not arxiv_id[:1].isdigit()]
+    if invalid_ids:
+        error_id = f"http://arxiv.org/api/errors#incorrect_id_format_for_{invalid_ids[0]}"
+        return (f'<?xml version="1.0" encoding="UTF-8"?><feed xmlns="http://www.w3.org/2005/Atom"><entry><id>{error_id}</id>'
+                f'<title>Error</title><summary>incorrect id format for {invalid_ids[0]}</summary></entry></feed>').encode()
+    entries = []
+    for arxiv_id in arxiv_ids:
+        if arxiv_id not in FAKE_CATEGORIES:
+            continue
+        categories = "".join(f'<category term="{term}" scheme="http://arxiv.org/schemas/atom"/>' for term in FAKE_CATEGORIES[arxiv_id])
+        entries.append(f"<entry><id>http://arxiv.org/abs/{arxiv_id}v2</id><title>Paper {arxiv_id}</title>{categories}</entry>")
+    return f'<?xml version="1.0" encoding="UTF-8"?><feed xmlns="http://www.w3.org/2005/Atom">{"".join(entries)}</feed>'.encode()
+
+
+@pytest.fixture
+def atom_server():
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            arxiv_ids = query.get("id_list", [""])[0].split(",")
+            requests_seen.append(arxiv_ids)
+            body = render_feed(arxiv_ids)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/atom+xml")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/api/query", requests_seen
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_normalize_arxiv_id():
+    assert normalize_arxiv_id("2401.00001v3") == "2401.00001"
+    assert normalize_arxiv_id("http://arxiv.org/abs/2401.00001v1") == "2401.00001"
+    assert normalize_arxiv_id("cs/0101001v1") == "cs/0101001"
+
+
+def test_resolver_batches_id_list_queries(session, atom_server):
+    url, requests_seen = atom_server
+    resolver = ArxivCategoryResolver(session, base_url=url, batch_size=2, delay_seconds=0)
+
+    result = resolver.resolve(["2401.00001v1", "2401.00002v1", "2401.00003v2", "2401.00004v1", "2401.00005v1"])
+
+    assert len(requests_seen) == 3
+    assert all(len(batch) <= 2 for batch in requests_seen)
+    assert result["2401.00001v1"] == ["cs.CL", "cs.AI"]
+    assert result["2401.00003v2"] == ["cs.LG", "stat.ML"]
+
+
+def test_resolver_never_looks_up_an_id_twice(session, atom_server):
+    url, requests_seen = atom_server
+    ArxivCategoryResolver(session, base_url=url, delay_seconds=0).resolve(["2401.00001v1", "9999.99999v1"])
+    assert len(requests_seen) == 1
+
+    # 別のリゾルバーでも永続キャッシュから返す（見つからなかったIDも再取得しない）
+    result = ArxivCategoryResolver(session, base_url=url, delay_seconds=0).resolve(["2401.00001v2", "9999.99999v1"])
+    assert len(requests_seen) == 1
+    assert result == {"2401.00001v2": ["cs.CL", "cs.AI"], "9999.99999v1": []}
+    assert session.query(models.ArxivCategoryCache).count() == 2
+
+
+def test_resolver_honors_request_delay(session, atom_server):
+    url, requests_seen = atom_server
+    resolver = ArxivCategoryResolver(session, base_url=url, batch_size=1, delay_seconds=0.2)
+
+    start = time.monotonic()
+    resolver.resolve(["2401.00001", "2401.00002", "2401.00003"])
+
+    assert len(requests_seen) == 3
+    assert time.monotonic() - start >= 0.4
+
+
+def test_error_feed_is_retried_per_id_and_not_cached(session, atom_server):
+    url, requests_seen = atom_server
+    resolver = ArxivCategoryResolver(session, base_url=url, delay_seconds=0)
+
+    result = resolver.resolve(["2401.00001v1", "bad-id", "9999.99999v1"])
+
+    assert result == {"2401.00001v1": ["cs.CL", "cs.AI"], "bad-id": [], "9999.99999v1": []}
+    assert len(requests_seen) == 4
+    assert {row.arxiv_id for row in session.query(models.ArxivCategoryCache)} == {"2401.00001", "9999.99999"}
+
+    # コミットは呼び出し側で行う
+    session.rollback()
+    assert session.query(models.ArxivCategoryCache).count() == 0
+
+
+def test_failed_batch_is_not_cached(session):
+    resolver = ArxivCategoryResolver(session, base_url="http://127.0.0.1:9/api/query", delay_seconds=0, timeout=1)
+
+    assert resolver.resolve(["2401.00001"]) == {"2401.00001": []}
+    assert session.query(models.ArxivCategoryCache).count() == 0
@@ -0,0 +1,85 @@
+"""
+Test cases for streaming candidate keyword discovery
+"""
+import random
+from collections import Counter
+from datetime import datetime, timezone
+
+from app import models
+from app.candidate_keywords import CandidateTermCounter, SpaceSaving, extract_ngrams
+from app.ingest import BulkIngestor
+from test_api import client, session, KeywordFactory
+from test_ingest import render_feed
+
+
+def paper(title, summary, month):
+    return {'title': title, 'summary': summary, 'published_at': datetime(2024, month, 15, tzinfo=timezone.utc)}
+
+
+def test_ngrams_skip_stop_word_edges_numbers_and_punctuation():
+    ngrams = extract_ngrams("We train a Mixture of Experts on 8 GPUs. Speculative decoding, too")
+    assert "mixture of experts" in ngrams
+    assert "speculative decoding" in ngrams
+    assert "of experts" not in ngrams  # ストップワードで始まる
+    assert "a mixture" not in ngrams
+    assert "experts on" not in ngrams
+    assert "gpus speculative" not in ngrams  # 句読点をまたがない
+    assert not any("8" in ngram.split() for ngram in ngrams)
+
+
+def test_space_saving_bounds_hold_under_eviction():
+    rng = random.Random(7)
+    # 少数の頻出語と多数の一度きりの語が混ざったストリーム
+    stream = [f"hot{rng.randrange(5)}" if rng.random() < 0.4 else f"rare{i}" for i in range(5000)]
+    summary = SpaceSaving(capacity=50)
+    for term in stream:
+        summary.add(term)
+
+    truth = Counter(stream)
+    assert len(summary.counts) == 50
+    for term, count in summary.counts.items():
+        assert count - summary.errors[term] <= truth[term] <= count
+    for term in (f"hot{i}" for i in range(5)):
+        assert term in summary.counts
+    assert all(truth[term] <= summary.min_count for term in truth if term not in summary.counts)
+
+
+def test_counter_state_persists_between_runs_and_stays_bounded(session):
+    CandidateTermCounter(capacity=20).update(session, [paper("Mixture of Experts routing", "", 1)] * 3)
+    session.commit()
+    CandidateTermCounter(capacity=20).update(session, [
+        paper("Mixture of Experts routing", f"unique phrase{i} alpha{i}", 1) for i in range(30)
+    ])
+    session.commit()
+
+    rows = {row.term: row for row in session.query(models.CandidateTermCount).filter_by(period="2024-01")}
+    assert len(rows) == 20
+    assert rows["mixture of experts"].count == 33
+    assert rows["mixture of experts"].error == 0
+
+
+def test_ingestion_feeds_the_counter(session):
+    BulkIngestor(session).ingest(render_feed([("2401.00001v1", "Speculative decoding for agents", [])]))
+    session.commit()
+    terms = {row.term for row in session.query(models.CandidateTermCount).filter_by(period="2024-01")}
+    assert "speculative decoding" in terms
+
+
+def test_candidates_endpoint_lists_growing_phrases_that_are_not_keywords(client, session):
+    counter = CandidateTermCounter()
+    counter.update(session, [paper("Graph transformers", "", 1)] * 6)
+    counter.update(session, [paper("Mixture of Experts", "Graph transformers", 2)] * 8 + [paper("Speculative decoding", "", 2)] * 6)
+    session.commit()
+    KeywordFactory(name="Speculative Decoding")
+
+    response = client.get("/api/v1/keywords/candidates", params={"min_count": 2})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["recent_periods"] == ["2024-02"]
+    assert data["previous_periods"] == ["2024-01"]
+    candidates = {c["name"]: c for c in data["candidates"]}
+    assert candidates["mixture of experts"]["recent_count"] == 8
+    assert candidates["mixture of experts"]["previous_count"] == 0
+    assert candidates["graph transformers"]["growth_count"] == 2
+    assert "speculative decoding" not in candidates  # 既存のキーワード
+    assert list(candidates)[0] == "mixture of experts"
@@ -0,0 +1,97 @@
+"""
+Test cases for arXiv categories persisted at ingest time
+"""
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import feedparser
+
+from app import models, services
+from app.config import settings
+from scripts.fetch_papers import save_papers_to_db
+from test_api import client, session, PaperFactory
+
+FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <entry>
+    <id>http://arxiv.org/abs/2401.00001v1</id>
+    <published>2024-01-02T00:00:00Z</published>
+    <title>Large Language Model agents</title>
+    <summary>We study large language model agents.</summary>
+    <author><name>Alice</name></author>
+    <category term="cs.CL" scheme="http://arxiv.org/schemas/atom"/>
+    <category term="cs.AI" scheme="http://arxiv.org/schemas/atom"/>
+  </entry>
+  <entry>
+    <id>http://arxiv.org/abs/2401.00002v1</id>
+    <published>2024-01-03T00:00:00Z</published>
+    <title>Vision Transformer pruning</title>
+    <summary>Pruning for vision transformer models.</summary>
+    <author><name>Bob</name></author>
+    <category term="cs.CV" scheme="http://arxiv.org/schemas/atom"/>
+    <category term="cs.AI" scheme="http://arxiv.org/schemas/atom"/>
+  </entry>
+</feed>
+"""
+
+
+def test_save_papers_persists_feed_categories(session):
+    with patch("scripts.fetch_papers.cleanup_low_quality_keywords", return_value=0):
+        save_papers_to_db(session, feedparser.parse(FEED).entries)
+
+    assert session.query(models.Category).count() == 3
+    assert session.query(models.PaperCategory).count() == 4
+
+    paper = session.query(models.Paper).filter_by(arxiv_id="2401.00001v1").one()
+    assert services.get_paper_categories(session, [paper.id]) == {paper.id: ["cs.CL", "cs.AI"]}
+
+
+def test_keyword_update_reads_categories_without_network(session):
+    papers = [PaperFactory(published_at=datetime.now(timezone.utc)) for _ in range(settings.keyword_min_occurrence_threshold)]
+    services.save_paper_categories(session, {paper.id: ["cs.CL"] for paper in papers})
+    session.commit()
+
+    with patch("app.services.ArxivCategoryResolver") as resolver:
+        services.update_keywords_from_papers_improved(session, limit=10)
+
+    resolver.assert_not_called()
+    assert session.query(models.Keyword).filter_by(name="Natural Language Processing").count() == 1
+
+
+def test_get_category_trends(client, session):
+    paper1 = PaperFactory(published_at=datetime(2023, 1, 1, tzinfo=timezone.utc))
+    paper2 = PaperFactory(published_at=datetime(2023, 1, 2, tzinfo=timezone.utc))
+    paper3 = PaperFactory(published_at=datetime(2023, 1, 15, tzinfo=timezone.utc))
+    services.save_paper_categories(session, {
+        paper1.id: ["cs.CL"],
+        paper2.id: ["cs.CL", "cs.LG"],
+        paper3.id: ["cs.CL"],
+    })
+    session.commit()
+
+    response = client.get("/api/v1/categories/trends?categories=cs.CL&categories=cs.CV")
+    assert response.status_code == 200
+    data = {item["category"]: item["data"] for item in response.json()}
+    assert data["cs.CL"] == [
+        {"date": "2022-12-27", "count": 2},
+        {"date": "2023-01-10", "count": 1},
+    ]
+    assert data["cs.CV"] == []
+
+
+def test_get_category_trends_invalid_date(client):
+    response = client.get("/api/v1/categories/trends?categories=cs.CL&start_date=2023/01/01")
+    assert response.status_code == 400
+
+
+def test_category_trend_weeks_match_keyword_trend_weeks(session):
+    monday = PaperFactory(published_at=datetime(2023, 1, 2, 23, 30, tzinfo=timezone.utc))
+    tuesday = PaperFactory(published_at=datetime(2023, 1, 3, 0, 30, tzinfo=timezone.utc))
+    services.save_paper_categories(session, {monday.id: ["cs.CL"], tuesday.id: ["cs.CL"]})
+    session.commit()
+
+    result = services.get_category_trends_data(session, ["cs.CL"], None, None)
+
+    assert [point.date for point in result[0].data] == [
+        services.get_week_label(monday.published_at), services.get_week_label(tuesday.published_at)
+    ] == ["2022-12-27", "2023-01-03"]
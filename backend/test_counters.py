@@ -0,0 +1,77 @@
+"""
+Test cases for the materialized dashboard counters
+"""
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func
+
+from app import counters, models, services
+from app.migrations import run_data_migrations
+from app.keyword_rebuild import reextract_stale_papers
+from test_api import client, session, PaperFactory, KeywordFactory, PaperKeywordFactory
+from test_reextraction import ingest, update_dictionary
+
+
+def actual_totals(session):
+    return {
+        counters.PAPERS: session.query(func.count(models.Paper.id)).scalar(),
+        counters.KEYWORDS: session.query(func.count(models.Keyword.id)).scalar(),
+        counters.LINKS: session.query(func.count()).select_from(models.PaperKeyword).scalar(),
+    }
+
+
+def stored_totals(session):
+    return counters.get_counters(session, [counters.PAPERS, counters.KEYWORDS, counters.LINKS])
+
+
+def test_write_paths_keep_the_counters_in_sync(session, update_dictionary):
+    ingest(session)
+    assert stored_totals(session) == actual_totals(session)
+    assert stored_totals(session)[counters.LINKS] > 0
+
+    update_dictionary()
+    reextract_stale_papers(session)
+    session.commit()
+    assert stored_totals(session) == actual_totals(session)
+
+    # ORMでの追加と、低品質キーワードの削除・大文字小文字の重複統合
+    paper = PaperFactory(published_at=datetime(2024, 1, 2, tzinfo=timezone.utc))
+    PaperKeywordFactory(paper=paper, keyword=KeywordFactory(name="text classification"))
+    PaperKeywordFactory(paper=paper, keyword=KeywordFactory(name="the"))
+    assert stored_totals(session) == actual_totals(session)
+    services.cleanup_low_quality_keywords(session)
+    assert stored_totals(session) == actual_totals(session)
+
+
+def test_recent_windows_match_raw_counts(session):
+    now = datetime.now(timezone.utc)
+    for hours in (1, 23, 25, 47, 24 * 6 + 23, 24 * 7 + 1, 24 * 29, 24 * 31, 24 * 90):
+        PaperFactory(published_at=now - timedelta(hours=hours))
+    session.commit()
+
+    for start in (now - timedelta(hours=24), now - timedelta(days=7), now - timedelta(days=30), now - timedelta(minutes=30)):
+        for end in (None, now - timedelta(hours=5), now - timedelta(days=3)):
+            raw = session.query(func.count(models.Paper.id)).filter(models.Paper.published_at >= start)
+            if end is not None:
+                raw = raw.filter(models.Paper.published_at < end)
+            assert counters.count_papers_since(session, start, end) == raw.scalar()
+
+
+def test_counters_are_computed_for_an_existing_corpus(client, session):
+    PaperKeywordFactory(
+        paper=PaperFactory(published_at=datetime.now(timezone.utc) - timedelta(hours=2)),
+        keyword=KeywordFactory(name="LLM")
+    )
+    session.query(models.CorpusCounter).delete()
+    session.query(models.PaperDailyCount).delete()
+    session.commit()
+    # 移行前にCLIが論文を追加すると、カウンタはその分だけの値で作られる
+    PaperFactory(published_at=datetime.now(timezone.utc) - timedelta(hours=3))
+    assert counters.get_counter(session, counters.PAPERS) == 1
+    assert client.get("/api/v1/keywords/stats").json() == {"total_keywords": 0, "total_associations": 0}
+
+    assert "corpus_counters" in run_data_migrations(session)
+    assert run_data_migrations(session) == []
+    assert client.get("/api/v1/keywords/stats").json() == {"total_keywords": 1, "total_associations": 1}
+    summary = client.get("/api/v1/dashboard/summary").json()
+    assert (summary["total_papers"], summary["recent_papers_24h"], summary["recent_papers_30d"]) == (2, 2, 2)
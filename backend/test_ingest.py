@@ -0,0 +1,226 @@
+"""
+Test cases for the bulk ingestion engine and the streaming ingest pipeline
+"""
+from datetime import datetime, timedelta, timezone
+
+import feedparser
+import pytest
+from sqlalchemy import event
+
+from app import models
+from app.ingest import (
+    BulkIngestor,
+    IngestPipeline,
+    finish_ingest_run,
+    get_ingest_checkpoint,
+    parse_entries,
+    plan_query_windows,
+    split_window,
+    start_ingest_run,
+)
+from test_api import client, session, PaperFactory
+
+
+def render_feed(papers):
+    entries = []
+    for arxiv_id, title, categories in papers:
+        tags = "".join(f'<category term="{term}"/>' for term in categories)
+        entries.append(
+            f"<entry><id>http://arxiv.org/abs/{arxiv_id}</id><published>2024-01-02T00:00:00Z</published>"
+            f"<title>{title}</title><summary>{title} for text classification.</summary>"
+            f"<author><name>Alice</name></author>{tags}</entry>"
+        )
+    xml = f'<?xml version="1.0" encoding="UTF-8"?><feed xmlns="http://www.w3.org/2005/Atom">{"".join(entries)}</feed>'
+    return feedparser.parse(xml.encode()).entries
+
+
+def test_ingest_inserts_papers_keywords_and_categories(session):
+    entries = render_feed([
+        ("2401.00001v1", "Large Language Model agents", ["cs.CL", "cs.AI"]),
+        ("2401.00002v1", "Graph Neural Network pruning", ["cs.LG"]),
+        ("2401.00003v1", "Large Language Model distillation", ["cs.CL"]),
+    ])
+
+    result = BulkIngestor(session, chunk_size=2).ingest(entries)
+    session.commit()
+
+    assert result.papers_added == 3
+    assert session.query(models.Paper).count() == 3
+    assert {kw.name for kw in session.query(models.Keyword)} >= {"Large Language Model", "Graph Neural Network"}
+    assert result.keywords_added == session.query(models.Keyword).count()
+    assert session.query(models.Category).count() == 3
+    assert session.query(models.PaperCategory).count() == 4
+
+    llm = session.query(models.Keyword).filter_by(name="Large Language Model").one()
+    assert session.query(models.PaperKeyword).filter_by(keyword_id=llm.id).count() == 2
+    assert llm.id in result.keyword_ids
+
+
+def test_ingest_skips_existing_and_duplicate_papers(session):
+    PaperFactory(arxiv_id="2401.00001v1")
+    entries = render_feed([
+        ("2401.00001v1", "Large Language Model agents", []),
+        ("2401.00002v1", "Graph Neural Network pruning", []),
+        ("2401.00002v1", "Graph Neural Network pruning", []),
+    ])
+
+    ingestor = BulkIngestor(session)
+    result = ingestor.ingest(entries)
+    session.commit()
+    assert result.papers_seen == 3
+    assert result.papers_added == 1
+    assert session.query(models.Paper).count() == 2
+
+    # 同じバッチを再度取り込んでも何も追加されない
+    assert ingestor.ingest(entries).papers_added == 0
+
+
+def test_ingest_reuses_keyword_ids_across_batches(session):
+    ingestor = BulkIngestor(session)
+    ingestor.ingest(render_feed([("2401.00001v1", "Large Language Model agents", [])]))
+
+    statements = []
+    event.listen(session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    result = ingestor.ingest(render_feed([("2401.00002v1", "Large Language Model agents", [])]))
+
+    assert result.keywords_added == 0
+    assert not any("FROM keywords" in statement for statement in statements)
+
+
+def test_parse_entries_skips_malformed_entries():
+    entries = render_feed([("2401.00001v1", "Graph Neural Network pruning", ["cs.LG"])])
+    del entries[0]["published"]
+    entries += render_feed([("2401.00002v1", "Graph Neural Network pruning", ["cs.LG"])])
+
+    records = parse_entries(entries)
+
+    assert [record["arxiv_id"] for record in records] == ["2401.00002v1"]
+    assert records[0]["categories"] == ["cs.LG"]
+
+
+def make_fetch_page(pages, session, committed_before_fetch):
+    """Fake arXiv page fetcher that records how many papers were committed before each request"""
+    def fetch_page(search_query, max_results, start):
+        committed_before_fetch.append(session.query(models.Paper).count())
+        index = start // max_results
+        return pages[index] if index < len(pages) else []
+    return fetch_page
+
+
+def test_pipeline_commits_each_page_before_fetching_the_next(session):
+    pages = [
+        render_feed([(f"2401.0000{i}v1", "Large Language Model agents", ["cs.CL"]) for i in range(page * 2, page * 2 + 2)])
+        for page in range(3)
+    ]
+    committed_before_fetch = []
+    run = start_ingest_run(session, "cat:cs.CL")
+    pipeline = IngestPipeline(session, make_fetch_page(pages, session, committed_before_fetch), page_size=2, delay_seconds=0)
+
+    result = pipeline.run("cat:cs.CL", run)
+    finish_ingest_run(session, run)
+
+    assert committed_before_fetch == [0, 2, 4, 6]
+    assert result.papers_seen == 6
+    assert result.papers_added == 6
+    assert (run.status, run.pages_fetched, run.papers_fetched, run.papers_added) == ("completed", 3, 6, 6)
+
+
+def test_fetch_progress_endpoint(client, session):
+    assert client.get("/api/v1/papers/fetch/progress").status_code == 404
+
+    run = start_ingest_run(session, "cat:cs.CL")
+    run.current_window = "2024-01"
+    run.pages_fetched = 2
+    run.papers_fetched = 2000
+    run.papers_added = 1500
+    session.commit()
+
+    response = client.get("/api/v1/papers/fetch/progress")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["run_id"] == run.id
+    assert data["status"] == "running"
+    assert data["current_window"] == "2024-01"
+    assert data["papers_added"] == 1500
+
+
+def test_checkpoint_resumes_after_a_failed_page(session):
+    pages = [
+        render_feed([(f"2401.0000{i}v1", "Large Language Model agents", ["cs.CL"]) for i in range(page * 2, page * 2 + 2)])
+        for page in range(3)
+    ]
+    window = (datetime(2024, 1, 1, tzinfo=timezone.utc), datetime(2024, 1, 31, tzinfo=timezone.utc))
+    requested_offsets = []
+
+    def flaky_fetch_page(search_query, max_results, start):
+        requested_offsets.append(start)
+        if start == 4 and requested_offsets.count(4) == 1:
+            raise ConnectionError("arXiv API unavailable")
+        index = start // max_results
+        return pages[index] if index < len(pages) else []
+
+    run = start_ingest_run(session, "cat:cs.CL")
+    pipeline = IngestPipeline(session, flaky_fetch_page, page_size=2, delay_seconds=0)
+    checkpoint = get_ingest_checkpoint(session, "cat:cs.CL", *window)
+    with pytest.raises(ConnectionError):
+        pipeline.run("cat:cs.CL", run, checkpoint=checkpoint)
+    session.rollback()
+
+    checkpoint = get_ingest_checkpoint(session, "cat:cs.CL", *window)
+    assert (checkpoint.last_offset, checkpoint.completed) == (4, False)
+
+    # 再実行は最後にコミットしたオフセットから続きを取得する
+    pipeline.run("cat:cs.CL", run, checkpoint=checkpoint)
+    assert requested_offsets == [0, 2, 4, 4, 6]
+    assert get_ingest_checkpoint(session, "cat:cs.CL", *window).completed
+    assert session.query(models.Paper).count() == 6
+    assert session.query(models.IngestCheckpoint).count() == 1
+
+
+def test_split_window_covers_the_window_without_gaps():
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    end = datetime(2024, 1, 31, 23, 59, 59, tzinfo=timezone.utc)
+
+    weeks = split_window(start, end)
+    assert len(weeks) == 5
+    assert weeks[0] == (start, datetime(2024, 1, 7, 23, 59, 59, tzinfo=timezone.utc))
+    assert weeks[-1] == (datetime(2024, 1, 29, tzinfo=timezone.utc), end)
+    assert all(b[0] - a[1] == timedelta(seconds=1) for a, b in zip(weeks, weeks[1:]))
+
+    days = split_window(*weeks[0])
+    assert len(days) == 7
+    assert split_window(*days[0]) == [days[0]]
+
+
+def test_plan_query_windows_splits_dense_ranges():
+    # 1日あたり100件、ただし1月10日だけ5000件
+    def count_results(window_start, window_end):
+        day = window_start
+        total = 0
+        while day <= window_end:
+            total += 5000 if day.day == 10 else 100
+            day += timedelta(days=1)
+        return total
+
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    end = datetime(2024, 1, 31, 23, 59, 59, tzinfo=timezone.utc)
+    windows = list(plan_query_windows(count_results, start, end, max_results=1000))
+
+    assert sum(count for _, _, count in windows) == count_results(start, end)
+    assert all(count <= 1000 or window_end - window_start < timedelta(days=1) for window_start, window_end, count in windows)
+    # 1月10日を含む週だけが日単位に分割される
+    assert len(windows) == 4 + 7
+    assert (datetime(2024, 1, 10, tzinfo=timezone.utc), datetime(2024, 1, 10, 23, 59, 59, tzinfo=timezone.utc), 5000) in windows
+
+
+def test_plan_query_windows_keeps_small_windows_whole():
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    end = datetime(2024, 1, 31, 23, 59, 59, tzinfo=timezone.utc)
+    probes = []
+
+    def count_results(window_start, window_end):
+        probes.append((window_start, window_end))
+        return 800
+
+    assert list(plan_query_windows(count_results, start, end, max_results=1000)) == [(start, end, 800)]
+    assert probes == [(start, end)]
@@ -0,0 +1,225 @@
+"""
+Test cases for background ingestion jobs
+"""
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import requests
+from sqlalchemy.orm import sessionmaker
+
+from app import harvester, models
+from app.arxiv_categories import ArxivApiError
+from app.harvester import count_papers_in_window, fetch_arxiv_page, harvest_papers, is_window_closed
+from app.ingest import start_ingest_run
+from app.ingest_jobs import IngestJobConflict, IngestJobManager, ingest_jobs
+from test_api import client, session
+from test_ingest import render_feed
+
+EMPTY_FEED = b'<?xml version="1.0" encoding="UTF-8"?><feed xmlns="http://www.w3.org/2005/Atom"></feed>'
+
+WINDOW = (datetime(2024, 1, 1, tzinfo=timezone.utc), datetime(2024, 1, 31, 23, 59, 59, tzinfo=timezone.utc))
+
+
+@pytest.fixture
+def blocking_harvest():
+    """Fake harvest that keeps the job running until released"""
+    release = threading.Event()
+
+    def harvest(db, ingest_run, start_dt, end_dt):
+        release.wait(5)
+        ingest_run.status = 'completed'
+        db.commit()
+        return 0
+
+    yield harvest, release
+    release.set()
+
+
+def test_only_one_job_runs_at_a_time(session, blocking_harvest):
+    harvest, release = blocking_harvest
+    manager = IngestJobManager(sessionmaker(bind=session.get_bind()), harvest=harvest)
+
+    job_id = manager.start(*WINDOW)
+    assert manager.running_job_id == job_id
+    with pytest.raises(IngestJobConflict) as exc_info:
+        manager.start(*WINDOW)
+    assert exc_info.value.job_id == job_id
+
+    release.set()
+    manager.wait(5)
+    assert manager.running_job_id is None
+    assert manager.start(*WINDOW) != job_id
+    manager.wait(5)
+
+
+def test_fetch_endpoint_returns_job_id_immediately(client, session, blocking_harvest, monkeypatch):
+    harvest, release = blocking_harvest
+    monkeypatch.setattr(ingest_jobs, "session_factory", sessionmaker(bind=session.get_bind()))
+    monkeypatch.setattr(ingest_jobs, "harvest", harvest)
+
+    response = client.post("/api/v1/papers/fetch", json={"start_date": "2024-01-01", "end_date": "2024-01-31"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "started"
+    job_id = data["job_id"]
+
+    # 実行中は同じジョブIDを返す
+    running = client.post("/api/v1/papers/fetch", json={}).json()
+    assert (running["status"], running["job_id"]) == ("running", job_id)
+
+    job = client.get(f"/api/v1/papers/fetch/jobs/{job_id}").json()
+    assert job["status"] == "running"
+    assert client.post(f"/api/v1/papers/fetch/jobs/{job_id}/cancel").json()["status"] == "cancelling"
+    assert client.post(f"/api/v1/papers/fetch/jobs/{job_id}/cancel").status_code == 409
+    assert client.get("/api/v1/papers/fetch/jobs/999").status_code == 404
+
+    release.set()
+    ingest_jobs.wait(5)
+
+
+def test_harvest_stops_after_the_current_page_when_cancelled(session):
+    pages = [
+        render_feed([(f"2401.0000{i}v1", "Large Language Model agents", ["cs.CL"]) for i in range(page * 2, page * 2 + 2)])
+        for page in range(3)
+    ]
+    ingest_run = start_ingest_run(session, "cat:cs.CL")
+    run_id = ingest_run.id
+
+    def fetch_page(search_query, max_results, start):
+        if start == 2:
+            # 1ページ目の保存後に別のワーカーからキャンセルされた
+            session.query(models.IngestRun).filter_by(id=run_id).update({"status": "cancelling"})
+        return pages[start // 2] if start // 2 < len(pages) else []
+
+    harvest_papers(session, ingest_run, *WINDOW, fetch_page=fetch_page, count_results=lambda start, end: 6)
+
+    ingest_run = session.get(models.IngestRun, run_id)
+    assert ingest_run.status == "cancelled"
+    assert ingest_run.finished_at is not None
+    assert ingest_run.papers_added == 4
+    assert session.query(models.IngestCheckpoint).filter_by(completed=True).count() == 0
+
+
+def test_harvest_does_not_link_keywords_removed_by_the_monthly_cleanup(session):
+    # 1月末のクリーンアップで "ML"（2文字）が削除された後も、2月の論文が削除済みのIDに関連付けられない
+    months = {
+        "202401": render_feed([("2401.00001v1", "ML for Large Language Model agents", ["cs.CL"])]),
+        "202402": render_feed([("2402.00001v1", "ML for Large Language Model agents", ["cs.CL"])]),
+    }
+    ingest_run = start_ingest_run(session, "cat:cs.CL")
+
+    def fetch_page(search_query, max_results, start):
+        month = search_query.split("submittedDate:[")[1][:6]
+        return months[month] if start == 0 else []
+
+    harvest_papers(
+        session, ingest_run, WINDOW[0], datetime(2024, 2, 29, 23, 59, 59, tzinfo=timezone.utc),
+        fetch_page=fetch_page, count_results=lambda start, end: 1
+    )
+
+    keyword_ids = {keyword.id for keyword in session.query(models.Keyword)}
+    assert session.query(models.Keyword).filter_by(name="ML").count() == 0
+    assert {link.keyword_id for link in session.query(models.PaperKeyword)} <= keyword_ids
+    assert {row.keyword_id for row in session.query(models.KeywordWeeklyCount)} <= keyword_ids
+    assert session.query(models.PaperKeyword).count() == 2
+
+
+class FakeHttpSession:
+    """Records the query parameters of arXiv API requests and answers with a fixed body"""
+
+    def __init__(self, content=EMPTY_FEED):
+        self.content = content
+        self.requests = []
+
+    def get(self, url, params, timeout):
+        self.requests.append(params)
+        response = requests.Response()
+        response.status_code = 200
+        response._content = self.content
+        return response
+
+
+def test_pages_are_requested_in_a_stable_order(monkeypatch):
+    # 関連度順（既定）ではオフセットが実行ごとに変わりうるので、再開できるよう投稿日時の昇順を指定する
+    http = FakeHttpSession()
+    monkeypatch.setattr(harvester, "get_http_session", lambda: http)
+    monkeypatch.setattr(harvester, "wait_for_rate_limit", lambda: None)
+
+    fetch_arxiv_page("cat:cs.CL", 100, start=200)
+    fetch_arxiv_page("cat:cs.CL", 100, start=300)
+    assert [(params["start"], params["sortBy"], params["sortOrder"]) for params in http.requests] == [
+        (200, "submittedDate", "ascending"), (300, "submittedDate", "ascending")
+    ]
+
+
+def test_open_windows_are_resumed_instead_of_completed(session):
+    # 今日までの取得では、後から公開される論文のために月とウィンドウを完了にしない
+    end = datetime.now(timezone.utc).replace(hour=23, minute=59, second=59, microsecond=0)
+    page = render_feed([(f"2401.0000{i}v1", "Large Language Model agents", ["cs.CL"]) for i in range(2)])
+    requested_offsets = []
+
+    def fetch_page(search_query, max_results, start):
+        requested_offsets.append(start)
+        return page if start == 0 else []
+
+    for _ in range(2):
+        harvest_papers(session, start_ingest_run(session, "cat:cs.CL"), end, end, fetch_page=fetch_page, count_results=lambda start, end: 2)
+
+    assert session.query(models.IngestCheckpoint).filter_by(completed=True).count() == 0
+    assert [checkpoint.last_offset for checkpoint in session.query(models.IngestCheckpoint)] == [2]
+    # 2回目は前回のオフセットから続きを取得する
+    assert requested_offsets == [0, 2, 2]
+    assert session.query(models.Paper).count() == 2
+
+
+def test_windows_within_the_indexing_lag_are_open():
+    now = datetime(2024, 3, 10, 12, tzinfo=timezone.utc)
+    assert is_window_closed(datetime(2024, 2, 29, 23, 59, 59, tzinfo=timezone.utc), now)
+    assert not is_window_closed(now - timedelta(hours=1), now)
+    assert not is_window_closed(now + timedelta(days=1), now)
+
+
+def count_feed(body):
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><feed xmlns="http://www.w3.org/2005/Atom" '
+        f'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">{body}</feed>'
+    ).encode()
+
+
+def test_count_probe_rejects_error_feeds_and_missing_counts(monkeypatch):
+    monkeypatch.setattr(harvester, "wait_for_rate_limit", lambda: None)
+    probes = {
+        "<opensearch:totalResults>42</opensearch:totalResults>": 42,
+        "<opensearch:totalResults>0</opensearch:totalResults>": 0,
+    }
+    for body, expected in probes.items():
+        monkeypatch.setattr(harvester, "get_http_session", lambda body=body: FakeHttpSession(count_feed(body)))
+        assert count_papers_in_window(*WINDOW) == expected
+
+    # arXivはHTTP 200でエラーフィードを返す（エラーフィードにもtotalResultsが含まれる）
+    error_feed = count_feed(
+        "<opensearch:totalResults>1</opensearch:totalResults>"
+        "<entry><id>http://arxiv.org/api/errors#malformed_query</id><title>Error</title><summary>malformed query</summary></entry>"
+    )
+    for content in (error_feed, EMPTY_FEED):
+        monkeypatch.setattr(harvester, "get_http_session", lambda content=content: FakeHttpSession(content))
+        with pytest.raises(ArxivApiError):
+            count_papers_in_window(*WINDOW)
+
+
+def test_months_with_an_empty_count_are_probed_again(session):
+    # 一時的に0件と返された月を完了にすると、以降の実行でその月が取得されなくなる
+    page = render_feed([("2401.00001v1", "Large Language Model agents", ["cs.CL"])])
+    counts = iter([0, 1])
+
+    def fetch_page(search_query, max_results, start):
+        return page if start == 0 else []
+
+    harvest_papers(session, start_ingest_run(session, "cat:cs.CL"), *WINDOW, fetch_page=fetch_page, count_results=lambda start, end: next(counts))
+    assert session.query(models.IngestCheckpoint).filter_by(completed=True).count() == 0
+    assert session.query(models.Paper).count() == 0
+
+    harvest_papers(session, start_ingest_run(session, "cat:cs.CL"), *WINDOW, fetch_page=fetch_page, count_results=lambda start, end: next(counts))
+    assert session.query(models.IngestCheckpoint).filter_by(completed=True).count() == 1
+    assert session.query(models.Paper).count() == 1
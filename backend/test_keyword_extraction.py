@@ -0,0 +1,89 @@
+"""
+Test cases for dictionary based technical term extraction
+"""
+import pytest
+from unittest.mock import patch
+
+from app import keyword_matcher
+from app.keyword_matcher import KeywordMatcher
+from app.services import (
+    SPECIALIZED_TECH_DICTIONARY,
+    extract_technical_terms_batch,
+    extract_technical_terms_from_text,
+)
+
+
+def legacy_dictionary_terms(text: str) -> set[str]:
+    """Reference implementation of the previous per-term replace loop"""
+    keywords = set()
+    text_lower = text.lower()
+    for term_lower, term_proper in sorted(SPECIALIZED_TECH_DICTIONARY.items(), key=lambda x: len(x[0]), reverse=True):
+        if term_lower in text_lower:
+            keywords.add(term_proper)
+            text_lower = text_lower.replace(term_lower, ' ')
+    return keywords
+
+
+SAMPLE_TEXTS = [
+    "We fine-tune a Large Language Model with LoRA and RLHF on GPU clusters.",
+    "A self-attention mechanism for Vision Transformer based object detection.",
+    "ChatGPT-4 and GPT-4 outperform BERT and RoBERTa on question answering.",
+    "Mask R-CNN and Faster R-CNN versus plain R-CNN for instance segmentation.",
+    "Reinforcement learning from human feedback improves reinforcement learning agents.",
+    "Storage organization for retrieval-augmented generation (RAG) pipelines.",
+    "no dictionary terms here at all",
+]
+
+
+@pytest.mark.parametrize("text", SAMPLE_TEXTS)
+def test_matcher_matches_legacy_semantics(text):
+    """Compiled matcher keeps the longest-match-wins results of the old loop"""
+    matcher = KeywordMatcher(SPECIALIZED_TECH_DICTIONARY)
+    assert set(matcher.match(text)) == legacy_dictionary_terms(text)
+
+
+@pytest.mark.parametrize("text", SAMPLE_TEXTS)
+def test_regex_fallback_matches_automaton(text):
+    """The pure Python fallback behaves like the pyahocorasick automaton"""
+    with patch.object(keyword_matcher, "ahocorasick", None):
+        fallback = KeywordMatcher(SPECIALIZED_TECH_DICTIONARY)
+    assert set(fallback.match(text)) == legacy_dictionary_terms(text)
+
+
+def test_longer_term_hides_overlapping_shorter_term():
+    """'attention mechanism' is longer than 'self-attention' and wins the overlap"""
+    keywords = extract_technical_terms_from_text("a self-attention mechanism")
+    assert "Attention Mechanism" in keywords
+    assert "Self-Attention" not in keywords
+
+
+def test_acronyms_are_extracted():
+    keywords = extract_technical_terms_from_text("THE NLP and ASR systems, not ABCDEF or RoBERTa")
+    assert "NLP" in keywords
+    assert "ASR" in keywords
+    assert "THE" not in keywords
+    assert "ABCDEF" not in keywords
+
+
+def test_batch_extraction_returns_one_list_per_text():
+    texts = ["Deep learning for computer vision", "", "Graph neural network"]
+    results = extract_technical_terms_batch(iter(texts))
+    assert len(results) == 3
+    assert set(results[0]) == {"Deep Learning", "Computer Vision"}
+    assert results[1] == []
+    assert set(results[2]) == {"Graph Neural Network"}
+
+
+def test_batch_extraction_matches_single_text_extraction():
+    results = extract_technical_terms_batch(SAMPLE_TEXTS)
+    assert [set(keywords) for keywords in results] == [set(extract_technical_terms_from_text(text)) for text in SAMPLE_TEXTS]
+
+
+@pytest.mark.parametrize("text", SAMPLE_TEXTS)
+def test_find_all_reports_every_substring_occurrence(text):
+    """find_all keeps overlapping shorter terms, with or without pyahocorasick"""
+    expected = {term for term in SPECIALIZED_TECH_DICTIONARY if term in text.lower()}
+    assert set(KeywordMatcher(SPECIALIZED_TECH_DICTIONARY).find_all(text)) == expected
+    with patch.object(keyword_matcher, "ahocorasick", None):
+        fallback = KeywordMatcher(SPECIALIZED_TECH_DICTIONARY)
+    assert set(fallback.find_all(text)) == expected
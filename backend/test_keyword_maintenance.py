@@ -0,0 +1,75 @@
+"""
+Test cases for keyword quality cleanup and case-duplicate merging
+"""
+from app import models
+from app.services import cleanup_low_quality_keywords, merge_case_duplicates
+from test_api import session, PaperFactory, KeywordFactory, PaperKeywordFactory
+
+
+def keyword_names(session):
+    return sorted(kw.name for kw in session.query(models.Keyword))
+
+
+def test_full_cleanup_removes_low_quality_keywords_and_merges_duplicates(session):
+    paper1 = PaperFactory()
+    paper2 = PaperFactory()
+    paper1_id, paper2_id = paper1.id, paper2.id
+    data = KeywordFactory(name="data")
+    upper = KeywordFactory(name="Deep Learning")
+    lower = KeywordFactory(name="deep learning")
+    PaperKeywordFactory(paper=paper1, keyword=data)
+    PaperKeywordFactory(paper=paper1, keyword=upper)
+    PaperKeywordFactory(paper=paper1, keyword=lower)
+    PaperKeywordFactory(paper=paper2, keyword=lower)
+    session.expunge_all()  # 取り込み直後と同じく関連コレクションは未ロードの状態にする
+
+    assert cleanup_low_quality_keywords(session) == 2
+
+    assert keyword_names(session) == ["Deep Learning"]
+    deep_learning = session.query(models.Keyword).filter_by(name="Deep Learning").one()
+    assert sorted(pk.paper_id for pk in session.query(models.PaperKeyword)) == sorted([paper1_id, paper2_id])
+    assert {pk.keyword_id for pk in session.query(models.PaperKeyword)} == {deep_learning.id}
+
+
+def test_scoped_cleanup_only_checks_touched_keywords(session):
+    paper = PaperFactory()
+    touched_low = KeywordFactory(name="data")
+    untouched_low = KeywordFactory(name="model")
+    touched_upper = KeywordFactory(name="Transformer")
+    untouched_lower = KeywordFactory(name="transformer")
+    untouched_pair = [KeywordFactory(name="Graph Neural Network"), KeywordFactory(name="graph neural network")]
+    for keyword in [touched_low, untouched_low, touched_upper, untouched_lower, *untouched_pair]:
+        PaperKeywordFactory(paper=paper, keyword=keyword)
+    touched_ids = [touched_low.id, touched_upper.id]
+    session.expunge_all()
+
+    removed = cleanup_low_quality_keywords(session, keyword_ids=touched_ids)
+
+    # 対象キーワードの低品質判定と、それと同名（大文字小文字違い）の統合だけが行われる
+    assert removed == 2
+    assert keyword_names(session) == ["Graph Neural Network", "Transformer", "graph neural network", "model"]
+
+
+def test_scoped_cleanup_with_no_touched_keywords_is_a_no_op(session):
+    KeywordFactory(name="data")
+    assert cleanup_low_quality_keywords(session, keyword_ids=set()) == 0
+    assert keyword_names(session) == ["data"]
+
+
+def test_merge_case_duplicates_renames_to_preferred_form_and_dedupes_links(session):
+    paper1 = PaperFactory()
+    paper2 = PaperFactory()
+    lower = KeywordFactory(name="attention mechanism")
+    upper = KeywordFactory(name="ATTENTION MECHANISM")
+    PaperKeywordFactory(paper=paper1, keyword=lower)
+    PaperKeywordFactory(paper=paper1, keyword=upper)
+    PaperKeywordFactory(paper=paper2, keyword=upper)
+    paper_ids = sorted([paper1.id, paper2.id])
+    session.expunge_all()
+
+    assert merge_case_duplicates(session) == 1
+
+    # 同じ論文への重複した関連付けは1件にまとまる
+    keyword = session.query(models.Keyword).one()
+    assert keyword.name == "ATTENTION MECHANISM"
+    assert sorted(pk.paper_id for pk in session.query(models.PaperKeyword)) == paper_ids
@@ -0,0 +1,68 @@
+"""
+Test cases for rebuilding paper-keyword associations
+"""
+from datetime import datetime, timezone
+
+from app import models
+from app.keyword_rebuild import rebuild_associations
+from app.services import rebuild_paper_keyword_associations
+from test_api import session, PaperFactory, KeywordFactory, PaperKeywordFactory
+
+
+def legacy_pairs(session) -> set[tuple[int, int]]:
+    """Reference result of the previous per-paper x per-keyword substring loop"""
+    pairs = set()
+    for paper in session.query(models.Paper):
+        paper_text = f"{paper.title} {paper.summary}".lower()
+        for keyword in session.query(models.Keyword):
+            if keyword.name.lower() in paper_text:
+                pairs.add((paper.id, keyword.id))
+    return pairs
+
+
+def linked_pairs(session) -> set[tuple[int, int]]:
+    return set(session.query(models.PaperKeyword.paper_id, models.PaperKeyword.keyword_id))
+
+
+def make_corpus():
+    PaperFactory(title="Self-Attention for Graph Neural Networks", summary="We study transformer models.")
+    PaperFactory(title="Diffusion models", summary="A score-based Diffusion Model with attention.")
+    PaperFactory(title="Unrelated", summary="Nothing to see here.")
+    for name in ["Attention", "Self-Attention", "Graph Neural Network", "transformer", "TRANSFORMER", "Diffusion Model"]:
+        KeywordFactory(name=name)
+
+
+def test_rebuild_links_every_substring_match_like_the_legacy_loop(session):
+    make_corpus()
+    paper = session.query(models.Paper).filter_by(title="Unrelated").one()
+    keyword = session.query(models.Keyword).filter_by(name="Attention").one()
+    # 既存の関連付けは重複して追加されない
+    PaperKeywordFactory(paper=paper, keyword=keyword)
+    expected = legacy_pairs(session) | {(paper.id, keyword.id)}
+
+    added = rebuild_associations(session)
+
+    assert linked_pairs(session) == expected
+    assert added == len(expected) - 1
+    assert rebuild_associations(session) == 0
+
+
+def test_process_pool_matches_in_process_rebuild(session):
+    make_corpus()
+    expected = legacy_pairs(session)
+
+    assert rebuild_associations(session, workers=2, chunk_size=1) == len(expected)
+    assert linked_pairs(session) == expected
+
+
+def test_default_rebuild_only_scans_the_latest_papers(session, monkeypatch):
+    monkeypatch.setattr("app.services.settings.latest_papers_fetch_limit", 1)
+    old = PaperFactory(title="Graph Neural Network", published_at=datetime(2023, 1, 1, tzinfo=timezone.utc))
+    new = PaperFactory(title="Graph Neural Network", published_at=datetime(2024, 1, 1, tzinfo=timezone.utc))
+    KeywordFactory(name="Graph Neural Network")
+    new_id, old_id = new.id, old.id
+
+    assert rebuild_paper_keyword_associations(session) == 1
+    assert {paper_id for paper_id, _ in linked_pairs(session)} == {new_id}
+    assert rebuild_paper_keyword_associations(session, all_papers=True) == 1
+    assert {paper_id for paper_id, _ in linked_pairs(session)} == {new_id, old_id}
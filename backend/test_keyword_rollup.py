@@ -0,0 +1,159 @@
+"""
+Test cases for the keyword weekly counts rollup
+"""
+import random
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, func, insert, inspect, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app import models, services
+from app.keyword_rebuild import reextract_stale_papers
+from app.keyword_rollup import ensure_link_dates, keyword_counts, link_values, rebuild_weekly_counts, week_start_of
+from app.migrations import init_db, run_data_migrations
+from test_api import session, PaperFactory, KeywordFactory, PaperKeywordFactory
+from test_reextraction import ingest, update_dictionary
+
+
+def rollup_rows(session):
+    return {
+        (row.keyword_id, row.week_start): row.count
+        for row in session.query(models.KeywordWeeklyCount)
+    }
+
+
+def rebuilt_rows(session):
+    """The rollup as a full rebuild from paper_keywords would produce it"""
+    expected = {}
+    for paper_id, keyword_id in session.query(models.PaperKeyword.paper_id, models.PaperKeyword.keyword_id):
+        week = week_start_of(session.get(models.Paper, paper_id).published_at)
+        expected[(keyword_id, week)] = expected.get((keyword_id, week), 0) + 1
+    return expected
+
+
+def test_links_carry_the_publication_week(session):
+    keyword = KeywordFactory(name="LLM")
+    for day in range(1, 15):
+        PaperKeywordFactory(paper=PaperFactory(published_at=datetime(2024, 1, day, 23, tzinfo=timezone.utc)), keyword=keyword)
+    links = session.query(models.PaperKeyword.published_at, models.PaperKeyword.week_start).all()
+    assert len(links) == 14
+    # 2024-01-02は火曜日
+    assert all(week_start.weekday() == 1 and timedelta(0) <= published_at.date() - week_start < timedelta(days=7)
+               for published_at, week_start in links)
+
+
+def test_link_dates_are_added_to_an_old_schema():
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE paper_keywords (paper_id INTEGER, keyword_id INTEGER, PRIMARY KEY (paper_id, keyword_id))"))
+        connection.execute(text("INSERT INTO paper_keywords VALUES (1, 1), (1, 2), (2, 1)"))
+    models.Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    published = [datetime(2024, 1, 3, tzinfo=timezone.utc), datetime(2024, 1, 9, 12, tzinfo=timezone.utc)]
+    db.execute(insert(models.Paper), [
+        {'arxiv_id': f"p{i}", 'title': "t", 'authors': [], 'summary': "s", 'published_at': published_at}
+        for i, published_at in enumerate(published)
+    ])
+    db.commit()
+
+    assert ensure_link_dates(db) is True
+    rows = set(db.query(models.PaperKeyword.paper_id, models.PaperKeyword.published_at, models.PaperKeyword.week_start))
+    assert rows == {(1, published[0], date(2024, 1, 2)), (2, published[1], date(2024, 1, 9))}
+    assert {index['name'] for index in inspect(engine).get_indexes('paper_keywords')} >= {
+        'idx_paper_keywords_keyword_week', 'idx_paper_keywords_week_keyword'
+    }
+    assert ensure_link_dates(db) is False
+    db.close()
+
+
+def test_init_db_upgrades_an_old_database_once():
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE paper_keywords (paper_id INTEGER, keyword_id INTEGER, PRIMARY KEY (paper_id, keyword_id))"))
+        connection.execute(text("CREATE TABLE keywords (id INTEGER PRIMARY KEY, name VARCHAR)"))
+        connection.execute(text(
+            "CREATE TABLE papers (id INTEGER PRIMARY KEY, arxiv_id VARCHAR, title VARCHAR, authors JSON, summary VARCHAR, published_at DATETIME)"
+        ))
+        connection.execute(text("INSERT INTO papers VALUES (1, 'p1', 't', '[]', 's', '2024-01-03 00:00:00')"))
+        connection.execute(text("INSERT INTO keywords VALUES (1, 'LLM')"))
+        connection.execute(text("INSERT INTO paper_keywords VALUES (1, 1)"))
+
+    assert init_db(engine) == ["keyword_weekly_counts", "corpus_counters", "trend_summary_papers", "tfidf_week_vectors"]
+    assert init_db(engine) == []
+    db = sessionmaker(bind=engine)()
+    assert rollup_rows(db) == {(1, date(2024, 1, 2)): 1}
+    assert services.get_summary_data(db).total_papers == 1
+    db.close()
+
+
+def test_window_counts_are_exact_at_partial_weeks(session):
+    rng = random.Random(3)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    session.execute(insert(models.Keyword), [{'name': f"Keyword {i}"} for i in range(5)])
+    published = [start + timedelta(minutes=rng.randrange(120 * 24 * 60)) for _ in range(400)]
+    session.execute(insert(models.Paper), [
+        {'arxiv_id': f"p{i}", 'title': "t", 'authors': [], 'summary': "s", 'published_at': published_at}
+        for i, published_at in enumerate(published)
+    ])
+    session.execute(insert(models.PaperKeyword), [
+        link_values(paper_id, rng.randrange(1, 6), published[paper_id - 1]) for paper_id in range(1, 401)
+    ])
+    rebuild_weekly_counts(session)
+    session.commit()
+
+    for _ in range(20):
+        lo = start + timedelta(hours=rng.randrange(120 * 24))
+        hi = lo + timedelta(hours=rng.randrange(1, 60 * 24))
+        for window in [(lo, hi), (lo, None), (None, hi)]:
+            counts = keyword_counts(*window)
+            actual = dict(session.execute(select(counts.c.keyword_id, counts.c.count)).all())
+            raw = (
+                session.query(models.PaperKeyword.keyword_id, func.count())
+                .join(models.Paper, models.Paper.id == models.PaperKeyword.paper_id)
+                .group_by(models.PaperKeyword.keyword_id)
+            )
+            if window[0]:
+                raw = raw.filter(models.Paper.published_at >= window[0])
+            if window[1]:
+                raw = raw.filter(models.Paper.published_at < window[1])
+            assert actual == dict(raw.all())
+
+
+def test_write_paths_keep_the_rollup_in_sync(session, update_dictionary):
+    ingest(session)
+    assert rollup_rows(session) == rebuilt_rows(session) != {}
+
+    update_dictionary()
+    reextract_stale_papers(session)
+    assert rollup_rows(session) == rebuilt_rows(session)
+
+    # 低品質キーワードの削除と大文字小文字の重複統合
+    paper = PaperFactory(published_at=datetime(2024, 1, 2, tzinfo=timezone.utc))
+    PaperKeywordFactory(paper=paper, keyword=KeywordFactory(name="text classification"))
+    PaperKeywordFactory(paper=paper, keyword=KeywordFactory(name="the"))
+    services.cleanup_low_quality_keywords(session)
+    assert rollup_rows(session) == rebuilt_rows(session)
+    text_classification = session.query(models.Keyword).filter_by(name="Text Classification").one()
+    assert rollup_rows(session)[(text_classification.id, week_start_of(paper.published_at))] == 4
+
+
+def test_orm_links_and_missing_rollup_are_counted(session):
+    keyword = KeywordFactory(name="LLM")
+    paper = PaperFactory(published_at=datetime(2024, 3, 6, tzinfo=timezone.utc))
+    link = PaperKeywordFactory(paper=paper, keyword=keyword)
+    assert rollup_rows(session) == {(keyword.id, week_start_of(paper.published_at)): 1}
+
+    session.delete(link)
+    session.commit()
+    assert rollup_rows(session) == {}
+
+    PaperKeywordFactory(paper=paper, keyword=keyword)
+    session.query(models.KeywordWeeklyCount).delete()
+    session.commit()
+    # 移行前にCLIが関連付けを追加すると、週次集計は一部だけ埋まった状態になる
+    PaperKeywordFactory(paper=PaperFactory(published_at=datetime(2024, 3, 20, tzinfo=timezone.utc)), keyword=keyword)
+    assert rollup_rows(session) and rollup_rows(session) != rebuilt_rows(session)
+
+    assert "keyword_weekly_counts" in run_data_migrations(session)
+    assert rollup_rows(session) == rebuilt_rows(session)
+    assert run_data_migrations(session) == []
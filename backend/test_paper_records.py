@@ -0,0 +1,108 @@
+"""
+Test cases for the batched paper records used by the AI analysis endpoints
+"""
+import asyncio
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+from sqlalchemy import event
+
+from app import models, schemas, services
+from test_api import session, PaperFactory, KeywordFactory, PaperKeywordFactory
+
+
+@contextmanager
+def count_queries(session):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = session.get_bind()
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+
+def add_papers(session, count: int, published_at: datetime) -> list[models.Paper]:
+    keywords = [KeywordFactory(name=f"keyword {i}") for i in range(4)]
+    papers = []
+    for i in range(count):
+        paper = PaperFactory(published_at=published_at - timedelta(minutes=i))
+        for keyword in keywords[:i % 4 + 1]:
+            PaperKeywordFactory(paper=paper, keyword=keyword)
+        papers.append(paper)
+    session.commit()
+    return papers
+
+
+def test_records_are_loaded_with_two_queries(session):
+    papers = add_papers(session, 30, datetime(2024, 3, 1, tzinfo=timezone.utc))
+    query = session.query(models.Paper).order_by(models.Paper.published_at.desc())
+
+    with count_queries(session) as statements:
+        records = services.load_paper_records(session, query)
+    assert len(statements) == 2
+
+    assert [record['id'] for record in records] == [paper.id for paper in papers]
+    for record, paper in zip(records, papers):
+        assert sorted(record['keywords']) == sorted(pk.keyword.name for pk in paper.keywords)
+        assert record['published_at'] == paper.published_at.isoformat()
+        assert services.to_paper_response(record).published_at == paper.published_at
+
+
+def test_top_keywords_are_counted_in_sql(session):
+    paper_ids = [paper.id for paper in add_papers(session, 8, datetime(2024, 3, 1, tzinfo=timezone.utc))]
+    with count_queries(session) as statements:
+        top = services.get_top_keywords_for_papers(session, paper_ids, limit=3)
+    assert len(statements) == 1
+    assert top == [
+        {"keyword": "keyword 0", "count": 8},
+        {"keyword": "keyword 1", "count": 6},
+        {"keyword": "keyword 2", "count": 4},
+    ]
+
+
+def test_trend_summary_queries_do_not_grow_with_papers(session):
+    mock_service = AsyncMock()
+    mock_service.generate_weekly_trend_overview.return_value = "Summary text"
+    request = schemas.TrendSummaryRequest(
+        title="March", period_start="2024-03-01", period_end="2024-03-01", paper_count=100
+    )
+
+    query_counts = []
+    for count in (10, 40):
+        add_papers(session, count, datetime(2024, 3, 1, 12, tzinfo=timezone.utc))
+        with patch('app.services.get_ai_service', return_value=mock_service), count_queries(session) as statements:
+            created = asyncio.run(services.create_trend_summary(session, request))
+        query_counts.append(len(statements))
+        assert created.id and len(created.papers) == created.paper_count
+        assert created.top_keywords[0] == {"keyword": "keyword 0", "count": created.paper_count}
+
+        with count_queries(session) as statements:
+            services.get_trend_summary_by_id(session, created.id)
+        assert len(statements) == 3
+        session.query(models.PaperKeyword).delete()
+        session.query(models.Paper).delete()
+        session.query(models.Keyword).delete()
+        session.commit()
+
+    assert query_counts[0] == query_counts[1]
+
+
+def test_topic_summary_papers_include_their_keywords(session):
+    add_papers(session, 12, datetime.now(timezone.utc) - timedelta(hours=1))
+    mock_service = AsyncMock()
+    mock_service.generate_topic_summary.return_value = {'topic_name': "Keyword 3", 'summary': "Summary", 'key_findings': []}
+
+    with patch('app.services.get_ai_service', return_value=mock_service), count_queries(session) as statements:
+        result = asyncio.run(services.get_topic_summary(session, ["keyword 3"], "en"))
+    # キャッシュの確認、論文とキーワード、件数、キャッシュへの保存
+    assert len(statements) == 5
+    analyzed = mock_service.generate_topic_summary.call_args.args[1]
+    assert len(analyzed) == result.related_paper_count == 3
+    assert all(paper['keywords'] == [f"keyword {i}" for i in range(4)] for paper in analyzed)
+    assert [paper.keywords for paper in result.papers] == [paper['keywords'] for paper in analyzed]
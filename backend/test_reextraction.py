@@ -0,0 +1,114 @@
+"""
+Test cases for versioned keyword extraction and incremental re-extraction
+"""
+import pytest
+
+from app import models, services
+from app.ingest import BulkIngestor
+from app.keyword_matcher import KeywordMatcher
+from app.keyword_rebuild import reextract_stale_papers
+from test_api import session, PaperFactory
+from test_ingest import render_feed
+
+
+def ingest(session):
+    BulkIngestor(session).ingest(render_feed([
+        ("2401.00001v1", "Large Language Model agents", []),
+        ("2401.00002v1", "Graph Neural Network pruning", []),
+        ("2401.00003v1", "Diffusion Model sampling", []),
+    ]))
+    session.commit()
+    return {paper.arxiv_id: paper.id for paper in session.query(models.Paper)}
+
+
+def linked_names(session, paper_id):
+    return {
+        name for name, in
+        session.query(models.Keyword.name)
+        .join(models.PaperKeyword, models.PaperKeyword.keyword_id == models.Keyword.id)
+        .filter(models.PaperKeyword.paper_id == paper_id)
+    }
+
+
+@pytest.fixture
+def update_dictionary(monkeypatch):
+    """Dictionary update: 'text classification' is added and 'graph neural network' is dropped"""
+    def update():
+        dictionary = dict(services.SPECIALIZED_TECH_DICTIONARY)
+        dictionary['text classification'] = 'Text Classification'
+        del dictionary['graph neural network']
+        monkeypatch.setattr(services, "SPECIALIZED_TECH_DICTIONARY", dictionary)
+        monkeypatch.setattr(services, "TECHNICAL_TERM_MATCHER", KeywordMatcher(dictionary))
+    return update
+
+
+def test_ingestion_records_the_extractor_version(session):
+    paper_ids = ingest(session)
+
+    extraction = session.get(models.PaperExtraction, paper_ids["2401.00002v1"])
+    assert extraction.extractor_version == services.get_keyword_extractor_version()
+    assert extraction.content_hash == services.get_paper_content_hash(
+        "Graph Neural Network pruning", "Graph Neural Network pruning for text classification."
+    )
+    assert extraction.keywords == ["Graph Neural Network"]
+    assert reextract_stale_papers(session).papers_processed == 0
+
+
+def test_dictionary_update_relinks_only_the_affected_papers(session, update_dictionary):
+    paper_ids = ingest(session)
+    legacy = PaperFactory(title="Large Language Model survey", summary="No extraction record yet.")
+    legacy_id = legacy.id
+    update_dictionary()
+
+    result = reextract_stale_papers(session)
+
+    assert result.papers_processed == 4
+    # 取り込み済みの論文には新しい用語が現れ、記録のない論文は初めて記録される。消えた用語の関連付けだけが削除される
+    assert result.papers_changed == 4
+    assert result.links_removed == 1
+    assert linked_names(session, paper_ids["2401.00002v1"]) == {"Text Classification"}
+    assert linked_names(session, paper_ids["2401.00001v1"]) == {"Large Language Model", "Text Classification"}
+    assert linked_names(session, legacy_id) == {"Large Language Model"}
+    version = services.get_keyword_extractor_version()
+    assert {e.extractor_version for e in session.query(models.PaperExtraction)} == {version}
+    assert reextract_stale_papers(session).papers_processed == 0
+
+
+def test_reextraction_resumes_after_a_stop(session, update_dictionary):
+    ingest(session)
+    update_dictionary()
+
+    first = reextract_stale_papers(session, chunk_size=1, should_stop=lambda: True)
+    assert first.papers_processed == 1
+
+    rest = reextract_stale_papers(session, chunk_size=1)
+    assert rest.papers_processed == 2
+
+
+def test_process_pool_reextraction(session):
+    paper_ids = ingest(session)
+    session.query(models.PaperExtraction).update({"extractor_version": "old", "keywords": []})
+    session.commit()
+
+    result = reextract_stale_papers(session, workers=2, chunk_size=1)
+
+    assert result.papers_processed == 3
+    assert result.links_added == 0  # 既存の関連付けはそのまま
+    assert linked_names(session, paper_ids["2401.00003v1"]) == {"Diffusion Model"}
+    assert session.query(models.PaperExtraction).filter_by(extractor_version="old").count() == 0
+
+
+def test_edited_paper_is_reextracted(session):
+    paper_ids = ingest(session)
+    paper = session.get(models.Paper, paper_ids["2401.00003v1"])
+    paper.summary = "Diffusion Model sampling with Reinforcement Learning."
+    session.commit()
+
+    result = reextract_stale_papers(session)
+
+    assert result.papers_processed == 1
+    assert linked_names(session, paper_ids["2401.00003v1"]) == {"Diffusion Model", "Reinforcement Learning"}
+    assert session.get(models.PaperExtraction, paper_ids["2401.00003v1"]).content_hash == services.get_paper_content_hash(
+        paper.title, paper.summary
+    )
+    assert reextract_stale_papers(session).papers_processed == 0
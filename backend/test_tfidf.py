@@ -0,0 +1,121 @@
+"""
+Test cases for the TF-IDF distinctive terms engine
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app import models, services
+from app.harvester import harvest_papers
+from app.ingest import start_ingest_run
+from app.keyword_rollup import week_start_of
+from app.migrations import run_data_migrations
+from app.tfidf import get_distinctive_terms, get_week_vectors, refresh_week_vectors, week_start
+from test_api import session, PaperFactory
+from test_ingest import render_feed
+
+TARGET_WEEK = datetime(2024, 3, 5, tzinfo=timezone.utc)  # 火曜日（キーワードトレンドと同じ週の始まり）
+
+
+def add_papers(week, texts):
+    for i, text in enumerate(texts):
+        PaperFactory(title=text, summary="We evaluate the approach on standard benchmarks.", published_at=week + timedelta(days=i % 5, hours=9))
+
+
+def build_corpus():
+    for w in range(1, 5):
+        add_papers(TARGET_WEEK - timedelta(weeks=w), ["Graph neural networks for molecules"] * 4 + ["Reinforcement learning agents"] * 2)
+    add_papers(TARGET_WEEK, ["Speculative decoding"] * 5 + ["Graph neural networks for molecules"] * 2)
+    refresh_week_vectors(PaperFactory._meta.sqlalchemy_session)
+
+
+def test_week_start_matches_the_keyword_trend_weeks():
+    assert week_start(datetime(2024, 3, 11, 23, 59, tzinfo=timezone.utc)) == TARGET_WEEK
+    assert week_start(datetime(2024, 3, 5)) == TARGET_WEEK
+    assert week_start(datetime(2024, 3, 4, 12, tzinfo=timezone.utc)).date() == week_start_of(datetime(2024, 3, 4, 12, tzinfo=timezone.utc))
+
+
+def test_over_represented_phrases_rank_first(session):
+    build_corpus()
+
+    terms = get_distinctive_terms(session, TARGET_WEEK, TARGET_WEEK + timedelta(days=6), limit=5, baseline_weeks=4, min_doc_freq=2)
+
+    names = [term.term for term in terms]
+    assert names[0] == "speculative decoding"
+    assert terms[0].doc_freq == 5
+    assert terms[0].baseline_doc_freq == 0
+    assert "speculative" not in names and "decoding" not in names  # 選ばれたフレーズの一部
+    assert not any("graph" in name or "benchmarks" in name for name in names)  # ベースラインと同程度かそれ以下
+
+
+def test_terms_once_per_baseline_week_keep_their_baseline(session):
+    # 各ベースライン週に1件ずつ出る語は、週ごとに間引くとベースライン0件になり誤って上位に来る
+    for w in range(1, 5):
+        add_papers(TARGET_WEEK - timedelta(weeks=w), ["Mixture of experts"] + ["Graph neural networks"] * 3)
+    add_papers(TARGET_WEEK, ["Mixture of experts"] * 2 + ["Speculative decoding"] * 2 + ["Graph neural networks"] * 3)
+    refresh_week_vectors(session)
+
+    terms = get_distinctive_terms(session, TARGET_WEEK, TARGET_WEEK + timedelta(days=6), limit=5, baseline_weeks=4, min_doc_freq=2)
+
+    by_name = {term.term: term for term in terms}
+    assert terms[0].term == "speculative decoding"
+    assert (by_name["mixture of experts"].doc_freq, by_name["mixture of experts"].baseline_doc_freq) == (2, 4)
+    assert by_name["mixture of experts"].score < terms[0].score
+
+
+def test_vectors_are_built_once_for_an_existing_corpus(session):
+    add_papers(TARGET_WEEK, ["Speculative decoding"] * 3)
+    session.query(models.SchemaMigration).delete()
+    session.commit()
+
+    assert "tfidf_week_vectors" in run_data_migrations(session)
+    assert [vector.paper_count for vector in get_week_vectors(session, [TARGET_WEEK]).values()] == [3]
+    assert run_data_migrations(session) == []
+
+
+def test_refresh_rebuilds_only_changed_weeks(session):
+    build_corpus()
+    weeks = [TARGET_WEEK - timedelta(weeks=1), TARGET_WEEK]
+    updated_at = [get_week_vectors(session, weeks)[week].updated_at for week in weeks]
+    session.add(models.WeeklyTermVector(week_start=TARGET_WEEK - timedelta(days=1), paper_count=1, term_ids=b"", doc_freqs=b""))
+    session.commit()
+
+    add_papers(TARGET_WEEK, ["Speculative decoding"])
+    assert refresh_week_vectors(session) == 1
+
+    vectors = get_week_vectors(session, weeks)
+    assert vectors[weeks[0]].updated_at == updated_at[0]
+    assert vectors[TARGET_WEEK].paper_count == 8
+    # 月曜始まりの古いベクトルは削除される
+    assert session.query(models.WeeklyTermVector).count() == 5
+
+
+def test_reads_do_not_build_vectors(session):
+    add_papers(TARGET_WEEK, ["Speculative decoding"] * 5)
+
+    assert get_distinctive_terms(session, TARGET_WEEK, TARGET_WEEK + timedelta(days=6), min_doc_freq=2) == []
+    assert session.query(models.WeeklyTermVector).count() == 0
+
+
+def test_harvest_builds_the_vectors_of_the_ingested_weeks(session):
+    entries = render_feed([(f"2401.0000{i}v1", "Speculative decoding", []) for i in range(3)])
+    ingest_run = start_ingest_run(session, "cat:cs.CL")
+
+    harvest_papers(
+        session, ingest_run, datetime(2024, 1, 1, tzinfo=timezone.utc), datetime(2024, 1, 31, tzinfo=timezone.utc),
+        fetch_page=lambda query, max_results, start: entries if start == 0 else [], count_results=lambda start, end: 3
+    )
+
+    vector = get_week_vectors(session, [week_start(datetime(2024, 1, 2, tzinfo=timezone.utc))])
+    assert [v.paper_count for v in vector.values()] == [3]
+
+
+def test_fallback_topic_keywords_use_distinctive_terms(session, monkeypatch):
+    now = TARGET_WEEK + timedelta(days=6)
+    monkeypatch.setattr(services, "get_utc_now", lambda: now)
+    build_corpus()
+
+    response = asyncio.run(services.get_fallback_topic_keywords(session, TARGET_WEEK, 5, 7))
+
+    assert response.keywords[0].keyword == "speculative decoding"
+    assert response.keywords[0].paper_count == 5
+    assert response.keywords[0].relevance_score == 100.0
@@ -0,0 +1,70 @@
+"""
+Test cases for the papers stored with each trend summary
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+from app import models, schemas, services
+from test_api import client, session, PaperFactory
+from test_paper_records import add_papers, count_queries
+
+
+def create_summary(session, paper_count: int = 10) -> schemas.TrendSummaryResponse:
+    mock_service = AsyncMock()
+    mock_service.generate_weekly_trend_overview.return_value = "Summary text"
+    request = schemas.TrendSummaryRequest(
+        title="March", period_start="2024-03-01", period_end="2024-03-01", paper_count=paper_count
+    )
+    with patch('app.services.get_ai_service', return_value=mock_service):
+        return asyncio.run(services.create_trend_summary(session, request))
+
+
+def test_summary_reads_return_the_analyzed_papers(client, session):
+    add_papers(session, 15, datetime(2024, 3, 1, 12, tzinfo=timezone.utc))
+    created = create_summary(session, paper_count=10)
+    analyzed = [paper.id for paper in created.papers]
+    assert len(analyzed) == 10
+
+    # 後から同じ期間に論文が増えても、分析時の論文をその順番で返す
+    PaperFactory(published_at=datetime(2024, 3, 1, 13, tzinfo=timezone.utc))
+    session.commit()
+    detail = client.get(f"/api/v1/trend-summary/{created.id}").json()
+    assert [paper["id"] for paper in detail["papers"]] == analyzed
+    assert detail["papers"][0]["keywords"] == created.papers[0].keywords
+
+    page = client.get(f"/api/v1/trend-summary/{created.id}/papers?skip=3&limit=4").json()
+    assert page["total_count"] == 10
+    assert [paper["id"] for paper in page["papers"]] == analyzed[3:7]
+    assert client.get("/api/v1/trend-summary/999/papers").status_code == 404
+
+    assert client.delete(f"/api/v1/trend-summary/{created.id}").status_code == 200
+    assert session.query(models.TrendSummaryPaper).count() == 0
+
+
+def test_summary_list_does_not_load_papers(client, session):
+    add_papers(session, 12, datetime(2024, 3, 1, 12, tzinfo=timezone.utc))
+    for _ in range(3):
+        create_summary(session)
+
+    with count_queries(session) as statements:
+        listed = client.get("/api/v1/trend-summaries").json()
+    assert len(statements) == 2
+    assert listed["total_count"] == 3
+    assert all(summary["papers"] is None for summary in listed["summaries"])
+
+
+def test_existing_summaries_get_their_papers(session):
+    period_start = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    papers = add_papers(session, 6, period_start + timedelta(hours=12))
+    paper_ids = [paper.id for paper in papers]
+    summary = models.TrendSummary(
+        title="Old", period_start=period_start, period_end=period_start + timedelta(hours=23),
+        paper_count=4, summary="Old summary", key_insights=[], top_keywords=[], language="ja"
+    )
+    session.add(summary)
+    session.commit()
+
+    assert services.ensure_trend_summary_papers(session) == 1
+    assert services.ensure_trend_summary_papers(session) == 0
+    assert [paper.id for paper in services.get_trend_summary_by_id(session, summary.id).papers] == paper_ids[:4]
@@ -89,10 +89,22 @@ const Dashboard: React.FC = () => {
         end_date: new Date().toISOString().split('T')[0]
       });
       
-      if (response.status === 'success') {
-        setFetchMessage(
-          `✅ ${response.total_fetched}件の新しい論文を取得しました (処理時間: ${PaperFetchService.formatProcessingTime(response.processing_time)})`
-        );
+      if (response.job_id != null) {
+        // バックグラウンドジョブの完了までポーリング
+        const startedAt = Date.now();
+        const job = await PaperFetchService.waitForFetchJob(response.job_id, (progress) => {
+          setFetchMessage(`⏳ 論文を取得中... ${progress.papers_added}件追加 (${progress.current_window ?? ''})`);
+        });
+        const processingTime = (Date.now() - startedAt) / 1000;
+        if (job.status === 'completed') {
+          setFetchMessage(
+            `✅ ${job.papers_added}件の新しい論文を取得しました (処理時間: ${PaperFetchService.formatProcessingTime(processingTime)})`
+          );
+        } else if (job.status === 'cancelled') {
+          setFetchMessage(`⚠️ 論文取得はキャンセルされました (${job.papers_added}件追加済み)`);
+        } else {
+          setFetchMessage(`❌ 論文取得に失敗しました: ${job.error_message ?? job.status}`);
+        }
         // 情報を更新
         await fetchLatestPaperInfo();
         // サマリーも更新
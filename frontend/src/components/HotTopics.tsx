@@ -24,7 +24,7 @@ const HotTopics: React.FC = () => {
     sortOrder: 'desc',
   });
 
-  const fetchHotTopics = async (requestParams?: HotTopicsRequest) => {
+  const fetchHotTopics = async (requestParams?: HotTopicsRequest, forceRegenerate: boolean = false) => {
     try {
       setLoading(true);
       setError(null);
@@ -40,7 +40,8 @@ const HotTopics: React.FC = () => {
         throw new Error(validationErrors.join(', '));
       }
 
-      const response = await HotTopicsService.getHotTopicsSummary(request);
+      // Cached results are returned until new papers arrive; Refresh asks for a new analysis
+      const response = await HotTopicsService.getHotTopicsSummary({ ...request, force_regenerate: forceRegenerate });
       setHotTopics(response);
       
     } catch (err) {
@@ -106,7 +107,7 @@ const HotTopics: React.FC = () => {
           <Button
             variant="primary"
             size="sm"
-            onClick={() => fetchHotTopics()}
+            onClick={() => fetchHotTopics(undefined, true)}
             disabled={loading}
           >
             {loading ? (
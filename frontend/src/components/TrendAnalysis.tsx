@@ -2,7 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { Form, Button, Row, Col, Card, Spinner, Alert } from 'react-bootstrap';
 import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer } from 'recharts';
 import { useTranslation } from 'react-i18next';
-import { TrendResult, TrendDataPoint } from '../types';
+import { TrendResult } from '../types';
 
 const TrendAnalysis: React.FC = () => {
   const { t } = useTranslation();
@@ -53,22 +53,8 @@ const TrendAnalysis: React.FC = () => {
       }
       const data: TrendResult[] = await response.json();
 
-      // Fill in missing dates with count 0 for each keyword
-      const allDates = new Set<string>();
-      data.forEach(trend => trend.data.forEach(dp => allDates.add(dp.date)));
-      const sortedDates = Array.from(allDates).sort();
-
-      const filledData = data.map(trend => {
-        const dataMap = new Map<string, number>();
-        trend.data.forEach(dp => dataMap.set(dp.date, dp.count));
-        const filledTrendData: TrendDataPoint[] = sortedDates.map(date => ({
-          date,
-          count: dataMap.get(date) || 0,
-        }));
-        return { ...trend, data: filledTrendData };
-      });
-
-      setTrendData(filledData);
+      // Weeks without papers are already filled with count 0 by the API
+      setTrendData(data);
     } catch (e: any) {
       setError(e.message);
     } finally {
@@ -35,6 +35,11 @@ interface TrendSummaryListResponse {
   total_count: number;
 }
 
+interface TrendSummaryPapersResponse {
+  papers: PaperReference[];
+  total_count: number;
+}
+
 const TrendSummary: React.FC = () => {
   const { t } = useTranslation();
   const { settings } = useSettings();
@@ -169,9 +174,29 @@ const TrendSummary: React.FC = () => {
     return new Date(dateString).toLocaleDateString('ja-JP');
   };
 
-  const handleSummaryClick = (summary: TrendSummaryData) => {
+  const handleSummaryClick = async (summary: TrendSummaryData) => {
     setSelectedSummary(summary);
     setShowDetailModal(true);
+    if (summary.papers) {
+      return;
+    }
+
+    // The list response omits papers; load the analyzed papers for this summary
+    try {
+      const limit = Math.min(Math.max(summary.paper_count, 1), 500);
+      const response = await fetch(`/api/v1/trend-summary/${summary.id}/papers?limit=${limit}`);
+
+      if (!response.ok) {
+        throw new Error(`Failed to fetch summary papers: ${response.statusText}`);
+      }
+
+      const data: TrendSummaryPapersResponse = await response.json();
+      const withPapers = (item: TrendSummaryData) => (item.id === summary.id ? { ...item, papers: data.papers } : item);
+      setSummaries(prev => prev.map(withPapers));
+      setSelectedSummary(prev => (prev ? withPapers(prev) : prev));
+    } catch (err) {
+      setError(err instanceof Error ? err.message : 'An error occurred');
+    }
   };
 
   const handleDeleteClick = (summary: TrendSummaryData, event: React.MouseEvent) => {
@@ -16,6 +16,7 @@ export class HotTopicsService {
       if (params.language) queryParams.append('language', params.language);
       if (params.days) queryParams.append('days', params.days.toString());
       if (params.max_topics) queryParams.append('max_topics', params.max_topics.toString());
+      if (params.force_regenerate) queryParams.append('force_regenerate', 'true');
 
       const url = `${API_BASE_URL}/api/v1/hot-topics/summary${queryParams.toString() ? '?' + queryParams.toString() : ''}`;
       
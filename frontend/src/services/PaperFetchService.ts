@@ -1,4 +1,4 @@
-import { PaperFetchRequest, PaperFetchResponse, LatestPaperInfo } from '../types';
+import { PaperFetchRequest, PaperFetchResponse, PaperFetchJob, LatestPaperInfo } from '../types';
 
 export class PaperFetchService {
   /**
@@ -20,6 +20,37 @@ export class PaperFetchService {
     return response.json();
   }
 
+  /**
+   * Get the progress of a background fetch job
+   */
+  static async getFetchJob(jobId: number): Promise<PaperFetchJob> {
+    const response = await fetch(`/api/v1/papers/fetch/jobs/${jobId}`);
+
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    return response.json();
+  }
+
+  /**
+   * Poll a background fetch job until it finishes
+   */
+  static async waitForFetchJob(
+    jobId: number,
+    onProgress?: (job: PaperFetchJob) => void,
+    intervalMs: number = 3000
+  ): Promise<PaperFetchJob> {
+    while (true) {
+      const job = await PaperFetchService.getFetchJob(jobId);
+      onProgress?.(job);
+      if (job.status !== 'running' && job.status !== 'cancelling') {
+        return job;
+      }
+      await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+  }
+
   /**
    * Get latest paper date and total count
    */
@@ -106,6 +106,8 @@ export interface RecentTrendResponse {
   total_papers_analyzed: number;
   generated_at: string;
   papers?: Paper[];
+  cache_age_seconds?: number | null;  // Age of a cached result
+  revalidating?: boolean;  // A background refresh is running
 }
 
 // Topic Keywords Types
@@ -127,6 +129,8 @@ export interface TopicKeywordsResponse {
   analysis_period: string;
   total_papers_analyzed: number;
   generated_at: string;
+  cache_age_seconds?: number | null;  // Age of a cached result
+  revalidating?: boolean;  // A background refresh is running
 }
 
 // Topic Summary Types
@@ -145,6 +149,8 @@ export interface TopicSummaryResponse {
   key_findings: string[];
   generated_at: string;
   papers?: Paper[];
+  cache_age_seconds?: number | null;  // Age of a cached result
+  revalidating?: boolean;  // A background refresh is running
 }
 
 // Legacy Hot Topics Types (for backward compatibility)
@@ -170,6 +176,7 @@ export interface HotTopicsRequest {
   language?: string;
   days?: number;
   max_topics?: number;
+  force_regenerate?: boolean;
 }
 
 export interface HotTopicsResponse {
@@ -177,6 +184,8 @@ export interface HotTopicsResponse {
   analysis_period_days: number;
   total_papers_analyzed: number;
   generated_at: string;
+  cache_age_seconds?: number | null;  // Age of a cached result
+  revalidating?: boolean;  // A background refresh is running
 }
 
 export interface HotTopicsFilters {
@@ -194,10 +203,24 @@ export interface PaperFetchRequest {
 }
 
 export interface PaperFetchResponse {
-  status: string;
+  status: string; // started / running / error
   message: string;
   total_fetched: number;
   processing_time: number;
+  job_id?: number | null;
+}
+
+export interface PaperFetchJob {
+  run_id: number;
+  status: string; // running / cancelling / completed / failed / cancelled
+  current_window: string | null;
+  pages_fetched: number;
+  papers_fetched: number;
+  papers_added: number;
+  error_message: string | null;
+  started_at: string | null;
+  updated_at: string | null;
+  finished_at: string | null;
 }
 
 export interface LatestPaperInfo {